@@ -182,11 +182,13 @@ class FlowHandlersMixin:
             status_code = result.get("status_code", 500)
             self._send_response(APIResponse(False, error=result.get("error")), status_code)
 
-    def _run_flow(self, flow_id: str, inputs: dict, timeout: float) -> dict:
+    def _run_flow(self, flow_id: str, inputs: dict, timeout: float, stream_key: str | None = None) -> dict:
         """
         Flow を実行し結果を返す（共通メソッド）。
 
         Flow実行API と Pack独自ルートの両方から呼ばれる。
+        stream_key を指定すると、ctx[stream_key] が OutputStream の場合に
+        返り値の "stream" に入れる（Pack独自ルートのストリーム中継用）。
         """
         # ---- T-015: 防御的バリデーション（Pack独自ルートから直接呼ばれる場合に備える） ----
         if not isinstance(flow_id, str) or not _RE_FLOW_ID.match(flow_id):
@@ -297,12 +299,18 @@ class FlowHandlersMixin:
             except Exception:
                 pass
 
-            return {
+            response = {
                 "success": True,
                 "flow_id": flow_id,
                 "result": result_data,
                 "execution_time": elapsed,
             }
+            if stream_key and isinstance(ctx, dict):
+                from ..output_stream import OutputStream
+                stream = ctx.get(stream_key)
+                if isinstance(stream, OutputStream):
+                    response["stream"] = stream
+            return response
         except Exception as e:
             _log_internal_error("run_flow", e)
             return {
@@ -1,6 +1,7 @@
 """Pack 独自ルート ハンドラ Mixin"""
 from __future__ import annotations
 
+import json
 import logging
 import re
 from urllib.parse import unquote
@@ -107,6 +108,9 @@ class RouteHandlersMixin:
                     "description": route.get("description", ""),
                     "input_mapping": route.get("input_mapping", {}),
                 }
+                stream_key = route.get("stream")
+                if isinstance(stream_key, str) and stream_key:
+                    route_info["stream"] = stream_key
 
                 # テンプレート判定 → 正規表現コンパイル or 完全一致登録
                 compiled = _compile_template_path(path)
@@ -209,8 +213,16 @@ class RouteHandlersMixin:
                     if param_name in path_params:
                         inputs[target_key] = path_params[param_name]
 
-        result = self._run_flow(flow_id, inputs, timeout=300)
+        stream_key = route_info.get("stream")
+        if stream_key:
+            result = self._run_flow(flow_id, inputs, timeout=300, stream_key=stream_key)
+        else:
+            result = self._run_flow(flow_id, inputs, timeout=300)
         if result.get("success"):
+            stream = result.pop("stream", None)
+            if stream is not None:
+                self._send_output_stream(stream)
+                return
             self._send_response(APIResponse(True, result))
         else:
             status_code = result.get("status_code", 500)
@@ -218,6 +230,63 @@ class RouteHandlersMixin:
                 APIResponse(False, error=result.get("error")), status_code,
             )
 
+    def _send_output_stream(self, stream) -> None:
+        """OutputStream のチャンクを届いた順に中継する。
+
+        Accept に ``text/event-stream`` を含む場合は SSE（``data:`` 行、終端は
+        ``event: end``）、それ以外は NDJSON（1 行 1 チャンク）で返す。
+        HTTP/1.1 では chunked 転送、HTTP/1.0 では接続断で終端を示す。
+        クライアントが切断した場合はストリームを close() して生産側を止める。
+        """
+        sse = "text/event-stream" in self.headers.get("Accept", "")
+        chunked = self.request_version != "HTTP/1.0"
+
+        def _frame(data: bytes) -> bytes:
+            if not chunked:
+                return data
+            return b"%X\r\n%s\r\n" % (len(data), data)
+
+        def _encode(event: str | None, payload) -> bytes:
+            text = json.dumps(payload, ensure_ascii=False, default=str)
+            if not sse:
+                return (text + "\n").encode("utf-8")
+            head = f"event: {event}\n" if event else ""
+            return (head + f"data: {text}\n\n").encode("utf-8")
+
+        self.send_response(200)
+        self.send_header(
+            "Content-Type",
+            "text/event-stream; charset=utf-8" if sse else "application/x-ndjson; charset=utf-8",
+        )
+        self.send_header("Cache-Control", "no-cache")
+        if chunked:
+            self.send_header("Transfer-Encoding", "chunked")
+        origin = self._get_cors_origin(self.headers.get("Origin", ""))
+        if origin:
+            self.send_header("Access-Control-Allow-Origin", origin)
+            self.send_header("Vary", "Origin")
+        self.end_headers()
+
+        from ..output_stream import OutputStreamError
+        try:
+            try:
+                for chunk in stream:
+                    self.wfile.write(_frame(_encode(None, chunk)))
+                    self.wfile.flush()
+                tail = _encode("end", {}) if sse else b""
+            except OutputStreamError as e:
+                error = {"error": str(e), "error_type": e.error_type}
+                tail = _encode("error", error)
+            if tail:
+                self.wfile.write(_frame(tail))
+            if chunked:
+                self.wfile.write(b"0\r\n\r\n")
+            self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError, OSError):
+            self.close_connection = True
+        finally:
+            stream.close()
+
     def _get_registered_routes(self) -> dict:
         """GET /api/routes — 登録済みPack独自ルート一覧を返す"""
         routes = []
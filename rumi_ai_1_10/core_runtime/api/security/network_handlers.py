@@ -65,3 +65,20 @@ class NetworkHandlersMixin:
         except Exception as e:
             _log_internal_error("network_list", e)
             return {"grants": {}, "error": _SAFE_ERROR_MSG}
+
+    def _egress_status(self) -> dict:
+        """UDS Egress Proxy の稼働状況・接続プール・DNS キャッシュ統計"""
+        try:
+            from ...egress_ip import get_dns_cache
+            from ...egress_connection_pool import get_egress_connection_pool
+            from ...egress_proxy import get_uds_egress_proxy_manager
+            active = get_uds_egress_proxy_manager().list_active_packs()
+            return {
+                "active_packs": active,
+                "active_count": len(active),
+                "connection_pool": get_egress_connection_pool().stats(),
+                "dns_cache": get_dns_cache().stats(),
+            }
+        except Exception as e:
+            _log_internal_error("egress_status", e)
+            return {"error": _SAFE_ERROR_MSG}
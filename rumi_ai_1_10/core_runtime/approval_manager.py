@@ -50,6 +50,7 @@ from .paths import (
 logger = logging.getLogger(__name__)
 
 
+from .pack_hash_index import PackFileWatcher, PackHashIndex, is_pack_file_watch_enabled
 from .hmac_key_manager import (
     generate_or_load_signing_key,
     compute_data_hmac,
@@ -135,6 +136,10 @@ class ApprovalManager:
         self._hash_cache_ttl: float = float(
             os.environ.get("RUMI_HASH_CACHE_TTL_SEC", "30")
         )
+        # stat インデックス: 変化したファイルのみ再ハッシュ（TOCTOU 緩和を維持）
+        self._hash_index = PackHashIndex()
+        # inotify による変更監視（RUMI_PACK_FILE_WATCH=1 のとき）
+        self._file_watcher: Optional[PackFileWatcher] = None
     
     def _now_ts(self) -> str:
         return datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
@@ -166,6 +171,9 @@ class ApprovalManager:
                     continue
             
             self._initialized = True
+
+        if is_pack_file_watch_enabled():
+            self.start_file_watcher()
     
     def _load_grant_file(self, path: Path) -> None:
         """grants.jsonを読み込み、HMAC検証"""
@@ -457,6 +465,22 @@ class ApprovalManager:
         
         return True, None
     
+    def get_approval_fingerprint(self, pack_id: str) -> Optional[str]:
+        """承認済みファイルハッシュ集合の指紋を返す。
+
+        常駐コンテナセッションのキーに使い、再承認・更新適用で
+        ハッシュが変わると別の指紋になる。APPROVED 以外は None。
+        """
+        if self._is_core_pack(pack_id):
+            return "core"
+        with self._lock:
+            approval = self._approvals.get(pack_id)
+            if approval is None or approval.status != PackStatus.APPROVED:
+                return None
+            items = sorted(approval.file_hashes.items())
+        digest = hashlib.sha256(json.dumps(items).encode("utf-8")).hexdigest()
+        return digest[:32]
+
     # ------------------------------------------------------------------ #
     # Wave 1-2: 開発モード自動承認
     # ------------------------------------------------------------------ #
@@ -562,6 +586,7 @@ class ApprovalManager:
             })
             
             self._save_grant(approval)
+            self._watch_pack(pack_id)
 
             # #62: 宣言的Store作成
             self._create_declared_stores(pack_id)
@@ -709,6 +734,15 @@ class ApprovalManager:
             if pack_id in self._approvals:
                 self._approvals[pack_id].status = PackStatus.MODIFIED
                 self._save_grant(self._approvals[pack_id])
+        self._invalidate_loaded_modules(pack_id)
+
+    def _invalidate_loaded_modules(self, pack_id: str) -> None:
+        """ホスト実行でキャッシュ済みの Pack モジュールを破棄する"""
+        try:
+            from .python_file_executor import invalidate_host_modules
+            invalidate_host_modules(pack_id)
+        except Exception:
+            pass
     
     # ------------------------------------------------------------------ #
     # Wave 1-1: ハッシュ粒度緩和 — ファイルごとのクリティカル判定
@@ -876,17 +910,8 @@ class ApprovalManager:
             if now - cached_time < self._hash_cache_ttl:
                 return dict(cached_result)
         
-        # 計算
-        hashes = {}
-        
-        for file_path in pack_dir.rglob("*"):
-            if file_path.is_file():
-                if any(p in str(file_path) for p in ["__pycache__", ".pyc", ".git"]):
-                    continue
-                
-                relative_path = str(file_path.relative_to(pack_dir))
-                hash_value = self._compute_file_hash(file_path)
-                hashes[relative_path] = hash_value
+        # 計算（stat インデックス経由）
+        hashes = self._hash_index.compute(pack_dir)
         
         # キャッシュ保存
         self._hash_cache[cache_key] = (hashes, now)
@@ -894,19 +919,12 @@ class ApprovalManager:
         return hashes
 
     def _compute_pack_hashes_nocache(self, pack_dir: Path) -> Dict[str, str]:
-        """Packの全ファイルのハッシュを計算（キャッシュを参照・更新しない）"""
-        hashes = {}
-
-        for file_path in pack_dir.rglob("*"):
-            if file_path.is_file():
-                if any(p in str(file_path) for p in ["__pycache__", ".pyc", ".git"]):
-                    continue
+        """Packの全ファイルのハッシュを計算（TTLキャッシュを参照・更新しない）
 
-                relative_path = str(file_path.relative_to(pack_dir))
-                hash_value = self._compute_file_hash(file_path)
-                hashes[relative_path] = hash_value
-
-        return hashes
+        毎回ディレクトリを走査して stat を取り直し、
+        (size, mtime_ns, inode, ctime_ns) が変わったファイルのみ再ハッシュする。
+        """
+        return self._hash_index.compute(pack_dir)
     
     def _compute_file_hash(self, path: Path) -> str:
         """ファイルのSHA-256ハッシュを計算"""
@@ -916,11 +934,78 @@ class ApprovalManager:
                 sha256.update(chunk)
         return f"sha256:{sha256.hexdigest()}"
     
+    # ------------------------------------------------------------------ #
+    # ファイル変更監視（inotify）
+    # ------------------------------------------------------------------ #
+
+    def start_file_watcher(self) -> bool:
+        """承認済み Pack のディレクトリ監視を開始する。
+
+        変更を検知すると即座にハッシュを再検証し、不一致なら MODIFIED にする。
+        inotify が使えない環境では False を返す（呼び出し時検証のみで動作）。
+        """
+        if self._file_watcher is None:
+            watcher = PackFileWatcher(self._on_pack_files_changed)
+            if not watcher.start():
+                logger.info("Pack file watcher unavailable; relying on per-call hash verification")
+                return False
+            self._file_watcher = watcher
+        with self._lock:
+            approved = [pid for pid, a in self._approvals.items() if a.status == PackStatus.APPROVED]
+        for pack_id in approved:
+            self._watch_pack(pack_id)
+        return True
+
+    def stop_file_watcher(self) -> None:
+        """ディレクトリ監視を停止する。"""
+        if self._file_watcher is not None:
+            self._file_watcher.stop()
+            self._file_watcher = None
+
+    def _watch_pack(self, pack_id: str) -> None:
+        if self._file_watcher is None or self._is_core_pack(pack_id) or pack_id == LOCAL_PACK_ID:
+            return
+        pack_dir = self._resolve_pack_dir(pack_id)
+        if pack_dir is not None and pack_dir.exists():
+            self._file_watcher.watch(pack_id, pack_dir)
+
+    def _on_pack_files_changed(self, pack_id: str) -> None:
+        """監視スレッドからの変更通知。"""
+        self._invalidate_hash_cache(pack_id)
+        with self._lock:
+            approval = self._approvals.get(pack_id)
+            if approval is None or approval.status != PackStatus.APPROVED:
+                return
+        if self.verify_hash(pack_id, use_cache=False):
+            return
+        logger.warning("Pack '%s' files changed after approval; marking as modified", pack_id)
+        self.mark_modified(pack_id)
+        try:
+            from .audit_logger import get_audit_logger
+            get_audit_logger().log_security_event(
+                event_type="pack_modified_detected",
+                severity="warning",
+                description=f"Pack '{pack_id}' files changed after approval (file watcher)",
+                pack_id=pack_id,
+            )
+        except Exception:
+            pass
+
+    def get_hash_index_stats(self) -> Dict[str, Any]:
+        """stat インデックスの統計を返す。"""
+        stats: Dict[str, Any] = dict(self._hash_index.stats())
+        stats["file_watcher"] = self._file_watcher is not None
+        if self._file_watcher is not None:
+            stats["watched_packs"] = self._file_watcher.watched_pack_ids()
+        return stats
+
     def remove_approval(self, pack_id: str) -> bool:
         """承認情報を削除"""
         with self._lock:
             if pack_id in self._approvals:
                 del self._approvals[pack_id]
+                if self._file_watcher is not None:
+                    self._file_watcher.unwatch(pack_id)
                 
                 grant_file = self.grants_dir / f"{pack_id}.grants.json"
                 if grant_file.exists():
@@ -994,6 +1079,9 @@ class ApprovalManager:
             # キャッシュ無効化
             self._invalidate_hash_cache(pack_id)
 
+        if not hashes_match:
+            self._invalidate_loaded_modules(pack_id)
+
         # audit log（ロック外）
         try:
             from .audit_logger import get_audit_logger
@@ -1100,6 +1188,7 @@ class ApprovalManager:
             })
 
             self._save_grant(approval)
+            self._watch_pack(pack_id)
 
             # キャッシュ無効化
             self._invalidate_hash_cache(pack_id)
@@ -0,0 +1,353 @@
+"""
+audit_index.py - 監査ログ (JSON Lines) のサイドカー索引
+
+{category}_{YYYY-MM-DD}.jsonl の各行について ts / category / owner_pack /
+flow_id / success とファイル内の位置 (offset, length) を SQLite に記録し、
+query_logs / get_summary が全行を json.loads せずに絞り込めるようにする。
+
+設計原則:
+- 正はあくまで .jsonl ファイル。索引は消しても作り直せる
+- AuditWriter が書いたバッチはその場で索引に追加する（add_batch）
+- 他プロセスや inline モードが書いた分は、検索時にファイルサイズと
+  audit_files.indexed_bytes を比べて末尾だけ追加で読む（catch_up）
+- ファイルが縮んだ（置き換えられた）場合はそのファイル分を作り直す
+- 検索は ts 降順 + id 降順のキーセットカーソルで返す
+
+永続化: <audit_dir>/audit_index.db  WAL モード
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+
+INDEX_DB_NAME = "audit_index.db"
+MAX_QUERY_LIMIT = 10000
+_CATCH_UP_INSERT_CHUNK = 1000
+
+
+def is_audit_index_enabled() -> bool:
+    """RUMI_AUDIT_INDEX が有効かどうかを返す（デフォルト有効）。"""
+    return os.environ.get("RUMI_AUDIT_INDEX", "1").lower() in ("1", "true", "yes")
+
+
+def _encode_cursor(ts: str, entry_id: int) -> str:
+    return f"{ts}|{entry_id}"
+
+
+def _decode_cursor(cursor: str) -> Optional[Tuple[str, int]]:
+    ts, sep, entry_id = cursor.rpartition("|")
+    if not sep:
+        return None
+    try:
+        return ts, int(entry_id)
+    except ValueError:
+        return None
+
+
+def _index_row(file: str, date: str, offset: int, length: int, entry: Dict[str, Any]) -> tuple:
+    success = entry.get("success")
+    return (
+        file,
+        offset,
+        length,
+        str(entry.get("ts") or ""),
+        str(entry.get("category") or ""),
+        date,
+        entry.get("owner_pack"),
+        entry.get("flow_id"),
+        None if success is None else int(bool(success)),
+    )
+
+
+class AuditIndex:
+    """監査ログ索引（1つの監査ログディレクトリにつき1つ）"""
+
+    def __init__(self, audit_dir: Path):
+        self._audit_dir = Path(audit_dir)
+        self._db_path = self._audit_dir / INDEX_DB_NAME
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            str(self._db_path), timeout=10.0, check_same_thread=False,
+        )
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.execute("PRAGMA synchronous = NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS audit_files (
+                file          TEXT PRIMARY KEY,
+                indexed_bytes INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE TABLE IF NOT EXISTS audit_entries (
+                id         INTEGER PRIMARY KEY,
+                file       TEXT NOT NULL,
+                offset     INTEGER NOT NULL,
+                length     INTEGER NOT NULL,
+                ts         TEXT NOT NULL,
+                category   TEXT NOT NULL,
+                date       TEXT NOT NULL,
+                owner_pack TEXT,
+                flow_id    TEXT,
+                success    INTEGER
+            );
+            CREATE INDEX IF NOT EXISTS idx_audit_entries_ts
+                ON audit_entries(ts, id);
+            CREATE INDEX IF NOT EXISTS idx_audit_entries_category
+                ON audit_entries(category, date, ts);
+            CREATE INDEX IF NOT EXISTS idx_audit_entries_pack
+                ON audit_entries(owner_pack, ts);
+            CREATE INDEX IF NOT EXISTS idx_audit_entries_flow
+                ON audit_entries(flow_id, ts);
+            CREATE INDEX IF NOT EXISTS idx_audit_entries_file
+                ON audit_entries(file, offset);
+        """)
+        self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            try:
+                self._conn.close()
+            except sqlite3.Error:
+                pass
+
+    @staticmethod
+    def _date_of(file: str) -> str:
+        return file[:-len(".jsonl")].rsplit("_", 1)[-1]
+
+    # ------------------------------------------------------------------
+    # 索引の追加
+    # ------------------------------------------------------------------
+
+    def add_batch(
+        self,
+        path: Path,
+        start_offset: int,
+        records: Iterable[Tuple[Dict[str, Any], int]],
+    ) -> bool:
+        """
+        AuditWriter が start_offset から追記した行を索引に加える
+
+        records は (エントリの dict, 改行込みのバイト長) の列。
+        索引済みの位置が start_offset と一致しない（他プロセスの追記が
+        挟まった等）場合は何もせず False を返し、catch_up に任せる。
+        """
+        file = path.name
+        date = self._date_of(file)
+        rows: List[tuple] = []
+        offset = start_offset
+        for entry, length in records:
+            rows.append(_index_row(file, date, offset, length, entry))
+            offset += length
+
+        with self._lock:
+            conn = self._conn
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                row = conn.execute(
+                    "SELECT indexed_bytes FROM audit_files WHERE file = ?", (file,),
+                ).fetchone()
+                indexed = row[0] if row is not None else 0
+                if indexed != start_offset:
+                    conn.rollback()
+                    return False
+                self._insert(conn, file, rows, offset)
+                conn.commit()
+                return True
+            except sqlite3.Error as e:
+                conn.rollback()
+                logger.warning("Failed to index audit batch for %s: %s", file, e)
+                return False
+
+    @staticmethod
+    def _insert(conn: sqlite3.Connection, file: str, rows: List[tuple], end: int) -> None:
+        conn.executemany(
+            "INSERT INTO audit_entries "
+            "(file, offset, length, ts, category, date, owner_pack, flow_id, success) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            rows,
+        )
+        conn.execute(
+            "INSERT INTO audit_files (file, indexed_bytes) VALUES (?, ?) "
+            "ON CONFLICT(file) DO UPDATE SET indexed_bytes = excluded.indexed_bytes",
+            (file, end),
+        )
+
+    def catch_up(self, paths: Iterable[Path]) -> None:
+        """索引に追いついていないファイルの未索引部分を読み込む"""
+        with self._lock:
+            known = dict(self._conn.execute("SELECT file, indexed_bytes FROM audit_files"))
+        for path in paths:
+            try:
+                size = path.stat().st_size
+            except OSError:
+                continue
+            if known.get(path.name) == size:
+                continue
+            self._catch_up_file(path)
+
+    def _catch_up_file(self, path: Path) -> None:
+        file = path.name
+        date = self._date_of(file)
+        with self._lock:
+            conn = self._conn
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                row = conn.execute(
+                    "SELECT indexed_bytes FROM audit_files WHERE file = ?", (file,),
+                ).fetchone()
+                indexed = row[0] if row is not None else 0
+                size = path.stat().st_size
+                if size < indexed:
+                    # 置き換え・切り詰め: このファイル分を作り直す
+                    conn.execute("DELETE FROM audit_entries WHERE file = ?", (file,))
+                    indexed = 0
+                rows: List[tuple] = []
+                offset = indexed
+                with open(path, "rb") as f:
+                    f.seek(indexed)
+                    for raw in f:
+                        if not raw.endswith(b"\n"):
+                            break  # 書き込み途中の行は次回
+                        length = len(raw)
+                        try:
+                            entry = json.loads(raw)
+                        except (json.JSONDecodeError, UnicodeDecodeError):
+                            entry = None
+                        if isinstance(entry, dict):
+                            rows.append(_index_row(file, date, offset, length, entry))
+                        offset += length
+                        if len(rows) >= _CATCH_UP_INSERT_CHUNK:
+                            self._insert(conn, file, rows, offset)
+                            rows = []
+                self._insert(conn, file, rows, offset)
+                conn.commit()
+            except (OSError, sqlite3.Error) as e:
+                conn.rollback()
+                logger.warning("Failed to catch up audit index for %s: %s", file, e)
+
+    def forget(self, files: Iterable[str]) -> None:
+        """削除されたファイルの索引を消す"""
+        names = list(files)
+        if not names:
+            return
+        with self._lock:
+            conn = self._conn
+            try:
+                conn.executemany("DELETE FROM audit_entries WHERE file = ?", [(n,) for n in names])
+                conn.executemany("DELETE FROM audit_files WHERE file = ?", [(n,) for n in names])
+                conn.commit()
+            except sqlite3.Error as e:
+                conn.rollback()
+                logger.warning("Failed to drop audit index entries: %s", e)
+
+    def forget_missing(self) -> None:
+        """ディレクトリから消えたファイルの索引を消す"""
+        with self._lock:
+            files = [r[0] for r in self._conn.execute("SELECT file FROM audit_files")]
+        self.forget(f for f in files if not (self._audit_dir / f).exists())
+
+    # ------------------------------------------------------------------
+    # 検索
+    # ------------------------------------------------------------------
+
+    def query(
+        self,
+        category: Optional[str] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        pack_id: Optional[str] = None,
+        flow_id: Optional[str] = None,
+        success_only: Optional[bool] = None,
+        limit: int = 1000,
+        cursor: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        条件に合うエントリを ts 降順で返す
+
+        Returns:
+            {"results": [...], "next_cursor": str | None}
+        """
+        limit = max(1, min(int(limit), MAX_QUERY_LIMIT))
+        conditions: List[str] = []
+        params: List[Any] = []
+        if category:
+            conditions.append("category = ?")
+            params.append(category)
+        if start_date:
+            conditions.append("date >= ?")
+            params.append(start_date)
+        if end_date:
+            conditions.append("date <= ?")
+            params.append(end_date)
+        if pack_id:
+            conditions.append("owner_pack = ?")
+            params.append(pack_id)
+        if flow_id:
+            conditions.append("flow_id = ?")
+            params.append(flow_id)
+        if success_only is not None:
+            conditions.append("success = ?")
+            params.append(int(bool(success_only)))
+        if cursor:
+            decoded = _decode_cursor(cursor)
+            if decoded is None:
+                raise ValueError(f"Invalid cursor: {cursor!r}")
+            conditions.append("(ts < ? OR (ts = ? AND id < ?))")
+            params.extend([decoded[0], decoded[0], decoded[1]])
+
+        where = " AND ".join(conditions) if conditions else "1"
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT id, file, offset, length, ts FROM audit_entries "
+                f"WHERE {where} ORDER BY ts DESC, id DESC LIMIT ?",
+                params + [limit + 1],
+            ).fetchall()
+
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        results = self._load(rows)
+        next_cursor = _encode_cursor(rows[-1][4], rows[-1][0]) if has_more else None
+        return {"results": results, "next_cursor": next_cursor}
+
+    def _load(self, rows: List[tuple]) -> List[Dict[str, Any]]:
+        """索引の位置情報からファイルの該当行だけを読む"""
+        loaded: Dict[int, Dict[str, Any]] = {}
+        by_file: Dict[str, List[tuple]] = {}
+        for row in rows:
+            by_file.setdefault(row[1], []).append(row)
+        for file, file_rows in by_file.items():
+            try:
+                with open(self._audit_dir / file, "rb") as f:
+                    for entry_id, _, offset, length, _ in sorted(file_rows, key=lambda r: r[2]):
+                        f.seek(offset)
+                        try:
+                            loaded[entry_id] = json.loads(f.read(length))
+                        except (json.JSONDecodeError, UnicodeDecodeError):
+                            continue
+            except OSError as e:
+                logger.warning("Failed to read audit log %s: %s", file, e)
+        return [loaded[r[0]] for r in rows if r[0] in loaded]
+
+    def summary(self, date: str, categories: List[str]) -> Dict[str, Dict[str, int]]:
+        """date の カテゴリ別 success / failure / total"""
+        placeholders = ",".join("?" for _ in categories)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT category, COALESCE(success, 0), COUNT(*) FROM audit_entries "
+                f"WHERE date = ? AND category IN ({placeholders}) "
+                f"GROUP BY category, COALESCE(success, 0)",
+                [date] + list(categories),
+            ).fetchall()
+        result = {cat: {"success": 0, "failure": 0, "total": 0} for cat in categories}
+        for cat, success, count in rows:
+            result[cat]["success" if success else "failure"] += count
+            result[cat]["total"] += count
+        return result
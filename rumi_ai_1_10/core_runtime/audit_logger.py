@@ -9,6 +9,11 @@ Flow実行、modifier適用、python_file_call、権限操作などの
 - 拒否理由を明確に記録
 - JSON Lines形式で永続化
 - ローテーション対応
+- 書き込みは専用スレッド（audit_writer.AuditWriter）で行い、
+  log() の呼び出し側にファイル I/O を負わせない
+  （RUMI_AUDIT_WRITER=inline で従来のバッファ＋同期書き込みに戻せる）
+- 検索・集計はサイドカー索引（audit_index.AuditIndex）で絞り込み、
+  該当行だけを読む（RUMI_AUDIT_INDEX=0 で全行走査に戻せる）
 
 Wave 19-A 変更:
   VULN-H05: to_json() で ensure_ascii=True を設定し、
@@ -26,6 +31,9 @@ from datetime import datetime, timezone, timedelta
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Literal
 
+from .audit_index import AuditIndex, is_audit_index_enabled
+from .audit_writer import AuditWriter, is_audit_writer_enabled
+
 
 AuditCategory = Literal[
     "flow_execution",
@@ -91,6 +99,19 @@ class AuditLogger:
         self._buffer: List[AuditEntry] = []
         self._buffer_size = 100
         self._ensure_dir()
+        self._index: Optional[AuditIndex] = None
+        if is_audit_index_enabled():
+            try:
+                self._index = AuditIndex(self._audit_dir)
+            except Exception as e:
+                print(f"[AuditLogger] Audit index unavailable, falling back to scans: {e}")
+        self._writer: Optional[AuditWriter] = None
+        if is_audit_writer_enabled():
+            self._writer = AuditWriter(
+                path_for=lambda e: self._get_log_file_for_entry(e.category, e.ts),
+                serialize=lambda e: e.to_json(),
+                on_write=self._index_batch,
+            )
         
         # 終了時にフラッシュ
         atexit.register(self._atexit_flush)
@@ -134,6 +155,9 @@ class AuditLogger:
     
     def log(self, entry: AuditEntry) -> None:
         """監査ログを記録"""
+        if self._writer is not None:
+            self._writer.submit(entry)
+            return
         with self._lock:
             self._buffer.append(entry)
             
@@ -165,14 +189,50 @@ class AuditLogger:
         self._buffer.clear()
     
     def flush(self) -> None:
-        """バッファを強制フラッシュ"""
+        """バッファを強制フラッシュ（書き込みスレッド使用時は書き込み完了まで待つ）"""
+        if self._writer is not None:
+            self._writer.flush()
+            return
         with self._lock:
             self._flush_buffer()
-    
+
+    def close(self) -> None:
+        """書き出しを完了し、書き込みスレッド・ファイルハンドル・索引を解放する"""
+        if self._writer is not None:
+            self._writer.stop()
+        else:
+            self.flush()
+        index, self._index = self._index, None
+        if index is not None:
+            index.close()
+
+    def _index_batch(self, path: Path, start_offset: int, records: List[Any]) -> None:
+        """AuditWriter が書いたバッチを索引に加える（書き込みスレッドで呼ばれる）"""
+        index = self._index
+        if index is None:
+            return
+        index.add_batch(path, start_offset, [
+            (
+                {
+                    "ts": e.ts,
+                    "category": e.category,
+                    "owner_pack": e.owner_pack,
+                    "flow_id": e.flow_id,
+                    "success": e.success,
+                },
+                length,
+            )
+            for e, length in records
+        ])
+
+    def writer_stats(self) -> Optional[Dict[str, Any]]:
+        """書き込みスレッドのキュー状態（inline モードでは None）"""
+        return self._writer.stats() if self._writer is not None else None
+
     def _atexit_flush(self) -> None:
         """終了時のフラッシュ(例外を握りつぶす)"""
         try:
-            self.flush()
+            self.close()
         except Exception:
             pass
     
@@ -422,29 +482,92 @@ class AuditLogger:
             limit: 最大取得件数
         
         Returns:
-            ログエントリのリスト
+            ログエントリのリスト（索引使用時は ts の新しい順）
+        """
+        return self.query_logs_page(
+            category=category,
+            start_date=start_date,
+            end_date=end_date,
+            pack_id=pack_id,
+            flow_id=flow_id,
+            success_only=success_only,
+            limit=limit,
+        )["results"]
+
+    def query_logs_page(
+        self,
+        category: AuditCategory = None,
+        start_date: str = None,
+        end_date: str = None,
+        pack_id: str = None,
+        flow_id: str = None,
+        success_only: bool = None,
+        limit: int = 1000,
+        cursor: str = None,
+    ) -> Dict[str, Any]:
+        """
+        監査ログを ts の新しい順にページ単位で検索する
+
+        引数は query_logs と同じ。cursor には前ページの next_cursor を渡す。
+        索引が無効な場合は全行走査になり、cursor は使えない（next_cursor は常に None）。
+
+        Returns:
+            {"results": [...], "next_cursor": str | None}
+
+        Raises:
+            ValueError: cursor が不正
         """
         self.flush()
-        
-        results = []
-        
-        # 対象ファイルを特定
-        if category:
-            pattern = f"{category}_*.jsonl"
-        else:
-            pattern = "*.jsonl"
-        
-        log_files = sorted(self._audit_dir.glob(pattern), reverse=True)
-        
-        for log_file in log_files:
-            # 日付フィルタ
+
+        log_files = self._candidate_files(category, start_date, end_date)
+        index = self._index
+        if index is not None:
+            index.catch_up(log_files)
+            return index.query(
+                category=category,
+                start_date=start_date,
+                end_date=end_date,
+                pack_id=pack_id,
+                flow_id=flow_id,
+                success_only=success_only,
+                limit=limit,
+                cursor=cursor,
+            )
+        return {
+            "results": self._scan_logs(log_files, pack_id, flow_id, success_only, limit),
+            "next_cursor": None,
+        }
+
+    def _candidate_files(
+        self,
+        category: Optional[str],
+        start_date: Optional[str],
+        end_date: Optional[str],
+    ) -> List[Path]:
+        """カテゴリ・日付範囲に該当する .jsonl ファイル（ファイル名の降順）"""
+        pattern = f"{category}_*.jsonl" if category else "*.jsonl"
+        log_files = []
+        for log_file in sorted(self._audit_dir.glob(pattern), reverse=True):
             file_date = self._extract_date_from_filename(log_file.name)
             if file_date:
                 if start_date and file_date < start_date:
                     continue
                 if end_date and file_date > end_date:
                     continue
-            
+            log_files.append(log_file)
+        return log_files
+
+    def _scan_logs(
+        self,
+        log_files: List[Path],
+        pack_id: Optional[str],
+        flow_id: Optional[str],
+        success_only: Optional[bool],
+        limit: int,
+    ) -> List[Dict[str, Any]]:
+        """索引を使わずに全行を読んで絞り込む（RUMI_AUDIT_INDEX=0 時）"""
+        results = []
+        for log_file in log_files:
             try:
                 with open(log_file, "r", encoding="utf-8") as f:
                     for line in f:
@@ -511,6 +634,17 @@ class AuditLogger:
             categories = ["flow_execution", "modifier_application", "python_file_call", 
                          "approval", "permission", "network", "security", "system"]
         
+        self.flush()
+        index = self._index
+        if index is not None:
+            index.catch_up(self._audit_dir / f"{cat}_{date}.jsonl" for cat in categories)
+            for cat, cat_summary in index.summary(date, categories).items():
+                summary["categories"][cat] = cat_summary
+                summary["total_entries"] += cat_summary["total"]
+                summary["total_success"] += cat_summary["success"]
+                summary["total_failure"] += cat_summary["failure"]
+            return summary
+
         for cat in categories:
             log_file = self._audit_dir / f"{cat}_{date}.jsonl"
             cat_summary = {"success": 0, "failure": 0, "total": 0}
@@ -550,6 +684,10 @@ class AuditLogger:
         """
         cutoff = (datetime.now(timezone.utc) - timedelta(days=days_to_keep)).strftime("%Y-%m-%d")
         deleted = 0
+
+        # 削除対象のファイルを書き込みスレッドが開いたままにしないよう閉じさせる
+        if self._writer is not None:
+            self._writer.flush(close_files=True)
         
         for log_file in self._audit_dir.glob("*.jsonl"):
             file_date = self._extract_date_from_filename(log_file.name)
@@ -559,7 +697,10 @@ class AuditLogger:
                     deleted += 1
                 except Exception as e:
                     print(f"[AuditLogger] Failed to delete {log_file}: {e}")
-        
+
+        if self._index is not None:
+            self._index.forget_missing()
+
         return deleted
 
 
@@ -580,7 +721,8 @@ def reset_audit_logger(audit_dir: str = None) -> AuditLogger:
     """
     AuditLogger をリセットする（テスト用）。
 
-    既存インスタンスを flush した後、新しいインスタンスで置き換える。
+    既存インスタンスを close（書き出し完了・書き込みスレッド停止）した後、
+    新しいインスタンスで置き換える。
 
     Args:
         audit_dir: 監査ログディレクトリ（省略時はデフォルト）
@@ -592,7 +734,7 @@ def reset_audit_logger(audit_dir: str = None) -> AuditLogger:
     container = get_container()
     old = container.get_or_none("audit_logger")
     if old is not None:
-        old.flush()
+        old.close()
     new_instance = AuditLogger(audit_dir)
     container.set_instance("audit_logger", new_instance)
     return new_instance
@@ -0,0 +1,396 @@
+"""
+audit_writer.py - 監査ログの専用書き込みスレッド
+
+AuditLogger.log() を呼んだスレッドがバッファ溢れのたびに他スレッドの
+エントリ分までファイル I/O を肩代わりしないよう、上限付きキューと
+専用の書き込みスレッドでエントリを JSON 化・追記する。
+
+設計原則:
+- 呼び出し側はキューに積むだけ（JSON 化もファイル I/O も行わない）
+- 書き込みスレッドはキューをまとめて取り出し、ファイルごとに1回の write で追記する
+- カテゴリ×日付ファイルのハンドルは開いたまま保持する（上限 MAX_OPEN_FILES）
+- キュー満杯時は RUMI_AUDIT_QUEUE_POLICY に従い待つ（block）か捨てる（drop）
+- 耐久性は RUMI_AUDIT_DURABILITY で選ぶ:
+    none     : OS のページキャッシュまで（fsync しない）
+    periodic : RUMI_AUDIT_FSYNC_INTERVAL 秒ごとに fsync
+    batch    : バッチを書くたびに fsync（グループコミット）
+- fork 後の子プロセスでは最初の submit でキューとスレッドを作り直す
+
+メトリクス（MetricsCollector）:
+- audit.queue_depth (gauge): キューの長さ
+- audit.batch_size (histogram): 1回の書き込みで処理したエントリ数
+- audit.enqueue_wait_seconds (histogram): block ポリシーで待った時間
+- audit.dropped (counter, label: reason): 捨てたエントリ数
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Dict, List, Optional, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+
+# ============================================================
+# 定数
+# ============================================================
+
+DURABILITY_NONE = "none"
+DURABILITY_PERIODIC = "periodic"
+DURABILITY_BATCH = "batch"
+
+POLICY_BLOCK = "block"
+POLICY_DROP = "drop"
+
+DEFAULT_QUEUE_SIZE = 10000
+DEFAULT_BLOCK_TIMEOUT = 5.0
+DEFAULT_FSYNC_INTERVAL = 1.0
+MAX_BATCH_ENTRIES = 1000
+MAX_OPEN_FILES = 32
+THREAD_JOIN_TIMEOUT_SECONDS = 5.0
+
+_STOP = object()
+
+
+class _FlushRequest:
+    """flush() がキューに積む区切り。これ以前のエントリを書き切ったら done を立てる。"""
+
+    __slots__ = ("done", "close_files")
+
+    def __init__(self, close_files: bool) -> None:
+        self.done = threading.Event()
+        self.close_files = close_files
+
+
+def _env_choice(name: str, default: str, choices: tuple) -> str:
+    value = os.environ.get(name, default).strip().lower()
+    if value not in choices:
+        logger.warning("Unknown %s=%r, using %s", name, value, default)
+        return default
+    return value
+
+
+def _env_number(name: str, default: float, minimum: float) -> float:
+    try:
+        return max(minimum, float(os.environ.get(name, str(default))))
+    except (TypeError, ValueError):
+        return default
+
+
+def is_audit_writer_enabled() -> bool:
+    """RUMI_AUDIT_WRITER が thread（デフォルト）かどうかを返す。inline で従来方式。"""
+    return _env_choice("RUMI_AUDIT_WRITER", "thread", ("thread", "inline")) == "thread"
+
+
+def _metrics():
+    try:
+        from .metrics import get_metrics_collector
+        return get_metrics_collector()
+    except Exception:
+        return None
+
+
+# ============================================================
+# AuditWriter
+# ============================================================
+
+class AuditWriter:
+    """
+    監査エントリを専用スレッドで JSON Lines ファイルに追記する
+
+    path_for(entry) で書き込み先ファイルを、serialize(entry) で1行分の
+    文字列（改行なし）を決める。スレッドは初回 submit 時に起動する。
+
+    on_write(path, start_offset, [(entry, 改行込みバイト長), ...]) を渡すと、
+    追記が他プロセスの書き込みと混ざらずに start_offset から連続して
+    行われたときに書き込みスレッド上で呼ばれる（監査ログ索引の更新用）。
+    """
+
+    def __init__(
+        self,
+        path_for: Callable[[Any], Path],
+        serialize: Callable[[Any], str],
+        queue_size: Optional[int] = None,
+        policy: Optional[str] = None,
+        durability: Optional[str] = None,
+        fsync_interval: Optional[float] = None,
+        block_timeout: Optional[float] = None,
+        name: str = "rumi-audit-writer",
+        on_write: Optional[Callable[[Path, int, List[Tuple[Any, int]]], None]] = None,
+    ) -> None:
+        self._path_for = path_for
+        self._serialize = serialize
+        self._on_write = on_write
+        self._name = name
+        self.queue_size = queue_size or int(
+            _env_number("RUMI_AUDIT_QUEUE_SIZE", DEFAULT_QUEUE_SIZE, 1)
+        )
+        self.policy = policy or _env_choice(
+            "RUMI_AUDIT_QUEUE_POLICY", POLICY_BLOCK, (POLICY_BLOCK, POLICY_DROP)
+        )
+        self.durability = durability or _env_choice(
+            "RUMI_AUDIT_DURABILITY",
+            DURABILITY_NONE,
+            (DURABILITY_NONE, DURABILITY_PERIODIC, DURABILITY_BATCH),
+        )
+        self.fsync_interval = fsync_interval or _env_number(
+            "RUMI_AUDIT_FSYNC_INTERVAL", DEFAULT_FSYNC_INTERVAL, 0.01
+        )
+        self.block_timeout = (
+            block_timeout if block_timeout is not None else DEFAULT_BLOCK_TIMEOUT
+        )
+
+        self._lock = threading.Lock()
+        self._queue: "queue.Queue" = queue.Queue(maxsize=self.queue_size)
+        self._thread: Optional[threading.Thread] = None
+        self._pid = os.getpid()
+
+        # 以下は書き込みスレッドのみが触る
+        self._files: "OrderedDict[Path, BinaryIO]" = OrderedDict()
+        self._dirty: Dict[Path, BinaryIO] = {}
+        self._last_fsync = time.monotonic()
+
+        self._stats_lock = threading.Lock()
+        self._written = 0
+        self._dropped = 0
+        self._batches = 0
+
+    # ------------------------------------------------------------------
+    # 呼び出し側
+    # ------------------------------------------------------------------
+
+    def _ensure_started(self) -> "queue.Queue":
+        thread = self._thread
+        if thread is not None and thread.is_alive() and self._pid == os.getpid():
+            return self._queue
+        with self._lock:
+            if self._pid != os.getpid():
+                # fork 後: 親のキュー・ハンドルは引き継がない
+                self._queue = queue.Queue(maxsize=self.queue_size)
+                self._files = OrderedDict()
+                self._dirty = {}
+                self._pid = os.getpid()
+                self._thread = None
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name=self._name, daemon=True,
+                )
+                self._thread.start()
+            return self._queue
+
+    def submit(self, entry: Any) -> bool:
+        """
+        エントリをキューに積む
+
+        Returns:
+            True: 積んだ / False: キュー満杯で捨てた
+        """
+        q = self._ensure_started()
+        try:
+            q.put_nowait(entry)
+            return True
+        except queue.Full:
+            pass
+
+        if self.policy == POLICY_BLOCK:
+            start = time.monotonic()
+            try:
+                q.put(entry, timeout=self.block_timeout)
+                mc = _metrics()
+                if mc is not None:
+                    mc.observe("audit.enqueue_wait_seconds", time.monotonic() - start)
+                return True
+            except queue.Full:
+                reason = "block_timeout"
+        else:
+            reason = "queue_full"
+
+        with self._stats_lock:
+            self._dropped += 1
+        mc = _metrics()
+        if mc is not None:
+            mc.increment("audit.dropped", labels={"reason": reason})
+        return False
+
+    def flush(self, timeout: Optional[float] = None, close_files: bool = False) -> bool:
+        """
+        これまでに積んだエントリの書き込み完了を待つ
+
+        durability が none 以外なら fsync も行う。
+        close_files=True なら保持中のファイルハンドルも閉じる。
+
+        Returns:
+            timeout 内に完了したか
+        """
+        thread = self._thread
+        if thread is None or not thread.is_alive() or self._pid != os.getpid():
+            return True
+        request = _FlushRequest(close_files)
+        self._queue.put(request)
+        return request.done.wait(timeout)
+
+    def stop(self) -> None:
+        """残りを書き出してスレッドを停止し、ファイルを閉じる"""
+        # 停止中に submit が2本目のスレッドを起動しないよう、ロックを保持したまま待つ
+        with self._lock:
+            thread = self._thread
+            if thread is None or not thread.is_alive() or self._pid != os.getpid():
+                return
+            self._queue.put(_STOP)
+            thread.join(timeout=THREAD_JOIN_TIMEOUT_SECONDS)
+            self._thread = None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            return {
+                "queue_depth": self._queue.qsize(),
+                "queue_size": self.queue_size,
+                "policy": self.policy,
+                "durability": self.durability,
+                "written": self._written,
+                "dropped": self._dropped,
+                "batches": self._batches,
+                "open_files": len(self._files),
+            }
+
+    # ------------------------------------------------------------------
+    # 書き込みスレッド
+    # ------------------------------------------------------------------
+
+    def _run(self) -> None:
+        q = self._queue
+        wait = self.fsync_interval if self.durability == DURABILITY_PERIODIC else None
+        while True:
+            try:
+                first = q.get(timeout=wait)
+            except queue.Empty:
+                self._maybe_periodic_fsync()
+                continue
+
+            items = [first]
+            while len(items) < MAX_BATCH_ENTRIES:
+                try:
+                    items.append(q.get_nowait())
+                except queue.Empty:
+                    break
+
+            entries: List[Any] = []
+            for item in items:
+                if item is _STOP:
+                    self._write(entries)
+                    self._close_files()
+                    return
+                if isinstance(item, _FlushRequest):
+                    self._write(entries)
+                    entries = []
+                    self._sync_dirty()
+                    if item.close_files:
+                        self._close_files()
+                    item.done.set()
+                    continue
+                entries.append(item)
+            self._write(entries)
+
+            if self.durability == DURABILITY_BATCH:
+                self._sync_dirty()
+            else:
+                self._maybe_periodic_fsync()
+
+            mc = _metrics()
+            if mc is not None:
+                mc.set_gauge("audit.queue_depth", q.qsize())
+
+    def _write(self, entries: List[Any]) -> None:
+        if not entries:
+            return
+        by_file: Dict[Path, List[Tuple[Any, bytes]]] = {}
+        for entry in entries:
+            try:
+                line = self._serialize(entry).encode("utf-8") + b"\n"
+                by_file.setdefault(self._path_for(entry), []).append((entry, line))
+            except Exception as e:
+                logger.warning("Failed to serialize audit entry: %s", e)
+
+        for path, items in by_file.items():
+            data = b"".join(line for _, line in items)
+            try:
+                f = self._open(path)
+                start = os.fstat(f.fileno()).st_size
+                f.write(data)
+                f.flush()
+                if self.durability != DURABILITY_NONE:
+                    self._dirty[path] = f
+            except Exception as e:
+                print(f"[AuditLogger] Failed to write to {path}: {e}")
+                self._close_file(path)
+                continue
+            if self._on_write is not None:
+                try:
+                    # 他プロセスの追記が挟まっていなければ start から連続している
+                    if os.fstat(f.fileno()).st_size - start == len(data):
+                        self._on_write(path, start, [(e, len(line)) for e, line in items])
+                except Exception as e:
+                    logger.warning("Audit on_write hook failed for %s: %s", path, e)
+
+        with self._stats_lock:
+            self._written += len(entries)
+            self._batches += 1
+        mc = _metrics()
+        if mc is not None:
+            mc.observe("audit.batch_size", len(entries))
+
+    def _open(self, path: Path) -> BinaryIO:
+        f = self._files.get(path)
+        if f is not None:
+            self._files.move_to_end(path)
+            return f
+        f = open(path, "ab")
+        self._files[path] = f
+        while len(self._files) > MAX_OPEN_FILES:
+            old_path, _ = next(iter(self._files.items()))
+            self._close_file(old_path)
+        return f
+
+    def _sync_dirty(self) -> None:
+        for path, f in list(self._dirty.items()):
+            try:
+                os.fsync(f.fileno())
+            except (OSError, ValueError) as e:
+                logger.warning("Failed to fsync audit log %s: %s", path, e)
+        self._dirty.clear()
+        self._last_fsync = time.monotonic()
+
+    def _maybe_periodic_fsync(self) -> None:
+        if (
+            self.durability == DURABILITY_PERIODIC
+            and self._dirty
+            and time.monotonic() - self._last_fsync >= self.fsync_interval
+        ):
+            self._sync_dirty()
+
+    def _close_file(self, path: Path) -> None:
+        f = self._files.pop(path, None)
+        if f is None:
+            return
+        if path in self._dirty:
+            self._dirty.pop(path, None)
+            try:
+                f.flush()
+                os.fsync(f.fileno())
+            except (OSError, ValueError):
+                pass
+        try:
+            f.close()
+        except OSError:
+            pass
+
+    def _close_files(self) -> None:
+        for path in list(self._files):
+            self._close_file(path)
@@ -50,6 +50,10 @@ try:
 except ImportError:
     _DockerRunBuilder = None
 
+# 常駐ワーカープール（RUMI_FUNCTION_WORKER_POOL=1 で有効）
+from .function_worker_pool import WorkerSpec, is_worker_pool_enabled
+from .container_session import ContainerSessionSpec, is_container_session_enabled
+
 # FunctionRegistry / FunctionEntry import
 try:
     from .function_registry import FunctionRegistry, FunctionEntry
@@ -190,6 +194,10 @@ class CapabilityExecutor:
         self._permission_manager = None
         # Wave 29: core function handler table
         self._core_function_handlers: Dict[str, str] = {}
+        # 常駐ワーカープール（None なら都度 subprocess）
+        self._worker_pool = None
+        # 常駐コンテナセッション（None なら都度 docker run --rm）
+        self._container_orchestrator = None
 
     def set_kernel(self, kernel) -> None:
         """
@@ -230,6 +238,10 @@ class CapabilityExecutor:
                     self._function_registry = _c.get_or_none("function_registry")
                     self._approval_manager = _c.get_or_none("approval_manager")
                     self._permission_manager = _c.get_or_none("permission_manager")
+                    if is_worker_pool_enabled():
+                        self._worker_pool = _c.get_or_none("function_worker_pool")
+                    if is_container_session_enabled():
+                        self._container_orchestrator = _c.get_or_none("container_orchestrator")
                 except Exception:
                     pass  # function.call 以外の機能に影響させない
 
@@ -682,6 +694,10 @@ if __name__ == "__main__":
         function_dir = Path(entry.function_dir)
         container_name = f"rumi-func-{pack_id}-{function_id}-{uuid.uuid4().hex[:8]}"
         context = {"principal_id": principal_id, "pack_id": pack_id, "function_id": function_id, "request_id": request_id, "ts": self._now_ts()}
+        if self._container_orchestrator is not None:
+            session_resp = self._execute_function_in_session(entry, context, args, start_time, timeout)
+            if session_resp is not None:
+                return session_resp
         subprocess_input = {"context": context, "args": args, "main_py_path": "/function/main.py"}
         input_json = json.dumps(subprocess_input, ensure_ascii=False, default=str)
         runner_script = self._generate_function_runner_script()
@@ -722,6 +738,8 @@ if __name__ == "__main__":
 
     def _execute_user_function_host(self, principal_id, entry, args, request_id, start_time, timeout):
         context = {"principal_id": principal_id, "pack_id": entry.pack_id, "function_id": entry.function_id, "request_id": request_id, "ts": self._now_ts()}
+        if self._worker_pool is not None:
+            return self._execute_function_in_pool(principal_id, entry, context, args, start_time, timeout)
         input_json = json.dumps({"context": context, "args": args, "main_py_path": str(entry.main_py_path)}, ensure_ascii=False, default=str)
         runner_file = None
         try:
@@ -761,6 +779,8 @@ if __name__ == "__main__":
         if main_py_path is None or not Path(main_py_path).is_file():
             return CapabilityResponse(success=False, error=f"main.py not found: {main_py_path}", error_type="main_py_not_found", latency_ms=(time.time() - start_time) * 1000)
         context = {"principal_id": principal_id, "pack_id": entry.pack_id, "function_id": entry.function_id, "request_id": request_id, "ts": self._now_ts()}
+        if self._worker_pool is not None:
+            return self._execute_function_in_pool(principal_id, entry, context, args, start_time, timeout)
         input_json = json.dumps({"context": context, "args": args, "main_py_path": str(main_py_path)}, ensure_ascii=False, default=str)
         runner_file = None
         try:
@@ -789,6 +809,58 @@ if __name__ == "__main__":
                 try: os.unlink(runner_file)
                 except Exception: pass
 
+    def _execute_function_in_pool(self, principal_id, entry, context, args, start_time, timeout):
+        """常駐ワーカープールで user function を実行する（_generate_function_runner_script と同等の意味論）。"""
+        main_py = str(Path(entry.main_py_path).resolve())
+        spec = WorkerSpec(scope=principal_id, module_path=main_py, func_name="run",
+                          cwd=str(Path(entry.function_dir)), path_entry=os.path.dirname(main_py),
+                          path_mode="insert", module_name="function_module")
+        reply = self._worker_pool.call(spec, context, args, timeout)
+        return self._function_reply_to_response(reply, start_time, timeout)
+
+    def _execute_function_in_session(self, entry, context, args, start_time, timeout):
+        """
+        常駐コンテナセッションで user function を実行する。
+
+        承認指紋が取れない・セッションが busy/起動失敗の場合は None を返し、
+        呼び出し側は使い捨てコンテナで実行する。
+        """
+        pack_id, function_id = entry.pack_id, entry.function_id
+        fingerprint = None
+        if self._approval_manager is not None:
+            try:
+                fingerprint = self._approval_manager.get_approval_fingerprint(pack_id)
+            except Exception:
+                fingerprint = None
+        if not fingerprint:
+            return None
+        spec = ContainerSessionSpec(
+            pack_id=pack_id,
+            kind="function",
+            image=getattr(entry, 'docker_image', '') or FUNCTION_BASE_IMAGE,
+            fingerprint=fingerprint,
+            volumes=(f"{Path(entry.function_dir).resolve()}:/function:ro",),
+            envs=(("RUMI_PACK_ID", pack_id), ("RUMI_FUNCTION_ID", function_id)),
+            sys_path=("/function",),
+        )
+        request = {"kind": "function", "module": "/function/main.py", "func": "run", "context": context, "args": args}
+        reply = self._container_orchestrator.call_in_session(spec, request, timeout, MAX_RESPONSE_SIZE)
+        if reply is None:
+            return None
+        return self._function_reply_to_response(reply, start_time, timeout)
+
+    def _function_reply_to_response(self, reply, start_time, timeout):
+        """ワーカープール/コンテナセッションの応答を CapabilityResponse に変換する。"""
+        latency_ms = (time.time() - start_time) * 1000
+        if reply.get("ok"):
+            return CapabilityResponse(success=True, output=reply.get("result"), latency_ms=latency_ms)
+        error_type = reply.get("error_type")
+        if error_type == "timeout":
+            return CapabilityResponse(success=False, error=f"Function execution timed out after {timeout}s", error_type="timeout", latency_ms=latency_ms)
+        if error_type == "response_too_large":
+            return CapabilityResponse(success=False, error="Response too large", error_type="response_too_large", latency_ms=latency_ms)
+        return CapabilityResponse(success=False, error=f"Function execution failed: {reply.get('error', '')}"[:1000], error_type="function_execution_error", latency_ms=latency_ms)
+
     def _dispatch_core_function(self, principal_id, entry, args, request_id, start_time):
         pack_id, function_id = entry.pack_id, entry.function_id
         grant_config = entry.manifest.get("grant_config", {})
@@ -930,6 +1002,8 @@ if __name__ == "__main__":
         ep_file, ep_func = handler_def.entrypoint.rsplit(":", 1)
         handler_py_path = handler_def.handler_dir / ep_file
         context = {"principal_id": principal_id, "permission_id": permission_id, "handler_id": handler_def.handler_id, "grant_config": grant_config, "request_id": request_id, "ts": self._now_ts()}
+        if self._worker_pool is not None:
+            return self._execute_handler_in_pool(handler_def, principal_id, handler_py_path, ep_func, context, args, timeout_seconds, start_time)
         runner_script = self._generate_runner_script(handler_py_path=str(handler_py_path), func_name=ep_func)
         runner_file = None
         try:
@@ -961,6 +1035,22 @@ if __name__ == "__main__":
                 try: os.unlink(runner_file)
                 except Exception: pass
 
+    def _execute_handler_in_pool(self, handler_def, principal_id, handler_py_path, func_name, context, args, timeout_seconds, start_time):
+        """常駐ワーカープールで handler を実行する（_generate_runner_script と同等の意味論）。"""
+        cwd = str(Path(__file__).parent.parent) if getattr(handler_def, "is_builtin", False) else str(handler_def.handler_dir)
+        spec = WorkerSpec(scope=principal_id, module_path=str(Path(handler_py_path).resolve()), func_name=func_name,
+                          cwd=cwd, path_entry=cwd, path_mode="append", module_name="handler_module")
+        reply = self._worker_pool.call(spec, context, args, timeout_seconds)
+        latency_ms = (time.time() - start_time) * 1000
+        if reply.get("ok"):
+            return CapabilityResponse(success=True, output=reply.get("result"), latency_ms=latency_ms)
+        error_type = reply.get("error_type")
+        if error_type == "timeout":
+            return CapabilityResponse(success=False, error="Handler execution timed out", error_type="timeout", latency_ms=latency_ms)
+        if error_type == "response_too_large":
+            return CapabilityResponse(success=False, error="Response too large", error_type="response_too_large", latency_ms=latency_ms)
+        return CapabilityResponse(success=False, error="Handler execution failed", error_type="handler_error", latency_ms=latency_ms)
+
     def _generate_runner_script(self, handler_py_path, func_name):
         safe_path = json.dumps(handler_py_path)
         safe_func = json.dumps(func_name)
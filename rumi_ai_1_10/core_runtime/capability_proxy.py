@@ -10,6 +10,7 @@ Pack コンテナからの capability 実行要求を受ける。
 - egress_proxy.py の UDS 設計と同等のアーキテクチャ
 - principal_id ごとに個別のソケットファイル
 - length-prefix JSON プロトコル（rumi_syscall と同じ）
+- 接続は永続化でき、"mux_id" 付きリクエストは1接続上で並行処理する（uds_multiplex）
 - permissive モードでも UDS 経由を維持
 
 セキュリティ:
@@ -35,9 +36,14 @@ from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 
+from .uds_multiplex import MUX_ID_FIELD, MuxResponder, is_valid_mux_id, read_frame_or_eof
+
 MAX_REQUEST_SIZE = 4 * 1024 * 1024
 MAX_RESPONSE_SIZE = 1 * 1024 * 1024
 
+# 永続接続のアイドルタイムアウト（クライアント側の再利用期限より長くする）
+DEFAULT_CONN_IDLE_TIMEOUT = 60.0
+
 _UNSAFE_CHARS = re.compile(r'[/\\:*?"<>|.\x00-\x1f]')
 
 # パーミッション定数
@@ -56,6 +62,14 @@ def _principal_socket_name(principal_id: str) -> str:
 # パーミッション ユーティリティ（モジュールレベル）
 # ============================================================
 
+def _get_conn_idle_timeout() -> float:
+    """RUMI_CAPABILITY_CONN_IDLE_TIMEOUT（秒）を返す"""
+    try:
+        return max(1.0, float(os.environ.get("RUMI_CAPABILITY_CONN_IDLE_TIMEOUT", str(DEFAULT_CONN_IDLE_TIMEOUT))))
+    except (TypeError, ValueError):
+        return DEFAULT_CONN_IDLE_TIMEOUT
+
+
 def _get_socket_mode() -> int:
     """環境変数からソケットパーミッションモードを取得"""
     raw = os.environ.get("RUMI_CAPABILITY_SOCKET_MODE", "").strip()
@@ -155,28 +169,6 @@ def _sanitize_for_path(s: str) -> str:
     return _UNSAFE_CHARS.sub("_", s)
 
 
-def _read_length_prefixed(sock: socket.socket, max_size: int) -> bytes:
-    """length-prefix データを読み取る"""
-    length_data = b""
-    while len(length_data) < 4:
-        chunk = sock.recv(4 - len(length_data))
-        if not chunk:
-            raise ConnectionError("Connection closed while reading length")
-        length_data += chunk
-    length = struct.unpack(">I", length_data)[0]
-    if length > max_size:
-        raise ValueError(f"Message too large: {length} > {max_size}")
-    if length == 0:
-        return b""
-    data = b""
-    while len(data) < length:
-        chunk = sock.recv(min(length - len(data), 65536))
-        if not chunk:
-            raise ConnectionError("Connection closed while reading data")
-        data += chunk
-    return data
-
-
 def _write_length_prefixed(sock: socket.socket, data: bytes) -> None:
     """length-prefix データを書き込む"""
     sock.sendall(struct.pack(">I", len(data)) + data)
@@ -186,54 +178,85 @@ def _write_length_prefixed(sock: socket.socket, data: bytes) -> None:
 # UDS ハンドラー / サーバー
 # ============================================================
 
+def _protocol_error_response() -> Dict[str, Any]:
+    return {
+        "success": False,
+        "error": "Invalid request",
+        "error_type": "protocol_error",
+        "latency_ms": 0,
+    }
+
+
+def _write_response(sock: socket.socket, resp_dict: Dict[str, Any]) -> None:
+    """応答 dict を書き込む（MAX_RESPONSE_SIZE 超過はエラー応答に置き換える）"""
+    resp_bytes = json.dumps(resp_dict, ensure_ascii=False, default=str).encode("utf-8")
+
+    # レスポンスサイズチェック
+    if len(resp_bytes) > MAX_RESPONSE_SIZE:
+        error_dict = {
+            "success": False,
+            "error": "Response too large",
+            "error_type": "response_too_large",
+            "output": None,
+            "latency_ms": resp_dict.get("latency_ms", 0),
+        }
+        if MUX_ID_FIELD in resp_dict:
+            error_dict[MUX_ID_FIELD] = resp_dict[MUX_ID_FIELD]
+        resp_bytes = json.dumps(error_dict, ensure_ascii=False).encode("utf-8")
+
+    _write_length_prefixed(sock, resp_bytes)
+
+
 class _PrincipalHandler(socketserver.BaseRequestHandler):
     """
     単一接続のハンドラー
 
     principal_id はサーバー属性から取得（ソケット由来）。
+    接続はクライアントが閉じるかアイドルタイムアウトまで維持し、
+    "mux_id" 付きリクエストは並行に処理する（uds_multiplex 参照）。
     """
 
     def handle(self):
         principal_id = self.server.principal_id
         executor = self.server.capability_executor
+        responder = MuxResponder(self.request, _write_response, name="rumi-capability-mux")
         try:
-            raw = _read_length_prefixed(self.request, MAX_REQUEST_SIZE)
-            request_data = json.loads(raw.decode("utf-8"))
-        except (ConnectionError, json.JSONDecodeError, ValueError):
-            error_resp = {
-                "success": False,
-                "error": "Invalid request",
-                "error_type": "protocol_error",
-                "latency_ms": 0,
-            }
-            try:
-                resp_bytes = json.dumps(error_resp, ensure_ascii=False).encode("utf-8")
-                _write_length_prefixed(self.request, resp_bytes)
-            except Exception:
-                pass
+            self.request.settimeout(_get_conn_idle_timeout())
+            while True:
+                try:
+                    raw = read_frame_or_eof(self.request, MAX_REQUEST_SIZE)
+                    if raw is None:
+                        return
+                    request_data = json.loads(raw.decode("utf-8"))
+                    if not isinstance(request_data, dict):
+                        raise ValueError("Request must be a JSON object")
+                except socket.timeout:
+                    if responder.busy():
+                        continue
+                    return
+                except (ConnectionError, json.JSONDecodeError, ValueError):
+                    responder.write(_protocol_error_response())
+                    return
+
+                mux_id = request_data.pop(MUX_ID_FIELD, None)
+                if mux_id is None:
+                    # executor に委譲（principal_id はソケット由来）
+                    response = executor.execute(principal_id, request_data)
+                    if not responder.write(response.to_dict()):
+                        return
+                elif not is_valid_mux_id(mux_id):
+                    responder.write(_protocol_error_response())
+                    return
+                else:
+                    responder.submit(
+                        mux_id,
+                        lambda req=request_data: executor.execute(principal_id, req).to_dict(),
+                    )
+        except OSError:
             return
-
-        # executor に委譲（principal_id はソケット由来）
-        response = executor.execute(principal_id, request_data)
-
-        resp_dict = response.to_dict()
-        resp_bytes = json.dumps(resp_dict, ensure_ascii=False, default=str).encode("utf-8")
-
-        # レスポンスサイズチェック
-        if len(resp_bytes) > MAX_RESPONSE_SIZE:
-            resp_dict = {
-                "success": False,
-                "error": "Response too large",
-                "error_type": "response_too_large",
-                "output": None,
-                "latency_ms": response.latency_ms,
-            }
-            resp_bytes = json.dumps(resp_dict, ensure_ascii=False).encode("utf-8")
-
-        try:
-            _write_length_prefixed(self.request, resp_bytes)
-        except Exception:
-            pass
+        finally:
+            # 処理中の多重化リクエストの応答を書き終えてから接続を閉じる
+            responder.wait()
 
 
 class _ThreadedUnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
@@ -3,17 +3,28 @@ capability_usage_store.py - Capability 使用回数永続化ストア
 
 principal_id x permission_id x scope_key ごとの使用回数を永続管理する。
 
-保存先: user_data/permissions/capability_usage/<safe_principal_id>.json
+保存先: user_data/permissions/capability_usage/<safe_principal_id>.json  (スナップショット)
+        user_data/permissions/capability_usage/<safe_principal_id>.wal   (追記ログ)
 
 設計原則:
 - 再起動しても使用回数は復活しない (永続)
-- HMAC 署名で改ざん検知
+- 使用回数はメモリ上で数え、消費 1 件ごとに追記ログへ 1 行追加する
+  （ファイル全体の書き直しをしない）
+- 追記ログの各行は直前の行の HMAC を含めて署名する（HMAC チェーン）。
+  スナップショットは従来どおり HMAC 署名。どちらも不一致は改ざんとして監査ログに記録
+- 追記ログ末尾の行の削除はチェーンからは検知できない。畳み込み済み（close 時を含む）の
+  消費はスナップショットの署名で守られるため、検知できない範囲は直近の畳み込み以降の行に限られる
+- グループコミット: 同じ principal への同時消費は 1 回の書き込みにまとめる。
+  RUMI_USAGE_FLUSH_INTERVAL_MS > 0 なら書き込みを待たずに返し、一定間隔でまとめて書く
+- 追記ログが RUMI_USAGE_COMPACT_THRESHOLD 行に達したらスナップショットへ畳み込む
+- ロックは principal 単位
 - fail-closed: 読み込みエラー時は使用済みとして扱う
 - atomic write (tmp -> rename) でファイル破損を防止
 """
 
 from __future__ import annotations
 
+import atexit
 import hashlib
 import hmac
 import json
@@ -21,10 +32,26 @@ import os
 import tempfile as _tf
 import threading
 import time
+import uuid
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Tuple
+
+
+def _get_flush_interval() -> float:
+    """追記ログの遅延書き込み間隔（秒）。0 なら消費ごとに書き込みを待つ"""
+    try:
+        return max(0.0, float(os.environ.get("RUMI_USAGE_FLUSH_INTERVAL_MS", "0"))) / 1000.0
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _get_compact_threshold() -> int:
+    try:
+        return max(1, int(os.environ.get("RUMI_USAGE_COMPACT_THRESHOLD", "1000")))
+    except (TypeError, ValueError):
+        return 1000
 
 
 @dataclass
@@ -67,6 +94,23 @@ class ConsumeResult:
     remaining: int = 0
 
 
+class _PrincipalState:
+    """principal ごとのメモリ上の使用記録と追記ログの状態"""
+
+    def __init__(self) -> None:
+        # ロック順: lock -> flush_lock -> pending_lock
+        self.lock = threading.RLock()
+        self.flush_lock = threading.Lock()  # 追記ログへの書き込みは 1 スレッドずつ
+        self.pending_lock = threading.Lock()
+        self.records: Dict[str, UsageRecord] = {}
+        self.wal_id: Optional[str] = None  # スナップショットと対応する追記ログの世代
+        self.last_mac = ""  # チェーン末尾の HMAC
+        self.seq = 0
+        self.flushed_seq = 0
+        self.wal_count = 0  # スナップショット以降の追記行数
+        self.pending: List[Tuple[int, str]] = []  # (seq, 署名済みの行)
+
+
 class CapabilityUsageStore:
     """Capability 使用回数永続化ストア"""
 
@@ -76,8 +120,12 @@ class CapabilityUsageStore:
     def __init__(self, usage_dir: str = None, secret_key: str = None):
         self._usage_dir = Path(usage_dir) if usage_dir else Path(self.USAGE_DIR)
         self._secret_key = secret_key or self._load_secret_key()
-        self._lock = threading.RLock()
-        self._cache: Dict[str, Dict[str, UsageRecord]] = {}
+        self._lock = threading.Lock()  # _states の出し入れのみ
+        self._states: Dict[str, _PrincipalState] = {}
+        self._flush_interval = _get_flush_interval()
+        self._compact_threshold = _get_compact_threshold()
+        self._flusher: Optional[threading.Thread] = None
+        self._closed = threading.Event()
         self._usage_dir.mkdir(parents=True, exist_ok=True)
 
     def _now_ts(self) -> str:
@@ -108,6 +156,9 @@ class CapabilityUsageStore:
     def _get_file_path(self, principal_id: str) -> Path:
         return self._usage_dir / (self._safe_principal_id(principal_id) + ".json")
 
+    def _get_wal_path(self, principal_id: str) -> Path:
+        return self._usage_dir / (self._safe_principal_id(principal_id) + ".wal")
+
     def _compute_hmac(self, data: Dict[str, Any]) -> str:
         data_copy = {k: v for k, v in data.items() if not k.startswith("_hmac")}
         payload = json.dumps(data_copy, sort_keys=True, ensure_ascii=False)
@@ -117,13 +168,52 @@ class CapabilityUsageStore:
             hashlib.sha256,
         ).hexdigest()
 
-    def _load_principal(self, principal_id: str) -> Dict[str, UsageRecord]:
-        if principal_id in self._cache:
-            return self._cache[principal_id]
+    def _chain_anchor(self, wal_id: str) -> str:
+        """追記ログの世代ごとのチェーン起点"""
+        return hmac.new(
+            self._secret_key.encode("utf-8"),
+            ("wal:" + wal_id).encode("utf-8"),
+            hashlib.sha256,
+        ).hexdigest()
+
+    def _chain_hmac(self, prev_mac: str, entry: Dict[str, Any]) -> str:
+        """直前の HMAC と行の内容を合わせて署名する"""
+        return self._compute_hmac({"prev": prev_mac, "entry": entry})
+
+    # ------------------------------------------------------------------
+    # 読み込み
+    # ------------------------------------------------------------------
+
+    def _get_state(self, principal_id: str) -> _PrincipalState:
+        """principal の状態を返す（未ロードならスナップショット + 追記ログから復元）"""
+        with self._lock:
+            state = self._states.get(principal_id)
+            if state is not None:
+                return state
+            state = _PrincipalState()
+            # ロード完了まで他スレッドを待たせる（利用側は必ず state.lock を取る）
+            state.lock.acquire()
+            self._states[principal_id] = state
+        try:
+            self._load_into(principal_id, state)
+        finally:
+            state.lock.release()
+        return state
+
+    def _load_into(self, principal_id: str, state: _PrincipalState) -> None:
+        snapshot_ok = self._load_snapshot(principal_id, state)
+        if snapshot_ok and state.wal_id is not None:
+            if not self._replay_wal(principal_id, state):
+                # チェーンが壊れた・末尾を切り詰められなかった追記ログには追記できないため、
+                # 検証済みの分で畳み直す
+                self._compact(principal_id, state)
+        state.flushed_seq = state.seq
+
+    def _load_snapshot(self, principal_id: str, state: _PrincipalState) -> bool:
+        """スナップショットを読む。改ざん・読み込みエラー時は空にして False"""
         file_path = self._get_file_path(principal_id)
         if not file_path.exists():
-            self._cache[principal_id] = {}
-            return self._cache[principal_id]
+            return True
         try:
             with open(file_path, "r", encoding="utf-8") as f:
                 data = json.load(f)
@@ -132,24 +222,176 @@ class CapabilityUsageStore:
                 computed_sig = self._compute_hmac(data)
                 if not hmac.compare_digest(stored_sig, computed_sig):
                     self._audit_tamper_detected(principal_id, file_path)
-                    self._cache[principal_id] = {}
-                    return self._cache[principal_id]
+                    return False
             records: Dict[str, UsageRecord] = {}
             for key, rec_data in data.get("records", {}).items():
                 records[key] = UsageRecord.from_dict(rec_data)
-            self._cache[principal_id] = records
-            return records
+            state.records = records
+            state.wal_id = data.get("wal_id")
+            state.seq = int(data.get("wal_seq", 0))
+            return True
+        except Exception:
+            state.records = {}
+            return False
+
+    def _replay_wal(self, principal_id: str, state: _PrincipalState) -> bool:
+        """
+        追記ログを検証しながら適用する。
+
+        別世代（畳み込み済み）の行は読み飛ばす。HMAC チェーンが切れた時点で
+        適用をやめ、改ざんとして監査ログに記録して False を返す。
+        末尾の書きかけの 1 行（クラッシュ時）は切り詰める。残すと次の追記が
+        同じ行に続き、チェーン切れと誤検知されるため。
+        """
+        wal_path = self._get_wal_path(principal_id)
+        if not wal_path.exists():
+            return True
+        try:
+            lines = wal_path.read_bytes().split(b"\n")
         except Exception:
-            self._cache[principal_id] = {}
-            return self._cache[principal_id]
+            return False
+        prev_by_wal: Dict[str, str] = {}
+        offset = 0  # 検証済みの行の末尾位置（バイト）
+        for index, raw in enumerate(lines):
+            line_end = offset + len(raw) + 1
+            if not raw:
+                offset = line_end
+                continue
+            try:
+                entry = json.loads(raw.decode("utf-8"))
+                mac = entry.pop("_hmac", "")
+                wal_id = entry["wal"]
+            except (ValueError, KeyError, TypeError, AttributeError):
+                if index == len(lines) - 1:
+                    # 書きかけの末尾行。切り詰められなければ畳み直しに任せる
+                    try:
+                        os.truncate(str(wal_path), offset)
+                    except OSError:
+                        return False
+                    break
+                self._audit_tamper_detected(principal_id, wal_path)
+                return False
+            prev = prev_by_wal.get(wal_id) or self._chain_anchor(str(wal_id))
+            if not hmac.compare_digest(str(mac), self._chain_hmac(prev, entry)):
+                self._audit_tamper_detected(principal_id, wal_path)
+                return False
+            prev_by_wal[wal_id] = mac
+            offset = line_end  # 読み飛ばす旧世代の行も含め、検証済みの行は残す
+            if wal_id != state.wal_id:
+                continue
+            self._apply(state.records, entry)
+            state.seq = int(entry.get("seq", state.seq))
+            state.last_mac = mac
+            state.wal_count += 1
+        return True
+
+    @staticmethod
+    def _apply(records: Dict[str, UsageRecord], entry: Dict[str, Any]) -> None:
+        """追記ログの 1 行をメモリ上の記録に適用する"""
+        if entry.get("op") != "consume":
+            return
+        key = entry["key"]
+        record = records.get(key)
+        if record is None:
+            record = UsageRecord(permission_id=entry.get("permission_id", ""),
+                                 scope_key=entry.get("scope_key", ""))
+            records[key] = record
+        record.used_count += 1
+        record.last_used_ts = entry.get("ts")
+        day = entry.get("day")
+        if day:
+            record.daily_counts[day] = record.daily_counts.get(day, 0) + 1
 
-    def _save_principal(self, principal_id: str) -> bool:
+    def _load_principal(self, principal_id: str) -> Dict[str, UsageRecord]:
+        return self._get_state(principal_id).records
+
+    # ------------------------------------------------------------------
+    # 書き込み
+    # ------------------------------------------------------------------
+
+    def _append(self, state: _PrincipalState, entry: Dict[str, Any]) -> int:
+        """追記ログの 1 行を署名して書き込み待ちに積む（state.lock を保持して呼ぶ）"""
+        state.seq += 1
+        entry["wal"] = state.wal_id
+        entry["seq"] = state.seq
+        if not state.last_mac:
+            state.last_mac = self._chain_anchor(str(state.wal_id))
+        mac = self._chain_hmac(state.last_mac, entry)
+        state.last_mac = mac
+        line = json.dumps({**entry, "_hmac": mac}, ensure_ascii=False)
+        with state.pending_lock:
+            state.pending.append((state.seq, line))
+        state.wal_count += 1
+        return state.seq
+
+    def _commit(self, principal_id: str, state: _PrincipalState, seq: int) -> bool:
+        """
+        seq までの追記ログを書き込む（グループコミット）。
+
+        書き込み中に積まれた行は次に flush_lock を取ったスレッドがまとめて書く。
+        先行スレッドが自分の行まで書いていれば何もしない。
+        """
+        with state.flush_lock:
+            if state.flushed_seq >= seq:
+                return True
+            with state.pending_lock:
+                batch = state.pending
+                state.pending = []
+            if not batch:
+                return state.flushed_seq >= seq
+            try:
+                with open(self._get_wal_path(principal_id), "a", encoding="utf-8") as f:
+                    f.write("\n".join(line for _, line in batch) + "\n")
+            except Exception:
+                # 書き込めなかった行は次回のコミットで再試行する
+                with state.pending_lock:
+                    state.pending = batch + state.pending
+                return False
+            state.flushed_seq = batch[-1][0]
+        if state.wal_count >= self._compact_threshold:
+            with state.lock:
+                if state.wal_count >= self._compact_threshold:
+                    self._compact(principal_id, state)
+        return True
+
+    def _compact(self, principal_id: str, state: _PrincipalState) -> bool:
+        """
+        メモリ上の記録をスナップショットに書き、新しい世代の追記ログを始める。
+
+        スナップショットが先に新世代を指すため、追記ログの切り詰め前にクラッシュしても
+        旧世代の行は読み飛ばされる（二重適用されない）。
+        """
+        with state.lock, state.flush_lock:
+            wal_id = uuid.uuid4().hex
+            if not self._save_principal(principal_id, state.records, wal_id, state.seq):
+                return False
+            with state.pending_lock:
+                state.pending = []  # スナップショットに反映済み
+            state.wal_id = wal_id
+            state.last_mac = ""
+            state.wal_count = 0
+            state.flushed_seq = state.seq
+            try:
+                with open(self._get_wal_path(principal_id), "w", encoding="utf-8"):
+                    pass
+            except Exception:
+                pass
+            return True
+
+    def _save_principal(
+        self,
+        principal_id: str,
+        records: Dict[str, UsageRecord],
+        wal_id: str,
+        wal_seq: int,
+    ) -> bool:
         """atomic write: tmp -> os.replace"""
-        records = self._cache.get(principal_id, {})
         data = {
             "principal_id": principal_id,
             "updated_at": self._now_ts(),
             "records": {key: rec.to_dict() for key, rec in records.items()},
+            "wal_id": wal_id,
+            "wal_seq": wal_seq,
         }
         data["_hmac_signature"] = self._compute_hmac(data)
         file_path = self._get_file_path(principal_id)
@@ -168,6 +410,60 @@ class CapabilityUsageStore:
                     pass
             return False
 
+    def flush(self) -> None:
+        """書き込み待ちの追記ログを全 principal 分書き込む"""
+        with self._lock:
+            items = list(self._states.items())
+        for principal_id, state in items:
+            with state.lock:
+                seq = state.seq
+            if state.flushed_seq < seq:
+                self._commit(principal_id, state, seq)
+
+    def close(self) -> None:
+        """
+        遅延書き込みスレッドを止めて残りを書き込み、スナップショットへ畳み込む。
+
+        畳み込んだ消費はスナップショットの署名で守られる（追記ログ末尾の削除で消えない）。
+        """
+        self._closed.set()
+        if self._flusher is not None:
+            self._flusher.join(timeout=5)
+            self._flusher = None
+        self.flush()
+        with self._lock:
+            items = list(self._states.items())
+        for principal_id, state in items:
+            with state.lock:
+                if state.wal_count:
+                    self._compact(principal_id, state)
+
+    def _ensure_flusher(self) -> None:
+        if self._flusher is not None or self._closed.is_set():
+            return
+        with self._lock:
+            if self._flusher is not None:
+                return
+            self._flusher = threading.Thread(
+                target=self._flush_loop, name="capability_usage_flush", daemon=True,
+            )
+            self._flusher.start()
+        atexit.register(self._atexit_flush)
+
+    def _flush_loop(self) -> None:
+        while not self._closed.wait(self._flush_interval):
+            try:
+                self.flush()
+            except Exception:
+                pass
+
+    def _atexit_flush(self) -> None:
+        """終了時のフラッシュ(例外を握りつぶす)"""
+        try:
+            self.close()
+        except Exception:
+            pass
+
     def _audit_tamper_detected(self, principal_id: str, file_path: Path) -> None:
         try:
             from .audit_logger import get_audit_logger
@@ -193,13 +489,14 @@ class CapabilityUsageStore:
         max_daily_count: int = 0,
         expires_at_epoch: float = 0,
     ) -> ConsumeResult:
-        with self._lock:
-            if expires_at_epoch > 0 and time.time() > expires_at_epoch:
-                return ConsumeResult(
-                    allowed=False, reason="expired",
-                    scope_key=scope_key, max_count=max_count,
-                )
-            records = self._load_principal(principal_id)
+        if expires_at_epoch > 0 and time.time() > expires_at_epoch:
+            return ConsumeResult(
+                allowed=False, reason="expired",
+                scope_key=scope_key, max_count=max_count,
+            )
+        state = self._get_state(principal_id)
+        with state.lock:
+            records = state.records
             key = self._record_key(permission_id, scope_key)
             record = records.get(key)
             if record is None:
@@ -221,40 +518,54 @@ class CapabilityUsageStore:
                         used_count=record.used_count, max_count=max_count,
                         scope_key=scope_key, remaining=rem,
                     )
-            record.used_count += 1
-            record.last_used_ts = self._now_ts()
-            if max_daily_count > 0:
-                today = self._today_str()
-                record.daily_counts[today] = record.daily_counts.get(today, 0) + 1
-            self._save_principal(principal_id)
-            rem = max(0, max_count - record.used_count) if max_count > 0 else -1
-            return ConsumeResult(
-                allowed=True, used_count=record.used_count,
-                max_count=max_count, scope_key=scope_key, remaining=rem,
-            )
+            if state.wal_id is None:
+                # 追記ログ導入前のスナップショット（または新規）: 世代を確定させてから追記する
+                self._compact(principal_id, state)
+            entry = {
+                "op": "consume",
+                "key": key,
+                "permission_id": permission_id,
+                "scope_key": scope_key,
+                "ts": self._now_ts(),
+                "day": self._today_str() if max_daily_count > 0 else None,
+            }
+            self._apply(records, entry)
+            seq = self._append(state, entry)
+            used_count = record.used_count
+        if self._flush_interval > 0:
+            self._ensure_flusher()
+        else:
+            self._commit(principal_id, state, seq)
+        rem = max(0, max_count - used_count) if max_count > 0 else -1
+        return ConsumeResult(
+            allowed=True, used_count=used_count,
+            max_count=max_count, scope_key=scope_key, remaining=rem,
+        )
 
     def get_usage(self, principal_id, permission_id, scope_key):
-        with self._lock:
-            records = self._load_principal(principal_id)
-            return records.get(self._record_key(permission_id, scope_key))
+        state = self._get_state(principal_id)
+        with state.lock:
+            return state.records.get(self._record_key(permission_id, scope_key))
 
     def get_all_usage(self, principal_id: str) -> Dict[str, UsageRecord]:
-        with self._lock:
-            return dict(self._load_principal(principal_id))
+        state = self._get_state(principal_id)
+        with state.lock:
+            return dict(state.records)
 
     def reset_usage(self, principal_id, permission_id, scope_key) -> bool:
-        with self._lock:
-            records = self._load_principal(principal_id)
+        state = self._get_state(principal_id)
+        with state.lock:
             key = self._record_key(permission_id, scope_key)
-            if key in records:
-                del records[key]
-                return self._save_principal(principal_id)
+            if key in state.records:
+                del state.records[key]
+                return self._compact(principal_id, state)
             return False
 
     def reset_all(self, principal_id: str) -> bool:
-        with self._lock:
-            self._cache[principal_id] = {}
-            return self._save_principal(principal_id)
+        state = self._get_state(principal_id)
+        with state.lock:
+            state.records = {}
+            return self._compact(principal_id, state)
 
 
 _global_usage_store: Optional[CapabilityUsageStore] = None
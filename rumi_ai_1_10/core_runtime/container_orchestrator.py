@@ -4,22 +4,38 @@ container_orchestrator.py - Dockerコンテナオーケストレーション
 W18-C: DockerRunBuilder に移行し、セキュリティベースラインを統一。
 
 Packごとのコンテナ管理を行う。
+
+常駐コンテナセッション（RUMI_CONTAINER_SESSIONS=1）:
+  call_in_session() で承認済み Pack/イメージごとの常駐コンテナに
+  リクエストを送る。承認ハッシュ変更・アイドル・リクエスト数でリサイクル。
 """
 
 from __future__ import annotations
 
 import json
 import logging
+import os
 import subprocess
 import threading
+import time
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 
 from .docker_run_builder import DockerRunBuilder
 from .paths import ECOSYSTEM_DIR
+from .container_session import (
+    DEFAULT_SESSION_IDLE_TIMEOUT,
+    DEFAULT_SESSION_MAX_REQUESTS,
+    DEFAULT_SESSION_STARTUP_TIMEOUT,
+    ChannelClosed,
+    ContainerSession,
+    ContainerSessionSpec,
+    FrameTimeout,
+    FrameTooLarge,
+)
 
 
 @dataclass
@@ -33,6 +49,13 @@ class ContainerResult:
 logger = logging.getLogger(__name__)
 
 
+def _env_positive_int(name: str, default: int) -> int:
+    try:
+        return max(1, int(os.environ.get(name, str(default))))
+    except (TypeError, ValueError):
+        return default
+
+
 class ContainerOrchestrator:
     """Dockerコンテナオーケストレータ"""
     
@@ -46,6 +69,14 @@ class ContainerOrchestrator:
         self._containers: Dict[str, str] = {}
         self._lock = threading.Lock()
         self._docker_available: Optional[bool] = None
+        # 常駐コンテナセッション
+        self._sessions: Dict[ContainerSessionSpec, ContainerSession] = {}
+        self._session_max_requests = _env_positive_int(
+            "RUMI_CONTAINER_SESSION_MAX_REQUESTS", DEFAULT_SESSION_MAX_REQUESTS)
+        self._session_idle_timeout = float(_env_positive_int(
+            "RUMI_CONTAINER_SESSION_IDLE_TIMEOUT", int(DEFAULT_SESSION_IDLE_TIMEOUT)))
+        self._session_reaper: Optional[threading.Thread] = None
+        self._session_reaper_stop = threading.Event()
     
     def is_docker_available(self) -> bool:
         """Docker利用可能性チェック"""
@@ -219,6 +250,156 @@ class ContainerOrchestrator:
 
 
 
+    # ── 常駐コンテナセッション ──────────────────────
+    def call_in_session(
+        self,
+        spec: ContainerSessionSpec,
+        request: Dict[str, Any],
+        timeout: float,
+        max_response_size: int,
+        preload_modules: Optional[Dict[str, str]] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        常駐コンテナセッションで1リクエストを実行する。
+
+        Returns:
+            応答 dict（{"ok": True, "result": ...} / {"ok": False, "error": ..., "error_type": ...}）。
+            セッションを使えない場合（Docker 不可・busy・起動失敗）は None を返し、
+            呼び出し側は従来の使い捨てコンテナで実行する。
+        """
+        if not self.is_docker_available():
+            return None
+
+        stale: List[ContainerSession] = []
+        with self._lock:
+            # 同一 Pack/種別で指紋（承認ハッシュ）が異なるセッションは破棄
+            for key in list(self._sessions):
+                if key.pack_id == spec.pack_id and key.kind == spec.kind and key.fingerprint != spec.fingerprint:
+                    stale.append(self._sessions.pop(key))
+            session = self._sessions.get(spec)
+            if session is None or session.closed:
+                session = ContainerSession(spec)
+                self._sessions[spec] = session
+        for old in stale:
+            # 実行中のリクエストがあればそのコンテナを殺さず、終わった側に閉じさせる
+            self._retire_session(old)
+
+        if not session.lock.acquire(blocking=False):
+            return None
+        try:
+            deadline = time.monotonic() + timeout
+            if session.proc is None:
+                try:
+                    ready = session.start(preload_modules or {},
+                                          min(timeout, DEFAULT_SESSION_STARTUP_TIMEOUT))
+                except Exception as e:
+                    logger.warning("Container session start failed for %s: %s", spec.pack_id, e)
+                    ready = {"ok": False}
+                if not ready.get("ok"):
+                    self._discard_session(session)
+                    return None
+                self._ensure_session_reaper()
+            remaining = max(deadline - time.monotonic(), 0.001)
+            try:
+                reply = session.request(request, remaining, max_response_size)
+            except FrameTimeout:
+                self._discard_session(session)
+                return {"ok": False, "error": f"Execution timed out after {timeout}s", "error_type": "timeout"}
+            except FrameTooLarge:
+                self._discard_session(session)
+                return {"ok": False, "error": "Response too large", "error_type": "response_too_large"}
+            except ChannelClosed as e:
+                self._discard_session(session)
+                return {"ok": False, "error": f"Container session exited unexpectedly: {e}",
+                        "error_type": "session_crashed"}
+            session.requests_served += 1
+            session.last_used = time.monotonic()
+            if session.requests_served >= self._session_max_requests:
+                self._discard_session(session)
+            return reply
+        finally:
+            session.lock.release()
+            if session.retired:
+                self._retire_session(session)
+
+    def stop_sessions(self, pack_id: Optional[str] = None) -> int:
+        """常駐コンテナセッションを停止する（pack_id 指定時はその Pack のみ）。"""
+        with self._lock:
+            victims = [k for k in self._sessions if pack_id is None or k.pack_id == pack_id]
+            sessions = [self._sessions.pop(k) for k in victims]
+        if pack_id is None:
+            self._session_reaper_stop.set()
+        for session in sessions:
+            session.close()
+        return len(sessions)
+
+    def reap_idle_sessions(self) -> int:
+        """アイドルタイムアウトを超えたセッションを停止する。"""
+        now = time.monotonic()
+        with self._lock:
+            victims = [
+                k for k, sess in self._sessions.items()
+                if not sess.lock.locked()
+                and (now - sess.last_used > self._session_idle_timeout or not sess.alive())
+            ]
+            sessions = [self._sessions.pop(k) for k in victims]
+        for session in sessions:
+            session.close()
+        return len(sessions)
+
+    def list_sessions(self) -> List[Dict[str, Any]]:
+        """常駐コンテナセッションの一覧"""
+        now = time.monotonic()
+        with self._lock:
+            return [
+                {
+                    "pack_id": spec.pack_id,
+                    "kind": spec.kind,
+                    "image": spec.image,
+                    "container_name": sess.container_name,
+                    "requests_served": sess.requests_served,
+                    "idle_seconds": round(now - sess.last_used, 1),
+                    "busy": sess.lock.locked(),
+                }
+                for spec, sess in self._sessions.items()
+            ]
+
+    def _discard_session(self, session: ContainerSession) -> None:
+        with self._lock:
+            if self._sessions.get(session.spec) is session:
+                del self._sessions[session.spec]
+        session.close()
+
+    def _retire_session(self, session: ContainerSession) -> None:
+        """
+        管理対象から外したセッションを、使用中でなければ閉じる。
+
+        使用中なら retired の印だけ付け、call_in_session が lock を離した後に閉じる。
+        印を付けてから lock を試すため、どちらか一方が必ず閉じる。
+        """
+        session.retired = True
+        if not session.lock.acquire(blocking=False):
+            return
+        try:
+            if not session.closed:
+                session.close()
+        finally:
+            session.lock.release()
+
+    def _ensure_session_reaper(self) -> None:
+        with self._lock:
+            if self._session_reaper is not None and self._session_reaper.is_alive():
+                return
+            self._session_reaper_stop.clear()
+            self._session_reaper = threading.Thread(
+                target=self._session_reap_loop, name="rumi-container-session-reaper", daemon=True)
+            self._session_reaper.start()
+
+    def _session_reap_loop(self) -> None:
+        interval = min(self._session_idle_timeout / 2, 30.0)
+        while not self._session_reaper_stop.wait(interval):
+            self.reap_idle_sessions()
+
     # ── universal_call container support ──────────────────────
     _UC_DEFAULT_IMAGES = {
         "python": "python:3.11-slim",
@@ -0,0 +1,287 @@
+"""
+container_session.py - 常駐コンテナセッション
+
+docker run --rm を呼び出しごとに行う代わりに、承認済み Pack ごとに
+ロックダウンされたコンテナを1つ起動したままにし、stdin/stdout の
+length-prefix JSON ループでリクエストを処理する。
+
+設計原則:
+- コンテナは DockerRunBuilder のセキュリティベースライン
+  （--network=none, --read-only, --cap-drop=ALL, RO マウント）で起動する
+- セッションキーに承認時のファイルハッシュ指紋を含め、
+  再承認・ハッシュ変更時は別セッションとして起動し直す
+- 1セッションは同時に1リクエストのみ処理（busy なら呼び出し側は
+  従来の使い捨てコンテナにフォールバックする）
+- タイムアウト時はセッションのコンテナを kill して破棄する
+
+主要コンポーネント:
+- ContainerSessionSpec: セッションキー（イメージ・マウント・指紋）
+- ContainerSession: 1コンテナとの通信ハンドル
+- SESSION_LOOP_SCRIPT: コンテナ内で動くリクエストループ
+"""
+
+from __future__ import annotations
+
+import os
+import subprocess
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+from .docker_run_builder import DockerRunBuilder
+from .function_worker_pool import (
+    FRAME_IO_SOURCE,
+    ChannelClosed,
+    FrameTimeout,
+    FrameTooLarge,
+    recv_frame,
+    send_frame,
+)
+
+
+DEFAULT_SESSION_MAX_REQUESTS = 1000
+DEFAULT_SESSION_IDLE_TIMEOUT = 300.0
+DEFAULT_SESSION_STARTUP_TIMEOUT = 60.0
+
+
+def is_container_session_enabled() -> bool:
+    """RUMI_CONTAINER_SESSIONS が有効かどうかを返す。"""
+    return os.environ.get("RUMI_CONTAINER_SESSIONS", "0").lower() in ("1", "true", "yes")
+
+
+# ============================================================
+# コンテナ内リクエストループ
+# ============================================================
+
+# init フレーム:  {"preload_modules": {name: source, ...}}
+# 要求フレーム:
+#   {"kind": "function", "module": path, "func": name, "context": {...}, "args": {...}}
+#     → fn(context, args)（_generate_function_runner_script と同じ呼び出し規約）
+#   {"kind": "python_file", "module": path, "input_data": ..., "context": {...}}
+#     → run(input_data, context) / run(input_data) / run()（_generate_executor_script と同じ）
+SESSION_LOOP_SCRIPT = FRAME_IO_SOURCE + r'''
+import importlib.util, inspect, types
+
+_MODULES = {}
+
+def _load(path, name):
+    mod = _MODULES.get(path)
+    if mod is not None:
+        return mod
+    spec = importlib.util.spec_from_file_location(name, path)
+    if spec is None or spec.loader is None:
+        raise ImportError("Cannot load module: " + path)
+    mod = importlib.util.module_from_spec(spec)
+    sys.modules[name] = mod
+    spec.loader.exec_module(mod)
+    _MODULES[path] = mod
+    return mod
+
+def _preload(modules):
+    for name, source in (modules or {}).items():
+        mod = types.ModuleType(name)
+        exec(compile(source, "<" + name + ">", "exec"), mod.__dict__)
+        sys.modules[name] = mod
+
+def _python_file_context(ctx):
+    try:
+        import rumi_syscall
+        def _http_request(method, url, headers=None, body=None, timeout_seconds=30.0):
+            return rumi_syscall.http_request(method, url, headers=headers, body=body,
+                                             timeout_seconds=timeout_seconds)
+        def _network_check(domain, port):
+            return {"allowed": True, "reason": "Network access controlled by UDS Egress Proxy in container mode"}
+        ctx["http_request"] = _http_request
+        ctx["network_check"] = _network_check
+    except ImportError:
+        pass
+    if os.path.exists("/run/rumi/capability.sock"):
+        ctx["capability_socket"] = "/run/rumi/capability.sock"
+    return ctx
+
+def _handle(req):
+    kind = req.get("kind")
+    path = req.get("module", "")
+    if not os.path.isfile(path):
+        return {"ok": False, "error": "Module not found: " + path, "error_type": "file_not_found"}
+    if kind == "function":
+        try:
+            mod = _load(path, "function_module")
+        except Exception as e:
+            return {"ok": False, "error": "Module load failed: " + str(e), "error_type": "load_error"}
+        fn = getattr(mod, req.get("func", "run"), None)
+        if fn is None:
+            return {"ok": False, "error": "No 'run' function in main.py", "error_type": "func_not_found"}
+        return {"ok": True, "result": fn(req.get("context", {}), req.get("args", {}))}
+    if kind == "python_file":
+        try:
+            mod = _load(path, "target_module")
+        except Exception as e:
+            return {"ok": False, "error": "Module load failed: " + str(e), "error_type": "load_error"}
+        fn = getattr(mod, "run", None)
+        if fn is None:
+            return {"ok": True, "result": {"error": "No run function found"}}
+        ctx = _python_file_context(req.get("context", {}))
+        n = len(inspect.signature(fn).parameters)
+        input_data = req.get("input_data", {})
+        if n >= 2:
+            result = fn(input_data, ctx)
+        elif n == 1:
+            result = fn(input_data)
+        else:
+            result = fn()
+        return {"ok": True, "result": result}
+    return {"ok": False, "error": "Unknown request kind: " + str(kind), "error_type": "invalid_request"}
+
+def main():
+    proto_in, proto_out = _open_protocol_streams()
+    sys.path.insert(0, "/")
+    init = _read_frame(proto_in)
+    if init is None:
+        return
+    for entry in init.get("sys_path", []):
+        if entry not in sys.path:
+            sys.path.insert(0, entry)
+    try:
+        _preload(init.get("preload_modules"))
+    except Exception as e:
+        _write_frame(proto_out, {"ok": False, "error": "Preload failed: " + str(e), "error_type": "load_error"})
+        return
+    _write_frame(proto_out, {"ok": True, "ready": True})
+    while True:
+        req = _read_frame(proto_in)
+        if req is None:
+            break
+        try:
+            reply = _handle(req)
+        except Exception as e:
+            reply = {"ok": False, "error": str(e), "error_type": type(e).__name__}
+        _write_frame(proto_out, reply)
+
+if __name__ == "__main__":
+    main()
+'''
+
+
+# ============================================================
+# ContainerSessionSpec
+# ============================================================
+
+@dataclass(frozen=True)
+class ContainerSessionSpec:
+    """
+    常駐コンテナセッションのキー。
+
+    Attributes:
+        pack_id: 所有 Pack ID
+        kind: "function" または "python_file"
+        image: Docker イメージ
+        fingerprint: 承認済みファイルハッシュの指紋（ApprovalManager 由来）
+        volumes: -v マウント指定（RO 推奨）
+        envs: 環境変数
+        group_adds: --group-add する GID
+        workdir: 作業ディレクトリ
+        sys_path: コンテナ内で sys.path 先頭に追加するパス
+        pids_limit: --pids-limit
+    """
+    pack_id: str
+    kind: str
+    image: str
+    fingerprint: str
+    volumes: Tuple[str, ...] = ()
+    envs: Tuple[Tuple[str, str], ...] = ()
+    group_adds: Tuple[int, ...] = ()
+    workdir: Optional[str] = None
+    sys_path: Tuple[str, ...] = ()
+    pids_limit: int = 50
+
+    def build_command(self, container_name: str) -> list:
+        """docker run -i コマンドを構築する（--rm は維持し、終了時に自動削除）。"""
+        builder = DockerRunBuilder(name=container_name)
+        builder.pids_limit(self.pids_limit)
+        for spec in self.volumes:
+            builder.volume(spec)
+        for key, value in self.envs:
+            builder.env(key, value)
+        for gid in self.group_adds:
+            builder.group_add(gid)
+        if self.workdir:
+            builder.workdir(self.workdir)
+        builder.label("rumi.managed", "true")
+        builder.label("rumi.pack_id", self.pack_id)
+        builder.label("rumi.type", f"session_{self.kind}")
+        builder.image(self.image)
+        builder.command(["python", "-c", SESSION_LOOP_SCRIPT])
+        cmd = builder.build()
+        cmd.insert(2, "-i")
+        return cmd
+
+
+# ============================================================
+# ContainerSession
+# ============================================================
+
+class ContainerSession:
+    """1つの常駐コンテナとの length-prefix JSON 通信を管理する。"""
+
+    def __init__(self, spec: ContainerSessionSpec) -> None:
+        self.spec = spec
+        self.container_name = f"rumi-session-{spec.pack_id}-{uuid.uuid4().hex[:8]}"
+        self.requests_served = 0
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+        self.lock = threading.Lock()
+        self.proc: Optional[subprocess.Popen] = None
+        self.closed = False
+        self.retired = False  # 管理対象から外された（実行中なら最後の利用者が閉じる）
+
+    def start(self, preload_modules: Dict[str, str], timeout: float) -> Dict[str, Any]:
+        """コンテナを起動し、ループの ready 応答を待つ。"""
+        self.proc = subprocess.Popen(
+            self.spec.build_command(self.container_name),
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            bufsize=0,
+        )
+        init = {"preload_modules": preload_modules, "sys_path": list(self.spec.sys_path)}
+        return self.request(init, timeout, 64 * 1024)
+
+    def alive(self) -> bool:
+        return not self.closed and self.proc is not None and self.proc.poll() is None
+
+    def request(self, payload: Dict[str, Any], timeout: float, max_size: int) -> Dict[str, Any]:
+        """
+        1リクエストを送って応答を待つ。
+
+        Raises:
+            FrameTimeout / FrameTooLarge / ChannelClosed
+        """
+        deadline = time.monotonic() + timeout
+        send_frame(self.proc.stdin, payload)
+        return recv_frame(self.proc.stdout.fileno(), deadline, max_size)
+
+    def close(self) -> None:
+        """コンテナを kill し、パイプを閉じる。"""
+        self.closed = True
+        try:
+            subprocess.run(["docker", "kill", self.container_name], capture_output=True, timeout=10)
+        except Exception:
+            pass
+        if self.proc is None:
+            return
+        try:
+            if self.proc.poll() is None:
+                self.proc.kill()
+            self.proc.wait(timeout=5)
+        except Exception:
+            pass
+        for stream in (self.proc.stdin, self.proc.stdout):
+            try:
+                if stream is not None:
+                    stream.close()
+            except Exception:
+                pass
+
@@ -0,0 +1,117 @@
+"""
+store.batch_set - Built-in Capability Handler
+
+複数キーを1トランザクションで書き込む。
+
+セキュリティ:
+- grant_config.allowed_store_ids で制限
+- 全 key を書き込み前に検証し、1件でも不正なら何も書き込まない
+- 1値あたり grant_config.max_value_bytes（デフォルト1MB）、合計 4MB まで
+
+制限:
+- 最大 100 キー
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Any, Dict
+
+
+_SAFE_KEY_RE = re.compile(r"^[a-zA-Z0-9_/.-]+$")
+DEFAULT_MAX_VALUE_BYTES = 1 * 1024 * 1024  # 1MB
+
+
+def execute(context: Dict[str, Any], args: Dict[str, Any]) -> Dict[str, Any]:
+    grant_config = context.get("grant_config", {})
+    principal_id = context.get("principal_id", "")
+
+    store_id = args.get("store_id", "")
+    items = args.get("items", {})
+
+    # --- 入力バリデーション ---
+    if not store_id or not isinstance(store_id, str):
+        return _error("Missing or invalid store_id", "validation_error")
+    if not items or not isinstance(items, dict):
+        return _error("Missing or invalid items", "validation_error")
+    if len(items) > 100:
+        return _error(
+            f"Too many keys ({len(items)}). Maximum is 100.",
+            "validation_error",
+        )
+
+    # --- key セキュリティチェック ---
+    for key in items:
+        if not key or not isinstance(key, str):
+            return _error(f"Invalid key in items: {key!r}", "validation_error")
+        validation = _validate_key(key)
+        if validation is not None:
+            return validation
+
+    # --- Grant config: allowed_store_ids ---
+    allowed = grant_config.get("allowed_store_ids", [])
+    if allowed and store_id not in allowed:
+        return _error("Store not in allowed_store_ids", "grant_denied")
+
+    # --- batch_set 実行 ---
+    max_bytes = grant_config.get("max_value_bytes", DEFAULT_MAX_VALUE_BYTES)
+    try:
+        from core_runtime.store_registry import get_store_registry
+        registry = get_store_registry()
+        result = registry.batch_set(
+            store_id=store_id, items=items, max_value_bytes=max_bytes,
+        )
+    except Exception as e:
+        return _error(f"Batch set failed: {e}", "internal_error")
+
+    if result.get("success"):
+        _audit_batch_set(
+            principal_id, store_id,
+            result.get("written", 0), result.get("size_bytes", 0),
+        )
+
+    return result
+
+
+def _validate_key(key: str) -> Any:
+    if ".." in key.split("/"):
+        return _error("Key contains '..' (path traversal)", "security_error")
+    if not _SAFE_KEY_RE.match(key):
+        return _error(
+            f"Key '{key}' contains invalid characters (allowed: a-zA-Z0-9_/.-)",
+            "validation_error",
+        )
+    if key.startswith("/") or key.endswith("/"):
+        return _error(
+            f"Key '{key}' must not start or end with '/'",
+            "validation_error",
+        )
+    return None
+
+
+def _error(message: str, error_type: str) -> Dict[str, Any]:
+    return {"success": False, "error": message, "error_type": error_type}
+
+
+def _audit_batch_set(
+    principal_id: str,
+    store_id: str,
+    written: int,
+    size_bytes: int,
+) -> None:
+    try:
+        from core_runtime.audit_logger import get_audit_logger
+        audit = get_audit_logger()
+        audit.log_permission_event(
+            pack_id=principal_id,
+            permission_type="capability",
+            action="store_batch_set",
+            success=True,
+            details={
+                "store_id": store_id,
+                "written": written,
+                "size_bytes": size_bytes,
+            },
+        )
+    except Exception:
+        pass
@@ -0,0 +1,57 @@
+"""
+store.changes - Built-in Capability Handler
+
+since_seq より後の Store の変更（書き込み・削除）を seq 順に返す。
+Store を丸ごと list + batch_get し直す代わりに、差分だけを取得できる。
+
+使い方:
+- 初回は since_seq=0（全キーが op="set" として返る）
+- 以後は応答の next_seq を since_seq に渡す
+- has_more が True の間は続けて呼ぶ
+- reset が True の場合は Store が作り直されているため、since_seq=0 から再同期する
+
+セキュリティ:
+- grant_config.allowed_store_ids で制限
+
+制限:
+- limit は最大 1000（デフォルト 100）
+- 累計 900KB を超えた時点で打ち切り、has_more=True で返す
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict
+
+
+def execute(context: Dict[str, Any], args: Dict[str, Any]) -> Dict[str, Any]:
+    grant_config = context.get("grant_config", {})
+
+    store_id = args.get("store_id", "")
+    since_seq = args.get("since_seq", 0)
+    limit = args.get("limit", 100)
+
+    # --- 入力バリデーション ---
+    if not store_id or not isinstance(store_id, str):
+        return _error("Missing or invalid store_id", "validation_error")
+    if isinstance(since_seq, bool) or not isinstance(since_seq, int) or since_seq < 0:
+        return _error("Invalid since_seq (must be non-negative integer)", "validation_error")
+    try:
+        limit = int(limit)
+    except (TypeError, ValueError):
+        return _error("Invalid limit (must be integer)", "validation_error")
+
+    # --- Grant config: allowed_store_ids ---
+    allowed = grant_config.get("allowed_store_ids", [])
+    if allowed and store_id not in allowed:
+        return _error("Store not in allowed_store_ids", "grant_denied")
+
+    try:
+        from core_runtime.store_registry import get_store_registry
+        registry = get_store_registry()
+        return registry.changes(store_id=store_id, since_seq=since_seq, limit=limit)
+    except Exception as e:
+        return _error(f"Failed to read changes: {e}", "internal_error")
+
+
+def _error(message: str, error_type: str) -> Dict[str, Any]:
+    return {"success": False, "error": message, "error_type": error_type}
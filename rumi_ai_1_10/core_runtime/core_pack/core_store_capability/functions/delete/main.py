@@ -5,14 +5,13 @@ Store からキーに対応するデータを削除する。
 
 セキュリティ:
 - grant_config.allowed_store_ids で制限
-- key の '..' 即拒否 + normpath + is_path_within で boundary チェック
+- key の '..' 即拒否 + 安全文字チェック
+- 削除は StoreRegistry の SQLite (store_data) に対して行う
 """
 
 from __future__ import annotations
 
-import os
 import re
-from pathlib import Path
 from typing import Any, Dict
 
 
@@ -42,29 +41,16 @@ def execute(context: Dict[str, Any], args: Dict[str, Any]) -> Dict[str, Any]:
     if allowed and store_id not in allowed:
         return _error("Store not in allowed_store_ids", "grant_denied")
 
-    # --- Store 解決 ---
-    store_root = _resolve_store_root(store_id)
-    if store_root is None:
-        return _error("Store not found: " + store_id, "store_not_found")
-
-    # --- ファイルパス構築 + boundary チェック ---
-    file_path = store_root / (key + ".json")
-    file_path = Path(os.path.normpath(file_path))
-
-    if not _is_path_within(file_path, store_root):
-        return _error("Path traversal detected", "security_error")
-
     # --- 削除 ---
-    if not file_path.exists():
-        return _error("Key not found: " + key, "key_not_found")
-
     try:
-        file_path.unlink()
-    except OSError as e:
+        from core_runtime.store_registry import get_store_registry
+        registry = get_store_registry()
+        result = registry.delete_value(store_id=store_id, key=key)
+    except Exception as e:
         return _error("Failed to delete: " + str(e), "delete_error")
 
-    # 空のサブディレクトリを掃除（store root 自体は削除しない）
-    _cleanup_empty_parents(file_path.parent, store_root)
+    if not result.get("success"):
+        return result
 
     _audit_store_delete(principal_id, store_id, key)
 
@@ -84,47 +70,6 @@ def _validate_key(key: str) -> Any:
     return None
 
 
-def _resolve_store_root(store_id: str) -> Any:
-    try:
-        from core_runtime.store_registry import get_store_registry
-        registry = get_store_registry()
-        store_def = registry.get_store(store_id)
-        if store_def is None:
-            return None
-        root = Path(store_def.root_path)
-        if not root.is_dir():
-            return None
-        return root.resolve()
-    except Exception:
-        return None
-
-
-def _is_path_within(target: Path, boundary: Path) -> bool:
-    try:
-        resolved_target = target.resolve()
-        resolved_boundary = boundary.resolve()
-        resolved_target.relative_to(resolved_boundary)
-        return True
-    except (ValueError, OSError):
-        return False
-
-
-def _cleanup_empty_parents(directory: Path, stop_at: Path) -> None:
-    """空のサブディレクトリを再帰的に削除（stop_at は削除しない）"""
-    try:
-        current = directory.resolve()
-        stop = stop_at.resolve()
-        while current != stop:
-            if not current.is_dir():
-                break
-            if any(current.iterdir()):
-                break
-            current.rmdir()
-            current = current.parent
-    except OSError:
-        pass
-
-
 def _error(message: str, error_type: str) -> Dict[str, Any]:
     return {"success": False, "error": message, "error_type": error_type}
 
@@ -6,6 +6,8 @@ Store 内のキーを列挙する。
 オプションの prefix フィルタでキーを絞り込める。
 
 後方互換: limit/cursor を指定しなければ従来通り全件返却。
+prefix 付きのページネーションでは total_estimate は include_total=true の
+ときだけ計算される（省略時は null）。
 
 セキュリティ:
 - grant_config.allowed_store_ids で制限
@@ -24,6 +26,7 @@ def execute(context: Dict[str, Any], args: Dict[str, Any]) -> Dict[str, Any]:
     prefix = args.get("prefix", "")
     limit = args.get("limit")
     cursor = args.get("cursor")
+    include_total = args.get("include_total", False)
 
     # --- 入力バリデーション ---
     if not store_id or not isinstance(store_id, str):
@@ -45,6 +48,9 @@ def execute(context: Dict[str, Any], args: Dict[str, Any]) -> Dict[str, Any]:
     if cursor is not None and not isinstance(cursor, str):
         return _error("Invalid cursor (must be string)", "validation_error")
 
+    if not isinstance(include_total, bool):
+        return _error("Invalid include_total (must be boolean)", "validation_error")
+
     # --- StoreRegistry の list_keys を呼び出す ---
     try:
         from core_runtime.store_registry import get_store_registry
@@ -54,6 +60,7 @@ def execute(context: Dict[str, Any], args: Dict[str, Any]) -> Dict[str, Any]:
             prefix=prefix or "",
             limit=limit,
             cursor=cursor,
+            include_total=include_total,
         )
     except Exception as e:
         return _error(f"Failed to list keys: {e}", "internal_error")
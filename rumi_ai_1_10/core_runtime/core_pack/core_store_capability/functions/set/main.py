@@ -5,22 +5,17 @@ Store にキーに対応する JSON 値を書き込む。
 
 セキュリティ:
 - grant_config.allowed_store_ids で制限
-- key の '..' 即拒否 + normpath + is_path_within で boundary チェック
-- サブプロセス実行のため store_registry は新インスタンス
-  （ファイルベースのため書き込みは正常動作。メインプロセスの
-   インメモリキャッシュとの即時同期は保証されない。
-   現時点では Store index 自体を変更しないため問題なし。
-   将来的に store_registry._load() 再呼び出しが必要になる可能性あり）
+- key の '..' 即拒否 + 安全文字チェック
+- 値は StoreRegistry の SQLite (store_data) に UPSERT する
+  （WAL モードのため、サブプロセスで生成された別インスタンスからの
+   書き込みもメインプロセスから即座に読める）
 
 注意: max_value_bytes の grant_config 制限をサポート（デフォルト1MB）
 """
 
 from __future__ import annotations
 
-import json
-import os
 import re
-from pathlib import Path
 from typing import Any, Dict
 
 
@@ -54,44 +49,23 @@ def execute(context: Dict[str, Any], args: Dict[str, Any]) -> Dict[str, Any]:
     if allowed and store_id not in allowed:
         return _error("Store not in allowed_store_ids", "grant_denied")
 
-    # --- value サイズチェック ---
+    # --- 書き込み（サイズチェックは StoreRegistry 側） ---
     max_bytes = grant_config.get("max_value_bytes", DEFAULT_MAX_VALUE_BYTES)
     try:
-        value_json = json.dumps(value, ensure_ascii=False, default=str)
-    except (TypeError, ValueError) as e:
-        return _error("Value is not JSON serializable: " + str(e), "validation_error")
-
-    if len(value_json.encode("utf-8")) > max_bytes:
-        return _error(
-            "Value too large (max " + str(max_bytes) + " bytes)",
-            "payload_too_large",
+        from core_runtime.store_registry import get_store_registry
+        registry = get_store_registry()
+        result = registry.set_value(
+            store_id=store_id, key=key, value=value, max_value_bytes=max_bytes,
         )
-
-    # --- Store 解決 ---
-    store_root = _resolve_store_root(store_id)
-    if store_root is None:
-        return _error("Store not found: " + store_id, "store_not_found")
-
-    # --- ファイルパス構築 + boundary チェック ---
-    file_path = store_root / (key + ".json")
-    file_path = Path(os.path.normpath(file_path))
-
-    if not _is_path_within(file_path, store_root):
-        return _error("Path traversal detected", "security_error")
-
-    # --- 書き込み（アトミック） ---
-    try:
-        file_path.parent.mkdir(parents=True, exist_ok=True)
-        tmp_path = file_path.with_suffix(".tmp")
-        with open(tmp_path, "w", encoding="utf-8") as f:
-            f.write(value_json)
-        tmp_path.replace(file_path)
-    except OSError as e:
+    except Exception as e:
         return _error("Failed to write: " + str(e), "write_error")
 
-    _audit_store_write(principal_id, store_id, key, len(value_json))
+    if not result.get("success"):
+        return result
+
+    _audit_store_write(principal_id, store_id, key, result.get("size_bytes", 0))
 
-    return {"success": True, "path": str(file_path)}
+    return {"success": True, "store_id": store_id, "key": key}
 
 
 def _validate_key(key: str) -> Any:
@@ -107,31 +81,6 @@ def _validate_key(key: str) -> Any:
     return None
 
 
-def _resolve_store_root(store_id: str) -> Any:
-    try:
-        from core_runtime.store_registry import get_store_registry
-        registry = get_store_registry()
-        store_def = registry.get_store(store_id)
-        if store_def is None:
-            return None
-        root = Path(store_def.root_path)
-        if not root.is_dir():
-            return None
-        return root.resolve()
-    except Exception:
-        return None
-
-
-def _is_path_within(target: Path, boundary: Path) -> bool:
-    try:
-        resolved_target = target.resolve()
-        resolved_boundary = boundary.resolve()
-        resolved_target.relative_to(resolved_boundary)
-        return True
-    except (ValueError, OSError):
-        return False
-
-
 def _error(message: str, error_type: str) -> Dict[str, Any]:
     return {"success": False, "error": message, "error_type": error_type}
 
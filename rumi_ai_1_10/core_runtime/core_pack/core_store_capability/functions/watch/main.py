@@ -0,0 +1,60 @@
+"""
+store.watch - Built-in Capability Handler
+
+store.changes のロングポーリング版。since_seq より後の変更が現れるまで
+最大 timeout 秒待ってから返す。変更が無いままタイムアウトした場合は
+空の changes と timed_out=True を返す。
+
+セキュリティ:
+- grant_config.allowed_store_ids で制限
+
+制限:
+- timeout は最大 25 秒（Function 実行タイムアウト 30 秒より短くする）
+- limit / サイズ上限は store.changes と同じ
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict
+
+
+MAX_WATCH_TIMEOUT = 25.0
+DEFAULT_WATCH_TIMEOUT = 10.0
+
+
+def execute(context: Dict[str, Any], args: Dict[str, Any]) -> Dict[str, Any]:
+    grant_config = context.get("grant_config", {})
+
+    store_id = args.get("store_id", "")
+    since_seq = args.get("since_seq", 0)
+    limit = args.get("limit", 100)
+    timeout = args.get("timeout", DEFAULT_WATCH_TIMEOUT)
+
+    # --- 入力バリデーション ---
+    if not store_id or not isinstance(store_id, str):
+        return _error("Missing or invalid store_id", "validation_error")
+    if isinstance(since_seq, bool) or not isinstance(since_seq, int) or since_seq < 0:
+        return _error("Invalid since_seq (must be non-negative integer)", "validation_error")
+    try:
+        limit = int(limit)
+        timeout = min(max(float(timeout), 0.0), MAX_WATCH_TIMEOUT)
+    except (TypeError, ValueError):
+        return _error("Invalid limit or timeout", "validation_error")
+
+    # --- Grant config: allowed_store_ids ---
+    allowed = grant_config.get("allowed_store_ids", [])
+    if allowed and store_id not in allowed:
+        return _error("Store not in allowed_store_ids", "grant_denied")
+
+    try:
+        from core_runtime.store_registry import get_store_registry
+        registry = get_store_registry()
+        return registry.watch(
+            store_id=store_id, since_seq=since_seq, timeout=timeout, limit=limit,
+        )
+    except Exception as e:
+        return _error(f"Failed to watch changes: {e}", "internal_error")
+
+
+def _error(message: str, error_type: str) -> Dict[str, Any]:
+    return {"success": False, "error": message, "error_type": error_type}
@@ -375,6 +375,21 @@ def _register_defaults(container: DIContainer) -> None:
         vr = c.get_or_none("vocab_registry")
         return FunctionRegistry(vocab_registry=vr)
 
+    # --- 常駐ワーカープール ---
+    def _function_worker_pool_factory() -> "FunctionWorkerPool":  # noqa: F821
+        from .function_worker_pool import FunctionWorkerPool
+        return FunctionWorkerPool()
+
+    # --- Egress keep-alive 接続プール ---
+    def _egress_connection_pool_factory() -> "EgressConnectionPool":  # noqa: F821
+        from .egress_connection_pool import EgressConnectionPool
+        return EgressConnectionPool()
+
+    # --- ホスト実行用の共有スレッドプール ---
+    def _host_execution_pool_factory() -> "HostExecutionPool":  # noqa: F821
+        from .host_execution_pool import HostExecutionPool
+        return HostExecutionPool()
+
     # --- Register all (each name exactly once) ---
     container.register("audit_logger", _audit_logger_factory)
     container.register("hmac_key_manager", _hmac_key_manager_factory)
@@ -408,3 +423,6 @@ def _register_defaults(container: DIContainer) -> None:
     container.register("profiler", _profiler_factory)
     container.register("docker_capability_handler", _docker_capability_handler_factory)
     container.register("function_registry", _function_registry_factory)
+    container.register("function_worker_pool", _function_worker_pool_factory)
+    container.register("egress_connection_pool", _egress_connection_pool_factory)
+    container.register("host_execution_pool", _host_execution_pool_factory)
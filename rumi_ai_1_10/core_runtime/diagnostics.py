@@ -2,29 +2,100 @@
 diagnostics.py - 起動/実行の結果集約(fail-softの"見える化")
 
 スレッドセーフ、メモリ上限対応版
+
+イベントは固定長リングバッファに _Record（__slots__）として保持する。
+status / phase の件数は記録・退避のたびに増減させて維持するため、
+summary() はイベント数に依存しない。ts の ISO 文字列は読み出し時に生成する。
 """
 
 from __future__ import annotations
 
+import time
+from collections import deque
 from dataclasses import dataclass, field
-from datetime import datetime, timezone, timedelta
-from typing import Any, Dict, List, Optional, Literal
+from datetime import datetime, timezone
+from typing import Any, Deque, Dict, List, Optional, Literal, Tuple
 from threading import RLock
 
 
 Status = Literal["success", "failed", "skipped", "disabled", "unknown"]
 
+_STATUSES = frozenset(("success", "failed", "skipped", "disabled", "unknown"))
+
+# summary() の failed / disabled に含める最大件数
+SUMMARY_RECENT_LIMIT = 50
+
+# query_events() の limit 上限
+MAX_QUERY_LIMIT = 1000
+
+
+def _format_ns(wall_ns: int) -> str:
+    return datetime.fromtimestamp(wall_ns / 1e9, timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+class _Record:
+    """リングバッファ上の 1 イベント（正規化済み・不変）"""
+
+    __slots__ = ("seq", "wall_ns", "mono_ns", "ts", "phase", "step_id", "handler",
+                 "status", "target", "error", "meta")
+
+    def __init__(self, seq: int, ts: Optional[str], phase: str, step_id: str, handler: str,
+                 status: str, target: Tuple[str, Any], error: Optional[Dict[str, Any]],
+                 meta: Dict[str, Any]) -> None:
+        self.seq = seq
+        self.wall_ns = time.time_ns()
+        self.mono_ns = time.monotonic_ns()
+        self.ts = ts
+        self.phase = phase
+        self.step_id = step_id
+        self.handler = handler
+        self.status = status
+        self.target = target
+        self.error = error
+        self.meta = meta
+
+    def ts_str(self) -> str:
+        return self.ts if self.ts is not None else _format_ns(self.wall_ns)
+
+    def target_dict(self) -> Dict[str, Any]:
+        return {"kind": self.target[0], "id": self.target[1]}
+
+    def to_event(self) -> Dict[str, Any]:
+        return {"ts": self.ts_str(), "phase": self.phase, "step_id": self.step_id, "handler": self.handler,
+                "status": self.status, "target": self.target_dict(), "error": self.error, "meta": self.meta}
+
+    def to_summary_item(self) -> Dict[str, Any]:
+        return {"ts": self.ts_str(), "phase": self.phase, "step_id": self.step_id,
+                "handler": self.handler, "target": self.target_dict(), "error": self.error}
+
 
 @dataclass
 class Diagnostics:
-    """起動・実行の診断情報を集約する（スレッドセーフ、メモリ上限対応）"""
+    """起動・実行の診断情報を集約する（スレッドセーフ、メモリ上限対応）
+
+    MAX_EVENTS 件を超えると最古のイベントから上書きする。上書きが起きる時点で
+    MAX_AGE_HOURS より古いイベントもまとめて退避する。
+    """
 
-    events: List[Dict[str, Any]] = field(default_factory=list)
     started_at: str = field(default_factory=lambda: datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"))
     _lock: RLock = field(default_factory=RLock)
     MAX_EVENTS: int = field(default=10000)
     MAX_AGE_HOURS: int = field(default=1)
 
+    _ring: List[Optional[_Record]] = field(default_factory=list, init=False, repr=False)
+    _start: int = field(default=0, init=False, repr=False)
+    _size: int = field(default=0, init=False, repr=False)
+    _next_seq: int = field(default=0, init=False, repr=False)
+    _counts: Dict[str, int] = field(default_factory=dict, init=False, repr=False)
+    _phase_counts: Dict[str, int] = field(default_factory=dict, init=False, repr=False)
+    _failed: Deque[_Record] = field(default_factory=lambda: deque(maxlen=SUMMARY_RECENT_LIMIT),
+                                    init=False, repr=False)
+    _disabled: Deque[_Record] = field(default_factory=lambda: deque(maxlen=SUMMARY_RECENT_LIMIT),
+                                      init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self._ring = [None] * max(1, int(self.MAX_EVENTS))
+
     def _now_ts(self) -> str:
         return datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
 
@@ -50,10 +121,15 @@ class Diagnostics:
         return {"type": "Error", "message": str(error)}
 
     def _normalize_status(self, status: Any) -> Status:
-        if status in ("success", "failed", "skipped", "disabled", "unknown"):
+        if status in _STATUSES:
             return status
         return "unknown"
 
+    def _normalize_meta(self, meta: Any) -> Dict[str, Any]:
+        if isinstance(meta, dict):
+            return meta
+        return {"_raw_meta": meta} if meta is not None else {}
+
     def normalize_event(self, event: Dict[str, Any]) -> Dict[str, Any]:
         ev = dict(event or {})
         ts = ev.get("ts") or self._now_ts()
@@ -63,67 +139,161 @@ class Diagnostics:
         status = self._normalize_status(ev.get("status"))
         target = self._normalize_target(ev.get("target"))
         error = self._normalize_error(ev.get("error"))
-        meta = ev.get("meta")
-        if not isinstance(meta, dict):
-            meta = {"_raw_meta": meta} if meta is not None else {}
+        meta = self._normalize_meta(ev.get("meta"))
 
         return {
             "ts": ts, "phase": phase, "step_id": step_id, "handler": handler,
             "status": status, "target": target, "error": error, "meta": meta,
         }
 
-    def record(self, event: Dict[str, Any]) -> None:
-        """診断イベントを追加（スレッドセーフ、自動クリーンアップ）"""
-        normalized = self.normalize_event(event)
-        with self._lock:
-            self.events.append(normalized)
-            if len(self.events) > int(self.MAX_EVENTS * 1.1):
-                self._cleanup_unlocked()
+    # ------------------------------------------------------------------
+    # 記録
+    # ------------------------------------------------------------------
 
-    def _cleanup_unlocked(self) -> None:
-        """古いイベントを削除"""
-        cutoff = (datetime.now(timezone.utc) - timedelta(hours=self.MAX_AGE_HOURS)).isoformat().replace("+00:00", "Z")
-        self.events = [e for e in self.events if e.get("ts", "") >= cutoff][-self.MAX_EVENTS:]
+    def record(self, event: Dict[str, Any]) -> None:
+        """診断イベントを追加（スレッドセーフ、容量超過時は最古から上書き）"""
+        ev = event or {}
+        self._append(ev.get("ts") or None, ev.get("phase") or "system", ev.get("step_id") or "unknown.step",
+                     ev.get("handler") or "unknown.handler", ev.get("status"), ev.get("target"),
+                     ev.get("error"), ev.get("meta"))
 
     def record_step(self, *, phase: str, step_id: str, handler: str, status: Status,
                     target: Any = None, error: Any = None, meta: Optional[Dict[str, Any]] = None) -> None:
         """推奨：標準形で確実に記録するためのヘルパー"""
-        self.record({"ts": self._now_ts(), "phase": phase, "step_id": step_id, "handler": handler,
-                     "status": status, "target": target, "error": error, "meta": meta or {}})
+        self._append(None, phase or "system", step_id or "unknown.step", handler or "unknown.handler",
+                     status, target, error, meta or {})
+
+    def _append(self, ts: Optional[str], phase: str, step_id: str, handler: str, status: Any,
+                target: Any, error: Any, meta: Any) -> None:
+        norm_target = self._normalize_target(target)
+        status = self._normalize_status(status)
+        rec_args = (ts, phase, step_id, handler, status, (norm_target["kind"], norm_target["id"]),
+                    self._normalize_error(error), self._normalize_meta(meta))
+        with self._lock:
+            if len(self._ring) != max(1, int(self.MAX_EVENTS)):
+                self._resize_unlocked()
+            capacity = len(self._ring)
+            if self._size == capacity:
+                self._evict_unlocked()
+            rec = _Record(self._next_seq, *rec_args)
+            self._next_seq += 1
+            self._ring[(self._start + self._size) % capacity] = rec
+            self._size += 1
+            self._counts[status] = self._counts.get(status, 0) + 1
+            self._phase_counts[phase] = self._phase_counts.get(phase, 0) + 1
+            if status == "failed":
+                self._failed.append(rec)
+            elif status == "disabled":
+                self._disabled.append(rec)
+
+    def _pop_oldest_unlocked(self) -> _Record:
+        rec = self._ring[self._start]
+        self._ring[self._start] = None
+        self._start = (self._start + 1) % len(self._ring)
+        self._size -= 1
+        for counts, key in ((self._counts, rec.status), (self._phase_counts, rec.phase)):
+            remaining = counts[key] - 1
+            if remaining:
+                counts[key] = remaining
+            else:
+                del counts[key]
+        return rec
+
+    def _evict_unlocked(self) -> None:
+        """最古の 1 件と、MAX_AGE_HOURS より古いイベントを退避する"""
+        self._pop_oldest_unlocked()
+        cutoff = time.monotonic_ns() - int(self.MAX_AGE_HOURS * 3600 * 1e9)
+        while self._size and self._ring[self._start].mono_ns < cutoff:
+            self._pop_oldest_unlocked()
+
+    def _resize_unlocked(self) -> None:
+        """MAX_EVENTS の変更に合わせてリングを作り直す（新しい側を残す）"""
+        capacity = max(1, int(self.MAX_EVENTS))
+        while self._size > capacity:
+            self._pop_oldest_unlocked()
+        records = self._records_unlocked()
+        self._ring = records + [None] * (capacity - len(records))
+        self._start = 0
+
+    def _records_unlocked(self) -> List[_Record]:
+        """古い順のレコード一覧"""
+        capacity = len(self._ring)
+        end = self._start + self._size
+        if end <= capacity:
+            return self._ring[self._start:end]
+        return self._ring[self._start:] + self._ring[:end - capacity]
+
+    def _oldest_seq_unlocked(self) -> int:
+        return self._ring[self._start].seq if self._size else self._next_seq
+
+    # ------------------------------------------------------------------
+    # 読み出し
+    # ------------------------------------------------------------------
+
+    @property
+    def events(self) -> List[Dict[str, Any]]:
+        """保持中のイベント（古い順）のコピー"""
+        with self._lock:
+            records = self._records_unlocked()
+        return [r.to_event() for r in records]
 
     def as_dict(self) -> Dict[str, Any]:
         """API返却などに使う辞書形式"""
         with self._lock:
-            return {"started_at": self.started_at, "event_count": len(self.events),
-                    "events": list(self.events), "summary": self._summary_unlocked()}
+            records = self._records_unlocked()
+            summary = self._summary_unlocked()
+        return {"started_at": self.started_at, "event_count": len(records),
+                "events": [r.to_event() for r in records], "summary": summary}
 
     def _summary_unlocked(self) -> Dict[str, Any]:
-        counts: Dict[str, int] = {}
-        phase_counts: Dict[str, int] = {}
-        failed: List[Dict[str, Any]] = []
-        disabled: List[Dict[str, Any]] = []
-        last_event_ts: Optional[str] = None
-        last_failure: Optional[Dict[str, Any]] = None
-
-        for ev in self.events:
-            status = ev.get("status", "unknown")
-            phase = ev.get("phase", "system")
-            counts[status] = counts.get(status, 0) + 1
-            phase_counts[phase] = phase_counts.get(phase, 0) + 1
-            last_event_ts = ev.get("ts") or last_event_ts
-
-            if status == "failed":
-                item = {"ts": ev.get("ts"), "phase": phase, "step_id": ev.get("step_id"),
-                        "handler": ev.get("handler"), "target": ev.get("target"), "error": ev.get("error")}
-                failed.append(item)
-                last_failure = item
-            if status == "disabled":
-                disabled.append({"ts": ev.get("ts"), "phase": phase, "step_id": ev.get("step_id"),
-                                 "handler": ev.get("handler"), "target": ev.get("target"), "error": ev.get("error")})
-
-        return {"counts": counts, "phase_counts": phase_counts, "failed": failed[-50:],
-                "disabled": disabled[-50:], "last_event_ts": last_event_ts, "last_failure": last_failure}
+        oldest = self._oldest_seq_unlocked()
+        failed = [r for r in self._failed if r.seq >= oldest]
+        disabled = [r for r in self._disabled if r.seq >= oldest]
+        last = self._ring[(self._start + self._size - 1) % len(self._ring)] if self._size else None
+        return {"counts": dict(self._counts), "phase_counts": dict(self._phase_counts),
+                "failed": [r.to_summary_item() for r in failed],
+                "disabled": [r.to_summary_item() for r in disabled],
+                "last_event_ts": last.ts_str() if last is not None else None,
+                "last_failure": failed[-1].to_summary_item() if failed else None}
 
     def summary(self) -> Dict[str, Any]:
         with self._lock:
             return self._summary_unlocked()
+
+    def query_events(self, *, phase: Optional[str] = None, status: Optional[str] = None,
+                     step_id_prefix: Optional[str] = None, handler: Optional[str] = None,
+                     before_seq: Optional[int] = None, limit: int = 100) -> Dict[str, Any]:
+        """保持中のイベントを新しい順に絞り込んで返す。
+
+        各イベントには "seq" が付く。次ページは返り値の next_before_seq を
+        before_seq に渡して取得する（これ以上無ければ None）。
+        """
+        limit = max(1, min(int(limit), MAX_QUERY_LIMIT))
+        with self._lock:
+            capacity = len(self._ring)
+            oldest = self._oldest_seq_unlocked()
+            newest = self._next_seq - 1
+            seq = newest if before_seq is None else min(int(before_seq) - 1, newest)
+            matched: List[_Record] = []
+            next_before: Optional[int] = None
+            while seq >= oldest:
+                rec = self._ring[(self._start + seq - oldest) % capacity]
+                seq -= 1
+                if phase is not None and rec.phase != phase:
+                    continue
+                if status is not None and rec.status != status:
+                    continue
+                if handler is not None and rec.handler != handler:
+                    continue
+                if step_id_prefix is not None and not rec.step_id.startswith(step_id_prefix):
+                    continue
+                if len(matched) == limit:
+                    next_before = matched[-1].seq
+                    break
+                matched.append(rec)
+        events = []
+        for rec in matched:
+            ev = rec.to_event()
+            ev["seq"] = rec.seq
+            events.append(ev)
+        return {"events": events, "next_before_seq": next_before}
@@ -0,0 +1,326 @@
+"""
+egress_connection_pool.py - Egress HTTP keep-alive 接続プール
+
+execute_http_request() がリクエストごとに TCP 接続と TLS ハンドシェイクを
+やり直す代わりに、レスポンスを読み切った接続を保持して再利用する。
+
+設計原則:
+- プールキーは (pack_id, scheme, 接続先IP, port, host)
+  host は https では SNI / 証明書検証に使ったホスト名
+  Pack 間で接続を共有せず、ホスト名ごとに検証済みの TLS セッションのみ再利用する
+- 接続先IPは呼び出し側が resolve_and_check_ip() で検証した IP のみ
+  （プールは IP を解決しない。DNS rebinding 対策は従来どおり毎リクエスト実施）
+- HTTPConnection.auto_open を無効化し、切断済み接続で
+  ホスト名への再接続（未検証の DNS 解決）が起きないようにする
+- アイドル時間 / 生存期間 / ホストごとのアイドル上限 / 全体上限で接続を捨てる
+- 取り出し時に select() でサーバー側からの切断を検出する
+
+主要コンポーネント:
+- EgressPoolKey: プールキー
+- PooledConnection: 貸し出し中の接続ハンドル
+- EgressConnectionPool: プール本体
+  - acquire(): アイドル接続を取り出す（なければ None）
+  - release(): 再利用可能なら返却、不可なら close
+  - close_pack() / close_all(): 接続の破棄
+  - stats(): プール状態
+- get_egress_connection_pool(): DI コンテナ経由のアクセサ
+"""
+
+from __future__ import annotations
+
+import http.client
+import os
+import select
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, NamedTuple, Optional
+
+
+# ============================================================
+# 定数
+# ============================================================
+
+DEFAULT_MAX_IDLE_PER_HOST = 4
+DEFAULT_MAX_IDLE_TOTAL = 64
+DEFAULT_IDLE_TIMEOUT = 30.0
+DEFAULT_MAX_LIFETIME = 300.0
+
+
+def is_egress_connection_pool_enabled() -> bool:
+    """RUMI_EGRESS_CONNECTION_POOL が有効かどうかを返す（デフォルト有効）。"""
+    return os.environ.get("RUMI_EGRESS_CONNECTION_POOL", "1").lower() in ("1", "true", "yes")
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return max(0, int(os.environ.get(name, str(default))))
+    except (TypeError, ValueError):
+        return default
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return max(0.0, float(os.environ.get(name, str(default))))
+    except (TypeError, ValueError):
+        return default
+
+
+# ============================================================
+# データ構造
+# ============================================================
+
+class EgressPoolKey(NamedTuple):
+    """プールキー。ip は resolve_and_check_ip() で検証済みのもの。"""
+    pack_id: str
+    scheme: str
+    ip: str
+    port: int
+    host: str
+
+
+@dataclass(eq=False)
+class PooledConnection:
+    """貸し出し中の接続。reused は acquire() で取り出したものかどうか。"""
+    key: EgressPoolKey
+    conn: http.client.HTTPConnection
+    created_at: float = field(default_factory=time.monotonic)
+    idle_since: float = 0.0
+    reused: bool = False
+
+    def close(self) -> None:
+        try:
+            self.conn.close()
+        except Exception:
+            pass
+
+
+def _is_connection_dropped(conn: http.client.HTTPConnection) -> bool:
+    """
+    アイドル接続がサーバー側で閉じられていないかを判定する。
+
+    keep-alive 中の接続は読み取り可能になるはずがないため、
+    readable（EOF または予期しないデータ）は切断扱いにする。
+    """
+    sock = conn.sock
+    if sock is None:
+        return True
+    try:
+        readable, _, _ = select.select([sock], [], [], 0)
+    except (OSError, ValueError):
+        return True
+    return bool(readable)
+
+
+# ============================================================
+# EgressConnectionPool
+# ============================================================
+
+class EgressConnectionPool:
+    """
+    Pack × 接続先ごとの keep-alive 接続プール。
+
+    接続の生成は呼び出し側が行い、プールは保持と期限管理のみを担う。
+    """
+
+    def __init__(
+        self,
+        max_idle_per_host: Optional[int] = None,
+        max_idle_total: Optional[int] = None,
+        idle_timeout: Optional[float] = None,
+        max_lifetime: Optional[float] = None,
+    ) -> None:
+        self._max_idle_per_host = (max_idle_per_host if max_idle_per_host is not None
+                                   else _env_int("RUMI_EGRESS_POOL_MAX_IDLE_PER_HOST",
+                                                 DEFAULT_MAX_IDLE_PER_HOST))
+        self._max_idle_total = (max_idle_total if max_idle_total is not None
+                                else _env_int("RUMI_EGRESS_POOL_MAX_IDLE_TOTAL", DEFAULT_MAX_IDLE_TOTAL))
+        self._idle_timeout = (idle_timeout if idle_timeout is not None
+                              else _env_float("RUMI_EGRESS_POOL_IDLE_TIMEOUT", DEFAULT_IDLE_TIMEOUT))
+        self._max_lifetime = (max_lifetime if max_lifetime is not None
+                              else _env_float("RUMI_EGRESS_POOL_MAX_LIFETIME", DEFAULT_MAX_LIFETIME))
+        self._lock = threading.Lock()
+        # キーごとのアイドル接続（末尾が最も新しい）
+        self._idle: Dict[EgressPoolKey, List[PooledConnection]] = {}
+        self._idle_count = 0
+        self._stats = {"hit": 0, "miss": 0, "stale": 0, "expired": 0, "evicted": 0, "released": 0}
+
+    # ------------------------------------------------------------------
+    # 貸し出し / 返却
+    # ------------------------------------------------------------------
+
+    def acquire(self, key: EgressPoolKey) -> Optional[PooledConnection]:
+        """
+        key のアイドル接続を取り出す。
+
+        Returns:
+            再利用可能な PooledConnection（reused=True）。なければ None
+        """
+        now = time.monotonic()
+        victims: List[PooledConnection] = []
+        found: Optional[PooledConnection] = None
+        with self._lock:
+            entries = self._idle.get(key)
+            while entries:
+                entry = entries.pop()
+                self._idle_count -= 1
+                if self._is_expired(entry, now):
+                    self._stats["expired"] += 1
+                    victims.append(entry)
+                    continue
+                if _is_connection_dropped(entry.conn):
+                    self._stats["stale"] += 1
+                    victims.append(entry)
+                    continue
+                found = entry
+                break
+            if not entries:
+                self._idle.pop(key, None)
+            idle_count = self._idle_count
+        for entry in victims:
+            entry.close()
+        self._set_idle_gauge(idle_count)
+
+        if found is None:
+            self._bump("miss")
+            return None
+        found.reused = True
+        self._bump("hit")
+        return found
+
+    def release(self, pooled: PooledConnection, reusable: bool) -> bool:
+        """
+        接続を返却する。
+
+        reusable=False、期限切れ、上限超過の場合は close する。
+
+        Returns:
+            プールに戻した場合 True
+        """
+        conn = pooled.conn
+        now = time.monotonic()
+        if (not reusable or conn.sock is None or self._max_idle_per_host <= 0
+                or self._max_idle_total <= 0 or self._is_expired(pooled, now, check_idle=False)):
+            pooled.close()
+            return False
+
+        pooled.idle_since = now
+        victims: List[PooledConnection] = []
+        with self._lock:
+            entries = self._idle.setdefault(pooled.key, [])
+            entries.append(pooled)
+            self._idle_count += 1
+            self._stats["released"] += 1
+            while len(entries) > self._max_idle_per_host:
+                victims.append(entries.pop(0))
+                self._idle_count -= 1
+                self._stats["evicted"] += 1
+            while self._idle_count > self._max_idle_total:
+                oldest_key = min(self._idle, key=lambda k: self._idle[k][0].idle_since if self._idle[k] else now)
+                oldest = self._idle[oldest_key]
+                victims.append(oldest.pop(0))
+                self._idle_count -= 1
+                self._stats["evicted"] += 1
+                if not oldest:
+                    del self._idle[oldest_key]
+            kept = not any(v is pooled for v in victims)
+            idle_count = self._idle_count
+        for entry in victims:
+            entry.close()
+        self._set_idle_gauge(idle_count)
+        return kept
+
+    # ------------------------------------------------------------------
+    # 破棄
+    # ------------------------------------------------------------------
+
+    def close_pack(self, pack_id: str) -> int:
+        """pack_id のアイドル接続をすべて閉じる。閉じた数を返す。"""
+        with self._lock:
+            keys = [k for k in self._idle if k.pack_id == pack_id]
+            victims = [e for k in keys for e in self._idle.pop(k)]
+            self._idle_count -= len(victims)
+            idle_count = self._idle_count
+        for entry in victims:
+            entry.close()
+        self._set_idle_gauge(idle_count)
+        return len(victims)
+
+    def close_all(self) -> int:
+        """全アイドル接続を閉じる。閉じた数を返す。"""
+        with self._lock:
+            victims = [e for entries in self._idle.values() for e in entries]
+            self._idle.clear()
+            self._idle_count = 0
+        for entry in victims:
+            entry.close()
+        self._set_idle_gauge(0)
+        return len(victims)
+
+    def prune(self) -> int:
+        """期限切れのアイドル接続を閉じる。閉じた数を返す。"""
+        now = time.monotonic()
+        victims: List[PooledConnection] = []
+        with self._lock:
+            for key in list(self._idle):
+                entries = self._idle[key]
+                alive = []
+                for e in entries:
+                    (victims if self._is_expired(e, now) else alive).append(e)
+                if alive:
+                    self._idle[key] = alive
+                else:
+                    del self._idle[key]
+            self._idle_count -= len(victims)
+            self._stats["expired"] += len(victims)
+            idle_count = self._idle_count
+        for entry in victims:
+            entry.close()
+        self._set_idle_gauge(idle_count)
+        return len(victims)
+
+    def stats(self) -> Dict[str, Any]:
+        """プールの状態を返す。"""
+        with self._lock:
+            return dict(
+                self._stats,
+                enabled=is_egress_connection_pool_enabled(),
+                idle_connections=self._idle_count,
+                hosts=len(self._idle),
+                max_idle_per_host=self._max_idle_per_host,
+                max_idle_total=self._max_idle_total,
+                idle_timeout=self._idle_timeout,
+                max_lifetime=self._max_lifetime,
+            )
+
+    # ------------------------------------------------------------------
+    # 内部
+    # ------------------------------------------------------------------
+
+    def _is_expired(self, entry: PooledConnection, now: float, check_idle: bool = True) -> bool:
+        if now - entry.created_at >= self._max_lifetime:
+            return True
+        return check_idle and now - entry.idle_since >= self._idle_timeout
+
+    def _bump(self, name: str) -> None:
+        with self._lock:
+            self._stats[name] += 1
+        try:
+            from .metrics import get_metrics_collector
+            get_metrics_collector().increment(f"egress.connection_pool.{name}")
+        except Exception:
+            pass
+
+    @staticmethod
+    def _set_idle_gauge(value: int) -> None:
+        try:
+            from .metrics import get_metrics_collector
+            get_metrics_collector().set_gauge("egress.connection_pool.idle", value)
+        except Exception:
+            pass
+
+
+def get_egress_connection_pool() -> EgressConnectionPool:
+    """DI コンテナから EgressConnectionPool を取得する。"""
+    from .di_container import get_container
+    return get_container().get("egress_connection_pool")
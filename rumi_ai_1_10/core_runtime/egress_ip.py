@@ -3,12 +3,24 @@ egress_ip.py - IP検証ユーティリティ
 
 内部IP/禁止レンジ判定、DNS解決＆内部IPチェック。
 egress_proxy.py から分離 (W13-T047)。
+
+DNS キャッシュ:
+- resolve_and_check_ip() の結果（解決IP一覧＋内部IP判定）をホスト名単位で保持する
+- 解決成功は RUMI_EGRESS_DNS_TTL 秒、解決失敗は RUMI_EGRESS_DNS_NEGATIVE_TTL 秒
+  （getaddrinfo はレコードの TTL を返さないため、TTL は設定値の上限として扱う）
+- 上限件数を超えたら LRU で追い出す
+- キャッシュ中も接続先は「検証済み IP 一覧」そのものなので、
+  TTL 内に DNS が内部IPへ切り替わっても（rebinding）接続先は変わらない
 """
 from __future__ import annotations
 
 import ipaddress
+import os
 import socket
-from typing import List, Tuple
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 
 # ============================================================
@@ -79,10 +91,156 @@ def _is_ip_literal(host: str) -> bool:
         return False
 
 
+# ============================================================
+# DNS キャッシュ
+# ============================================================
+
+DEFAULT_DNS_CACHE_TTL = 30.0
+DEFAULT_DNS_CACHE_NEGATIVE_TTL = 5.0
+DEFAULT_DNS_CACHE_MAX_ENTRIES = 1024
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return max(0.0, float(os.environ.get(name, str(default))))
+    except (TypeError, ValueError):
+        return default
+
+
+class DnsCache:
+    """
+    resolve_and_check_ip() 用のスレッドセーフな TTL + LRU キャッシュ。
+
+    値は (is_blocked, reason, resolved_ips) をそのまま保持する。
+    ttl / negative_ttl が 0 の場合、その種類の結果はキャッシュしない。
+    """
+
+    def __init__(
+        self,
+        ttl: Optional[float] = None,
+        negative_ttl: Optional[float] = None,
+        max_entries: Optional[int] = None,
+    ) -> None:
+        self._ttl = ttl if ttl is not None else _env_float("RUMI_EGRESS_DNS_TTL", DEFAULT_DNS_CACHE_TTL)
+        self._negative_ttl = (negative_ttl if negative_ttl is not None
+                              else _env_float("RUMI_EGRESS_DNS_NEGATIVE_TTL", DEFAULT_DNS_CACHE_NEGATIVE_TTL))
+        self._max_entries = (max_entries if max_entries is not None
+                             else int(_env_float("RUMI_EGRESS_DNS_CACHE_SIZE", DEFAULT_DNS_CACHE_MAX_ENTRIES)))
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[float, Tuple[bool, str, List[str]]]]" = OrderedDict()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+
+    def get(self, hostname: str) -> Optional[Tuple[bool, str, List[str]]]:
+        """有効期限内のエントリを返す（なければ None）。"""
+        key = hostname.lower()
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+                blocked, reason, ips = entry[1]
+                return blocked, reason, list(ips)
+            if entry is not None:
+                del self._entries[key]
+            self._stats["misses"] += 1
+            return None
+
+    def put(self, hostname: str, result: Tuple[bool, str, List[str]], negative: bool = False) -> None:
+        """結果を保存する。negative=True は解決失敗（negative_ttl を使う）。"""
+        ttl = self._negative_ttl if negative else self._ttl
+        if ttl <= 0 or self._max_entries <= 0:
+            return
+        blocked, reason, ips = result
+        key = hostname.lower()
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, (blocked, reason, list(ips)))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def invalidate(self, hostnames: Optional[Iterable[str]] = None) -> int:
+        """
+        エントリを破棄する。
+
+        hostnames には network grant の allowed_domains と同じ形式
+        （完全一致 / "*.example.com" / "*"）を指定できる。None は全件。
+
+        Returns:
+            破棄した件数
+        """
+        with self._lock:
+            if hostnames is None:
+                keys = list(self._entries)
+            else:
+                patterns = [h.lower() for h in hostnames]
+                if "*" in patterns:
+                    keys = list(self._entries)
+                else:
+                    keys = [k for k in self._entries if any(_host_matches(k, p) for p in patterns)]
+            for key in keys:
+                del self._entries[key]
+            self._stats["invalidations"] += len(keys)
+            return len(keys)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return dict(
+                self._stats,
+                entries=len(self._entries),
+                max_entries=self._max_entries,
+                ttl=self._ttl,
+                negative_ttl=self._negative_ttl,
+                hit_rate=(self._stats["hits"] / lookups) if lookups else 0.0,
+            )
+
+
+def _host_matches(host: str, pattern: str) -> bool:
+    """NetworkGrantManager._check_domain と同じ規則でホストとパターンを照合する。"""
+    if pattern.startswith("*."):
+        base = pattern[2:]
+        return host == base or host.endswith("." + base)
+    return host == pattern
+
+
+_dns_cache: Optional[DnsCache] = None
+_dns_cache_lock = threading.Lock()
+
+
+def get_dns_cache() -> DnsCache:
+    """プロセス共通の DnsCache を返す。"""
+    global _dns_cache
+    if _dns_cache is None:
+        with _dns_cache_lock:
+            if _dns_cache is None:
+                _dns_cache = DnsCache()
+    return _dns_cache
+
+
+def invalidate_dns_cache(hostnames: Optional[Iterable[str]] = None) -> int:
+    """DNS キャッシュを破棄する（hostnames 省略時は全件）。"""
+    return get_dns_cache().invalidate(hostnames)
+
+
+def reset_dns_cache() -> None:
+    """DnsCache インスタンスを破棄する（設定再読込・テスト用）。"""
+    global _dns_cache
+    with _dns_cache_lock:
+        _dns_cache = None
+
+
+# ============================================================
+# DNS解決＆内部IPチェック
+# ============================================================
+
 def resolve_and_check_ip(hostname: str) -> Tuple[bool, str, List[str]]:
     """
     ホスト名をDNS解決し、内部IPが含まれていないかチェック
 
+    ホスト名の結果は DnsCache に保持され、有効期限内は再解決しない。
+
     Returns:
         (is_blocked, reason, resolved_ips)
     """
@@ -90,20 +248,33 @@ def resolve_and_check_ip(hostname: str) -> Tuple[bool, str, List[str]]:
         is_blocked, reason = is_internal_ip(hostname)
         return is_blocked, reason, [hostname] if not is_blocked else []
 
+    cache = get_dns_cache()
+    cached = cache.get(hostname)
+    if cached is not None:
+        return cached
+
     try:
         results = socket.getaddrinfo(hostname, None, socket.AF_UNSPEC, socket.SOCK_STREAM)
         resolved_ips = list(set(r[4][0] for r in results))
 
         if not resolved_ips:
-            return True, f"DNS resolution failed: no addresses for {hostname}", []
+            result = (True, f"DNS resolution failed: no addresses for {hostname}", [])
+            cache.put(hostname, result, negative=True)
+            return result
 
         for ip in resolved_ips:
             is_internal, reason = is_internal_ip(ip)
             if is_internal:
-                return True, f"DNS rebinding blocked: {reason}", resolved_ips
+                result = (True, f"DNS rebinding blocked: {reason}", resolved_ips)
+                cache.put(hostname, result)
+                return result
 
-        return False, "", resolved_ips
+        result = (False, "", resolved_ips)
+        cache.put(hostname, result)
+        return result
     except socket.gaierror as e:
-        return True, f"DNS resolution failed: {e}", []
+        result = (True, f"DNS resolution failed: {e}", [])
+        cache.put(hostname, result, negative=True)
+        return result
     except Exception as e:
         return True, f"DNS check error: {e}", []
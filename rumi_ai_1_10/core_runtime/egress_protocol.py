@@ -4,13 +4,22 @@ egress_protocol.py - Egress通信プロトコルユーティリティ
 length-prefix JSON プロトコル、リクエストバリデーション、
 レスポンス読み取り（B2対応）、監査ログヘルパー。
 egress_proxy.py から分離 (W13-T047)。
+
+ストリーミング応答（リクエストに "stream": true）:
+  1. ヘッダーフレーム: length-prefix JSON
+     {"stream": "header", "success": true, "status_code", "headers", "final_url", "redirect_hops"}
+     ボディ送出前に失敗した場合は、通常のエラー応答 JSON 1フレームのみを返す
+  2. ボディチャンク: 4バイト長 + 生バイト列（1〜MAX_RESPONSE_READ_CHUNK バイト）
+     長さ 0 のフレームでボディ終端
+  3. トレーラーフレーム: length-prefix JSON
+     {"stream": "trailer", "success", "bytes_read", "truncated", "error", "error_type", ...}
 """
 from __future__ import annotations
 
 import json
 import socket
 import struct
-from typing import Any, Dict, Optional, Tuple
+from typing import Any, Callable, Dict, Optional, Tuple
 from urllib.parse import urlparse
 
 
@@ -27,6 +36,10 @@ MAX_CONNECT_TIMEOUT = 60.0
 MAX_READ_TIMEOUT = MAX_TIMEOUT  # 120.0
 MAX_RESPONSE_READ_CHUNK = 65536
 
+# ストリーミング応答のフレーム種別
+STREAM_FRAME_HEADER = "header"
+STREAM_FRAME_TRAILER = "trailer"
+
 
 # ============================================================
 # length-prefix JSON プロトコル
@@ -68,6 +81,54 @@ def write_length_prefixed_json(sock: socket.socket, data: Dict[str, Any]) -> Non
     sock.sendall(length + payload)
 
 
+# ============================================================
+# ストリーミング応答フレーム
+# ============================================================
+
+class StreamClientGone(Exception):
+    """ストリーミング中に Pack 側の接続が失われた"""
+
+
+class StreamSink:
+    """
+    ストリーミング応答をクライアントソケットへ書き出す。
+
+    書き込み時の OSError は StreamClientGone に変換する
+    （上流の接続エラーやタイムアウトと区別するため）。
+    """
+
+    def __init__(self, sock: socket.socket) -> None:
+        self._sock = sock
+        self.started = False
+
+    def start(self, header: Dict[str, Any]) -> None:
+        """ヘッダーフレームを送る。"""
+        frame = dict(header, stream=STREAM_FRAME_HEADER)
+        try:
+            write_length_prefixed_json(self._sock, frame)
+        except OSError as e:
+            raise StreamClientGone(str(e)) from e
+        self.started = True
+
+    def write(self, chunk: bytes) -> None:
+        """ボディチャンクを1フレーム送る（空チャンクは送らない）。"""
+        if not chunk:
+            return
+        try:
+            self._sock.sendall(struct.pack(">I", len(chunk)) + chunk)
+        except OSError as e:
+            raise StreamClientGone(str(e)) from e
+
+    def finish(self, trailer: Dict[str, Any]) -> None:
+        """終端フレームとトレーラーフレームを送る。"""
+        frame = dict(trailer, stream=STREAM_FRAME_TRAILER)
+        try:
+            self._sock.sendall(struct.pack(">I", 0))
+            write_length_prefixed_json(self._sock, frame)
+        except OSError as e:
+            raise StreamClientGone(str(e)) from e
+
+
 # ============================================================
 # リクエストバリデーション
 # ============================================================
@@ -138,6 +199,10 @@ def validate_request(request: Dict[str, Any]) -> Tuple[bool, str]:
         if read_timeout > MAX_READ_TIMEOUT:
             return False, f"Read timeout too large: {read_timeout} > {MAX_READ_TIMEOUT}"
 
+    stream = request.get("stream")
+    if stream is not None and not isinstance(stream, bool):
+        return False, "stream must be a boolean"
+
     return True, ""
 
 
@@ -250,3 +315,43 @@ def read_response_with_limit(resp, max_size: int) -> Tuple[bytes, bool, int]:
         data += chunk
 
     return data, exceeded, bytes_read
+
+
+def content_length_exceeds(resp, max_size: int) -> bool:
+    """Content-Length ヘッダーが max_size を超えているか"""
+    content_length = resp.getheader("Content-Length")
+    if content_length:
+        try:
+            return int(content_length) > max_size
+        except (ValueError, TypeError):
+            pass
+    return False
+
+
+def stream_response_with_limit(resp, write: Callable[[bytes], None], max_size: int) -> Tuple[bool, int]:
+    """
+    レスポンスボディを上限付きで write() に逐次渡す（B2 のストリーミング版）
+
+    read1() で届いた分だけ読むため、SSE 等でも最初のバイトを待たせない。
+    上限を超えた場合は上限までを渡して打ち切る。
+    write() の例外（StreamClientGone 等）はそのまま送出する。
+
+    Returns:
+        (exceeded, bytes_read)
+    """
+    read = getattr(resp, "read1", None) or resp.read
+    bytes_read = 0
+
+    while True:
+        remaining = max_size - bytes_read + 1
+        chunk = read(min(MAX_RESPONSE_READ_CHUNK, remaining))
+        if not chunk:
+            return False, bytes_read
+
+        bytes_read += len(chunk)
+
+        if bytes_read > max_size:
+            write(chunk[:max_size - (bytes_read - len(chunk))])
+            return True, bytes_read
+
+        write(chunk)
@@ -72,6 +72,10 @@ from .egress_protocol import (  # noqa: F401 — re-export
     write_length_prefixed_json,
     validate_request,
     read_response_with_limit,
+    content_length_exceeds,
+    stream_response_with_limit,
+    StreamClientGone,
+    StreamSink,
     _log_network_event,
     ALLOWED_METHODS,
     MAX_HEADER_COUNT,
@@ -88,6 +92,13 @@ from .egress_domain_controller import (  # noqa: F401 — re-export
     DomainController,
     _ECOSYSTEM_DIR,
 )
+from .egress_connection_pool import (
+    EgressPoolKey,
+    PooledConnection,
+    get_egress_connection_pool,
+    is_egress_connection_pool_enabled,
+)
+from .uds_multiplex import MUX_ID_FIELD, MuxResponder, is_valid_mux_id
 
 
 # ============================================================
@@ -98,6 +109,12 @@ from .egress_domain_controller import (  # noqa: F401 — re-export
 MAX_REQUEST_SIZE = 1 * 1024 * 1024   # 1MB
 MAX_RESPONSE_SIZE = 4 * 1024 * 1024  # 4MB
 
+# ストリーミング応答の上限（デフォルトは MAX_RESPONSE_SIZE と同じ）
+try:
+    MAX_STREAM_RESPONSE_SIZE = int(os.environ.get("RUMI_EGRESS_MAX_STREAM_BYTES", str(MAX_RESPONSE_SIZE)))
+except (ValueError, TypeError):
+    MAX_STREAM_RESPONSE_SIZE = MAX_RESPONSE_SIZE
+
 # タイムアウト
 DEFAULT_TIMEOUT = 30.0
 MAX_TIMEOUT = 120.0
@@ -234,6 +251,52 @@ def _audit_egress_permission_warning(event_type: str, path: str, message: str) -
 # HTTPリクエスト実行
 # ============================================================
 
+# 再利用した接続がサーバー側で閉じられていた場合に再送してよいメソッド
+# （RFC 9110 の冪等メソッド。POST/PATCH は二重送信を避けるため再送しない）
+_IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "PUT", "DELETE"})
+
+# 再利用接続の送信〜ステータス行受信までに起きうる切断系例外
+_STALE_CONNECTION_ERRORS = (
+    http.client.RemoteDisconnected,
+    http.client.BadStatusLine,
+    ConnectionResetError,
+    BrokenPipeError,
+)
+
+
+def _open_http_connection(
+    scheme: str,
+    connect_ip: str,
+    domain: str,
+    port: int,
+    connect_timeout: float,
+    read_timeout: float,
+) -> http.client.HTTPConnection:
+    """
+    検証済み IP に接続した HTTP(S)Connection を返す。
+
+    TLS の SNI / 証明書検証は domain で行う。
+    auto_open を無効にし、切断後に http.client が domain を
+    DNS 解決して再接続すること（DNS rebinding 対策の迂回）を防ぐ。
+    """
+    raw_sock = socket.create_connection((connect_ip, port), timeout=connect_timeout)
+    try:
+        raw_sock.settimeout(read_timeout)
+        if scheme == "https":
+            context = ssl.create_default_context()
+            sock = context.wrap_socket(raw_sock, server_hostname=domain)
+            conn = http.client.HTTPSConnection(domain, port, timeout=read_timeout, context=context)
+        else:
+            sock = raw_sock
+            conn = http.client.HTTPConnection(domain, port, timeout=read_timeout)
+    except BaseException:
+        raw_sock.close()
+        raise
+    conn.sock = sock
+    conn.auto_open = 0
+    return conn
+
+
 def execute_http_request(
     pack_id: str,
     request: Dict[str, Any],
@@ -241,6 +304,7 @@ def execute_http_request(
     audit_logger,
     rate_limiter: "PackRateLimiter" = None,
     domain_controller: "DomainController" = None,
+    stream_sink: Optional[StreamSink] = None,
 ) -> Dict[str, Any]:
     """
     HTTPリクエストを実行（リダイレクト、セキュリティチェック込み）
@@ -256,8 +320,19 @@ def execute_http_request(
     - ドメイン制御チェック（DNS解決後、Grant前）
     - レート制限チェック（ドメイン制御後、Grant前、初回のみ）
     - 細粒度タイムアウト（connect_timeout / read_timeout 分離）
+
+    接続プール:
+    - (pack_id, scheme, 検証済みIP, port, host) 単位で keep-alive 接続を再利用
+    - レスポンスを読み切り、サーバーが close を要求しなかった接続のみ返却
+
+    ストリーミング（stream_sink 指定時）:
+    - リダイレクト追従後の最終レスポンスのみ、ヘッダー→ボディチャンクの順で
+      stream_sink に逐次書き出す（戻り値の body は空、トレーラーは呼び出し側が送る）
+    - 上限は MAX_STREAM_RESPONSE_SIZE。Content-Length で超過が分かれば送出前に失敗、
+      送出中に超過した場合は打ち切って truncated=True で失敗化
     """
     start_time = time.time()
+    pool = get_egress_connection_pool() if is_egress_connection_pool_enabled() else None
 
     method = request.get("method", "GET").upper()
     original_url = request.get("url", "")
@@ -304,6 +379,8 @@ def execute_http_request(
         "bytes_read": 0,
         "final_url": original_url,
     }
+    if stream_sink is not None:
+        result["truncated"] = False
 
     try:
         rate_limit_checked = False  # W13-T047: レート制限は初回のみ
@@ -446,19 +523,24 @@ def execute_http_request(
             # (W12-T046: 細粒度タイムアウト適用)
             # ============================================================
             conn = None
+            pooled: Optional[PooledConnection] = None
+            reusable = False
             # resolved_ips は resolve_and_check_ip() で取得済み (TOCTOU回避)
             connect_ip = resolved_ips[0] if resolved_ips else domain
+            pool_key = EgressPoolKey(pack_id, parsed.scheme, connect_ip, port, domain)
             try:
-                raw_sock = socket.create_connection((connect_ip, port), timeout=connect_timeout)
-                raw_sock.settimeout(read_timeout)
-                if parsed.scheme == "https":
-                    context = ssl.create_default_context()
-                    ssl_sock = context.wrap_socket(raw_sock, server_hostname=domain)
-                    conn = http.client.HTTPSConnection(domain, port, timeout=read_timeout, context=context)
-                    conn.sock = ssl_sock
+                if pool is not None:
+                    pooled = pool.acquire(pool_key)
+                if pooled is not None:
+                    conn = pooled.conn
+                    conn.timeout = read_timeout
+                    conn.sock.settimeout(read_timeout)
                 else:
-                    conn = http.client.HTTPConnection(domain, port, timeout=read_timeout)
-                    conn.sock = raw_sock
+                    conn = _open_http_connection(
+                        parsed.scheme, connect_ip, domain, port, connect_timeout, read_timeout
+                    )
+                    if pool is not None:
+                        pooled = PooledConnection(pool_key, conn)
 
                 path = parsed.path or "/"
                 if parsed.query:
@@ -472,16 +554,94 @@ def execute_http_request(
                 if body is not None:
                     req_body = body.encode("utf-8") if isinstance(body, str) else body
 
-                conn.request(method, path, body=req_body, headers=req_headers)
-                resp = conn.getresponse()
+                try:
+                    conn.request(method, path, body=req_body, headers=req_headers)
+                    resp = conn.getresponse()
+                except _STALE_CONNECTION_ERRORS:
+                    if pooled is None or not pooled.reused or method not in _IDEMPOTENT_METHODS:
+                        raise
+                    # アイドル中にサーバーが閉じた接続: 新しい接続で1回だけ再送
+                    pool.release(pooled, False)
+                    pooled = None
+                    conn = _open_http_connection(
+                        parsed.scheme, connect_ip, domain, port, connect_timeout, read_timeout
+                    )
+                    pooled = PooledConnection(pool_key, conn)
+                    conn.request(method, path, body=req_body, headers=req_headers)
+                    resp = conn.getresponse()
 
                 resp_headers = {k: v for k, v in resp.getheaders()}
 
+                location = resp_headers.get("Location") or resp_headers.get("location")
+                follows_redirect = (
+                    resp.status in (301, 302, 303, 307, 308)
+                    and method in ("GET", "HEAD")
+                    and bool(location)
+                )
+
+                # ============================================================
+                # ストリーミング: 最終レスポンスのボディを逐次転送
+                # ============================================================
+                if stream_sink is not None and not follows_redirect:
+                    if content_length_exceeds(resp, MAX_STREAM_RESPONSE_SIZE):
+                        size_exceeded, read_bytes = True, 0
+                    else:
+                        stream_sink.start({
+                            "success": True,
+                            "status_code": resp.status,
+                            "headers": resp_headers,
+                            "final_url": final_url,
+                            "redirect_hops": redirect_hops,
+                        })
+                        size_exceeded, read_bytes = stream_response_with_limit(
+                            resp, stream_sink.write, MAX_STREAM_RESPONSE_SIZE
+                        )
+                    bytes_read += read_bytes
+                    reusable = not size_exceeded and resp.isclosed() and conn.sock is not None
+
+                    result["status_code"] = resp.status
+                    result["final_url"] = final_url
+                    result["redirect_hops"] = redirect_hops
+                    result["bytes_read"] = bytes_read
+                    result["latency_ms"] = (time.time() - start_time) * 1000
+
+                    if size_exceeded:
+                        result["error"] = f"Response too large (max: {MAX_STREAM_RESPONSE_SIZE} bytes)"
+                        result["error_type"] = "response_too_large"
+                        result["truncated"] = stream_sink.started
+                        _log_network_event(
+                            audit_logger, pack_id, domain, port, False,
+                            reason=f"Response exceeded size limit: {read_bytes} bytes read, max {MAX_STREAM_RESPONSE_SIZE}",
+                            method=method, url=original_url, final_url=final_url,
+                            latency_ms=result["latency_ms"],
+                            status_code=resp.status,
+                            redirect_hops=redirect_hops,
+                            bytes_read=bytes_read,
+                            error_type="response_too_large",
+                            max_response_bytes=MAX_STREAM_RESPONSE_SIZE,
+                            check_type="proxy_stream"
+                        )
+                        return result
+
+                    result["success"] = True
+                    _log_network_event(
+                        audit_logger, pack_id, domain, port, True,
+                        method=method, url=original_url, final_url=final_url,
+                        latency_ms=result["latency_ms"],
+                        status_code=resp.status,
+                        redirect_hops=redirect_hops,
+                        bytes_read=bytes_read,
+                        check_type="proxy_stream"
+                    )
+                    return result
+
                 # ============================================================
                 # B2: 巨大レスポンスは必ず失敗化
                 # ============================================================
                 resp_body, size_exceeded, read_bytes = read_response_with_limit(resp, MAX_RESPONSE_SIZE)
                 bytes_read += read_bytes
+                # 読み切った（isclosed）かつ Connection: close でない（sock 維持）場合のみ再利用可
+                reusable = not size_exceeded and resp.isclosed() and conn.sock is not None
 
                 if size_exceeded:
                     result["error"] = f"Response too large (max: {MAX_RESPONSE_SIZE} bytes)"
@@ -507,7 +667,6 @@ def execute_http_request(
 
                 # 5. リダイレクト判定（GET/HEADのみfollow）
                 if resp.status in (301, 302, 303, 307, 308) and method in ("GET", "HEAD"):
-                    location = resp_headers.get("Location") or resp_headers.get("location")
                     if location:
                         redirect_hops += 1
                         if redirect_hops > MAX_REDIRECTS:
@@ -562,6 +721,11 @@ def execute_http_request(
 
                 return result
 
+            except StreamClientGone as e:
+                result["error"] = f"Client disconnected during stream: {e}"
+                result["error_type"] = "client_disconnected"
+                result["truncated"] = True
+                break
             except socket.timeout:
                 result["error"] = f"Request timed out (connect={connect_timeout}s, read={read_timeout}s)"
                 result["error_type"] = "timeout"
@@ -579,7 +743,9 @@ def execute_http_request(
                 result["error_type"] = type(e).__name__
                 break
             finally:
-                if conn:
+                if pooled is not None:
+                    pool.release(pooled, reusable)
+                elif conn:
                     try:
                         conn.close()
                     except Exception:
@@ -739,10 +905,14 @@ class UDSEgressServer:
         self._running = False
         self._thread: Optional[threading.Thread] = None
         self._lock = threading.Lock()
-        # #33: スレッドプール化
+        # #33: スレッドプール化。上限は接続数ではなく処理中のリクエスト数に掛ける
+        # （keep-alive 接続がアイドルのまま枠を占有しないように）
         self._max_workers = int(os.environ.get("RUMI_EGRESS_MAX_WORKERS", "20"))
-        self._executor: Optional[concurrent.futures.ThreadPoolExecutor] = None
+        self._max_connections = int(os.environ.get("RUMI_EGRESS_MAX_CONNECTIONS", "64"))
+        self._executor: Optional[concurrent.futures.ThreadPoolExecutor] = None  # mux リクエスト用
         self._worker_semaphore: Optional[threading.Semaphore] = None
+        self._connections = 0
+        self._connections_lock = threading.Lock()
 
     def start(self) -> bool:
         """サーバーを起動"""
@@ -814,25 +984,32 @@ class UDSEgressServer:
         self._thread = None
 
     def _serve_forever(self) -> None:
-        """リクエストを処理し続ける (#33: ThreadPoolExecutor方式)"""
+        """
+        接続を受け付け続ける
+
+        接続ごとの受信ループは専用スレッドで回し、リクエストの処理は
+        _worker_semaphore（RUMI_EGRESS_MAX_WORKERS）の枠を取って行う (#33)。
+        """
         while self._running:
             try:
                 client_sock, _ = self._server_socket.accept()
-                # #33: セマフォで枯渇検知
-                if not self._worker_semaphore.acquire(blocking=False):
-                    # プール枯渇: 接続を拒否
+                with self._connections_lock:
+                    accepted = self._connections < self._max_connections
+                    if accepted:
+                        self._connections += 1
+                if not accepted:
+                    # 接続数の上限: 接続を拒否
                     print(
-                        f"[UDSEgressServer] Thread pool exhausted for "
-                        f"pack '{self.pack_id}' (max_workers={self._max_workers}). "
+                        f"[UDSEgressServer] Too many connections for "
+                        f"pack '{self.pack_id}' (max_connections={self._max_connections}). "
                         f"Rejecting connection."
                     )
                     try:
-                        response = {
+                        write_length_prefixed_json(client_sock, {
                             "success": False,
-                            "error": "Server busy: thread pool exhausted",
+                            "error": "Server busy: too many connections",
                             "error_type": "pool_exhausted",
-                        }
-                        write_length_prefixed_json(client_sock, response)
+                        })
                     except Exception:
                         pass
                     finally:
@@ -842,18 +1019,18 @@ class UDSEgressServer:
                             pass
                     continue
 
-                # スレッドプールに投入
                 try:
-                    self._executor.submit(self._handle_client_pooled, client_sock)
+                    threading.Thread(
+                        target=self._handle_client_counted, args=(client_sock,),
+                        name=f"egress-conn-{self.pack_id[:16]}", daemon=True,
+                    ).start()
                 except RuntimeError:
-                    # executor が shutdown 済み
-                    self._worker_semaphore.release()
+                    with self._connections_lock:
+                        self._connections -= 1
                     try:
                         client_sock.close()
                     except Exception:
                         pass
-                    if self._running:
-                        break
             except socket.timeout:
                 continue
             except OSError:
@@ -864,73 +1041,196 @@ class UDSEgressServer:
                 if self._running:
                     print(f"[UDSEgressServer] Accept error for {self.pack_id}: {e}")
 
-    def _handle_client_pooled(self, client_sock: socket.socket) -> None:
-        """スレッドプール用クライアントハンドラ (セマフォ解放付き) (#33)"""
+    def _handle_client_counted(self, client_sock: socket.socket) -> None:
+        """接続数を数えるクライアントハンドラ"""
         try:
             self._handle_client(client_sock)
+        finally:
+            with self._connections_lock:
+                self._connections -= 1
+
+    def _acquire_worker(self) -> bool:
+        """リクエスト処理の枠を取る（空きがなければ False） (#33)"""
+        if self._worker_semaphore.acquire(blocking=False):
+            return True
+        print(
+            f"[UDSEgressServer] Thread pool exhausted for "
+            f"pack '{self.pack_id}' (max_workers={self._max_workers}). "
+            f"Rejecting request."
+        )
+        return False
+
+    @staticmethod
+    def _pool_exhausted_response() -> Dict[str, Any]:
+        return {
+            "success": False,
+            "error": "Server busy: thread pool exhausted",
+            "error_type": "pool_exhausted",
+        }
+
+    def _execute_with_worker(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """_acquire_worker() で取った枠を、処理後に返す"""
+        try:
+            return self._execute(request)
         finally:
             self._worker_semaphore.release()
 
     def _handle_client(self, client_sock: socket.socket) -> None:
-        """クライアント接続を処理"""
+        """
+        クライアント接続を処理
+
+        接続はクライアントが閉じるかアイドルタイムアウト（DEFAULT_TIMEOUT）まで維持する。
+        "mux_id" 付きリクエストは共有スレッドプールで並行に処理し、ストリーミング要求は
+        多重化せず到着順に処理する（uds_multiplex 参照）。どのリクエストも処理中は
+        _worker_semaphore の枠を 1 つ使い、空きがなければ pool_exhausted を返す。
+        """
+        responder = MuxResponder(client_sock, write_length_prefixed_json,
+                                 name="rumi-egress-mux", executor=self._executor)
         try:
             client_sock.settimeout(DEFAULT_TIMEOUT)
 
-            # リクエスト読み取り
-            request = read_length_prefixed_json(client_sock, MAX_REQUEST_SIZE)
-            if request is None:
-                return
-
-            # バリデーション
-            valid, reason = validate_request(request)
-            if not valid:
-                response = {
-                    "success": False,
-                    "error": reason,
-                    "error_type": "validation_error"
-                }
-                write_length_prefixed_json(client_sock, response)
-                return
-
-            # pack_id はソケットパスから確定済み（payloadのowner_packは無視）
-            response = execute_http_request(
-                pack_id=self.pack_id,
-                request=request,
-                network_grant_manager=self._network_grant_manager,
-                audit_logger=self._audit_logger,
-                rate_limiter=self._rate_limiter,
-                domain_controller=self._domain_controller,
-            )
+            while self._running:
+                # リクエスト読み取り
+                try:
+                    request = read_length_prefixed_json(client_sock, MAX_REQUEST_SIZE)
+                except socket.timeout:
+                    if responder.busy():
+                        continue
+                    return
+                except ValueError as e:
+                    # サイズ超過などのプロトコルエラー
+                    responder.write({
+                        "success": False,
+                        "error": str(e),
+                        "error_type": "protocol_error"
+                    })
+                    return
+                if request is None:
+                    return
+                if not isinstance(request, dict):
+                    responder.write({
+                        "success": False,
+                        "error": "Request must be a JSON object",
+                        "error_type": "protocol_error"
+                    })
+                    return
+
+                mux_id = request.pop(MUX_ID_FIELD, None)
+                if mux_id is not None and not is_valid_mux_id(mux_id):
+                    responder.write({
+                        "success": False,
+                        "error": "Invalid mux_id",
+                        "error_type": "protocol_error"
+                    })
+                    return
+
+                # バリデーション
+                valid, reason = validate_request(request)
+                if valid and mux_id is not None and request.get("stream"):
+                    valid, reason = False, "Streaming requests cannot be multiplexed"
+                if not valid:
+                    response = {
+                        "success": False,
+                        "error": reason,
+                        "error_type": "validation_error"
+                    }
+                    if mux_id is not None:
+                        response[MUX_ID_FIELD] = mux_id
+                    if not responder.write(response):
+                        return
+                    continue
 
-            write_length_prefixed_json(client_sock, response)
+                if not self._acquire_worker():
+                    response = self._pool_exhausted_response()
+                    if mux_id is not None:
+                        response[MUX_ID_FIELD] = mux_id
+                    if not responder.write(response):
+                        return
+                    continue
+
+                if mux_id is not None:
+                    if not responder.submit(mux_id, lambda req=request: self._execute_with_worker(req)):
+                        # executor が shutdown 済み（停止中）
+                        self._worker_semaphore.release()
+                        return
+                    continue
+
+                if request.get("stream"):
+                    try:
+                        # チャンクフレームに他の応答が割り込まないよう、処理中の応答を書き終えてから送る
+                        responder.wait()
+                        keep_open = self._handle_stream(client_sock, request)
+                    finally:
+                        self._worker_semaphore.release()
+                    if not keep_open:
+                        return
+                    continue
+
+                if not responder.write(self._execute_with_worker(request)):
+                    return
 
-        except ValueError as e:
-            # サイズ超過などのプロトコルエラー
-            try:
-                response = {
-                    "success": False,
-                    "error": str(e),
-                    "error_type": "protocol_error"
-                }
-                write_length_prefixed_json(client_sock, response)
-            except Exception:
-                pass
         except Exception as e:
-            try:
-                response = {
-                    "success": False,
-                    "error": str(e),
-                    "error_type": type(e).__name__
-                }
-                write_length_prefixed_json(client_sock, response)
-            except Exception:
-                pass
+            responder.write({
+                "success": False,
+                "error": str(e),
+                "error_type": type(e).__name__
+            })
         finally:
+            responder.wait()
             try:
                 client_sock.close()
             except Exception:
                 pass
 
+    def _execute(self, request: Dict[str, Any], stream_sink: Optional[StreamSink] = None) -> Dict[str, Any]:
+        # pack_id はソケットパスから確定済み（payloadのowner_packは無視）
+        return execute_http_request(
+            pack_id=self.pack_id,
+            request=request,
+            network_grant_manager=self._network_grant_manager,
+            audit_logger=self._audit_logger,
+            rate_limiter=self._rate_limiter,
+            domain_controller=self._domain_controller,
+            stream_sink=stream_sink,
+        )
+
+    def _handle_stream(self, client_sock: socket.socket, request: Dict[str, Any]) -> bool:
+        """
+        ストリーミング要求を処理する
+
+        Returns:
+            接続を続けて使えるか
+        """
+        sink = StreamSink(client_sock)
+        try:
+            response = self._execute(request, stream_sink=sink)
+        except Exception as e:
+            if sink.started:
+                # チャンク送出中は JSON フレームを挟めないため切断のみ
+                return False
+            response = {
+                "success": False,
+                "error": str(e),
+                "error_type": type(e).__name__
+            }
+
+        if not sink.started:
+            write_length_prefixed_json(client_sock, response)
+            return True
+
+        if response.get("error_type") == "client_disconnected":
+            return False
+        sink.finish({
+            "success": response["success"],
+            "bytes_read": response["bytes_read"],
+            # ヘッダー送出後の失敗はボディが途中までしか届いていない
+            "truncated": response.get("truncated", False) or not response["success"],
+            "error": response["error"],
+            "error_type": response["error_type"],
+            "latency_ms": response["latency_ms"],
+        })
+        return True
+
 
 # ============================================================
 # UDS Egress Proxy Manager
@@ -1020,6 +1320,8 @@ class UDSEgressProxyManager:
                 self._servers[pack_id].stop()
                 del self._servers[pack_id]
             self._socket_manager.cleanup_socket(pack_id)
+        if is_egress_connection_pool_enabled():
+            get_egress_connection_pool().close_pack(pack_id)
 
     def stop_all(self) -> None:
         """全サーバーを停止"""
@@ -1028,6 +1330,8 @@ class UDSEgressProxyManager:
                 self._servers[pack_id].stop()
                 self._socket_manager.cleanup_socket(pack_id)
             self._servers.clear()
+        if is_egress_connection_pool_enabled():
+            get_egress_connection_pool().close_all()
         print("[UDSEgressProxyManager] All servers stopped")
 
     def is_running(self, pack_id: str) -> bool:
@@ -148,6 +148,7 @@ class FlowStep:
     file: Optional[str] = None
     timeout_seconds: float = 60.0
     principal_id: Optional[str] = None
+    output_stream: Optional[str] = None  # 逐次出力（OutputStream）を格納する ctx キー
 
     # Wave 10-A: ステップ間依存
     depends_on: Optional[List[str]] = None
@@ -170,6 +171,7 @@ class FlowDefinition:
     source_type: str = "unknown"  # "official", "shared", "pack", "local_pack"
     source_pack_id: Optional[str] = None  # pack提供の場合のpack_id
     schedule: Optional[Dict] = None  # schedule定義（cron/interval）
+    execution: Optional[Dict[str, Any]] = None  # 実行モード（{"mode": "dag", "max_concurrency": N}）
 
     def to_dict(self) -> Dict[str, Any]:
         """既存Kernelが処理できる形式に変換"""
@@ -186,6 +188,8 @@ class FlowDefinition:
         }
         if self.schedule is not None:
             d["schedule"] = self.schedule
+        if self.execution is not None:
+            d["execution"] = self.execution
         return d
 
     def _step_to_dict(self, step: FlowStep) -> Dict[str, Any]:
@@ -210,6 +214,8 @@ class FlowDefinition:
             d["timeout_seconds"] = step.timeout_seconds
         if step.principal_id:
             d["principal_id"] = step.principal_id
+        if step.output_stream:
+            d["output_stream"] = step.output_stream
         if step.depends_on is not None:
             d["depends_on"] = step.depends_on
         if step.runtime is not None:
@@ -750,6 +756,11 @@ class FlowLoader:
             result.warnings.append("'schedule' should be a dict, ignoring")
             schedule = None
 
+        # execution フィールド（オプション）: "sequential"（既定）/ "dag"
+        execution, execution_warning = self._parse_execution(raw_data.get("execution"))
+        if execution_warning:
+            result.warnings.append(execution_warning)
+
         flow_def = FlowDefinition(
             flow_id=flow_id,
             inputs=inputs,
@@ -760,13 +771,45 @@ class FlowLoader:
             source_file=file_path,
             source_type=source_type,
             source_pack_id=pack_id,
-            schedule=schedule
+            schedule=schedule,
+            execution=execution,
         )
 
         result.success = True
         result.flow_def = flow_def
         return result
 
+    def _parse_execution(self, raw: Any) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        """
+        execution フィールドを正規化する。
+
+        受理形式:
+            execution: dag
+            execution: {mode: dag, max_concurrency: 4}
+
+        Returns:
+            (正規化済み dict または None, 警告メッセージ)
+        """
+        if raw is None:
+            return None, None
+        if isinstance(raw, str):
+            raw = {"mode": raw}
+        if not isinstance(raw, dict):
+            return None, "'execution' should be a string or dict, ignoring"
+        mode = str(raw.get("mode", "sequential")).lower()
+        if mode not in ("sequential", "dag"):
+            return None, f"Unknown execution mode '{mode}', using sequential"
+        execution: Dict[str, Any] = {"mode": mode}
+        if "max_concurrency" in raw:
+            try:
+                max_concurrency = int(raw["max_concurrency"])
+            except (TypeError, ValueError):
+                return execution, "'execution.max_concurrency' must be an integer, ignoring"
+            if max_concurrency < 1:
+                return execution, "'execution.max_concurrency' must be >= 1, ignoring"
+            execution["max_concurrency"] = max_concurrency
+        return execution, None
+
     def _parse_steps(
         self,
         raw_steps: List[Any],
@@ -909,6 +952,11 @@ class FlowLoader:
                 step.file = raw_step.get("file")
                 step.principal_id = raw_step.get("principal_id")
                 step.timeout_seconds = raw_step.get("timeout_seconds", 60.0)
+                output_stream = raw_step.get("output_stream")
+                if output_stream is not None and (not isinstance(output_stream, str) or not output_stream):
+                    errors.append(f"steps[{i}] ({step_id}): 'output_stream' must be a non-empty string")
+                    continue
+                step.output_stream = output_stream
 
                 if not step.file:
                     errors.append(f"steps[{i}] ({step_id}): python_file_call requires 'file'")
@@ -353,7 +353,8 @@ class FlowModifierApplier:
             steps=new_steps,
             source_file=flow_def.source_file,
             source_type=flow_def.source_type,
-            source_pack_id=flow_def.source_pack_id
+            source_pack_id=flow_def.source_pack_id,
+            execution=copy.deepcopy(flow_def.execution),
         )
 
         if self._dry_run:
@@ -408,6 +409,7 @@ class FlowModifierApplier:
             step.owner_pack = step_dict.get("owner_pack")
             step.file = step_dict.get("file")
             step.timeout_seconds = step_dict.get("timeout_seconds", 60.0)
+            step.output_stream = step_dict.get("output_stream")
         return step
 
     def _apply_single_modifier(
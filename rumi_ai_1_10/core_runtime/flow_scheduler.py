@@ -2,12 +2,16 @@
 flow_scheduler.py - Flow スケジュール実行エンジン
 
 cron式またはinterval秒で定期的にFlowを実行するスケジューラー。
-threading.Timer ベースの tick 方式で10秒ごとにスケジュールテーブルを評価する。
+各エントリの次回発火時刻を事前計算してヒープに積み、1 本の常駐スレッドが
+最も早い発火時刻まで眠って実行する。
 
 設計原則:
 - 外部ライブラリ不使用（標準ライブラリのみ）
 - Kernel への直接参照なし（コールバック経由で疎結合）
-- 実行中の Flow は重複実行しない
+- Flow ごとの同時実行数は max_concurrency（デフォルト 1 = 重複実行しない）
+- 最終実行時刻を状態ファイルに永続化し、停止中に逃した実行は misfire ポリシーで扱う
+  （skip: 捨てる / run_once: 1 回だけ追いつき実行）
+- jitter: 同じ cron の Flow が同時に発火しないよう、Flow ID から決まる固定オフセットで分散
 - グレースフル shutdown 対応
 - cron: 5フィールド（分 時 日 月 曜日）、*, */N, 数値, カンマ区切り, 範囲をサポート
 - interval: 最小10秒
@@ -16,19 +20,49 @@ threading.Timer ベースの tick 方式で10秒ごとにスケジュールテ
 
 from __future__ import annotations
 
+import heapq
+import json
 import logging
+import os
+import tempfile
 import threading
 import time
+import zlib
 from datetime import datetime, timedelta, timezone
-from typing import Any, Callable, Dict, List, Optional, Set
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 
-# tick 間隔（秒）
-TICK_INTERVAL = 10.0
-
 # interval の最小値（秒）
 MIN_INTERVAL = 10.0
 
+# スケジューラースレッドが 1 回に眠る最大秒数（壁時計の変更に追従するため）
+MAX_SLEEP = 60.0
+
+# 発火予定時刻からこの秒数以上遅れた実行は misfire として扱う
+MISFIRE_GRACE_SECONDS = 60.0
+
+# cron の次回時刻探索の上限（日付と曜日の組み合わせで稀にしか一致しない式向け）
+_CRON_SEARCH_DAYS = 366 * 28
+
+MISFIRE_POLICIES = frozenset({"skip", "run_once"})
+
+STATE_VERSION = 1
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return max(1, int(os.environ.get(name, str(default))))
+    except (TypeError, ValueError):
+        return default
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return max(0.0, float(os.environ.get(name, str(default))))
+    except (TypeError, ValueError):
+        return default
+
 # --- Timezone support (#60) -------------------------------------------
 
 logger = logging.getLogger(__name__)
@@ -80,6 +114,11 @@ class CronField:
     def matches(self, value: int) -> bool:
         return value in self._values
 
+    def next_value(self, value: int) -> Optional[int]:
+        """value 以上で最小の値を返す。なければ None。"""
+        candidates = [v for v in self._values if v >= value]
+        return min(candidates) if candidates else None
+
     @classmethod
     def parse(cls, expr: str, min_val: int, max_val: int) -> "CronField":
         """
@@ -165,6 +204,35 @@ class CronExpression:
             and self.weekday.matches(dt.weekday())
         )
 
+    def next_after(self, after: datetime) -> Optional[datetime]:
+        """
+        after より後で最初にマッチする分（秒以下 0）を返す。
+
+        after はローカル時刻の naive datetime として扱う。フィールド単位で
+        一致しない月・日・時をまとめて読み飛ばす。見つからなければ None。
+        """
+        t = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = t + timedelta(days=_CRON_SEARCH_DAYS)
+        while t < limit:
+            if not self.month.matches(t.month):
+                if t.month == 12:
+                    t = t.replace(year=t.year + 1, month=1, day=1, hour=0, minute=0)
+                else:
+                    t = t.replace(month=t.month + 1, day=1, hour=0, minute=0)
+                continue
+            if not (self.day.matches(t.day) and self.weekday.matches(t.weekday())):
+                t = t.replace(hour=0, minute=0) + timedelta(days=1)
+                continue
+            if not self.hour.matches(t.hour):
+                t = t.replace(minute=0) + timedelta(hours=1)
+                continue
+            minute = self.minute.next_value(t.minute)
+            if minute is None:
+                t = t.replace(minute=0) + timedelta(hours=1)
+                continue
+            return t.replace(minute=minute)
+        return None
+
     @classmethod
     def parse(cls, cron_str: str) -> "CronExpression":
         """
@@ -203,11 +271,15 @@ class ScheduleEntry:
         "flow_id",
         "cron",
         "interval_seconds",
+        "misfire",
+        "jitter_seconds",
+        "max_concurrency",
         "last_executed_at",
-        "next_interval_at",
+        "last_run_utc",
+        "generation",
         "_tz",
+        "_next_base_utc",
         "_next_run_utc",
-        "_last_cron_minute",
     )
 
     def __init__(
@@ -216,59 +288,71 @@ class ScheduleEntry:
         cron: Optional[CronExpression] = None,
         interval_seconds: Optional[float] = None,
         tz: Any = None,
+        misfire: str = "skip",
+        jitter_seconds: float = 0.0,
+        max_concurrency: int = 1,
     ):
         self.flow_id = flow_id
         self.cron = cron
         self.interval_seconds = interval_seconds
+        self.misfire = misfire
+        self.jitter_seconds = jitter_seconds
+        self.max_concurrency = max_concurrency
         self.last_executed_at: float = 0.0  # monotonic
-        self.next_interval_at: float = 0.0  # monotonic (legacy fallback)
+        self.last_run_utc: Optional[datetime] = None  # 最後に処理した発火予定時刻（jitter 前）
+        self.generation = 0
         self._tz: Any = tz if tz is not None else _UTC
-        self._next_run_utc: Optional[datetime] = None
-        self._last_cron_minute: int = -1  # 同一分内での多重発火防止
+        self._next_base_utc: Optional[datetime] = None  # 次回発火予定時刻（jitter 前）
+        self._next_run_utc: Optional[datetime] = None  # 次回発火時刻（jitter 込み）
 
-    def should_run(self, now_mono: float, now_utc: datetime) -> bool:
-        """今の tick で実行すべきか判定する。"""
+    @property
+    def schedule_key(self) -> str:
+        """永続化状態との対応確認用。スケジュール定義が変わると一致しなくなる。"""
         if self.cron is not None:
-            # cron 評価は指定 TZ のローカル時刻で行う
-            now_dt = now_utc.astimezone(self._tz)
-            # 同一分内で多重発火しないようにする
-            current_minute = now_dt.year * 525960 + now_dt.month * 43800 + \
-                now_dt.day * 1440 + now_dt.hour * 60 + now_dt.minute
-            if current_minute == self._last_cron_minute:
-                return False
-            if self.cron.matches(now_dt):
-                self._last_cron_minute = current_minute
-                return True
-            return False
+            return f"cron:{self.cron._raw}@{self._tz}"
+        return f"interval:{self.interval_seconds}"
+
+    @property
+    def jitter_offset(self) -> timedelta:
+        """Flow ID から決まる固定の発火オフセット（0 〜 jitter_seconds）"""
+        if self.jitter_seconds <= 0:
+            return timedelta(0)
+        ratio = (zlib.crc32(self.flow_id.encode("utf-8")) % 1000) / 1000.0
+        return timedelta(seconds=self.jitter_seconds * ratio)
+
+    def compute_next_base(self, after_utc: datetime) -> Optional[datetime]:
+        """after_utc より後の次回発火予定時刻（jitter 前、UTC）を返す。"""
+        if self.cron is not None:
+            # cron 評価は指定 TZ のローカル時刻（wall-clock）で行う
+            local = after_utc.astimezone(self._tz).replace(tzinfo=None)
+            for _ in range(4):
+                candidate = self.cron.next_after(local)
+                if candidate is None:
+                    return None
+                candidate_utc = candidate.replace(tzinfo=self._tz).astimezone(_UTC)
+                # DST の巻き戻しで同じ壁時計時刻が 2 回ある場合は先に進める
+                if candidate_utc > after_utc:
+                    return candidate_utc
+                local = candidate
+            return None
         if self.interval_seconds is not None:
-            # TZ-aware な _next_run_utc があればそちらで判定
-            if self._next_run_utc is not None:
-                return now_utc >= self._next_run_utc
-            return now_mono >= self.next_interval_at
-        return False
+            # aware datetime の加算は absolute-time ベースのため DST を跨いでも正しい
+            return after_utc + timedelta(seconds=self.interval_seconds)
+        return None
 
-    def compute_next_interval(self) -> None:
-        """次回 interval 実行時刻を計算する。
-
-        指定 TZ の wall-clock 上で *interval_seconds* を加算し、
-        UTC に変換して ``_next_run_utc`` に保存する。
-        aware datetime 同士の timedelta 加算は absolute-time ベースで
-        行われるため、DST 遷移を跨いでも正しく動作する。
-        """
-        if self.interval_seconds is None:
-            return
-        now_utc = datetime.now(_UTC)
-        now_local = now_utc.astimezone(self._tz)
-        next_local = now_local + timedelta(seconds=self.interval_seconds)
-        self._next_run_utc = next_local.astimezone(_UTC)
+    def set_next(self, base_utc: Optional[datetime]) -> None:
+        """次回発火予定時刻を設定する。"""
+        self._next_base_utc = base_utc
+        self._next_run_utc = base_utc + self.jitter_offset if base_utc is not None else None
 
 
 class FlowScheduler:
     """
     Flow スケジューラー。
 
-    tick ベース（TICK_INTERVAL 秒ごと）で全スケジュールエントリを評価し、
-    実行条件を満たした Flow をコールバック経由で実行する。
+    (次回発火時刻, 連番, flow_id, generation) のヒープを持ち、1 本の常駐スレッドが
+    先頭の発火時刻まで眠る。発火した Flow はコールバック経由でワーカースレッドで実行する。
+    unregister / 再 register で古くなったヒープ要素は generation 不一致で読み捨てる。
 
     Kernel を直接参照しない疎結合設計。
     """
@@ -277,6 +361,7 @@ class FlowScheduler:
         self,
         execute_callback: Callable[[str, Optional[Dict[str, Any]]], Dict[str, Any]],
         diagnostics_callback: Optional[Callable[..., None]] = None,
+        state_path: Optional[str] = None,
     ):
         """
         Args:
@@ -285,16 +370,24 @@ class FlowScheduler:
                 典型的には kernel.execute_flow_sync を渡す。
             diagnostics_callback: 診断記録コールバック（任意）。
                 シグネチャ: (phase=, step_id=, handler=, status=, **kwargs)
+            state_path: 最終実行時刻を保存する JSON ファイル（任意）。
+                None なら永続化せず、起動ごとに次回時刻から数え直す。
         """
         self._execute_callback = execute_callback
         self._diagnostics_callback = diagnostics_callback
         self._entries: Dict[str, ScheduleEntry] = {}
-        self._running_flows: Set[str] = set()
+        self._running: Dict[str, int] = {}
+        self._heap: List[Tuple[float, int, str, int]] = []
+        self._seq = 0
         self._lock = threading.Lock()
-        self._timer: Optional[threading.Timer] = None
+        self._wakeup = threading.Condition(self._lock)
+        self._thread: Optional[threading.Thread] = None
         self._stopped = threading.Event()
         self._stopped.set()  # 初期状態は停止
         self._executor: Optional[Any] = None  # ThreadPoolExecutor
+        self._state_path = Path(state_path) if state_path else None
+        self._state_lock = threading.Lock()
+        self._persisted = self._load_state()
 
     def register(
         self,
@@ -308,6 +401,9 @@ class FlowScheduler:
             flow_id: Flow ID
             schedule_def: {'cron': '...'} or {'interval_seconds': N} or {'interval': N}
                           オプション: {'timezone': 'Asia/Tokyo'}
+                                      {'misfire': 'skip' | 'run_once'}
+                                      {'jitter': 秒}
+                                      {'max_concurrency': N}
 
         Returns:
             登録成功したか
@@ -322,18 +418,28 @@ class FlowScheduler:
         cron = None
         interval_seconds = None
 
-        if cron_expr:
-            try:
+        try:
+            if cron_expr:
                 cron = CronExpression.parse(str(cron_expr))
-            except ValueError as e:
-                self._diag(
-                    "scheduler",
-                    f"scheduler.register.{flow_id}.failed",
-                    "flow_scheduler:register",
-                    "failed",
-                    error=str(e),
+            misfire = str(schedule_def.get("misfire", "skip"))
+            if misfire not in MISFIRE_POLICIES:
+                raise ValueError(
+                    f"Invalid misfire policy '{misfire}' (expected one of {sorted(MISFIRE_POLICIES)})"
                 )
-                return False
+            jitter = float(schedule_def.get(
+                "jitter", _env_float("RUMI_SCHEDULER_JITTER_SECONDS", 0.0)))
+            max_concurrency = int(schedule_def.get("max_concurrency", 1))
+            if jitter < 0 or max_concurrency < 1:
+                raise ValueError("jitter must be >= 0 and max_concurrency must be >= 1")
+        except (TypeError, ValueError) as e:
+            self._diag(
+                "scheduler",
+                f"scheduler.register.{flow_id}.failed",
+                "flow_scheduler:register",
+                "failed",
+                error=str(e),
+            )
+            return False
 
         if interval:
             interval_seconds = max(float(interval), MIN_INTERVAL)
@@ -345,14 +451,29 @@ class FlowScheduler:
             cron=cron,
             interval_seconds=interval_seconds,
             tz=tz,
+            misfire=misfire,
+            jitter_seconds=jitter,
+            max_concurrency=max_concurrency,
         )
 
+        now_utc = datetime.now(_UTC)
+        persisted = self._persisted.get(flow_id)
+        if isinstance(persisted, dict) and persisted.get("schedule") == entry.schedule_key:
+            try:
+                entry.last_run_utc = datetime.fromisoformat(persisted["last_run_at"])
+            except (KeyError, TypeError, ValueError):
+                entry.last_run_utc = None
+
+        # 前回実行があればそこから数える（停止中に逃した分は発火時に misfire 判定）
+        # interval の初回実行は interval_seconds 後
+        entry.set_next(entry.compute_next_base(entry.last_run_utc or now_utc))
+
         with self._lock:
-            # interval の初回実行を interval_seconds 後に設定
-            if interval_seconds is not None:
-                entry.next_interval_at = time.monotonic() + interval_seconds
-                entry.compute_next_interval()
+            previous = self._entries.get(flow_id)
+            if previous is not None:
+                entry.generation = previous.generation + 1
             self._entries[flow_id] = entry
+            self._push(entry)
 
         self._diag(
             "scheduler",
@@ -364,15 +485,20 @@ class FlowScheduler:
                 "cron": cron_expr,
                 "interval": interval_seconds,
                 "timezone": str(tz),
+                "misfire": misfire,
+                "jitter": jitter,
+                "max_concurrency": max_concurrency,
+                "next_run_utc": entry._next_run_utc.isoformat() if entry._next_run_utc else None,
             },
         )
         return True
 
     def unregister(self, flow_id: str) -> bool:
-        """スケジュールエントリを削除する。"""
+        """スケジュールエントリを削除する（ヒープ上の要素は発火時に読み捨てる）。"""
         with self._lock:
             if flow_id in self._entries:
                 del self._entries[flow_id]
+                self._wakeup.notify()
                 return True
         return False
 
@@ -383,10 +509,14 @@ class FlowScheduler:
 
         from concurrent.futures import ThreadPoolExecutor
         self._executor = ThreadPoolExecutor(
-            max_workers=2, thread_name_prefix="flow_sched"
+            max_workers=_env_int("RUMI_SCHEDULER_MAX_WORKERS", 4),
+            thread_name_prefix="flow_sched",
         )
         self._stopped.clear()
-        self._schedule_next_tick()
+        self._thread = threading.Thread(
+            target=self._run_loop, name="flow_scheduler", daemon=True,
+        )
+        self._thread.start()
 
         self._diag(
             "scheduler",
@@ -400,11 +530,12 @@ class FlowScheduler:
         """スケジューラーをグレースフル停止する。"""
         self._stopped.set()
 
-        # Timer をキャンセル
+        # スケジューラースレッドを起こして終了を待つ
         with self._lock:
-            if self._timer is not None:
-                self._timer.cancel()
-                self._timer = None
+            self._wakeup.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
 
         # ThreadPoolExecutor を shutdown
         if self._executor is not None:
@@ -428,59 +559,128 @@ class FlowScheduler:
                         "cron": entry.cron._raw if entry.cron else None,
                         "interval": entry.interval_seconds,
                         "last_executed_at": entry.last_executed_at,
+                        "last_run_utc": entry.last_run_utc.isoformat() if entry.last_run_utc else None,
                         "timezone": str(entry._tz),
                         "next_run_utc": entry._next_run_utc.isoformat() if entry._next_run_utc else None,
-                        "is_running": fid in self._running_flows,
+                        "misfire": entry.misfire,
+                        "jitter": entry.jitter_seconds,
+                        "max_concurrency": entry.max_concurrency,
+                        "running_count": self._running.get(fid, 0),
+                        "is_running": self._running.get(fid, 0) > 0,
                     }
                     for fid, entry in self._entries.items()
                 },
             }
 
-    def _schedule_next_tick(self) -> None:
-        """次の tick をスケジュールする。"""
-        if self._stopped.is_set():
-            return
-        self._timer = threading.Timer(TICK_INTERVAL, self._tick)
-        self._timer.daemon = True
-        self._timer.start()
+    # ------------------------------------------------------------------
+    # ヒープ / スケジューラースレッド
+    # ------------------------------------------------------------------
 
-    def _tick(self) -> None:
-        """tick 処理: スケジュールテーブルを評価し、条件を満たしたFlowを実行。"""
-        if self._stopped.is_set():
+    def _push(self, entry: ScheduleEntry) -> None:
+        """次回発火時刻をヒープに積む（_lock を保持して呼ぶ）"""
+        if entry._next_run_utc is None:
             return
-
-        now_mono = time.monotonic()
-        now_utc = datetime.now(_UTC)
-
-        with self._lock:
-            entries_snapshot = list(self._entries.values())
-
-        for entry in entries_snapshot:
-            if self._stopped.is_set():
-                break
-
-            # 重複実行防止
+        self._seq += 1
+        heapq.heappush(
+            self._heap,
+            (entry._next_run_utc.timestamp(), self._seq, entry.flow_id, entry.generation),
+        )
+        self._wakeup.notify()
+
+    def _pop_due(self, now_ts: float) -> List[ScheduleEntry]:
+        """発火時刻を過ぎたエントリを取り出す（_lock を保持して呼ぶ）"""
+        due: List[ScheduleEntry] = []
+        while self._heap and self._heap[0][0] <= now_ts:
+            _, _, flow_id, generation = heapq.heappop(self._heap)
+            entry = self._entries.get(flow_id)
+            if entry is None or entry.generation != generation:
+                continue  # unregister / 再 register 済み
+            due.append(entry)
+        return due
+
+    def _run_loop(self) -> None:
+        """最も早い発火時刻まで眠り、発火したエントリを処理する。"""
+        while not self._stopped.is_set():
             with self._lock:
-                if entry.flow_id in self._running_flows:
+                due = self._pop_due(time.time())
+                if not due:
+                    wait = MAX_SLEEP
+                    if self._heap:
+                        wait = min(max(self._heap[0][0] - time.time(), 0.0), MAX_SLEEP)
+                    self._wakeup.wait(wait)
                     continue
+            now_utc = datetime.now(_UTC)
+            for entry in due:
+                if self._stopped.is_set():
+                    break
+                self._fire(entry, now_utc)
 
-            if entry.should_run(now_mono, now_utc):
-                with self._lock:
-                    # ダブルチェック
-                    if entry.flow_id in self._running_flows:
-                        continue
-                    self._running_flows.add(entry.flow_id)
-                    entry.last_executed_at = now_mono
-                    if entry.interval_seconds is not None:
-                        entry.next_interval_at = now_mono + entry.interval_seconds
-                        entry.compute_next_interval()
+    def _fire(self, entry: ScheduleEntry, now_utc: datetime) -> None:
+        """
+        発火したエントリを実行に回し、次回発火時刻を積み直す。
+
+        - 予定から MISFIRE_GRACE_SECONDS 以上遅れた発火は misfire:
+          skip なら実行せず、run_once なら 1 回だけ実行する。
+          どちらも次回は現在時刻以降から数える（逃した回数分は実行しない）
+        - 実行中の数が max_concurrency に達していればこの回は見送る
+        """
+        with self._lock:
+            if self._entries.get(entry.flow_id) is not entry:
+                return
+            base = entry._next_base_utc
+            if base is None or entry._next_run_utc is None:
+                return
+            lateness = (now_utc - entry._next_run_utc).total_seconds()
+            missed = lateness > MISFIRE_GRACE_SECONDS
+
+            skip_reason = None
+            if missed and entry.misfire == "skip":
+                skip_reason = "misfire"
+            elif self._running.get(entry.flow_id, 0) >= entry.max_concurrency:
+                skip_reason = "max_concurrency"
+
+            if skip_reason is None:
+                self._running[entry.flow_id] = self._running.get(entry.flow_id, 0) + 1
+                entry.last_executed_at = time.monotonic()
+            # 見送った回も処理済みとし、再起動時に同じ回を misfire として数え直さない
+            entry.last_run_utc = now_utc if missed else base
+
+            entry.set_next(entry.compute_next_base(now_utc if missed else base))
+            self._push(entry)
+
+        self._save_state()
+        if skip_reason is not None:
+            self._diag(
+                "scheduler",
+                f"scheduler.execute.{entry.flow_id}.skipped",
+                "flow_scheduler:execute",
+                "skipped",
+                meta={
+                    "flow_id": entry.flow_id,
+                    "reason": skip_reason,
+                    "scheduled_at": base.isoformat(),
+                    "lateness_seconds": round(lateness, 3),
+                },
+            )
+            return
 
-                # executor に submit
-                if self._executor is not None:
-                    self._executor.submit(self._execute_flow, entry.flow_id)
+        executor = self._executor
+        if executor is None:
+            self._release(entry.flow_id)
+            return
+        try:
+            executor.submit(self._execute_flow, entry.flow_id)
+        except RuntimeError:
+            # shutdown 済み
+            self._release(entry.flow_id)
 
-        # 次の tick をスケジュール
-        self._schedule_next_tick()
+    def _release(self, flow_id: str) -> None:
+        with self._lock:
+            n = self._running.get(flow_id, 0) - 1
+            if n > 0:
+                self._running[flow_id] = n
+            else:
+                self._running.pop(flow_id, None)
 
     def _execute_flow(self, flow_id: str) -> None:
         """Flow を実行する（ワーカースレッド）。"""
@@ -516,8 +716,56 @@ class FlowScheduler:
                 error=e,
             )
         finally:
-            with self._lock:
-                self._running_flows.discard(flow_id)
+            self._release(flow_id)
+
+    # ------------------------------------------------------------------
+    # 実行状態の永続化
+    # ------------------------------------------------------------------
+
+    def _load_state(self) -> Dict[str, Any]:
+        """状態ファイルを読む。存在しない・壊れている場合は空。"""
+        if self._state_path is None or not self._state_path.exists():
+            return {}
+        try:
+            with open(self._state_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning("Failed to load scheduler state %s: %s", self._state_path, e)
+            return {}
+        if not isinstance(data, dict) or data.get("version") != STATE_VERSION:
+            return {}
+        flows = data.get("flows")
+        return flows if isinstance(flows, dict) else {}
+
+    def _save_state(self) -> None:
+        """atomic write: tmp -> os.replace"""
+        if self._state_path is None:
+            return
+        with self._lock:
+            flows = dict(self._persisted)
+            for fid, entry in self._entries.items():
+                if entry.last_run_utc is not None:
+                    flows[fid] = {
+                        "schedule": entry.schedule_key,
+                        "last_run_at": entry.last_run_utc.isoformat(),
+                    }
+            self._persisted = flows
+        data = {"version": STATE_VERSION, "flows": flows}
+        with self._state_lock:
+            tmp_path: Optional[str] = None
+            try:
+                self._state_path.parent.mkdir(parents=True, exist_ok=True)
+                fd, tmp_path = tempfile.mkstemp(dir=str(self._state_path.parent), suffix=".tmp")
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(data, f, ensure_ascii=False, indent=2)
+                os.replace(tmp_path, str(self._state_path))
+            except Exception as e:
+                logger.warning("Failed to save scheduler state %s: %s", self._state_path, e)
+                if tmp_path is not None and os.path.exists(tmp_path):
+                    try:
+                        os.unlink(tmp_path)
+                    except Exception:
+                        pass
 
     def _diag(
         self,
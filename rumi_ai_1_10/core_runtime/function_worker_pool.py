@@ -0,0 +1,646 @@
+"""
+function_worker_pool.py - 常駐 Python ワーカープール
+
+CapabilityExecutor の function.call / handler 実行で、呼び出しごとに
+sys.executable を新規起動する代わりに、事前起動済みのワーカープロセスを
+再利用する。
+
+設計原則:
+- ワーカーは (scope, module_path, func_name, cwd) ごとにプールされる
+  scope は principal_id（principal 間でモジュール状態を共有しない）
+- ワーカーは起動時に main.py / handler モジュールを一度だけロードし、
+  length-prefix JSON（4バイトビッグエンディアン + JSON）で多数の要求を処理する
+- max_requests 到達でワーカーをリサイクル、idle_timeout 超過で回収
+- 呼び出しタイムアウト時は該当ワーカーのみ kill する
+- モジュールファイルの (mtime_ns, size) が変わったら既存ワーカーを破棄する
+
+主要コンポーネント:
+- WorkerSpec: プールキー
+- FunctionWorkerPool: プール本体
+  - call(): 1リクエストを実行し応答 dict を返す
+  - stats(): プール状態
+  - shutdown(): 全ワーカー停止
+- get_function_worker_pool(): DI コンテナ経由のアクセサ
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import select
+import struct
+import subprocess
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+# ============================================================
+# 定数
+# ============================================================
+
+DEFAULT_MAX_WORKERS_PER_KEY = 4
+DEFAULT_MAX_REQUESTS_PER_WORKER = 500
+DEFAULT_IDLE_TIMEOUT = 300.0
+DEFAULT_STARTUP_TIMEOUT = 30.0
+MAX_REAP_INTERVAL = 30.0
+
+# 応答フレームの上限（CapabilityExecutor.MAX_RESPONSE_SIZE と同値）
+DEFAULT_MAX_RESPONSE_SIZE = 1 * 1024 * 1024
+
+_FRAME_HEADER = struct.Struct(">I")
+
+
+def is_worker_pool_enabled() -> bool:
+    """RUMI_FUNCTION_WORKER_POOL が有効かどうかを返す。"""
+    return os.environ.get("RUMI_FUNCTION_WORKER_POOL", "0").lower() in ("1", "true", "yes")
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return max(1, int(os.environ.get(name, str(default))))
+    except (TypeError, ValueError):
+        return default
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return max(1.0, float(os.environ.get(name, str(default))))
+    except (TypeError, ValueError):
+        return default
+
+
+# ============================================================
+# ワーカースクリプト（子プロセス側）
+# ============================================================
+
+# 子プロセス側の length-prefix JSON 入出力（container_session.py と共用）
+FRAME_IO_SOURCE = r'''
+import sys, os, json, struct
+
+_HDR = struct.Struct(">I")
+
+def _read_exact(f, n):
+    buf = b""
+    while len(buf) < n:
+        chunk = f.read(n - len(buf))
+        if not chunk:
+            return None
+        buf += chunk
+    return buf
+
+def _read_frame(f):
+    header = _read_exact(f, 4)
+    if header is None:
+        return None
+    (length,) = _HDR.unpack(header)
+    data = _read_exact(f, length) if length else b"{}"
+    if data is None:
+        return None
+    return json.loads(data.decode("utf-8"))
+
+def _write_frame(f, obj):
+    try:
+        payload = json.dumps(obj, ensure_ascii=False, default=str).encode("utf-8")
+    except Exception:
+        payload = json.dumps({"ok": False, "error": "Result is not JSON serializable",
+                              "error_type": "serialize_error"}).encode("utf-8")
+    f.write(_HDR.pack(len(payload)) + payload)
+    f.flush()
+
+def _open_protocol_streams():
+    # fd 0/1 はプロトコル専用に複製し、Pack コードの print() は stderr に逃がす
+    proto_in = os.fdopen(os.dup(0), "rb", buffering=0)
+    proto_out = os.fdopen(os.dup(1), "wb")
+    devnull = os.open(os.devnull, os.O_RDONLY)
+    os.dup2(devnull, 0)
+    os.dup2(2, 1)
+    sys.stdin = open(os.devnull, "r")
+    sys.stdout = sys.stderr
+    return proto_in, proto_out
+'''
+
+WORKER_SCRIPT = FRAME_IO_SOURCE + r'''
+import importlib.util
+
+def main():
+    proto_in, proto_out = _open_protocol_streams()
+
+    init = _read_frame(proto_in)
+    if init is None:
+        return
+    module_path = init.get("module_path", "")
+    func_name = init.get("func_name", "run")
+    module_name = init.get("module_name", "function_module")
+    path_entry = init.get("path_entry")
+    if path_entry and path_entry not in sys.path:
+        if init.get("path_mode") == "append":
+            sys.path.append(path_entry)
+        else:
+            sys.path.insert(0, path_entry)
+    if not module_path or not os.path.isfile(module_path):
+        _write_frame(proto_out, {"ok": False, "error": "Module not found: " + str(module_path),
+                                 "error_type": "file_not_found"})
+        return
+    try:
+        spec = importlib.util.spec_from_file_location(module_name, module_path)
+        if spec is None or spec.loader is None:
+            _write_frame(proto_out, {"ok": False, "error": "Cannot load module: " + module_path,
+                                     "error_type": "load_error"})
+            return
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[module_name] = module
+        spec.loader.exec_module(module)
+    except Exception as e:
+        _write_frame(proto_out, {"ok": False, "error": "Module load failed: " + str(e),
+                                 "error_type": "load_error"})
+        return
+    fn = getattr(module, func_name, None)
+    if fn is None:
+        _write_frame(proto_out, {"ok": False, "error": "Function '" + func_name + "' not found",
+                                 "error_type": "func_not_found"})
+        return
+    _write_frame(proto_out, {"ok": True, "ready": True})
+
+    while True:
+        req = _read_frame(proto_in)
+        if req is None:
+            break
+        try:
+            result = fn(req.get("context", {}), req.get("args", {}))
+        except Exception as e:
+            _write_frame(proto_out, {"ok": False, "error": str(e), "error_type": type(e).__name__})
+            continue
+        _write_frame(proto_out, {"ok": True, "result": result})
+
+if __name__ == "__main__":
+    main()
+'''
+
+
+# ============================================================
+# WorkerSpec
+# ============================================================
+
+@dataclass(frozen=True)
+class WorkerSpec:
+    """
+    ワーカープールのキー。
+
+    Attributes:
+        scope: 分離単位（principal_id）
+        module_path: ロードするモジュールの絶対パス
+        func_name: 呼び出す関数名
+        cwd: ワーカーの作業ディレクトリ
+        path_entry: sys.path に追加するディレクトリ（None なら追加しない）
+        path_mode: "insert"（先頭に追加）または "append"（末尾に追加）
+        module_name: sys.modules に登録するモジュール名
+    """
+    scope: str
+    module_path: str
+    func_name: str
+    cwd: str
+    path_entry: Optional[str] = None
+    path_mode: str = "insert"
+    module_name: str = "function_module"
+
+
+def _file_stamp(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+# ============================================================
+# _PooledWorker（親プロセス側ハンドル）
+# ============================================================
+
+class ChannelClosed(Exception):
+    """子プロセスが応答前に終了した / 不正なフレームを返した。"""
+
+
+class FrameTimeout(Exception):
+    """期限までに応答フレームが揃わなかった。"""
+
+
+class FrameTooLarge(Exception):
+    """応答フレームが上限を超えた。"""
+
+
+def send_frame(stream, payload: Dict[str, Any]) -> None:
+    """length-prefix JSON フレームを子プロセスの stdin に書き込む。"""
+    data = json.dumps(payload, ensure_ascii=False, default=str).encode("utf-8")
+    try:
+        stream.write(_FRAME_HEADER.pack(len(data)) + data)
+        stream.flush()
+    except (BrokenPipeError, OSError, ValueError) as e:
+        raise ChannelClosed(f"write failed: {e}")
+
+
+def recv_frame(fd: int, deadline: float, max_size: int) -> Dict[str, Any]:
+    """
+    子プロセスの stdout から length-prefix JSON フレームを1つ読み取る。
+
+    Raises:
+        FrameTimeout: deadline（time.monotonic() 基準）超過
+        FrameTooLarge: フレーム長が max_size 超過
+        ChannelClosed: EOF または不正なフレーム
+    """
+    header = _read_exact_fd(fd, 4, deadline)
+    (length,) = _FRAME_HEADER.unpack(header)
+    if length > max_size:
+        raise FrameTooLarge(f"{length} > {max_size}")
+    body = _read_exact_fd(fd, length, deadline) if length else b"{}"
+    try:
+        reply = json.loads(body.decode("utf-8"))
+    except (UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise ChannelClosed(f"invalid frame: {e}")
+    if not isinstance(reply, dict):
+        raise ChannelClosed("invalid frame: not an object")
+    return reply
+
+
+def _read_exact_fd(fd: int, n: int, deadline: float) -> bytes:
+    buf = b""
+    while len(buf) < n:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise FrameTimeout()
+        readable, _, _ = select.select([fd], [], [], remaining)
+        if not readable:
+            raise FrameTimeout()
+        chunk = os.read(fd, min(n - len(buf), 65536))
+        if not chunk:
+            raise ChannelClosed("process exited")
+        buf += chunk
+    return buf
+
+
+class _PooledWorker:
+    """1つのワーカープロセスとの length-prefix JSON 通信を管理する。"""
+
+    def __init__(self, spec: WorkerSpec, stamp: Optional[Tuple[int, int]],
+                 python_executable: str) -> None:
+        self.spec = spec
+        self.stamp = stamp
+        self.requests_served = 0
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+        self.proc = subprocess.Popen(
+            [python_executable, "-c", WORKER_SCRIPT],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            cwd=spec.cwd,
+            bufsize=0,
+        )
+
+    @property
+    def pid(self) -> int:
+        return self.proc.pid
+
+    def alive(self) -> bool:
+        return self.proc.poll() is None
+
+    def start(self, timeout: float, max_size: int) -> Dict[str, Any]:
+        """init フレームを送りモジュールのロード結果を待つ。"""
+        init = {
+            "module_path": self.spec.module_path,
+            "func_name": self.spec.func_name,
+            "module_name": self.spec.module_name,
+            "path_entry": self.spec.path_entry,
+            "path_mode": self.spec.path_mode,
+        }
+        return self.request(init, timeout, max_size)
+
+    def request(self, payload: Dict[str, Any], timeout: float, max_size: int) -> Dict[str, Any]:
+        deadline = time.monotonic() + timeout
+        send_frame(self.proc.stdin, payload)
+        return recv_frame(self.proc.stdout.fileno(), deadline, max_size)
+
+    def kill(self) -> None:
+        try:
+            if self.proc.poll() is None:
+                self.proc.kill()
+            self.proc.wait(timeout=5)
+        except Exception:
+            pass
+        for stream in (self.proc.stdin, self.proc.stdout):
+            try:
+                if stream is not None:
+                    stream.close()
+            except Exception:
+                pass
+
+
+# ============================================================
+# FunctionWorkerPool
+# ============================================================
+
+class FunctionWorkerPool:
+    """
+    事前起動済み Python ワーカーのプール。
+
+    call() は常に dict を返す:
+        {"ok": True, "result": <任意>}
+        {"ok": False, "error": str, "error_type": str}
+
+    プール由来の error_type:
+        - "timeout": 呼び出しタイムアウト（該当ワーカーは kill 済み）
+        - "worker_crashed": ワーカーが応答せず終了した
+        - "response_too_large": 応答フレームが上限超過
+        - "load_error" / "file_not_found" / "func_not_found": モジュールロード失敗
+        - "spawn_error": ワーカー起動失敗
+    それ以外の error_type は関数が送出した例外のクラス名。
+    """
+
+    def __init__(
+        self,
+        max_workers_per_key: Optional[int] = None,
+        max_requests: Optional[int] = None,
+        idle_timeout: Optional[float] = None,
+        max_response_size: int = DEFAULT_MAX_RESPONSE_SIZE,
+        python_executable: Optional[str] = None,
+    ) -> None:
+        self._max_workers_per_key = max_workers_per_key or _env_int(
+            "RUMI_FUNCTION_WORKER_MAX_PER_KEY", DEFAULT_MAX_WORKERS_PER_KEY)
+        self._max_requests = max_requests or _env_int(
+            "RUMI_FUNCTION_WORKER_MAX_REQUESTS", DEFAULT_MAX_REQUESTS_PER_WORKER)
+        self._idle_timeout = idle_timeout or _env_float(
+            "RUMI_FUNCTION_WORKER_IDLE_TIMEOUT", DEFAULT_IDLE_TIMEOUT)
+        self._max_response_size = max_response_size
+        self._python = python_executable or sys.executable
+
+        self._cond = threading.Condition()
+        self._idle: Dict[WorkerSpec, List[_PooledWorker]] = {}
+        self._busy_count: Dict[WorkerSpec, int] = {}
+        self._closed = False
+
+        self._reaper: Optional[threading.Thread] = None
+        self._reaper_stop = threading.Event()
+
+        self._stats = {
+            "spawned": 0,
+            "reused": 0,
+            "recycled": 0,
+            "reaped": 0,
+            "timeouts": 0,
+            "crashed": 0,
+            "stale": 0,
+        }
+
+    # ------------------------------------------------------------------
+    # public API
+    # ------------------------------------------------------------------
+
+    def call(
+        self,
+        spec: WorkerSpec,
+        context: Dict[str, Any],
+        args: Any,
+        timeout: float,
+    ) -> Dict[str, Any]:
+        """
+        ワーカーで関数を1回実行する。
+
+        Args:
+            spec: プールキー
+            context: 関数に渡す context
+            args: 関数に渡す args
+            timeout: ワーカー確保・起動・実行を含む全体のタイムアウト（秒）
+
+        Returns:
+            応答 dict（クラス docstring 参照）
+        """
+        deadline = time.monotonic() + timeout
+        worker, err = self._acquire(spec, deadline)
+        if worker is None:
+            return err
+
+        keep = False
+        try:
+            remaining = max(deadline - time.monotonic(), 0.001)
+            try:
+                reply = worker.request({"context": context, "args": args}, remaining,
+                                       self._max_response_size)
+            except FrameTimeout:
+                self._bump("timeouts")
+                return {"ok": False, "error": f"Function execution timed out after {timeout}s",
+                        "error_type": "timeout"}
+            except FrameTooLarge:
+                return {"ok": False, "error": "Response too large", "error_type": "response_too_large"}
+            except ChannelClosed as e:
+                self._bump("crashed")
+                return {"ok": False, "error": f"Worker exited unexpectedly: {e}",
+                        "error_type": "worker_crashed"}
+            worker.requests_served += 1
+            worker.last_used = time.monotonic()
+            keep = worker.requests_served < self._max_requests
+            if not keep:
+                self._bump("recycled")
+            return reply
+        finally:
+            self._release(worker, keep)
+
+    def stats(self) -> Dict[str, Any]:
+        """プールの状態を返す。"""
+        with self._cond:
+            idle = sum(len(v) for v in self._idle.values())
+            busy = sum(self._busy_count.values())
+            keys = len(set(self._idle) | {k for k, v in self._busy_count.items() if v})
+            return {
+                "enabled": is_worker_pool_enabled(),
+                "keys": keys,
+                "idle_workers": idle,
+                "busy_workers": busy,
+                "max_workers_per_key": self._max_workers_per_key,
+                "max_requests": self._max_requests,
+                "idle_timeout": self._idle_timeout,
+                **self._stats,
+            }
+
+    def invalidate(self, scope: Optional[str] = None, module_path: Optional[str] = None) -> int:
+        """
+        条件に一致するアイドルワーカーを停止する。
+
+        busy なワーカーは返却時に破棄される（mtime/size 不一致検出による）。
+
+        Returns:
+            停止したワーカー数
+        """
+        victims: List[_PooledWorker] = []
+        with self._cond:
+            for key in list(self._idle):
+                if scope is not None and key.scope != scope:
+                    continue
+                if module_path is not None and key.module_path != module_path:
+                    continue
+                victims.extend(self._idle.pop(key))
+            self._cond.notify_all()
+        for w in victims:
+            w.kill()
+        return len(victims)
+
+    def shutdown(self) -> None:
+        """全アイドルワーカーを停止し、以後の call() を拒否する。"""
+        self._reaper_stop.set()
+        with self._cond:
+            self._closed = True
+            victims = [w for ws in self._idle.values() for w in ws]
+            self._idle.clear()
+            self._cond.notify_all()
+        for w in victims:
+            w.kill()
+        reaper = self._reaper
+        if reaper is not None and reaper is not threading.current_thread():
+            reaper.join(timeout=5)
+
+    # ------------------------------------------------------------------
+    # acquire / release
+    # ------------------------------------------------------------------
+
+    def _acquire(self, spec: WorkerSpec, deadline: float) -> Tuple[Optional[_PooledWorker], Dict[str, Any]]:
+        stamp = _file_stamp(spec.module_path)
+        stale: List[_PooledWorker] = []
+        try:
+            with self._cond:
+                while True:
+                    if self._closed:
+                        return None, {"ok": False, "error": "Worker pool is shut down",
+                                      "error_type": "pool_closed"}
+                    idle = self._idle.get(spec, [])
+                    while idle:
+                        w = idle.pop()
+                        if w.stamp != stamp or not w.alive():
+                            stale.append(w)
+                            self._stats["stale"] += 1
+                            continue
+                        self._busy_count[spec] = self._busy_count.get(spec, 0) + 1
+                        self._stats["reused"] += 1
+                        return w, {}
+                    self._idle.pop(spec, None)
+                    if self._busy_count.get(spec, 0) < self._max_workers_per_key:
+                        self._busy_count[spec] = self._busy_count.get(spec, 0) + 1
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._stats["timeouts"] += 1
+                        return None, {"ok": False, "error": "Timed out waiting for a free worker",
+                                      "error_type": "timeout"}
+                    self._cond.wait(remaining)
+        finally:
+            for w in stale:
+                w.kill()
+
+        worker, err = self._spawn(spec, stamp, deadline)
+        if worker is None:
+            with self._cond:
+                self._decrement_busy(spec)
+                self._cond.notify()
+        return worker, err
+
+    def _spawn(self, spec: WorkerSpec, stamp, deadline: float) -> Tuple[Optional[_PooledWorker], Dict[str, Any]]:
+        try:
+            worker = _PooledWorker(spec, stamp, self._python)
+        except Exception as e:
+            return None, {"ok": False, "error": f"Failed to start worker: {e}", "error_type": "spawn_error"}
+        self._bump("spawned")
+        self._ensure_reaper()
+        remaining = max(min(deadline - time.monotonic(), DEFAULT_STARTUP_TIMEOUT), 0.001)
+        try:
+            ready = worker.start(remaining, self._max_response_size)
+        except FrameTimeout:
+            worker.kill()
+            self._bump("timeouts")
+            return None, {"ok": False, "error": "Worker startup timed out", "error_type": "timeout"}
+        except (ChannelClosed, FrameTooLarge) as e:
+            worker.kill()
+            self._bump("crashed")
+            return None, {"ok": False, "error": f"Worker failed to start: {e}", "error_type": "worker_crashed"}
+        if not ready.get("ok"):
+            worker.kill()
+            return None, ready
+        return worker, {}
+
+    def _release(self, worker: _PooledWorker, keep: bool) -> None:
+        spec = worker.spec
+        with self._cond:
+            self._decrement_busy(spec)
+            if keep and not self._closed and worker.alive():
+                self._idle.setdefault(spec, []).append(worker)
+                worker = None
+            self._cond.notify()
+        if worker is not None:
+            worker.kill()
+
+    def _decrement_busy(self, spec: WorkerSpec) -> None:
+        n = self._busy_count.get(spec, 0) - 1
+        if n > 0:
+            self._busy_count[spec] = n
+        else:
+            self._busy_count.pop(spec, None)
+
+    def _bump(self, name: str) -> None:
+        with self._cond:
+            self._stats[name] += 1
+        try:
+            from .metrics import get_metrics_collector
+            get_metrics_collector().increment(f"function_worker_pool.{name}")
+        except Exception:
+            pass
+
+    # ------------------------------------------------------------------
+    # idle reaper
+    # ------------------------------------------------------------------
+
+    def _ensure_reaper(self) -> None:
+        with self._cond:
+            if self._reaper is not None and self._reaper.is_alive():
+                return
+            self._reaper_stop.clear()
+            self._reaper = threading.Thread(
+                target=self._reap_loop, name="rumi-function-worker-reaper", daemon=True)
+            self._reaper.start()
+
+    def _reap_loop(self) -> None:
+        interval = min(self._idle_timeout / 2, MAX_REAP_INTERVAL)
+        while not self._reaper_stop.wait(interval):
+            self.reap_idle()
+
+    def reap_idle(self) -> int:
+        """idle_timeout を超えたアイドルワーカーを停止する。"""
+        now = time.monotonic()
+        victims: List[_PooledWorker] = []
+        with self._cond:
+            for key in list(self._idle):
+                keep = []
+                for w in self._idle[key]:
+                    if now - w.last_used > self._idle_timeout or not w.alive():
+                        victims.append(w)
+                    else:
+                        keep.append(w)
+                if keep:
+                    self._idle[key] = keep
+                else:
+                    del self._idle[key]
+            self._stats["reaped"] += len(victims)
+        for w in victims:
+            w.kill()
+        return len(victims)
+
+
+# ============================================================
+# アクセサ
+# ============================================================
+
+def get_function_worker_pool() -> FunctionWorkerPool:
+    """DI コンテナから FunctionWorkerPool を取得する。"""
+    from .di_container import get_container
+    return get_container().get("function_worker_pool")
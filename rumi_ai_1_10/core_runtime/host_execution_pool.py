@@ -0,0 +1,304 @@
+"""
+host_execution_pool.py - permissive ホスト実行用の共有スレッドプール
+
+PythonFileExecutor._execute_on_host が呼び出しごとに
+ThreadPoolExecutor(max_workers=1) を作って join する代わりに、
+プロセス共通の有界プールで Pack コードを実行する。
+
+設計原則:
+- ワーカースレッドは最大 RUMI_HOST_POOL_MAX_WORKERS 本（必要時に起動、アイドルで回収）
+- Pack ごとの同時実行（待ち行列を含む）は RUMI_HOST_POOL_MAX_PER_PACK 件まで。
+  枠が空くまで呼び出し側のタイムアウト内で待つ
+- 待ち行列は RUMI_HOST_POOL_MAX_QUEUE 件まで。超えたら即座に HostPoolBusy
+- タイムアウトした実行は待たずに放棄する。実行中のスレッドはプールから切り離し、
+  代わりのワーカーを起動する。放棄した実行が実際に終わるまで Pack の枠は返さない
+  （暴走する Pack が使えるスレッド数は MAX_PER_PACK で頭打ちになる）
+- 待ち行列長・稼働ワーカー数・放棄中の実行数は MetricsCollector のゲージで公開する
+"""
+
+from __future__ import annotations
+
+import concurrent.futures
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional
+
+
+DEFAULT_MAX_WORKERS = 8
+DEFAULT_MAX_PER_PACK = 4
+DEFAULT_MAX_QUEUE = 256
+DEFAULT_IDLE_TIMEOUT = 60.0
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return max(1, int(os.environ.get(name, str(default))))
+    except (TypeError, ValueError):
+        return default
+
+
+class HostPoolBusy(Exception):
+    """待ち行列の上限、または Pack の同時実行枠の待ち時間切れ"""
+
+    error_type = "host_pool_busy"
+
+
+class _Task:
+    __slots__ = ("pack_key", "fn", "future", "enqueued_at", "state")
+
+    def __init__(self, pack_key: str, fn: Callable[[], Any]):
+        self.pack_key = pack_key
+        self.fn = fn
+        self.future: "concurrent.futures.Future[Any]" = concurrent.futures.Future()
+        self.enqueued_at = time.monotonic()
+        self.state = "queued"  # queued / running / done / abandoned
+
+
+class HostExecutionPool:
+    """
+    ホスト実行用の有界スレッドプール
+
+    run() は fn の戻り値を返す。fn の例外はそのまま送出し、タイムアウト時は
+    concurrent.futures.TimeoutError、混雑時は HostPoolBusy を送出する。
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        max_per_pack: Optional[int] = None,
+        max_queue: Optional[int] = None,
+        idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+    ) -> None:
+        self._max_workers = max_workers or _env_int("RUMI_HOST_POOL_MAX_WORKERS", DEFAULT_MAX_WORKERS)
+        self._max_per_pack = max_per_pack or _env_int("RUMI_HOST_POOL_MAX_PER_PACK", DEFAULT_MAX_PER_PACK)
+        self._max_queue = max_queue or _env_int("RUMI_HOST_POOL_MAX_QUEUE", DEFAULT_MAX_QUEUE)
+        self._idle_timeout = idle_timeout
+
+        self._cond = threading.Condition()
+        self._queue: Deque[_Task] = deque()
+        self._pack_inflight: Dict[str, int] = {}
+        self._workers = 0  # プールに属するワーカースレッド数（放棄中を除く）
+        self._idle_workers = 0
+        self._active = 0
+        self._abandoned_running = 0
+        self._closed = False
+        self._stats = {
+            "completed": 0,
+            "timeouts": 0,
+            "abandoned": 0,
+            "rejected": 0,
+        }
+
+    # ------------------------------------------------------------------
+    # public API
+    # ------------------------------------------------------------------
+
+    def run(self, pack_id: Optional[str], fn: Callable[[], Any], timeout: float) -> Any:
+        """
+        fn をプールで実行し、結果を返す。
+
+        timeout は Pack 枠の待ち・待ち行列・実行を含む全体の上限（秒）。
+        """
+        deadline = time.monotonic() + timeout
+        task = self._enqueue(pack_id or "", fn, deadline)
+        try:
+            return task.future.result(timeout=max(deadline - time.monotonic(), 0.0))
+        except concurrent.futures.TimeoutError:
+            self._abandon(task)
+            raise
+
+    def submit(self, pack_id: Optional[str], fn: Callable[[], Any], timeout: float) -> "concurrent.futures.Future[Any]":
+        """
+        fn をプールに投入して Future を返す（完了を待たない）。
+
+        timeout は Pack 枠が空くまで待つ上限（秒）。fn 自体の打ち切りは行わない。
+        """
+        return self._enqueue(pack_id or "", fn, time.monotonic() + timeout).future
+
+    def stats(self) -> Dict[str, Any]:
+        """プールの状態を返す。"""
+        with self._cond:
+            return {
+                "max_workers": self._max_workers,
+                "max_per_pack": self._max_per_pack,
+                "max_queue": self._max_queue,
+                "workers": self._workers,
+                "active_workers": self._active,
+                "queue_depth": len(self._queue),
+                "abandoned_running": self._abandoned_running,
+                "packs": dict(self._pack_inflight),
+                **self._stats,
+            }
+
+    def shutdown(self) -> None:
+        """待ち行列を破棄し、以後の投入を拒否する（実行中の処理は待たない）。"""
+        with self._cond:
+            self._closed = True
+            dropped = list(self._queue)
+            self._queue.clear()
+            for task in dropped:
+                task.state = "done"
+                self._release_pack(task.pack_key)
+            self._cond.notify_all()
+        for task in dropped:
+            task.future.cancel()
+        self._publish()
+
+    # ------------------------------------------------------------------
+    # 投入 / 放棄
+    # ------------------------------------------------------------------
+
+    def _enqueue(self, pack_key: str, fn: Callable[[], Any], deadline: float) -> _Task:
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise RuntimeError("Host execution pool is shut down")
+                if self._pack_inflight.get(pack_key, 0) < self._max_per_pack:
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._stats["rejected"] += 1
+                    self._bump_metric("rejected")
+                    raise HostPoolBusy(
+                        f"Pack '{pack_key or 'unknown'}' reached its host execution limit "
+                        f"({self._max_per_pack} concurrent)"
+                    )
+                self._cond.wait(remaining)
+            if len(self._queue) >= self._max_queue:
+                self._stats["rejected"] += 1
+                self._bump_metric("rejected")
+                raise HostPoolBusy(f"Host execution queue is full ({self._max_queue})")
+            task = _Task(pack_key, fn)
+            self._pack_inflight[pack_key] = self._pack_inflight.get(pack_key, 0) + 1
+            self._queue.append(task)
+            if self._idle_workers == 0 and self._workers < self._max_workers:
+                self._spawn_worker()
+            self._cond.notify()
+        self._publish()
+        return task
+
+    def _abandon(self, task: _Task) -> None:
+        """タイムアウトした実行を放棄する（待たない）"""
+        with self._cond:
+            self._stats["timeouts"] += 1
+            if task.state == "queued":
+                # まだ始まっていなければ取り消して枠を返す
+                self._queue.remove(task)
+                task.state = "done"
+                self._release_pack(task.pack_key)
+                task.future.cancel()
+            elif task.state == "running":
+                # ワーカーを切り離し、代わりのワーカーを用意する
+                task.state = "abandoned"
+                self._workers -= 1
+                self._active -= 1
+                self._abandoned_running += 1
+                self._stats["abandoned"] += 1
+                if self._queue and self._idle_workers == 0 and self._workers < self._max_workers:
+                    self._spawn_worker()
+        self._bump_metric("timeouts")
+        if task.state == "abandoned":
+            self._bump_metric("abandoned")
+        self._publish()
+
+    def _release_pack(self, pack_key: str) -> None:
+        n = self._pack_inflight.get(pack_key, 0) - 1
+        if n > 0:
+            self._pack_inflight[pack_key] = n
+        else:
+            self._pack_inflight.pop(pack_key, None)
+        self._cond.notify_all()
+
+    # ------------------------------------------------------------------
+    # ワーカー
+    # ------------------------------------------------------------------
+
+    def _spawn_worker(self) -> None:
+        """ワーカーを 1 本起動する（_cond を保持して呼ぶ）"""
+        self._workers += 1
+        threading.Thread(target=self._worker_loop, name="rumi-host-exec", daemon=True).start()
+
+    def _worker_loop(self) -> None:
+        while True:
+            with self._cond:
+                self._idle_workers += 1
+                while not self._queue and not self._closed:
+                    if not self._cond.wait(self._idle_timeout) and not self._queue:
+                        break
+                self._idle_workers -= 1
+                if not self._queue:
+                    self._workers -= 1
+                    return
+                task = self._queue.popleft()
+                task.state = "running"
+                self._active += 1
+            self._publish()
+            self._observe_wait(time.monotonic() - task.enqueued_at)
+
+            try:
+                value = task.fn()
+                error: Optional[BaseException] = None
+            except BaseException as e:  # noqa: BLE001 — Future に載せて呼び出し側へ返す
+                value, error = None, e
+
+            with self._cond:
+                abandoned = task.state == "abandoned"
+                if abandoned:
+                    self._abandoned_running -= 1
+                else:
+                    self._active -= 1
+                    self._stats["completed"] += 1
+                task.state = "done"
+                self._release_pack(task.pack_key)
+            if error is None:
+                task.future.set_result(value)
+            else:
+                task.future.set_exception(error)
+            self._publish()
+            if abandoned:
+                # 切り離されたスレッドはプールに戻らない
+                return
+
+    # ------------------------------------------------------------------
+    # メトリクス
+    # ------------------------------------------------------------------
+
+    def _publish(self) -> None:
+        try:
+            from .metrics import get_metrics_collector
+            mc = get_metrics_collector()
+            with self._cond:
+                queue_depth = len(self._queue)
+                active = self._active
+                abandoned = self._abandoned_running
+            mc.set_gauge("host_pool.queue_depth", queue_depth)
+            mc.set_gauge("host_pool.active_workers", active)
+            mc.set_gauge("host_pool.abandoned_running", abandoned)
+        except Exception:
+            pass
+
+    def _observe_wait(self, seconds: float) -> None:
+        try:
+            from .metrics import get_metrics_collector
+            get_metrics_collector().observe("host_pool.wait_seconds", seconds)
+        except Exception:
+            pass
+
+    def _bump_metric(self, name: str) -> None:
+        try:
+            from .metrics import get_metrics_collector
+            get_metrics_collector().increment(f"host_pool.{name}")
+        except Exception:
+            pass
+
+
+# ============================================================
+# アクセサ
+# ============================================================
+
+def get_host_execution_pool() -> HostExecutionPool:
+    """DI コンテナから HostExecutionPool を取得する。"""
+    from .di_container import get_container
+    return get_container().get("host_execution_pool")
@@ -76,6 +76,8 @@ class KernelCore:
         self._shutdown_handlers: List[Callable[[], None]] = []
         self._capability_proxy = None
         self._executor: ThreadPoolExecutor = ThreadPoolExecutor(max_workers=4)
+        from .kernel_event_loop import KernelEventLoop
+        self._flow_loop: "KernelEventLoop" = KernelEventLoop()  # execute_flow_sync 用の常駐ループ（遅延起動）
         self._flow_scheduler = None  # FlowScheduler instance (lazy)
         self._uds_proxy_manager = None  # UDS Egress Proxy Manager
         # SV-3 fix: circuit breaker flags for lazy init proxies
@@ -447,12 +449,14 @@ class KernelCore:
         InterfaceRegistry に登録されている全 Flow から schedule フィールドを
         スキャンし、スケジュールテーブルを構築して起動する。
         Kernel を直接参照せず、execute_flow_sync コールバックで疎結合。
+        最終実行時刻は RUMI_SCHEDULER_STATE_FILE（既定 user_data/scheduler/state.json）に保存する。
 
         Returns:
             {"started": bool, "registered_count": int, "entries": [...]}
         """
         try:
             from .flow_scheduler import FlowScheduler, scan_flows_for_schedules
+            from .paths import SCHEDULER_STATE_FILE
         except ImportError as e:
             self.diagnostics.record_step(
                 phase="scheduler", step_id="scheduler.import.failed",
@@ -463,6 +467,7 @@ class KernelCore:
         scheduler = FlowScheduler(
             execute_callback=self.execute_flow_sync,
             diagnostics_callback=self.diagnostics.record_step,
+            state_path=os.environ.get("RUMI_SCHEDULER_STATE_FILE") or SCHEDULER_STATE_FILE,
         )
 
         scheduled_flows = scan_flows_for_schedules(self.interface_registry)
@@ -515,6 +520,29 @@ class KernelCore:
             except Exception as e:
                 results.append({"handler": "uds_proxy_manager", "status": "failed", "error": str(e)})
 
+        # 常駐ワーカープールを停止
+        try:
+            from .di_container import get_container
+            worker_pool = get_container().get_or_none("function_worker_pool")
+            if worker_pool is not None:
+                worker_pool.shutdown()
+                get_container().reset("function_worker_pool")
+                results.append({"handler": "function_worker_pool", "status": "success"})
+        except Exception as e:
+            results.append({"handler": "function_worker_pool", "status": "failed", "error": str(e)})
+
+        # 常駐コンテナセッションを停止
+        try:
+            from .container_session import is_container_session_enabled
+            if is_container_session_enabled():
+                from .di_container import get_container
+                orchestrator = get_container().get_or_none("container_orchestrator")
+                if orchestrator is not None:
+                    stopped = orchestrator.stop_sessions()
+                    results.append({"handler": "container_sessions", "status": "success", "stopped": stopped})
+        except Exception as e:
+            results.append({"handler": "container_sessions", "status": "failed", "error": str(e)})
+
         for fn in reversed(self._shutdown_handlers):
             try:
                 fn()
@@ -525,6 +553,11 @@ class KernelCore:
             self.event_bus.clear()
         except Exception:
             pass
+        try:
+            # 常駐ループの Flow をキャンセルしてから executor を止める
+            self._flow_loop.stop()
+        except Exception:
+            pass
         try:
             # SV-4 fix: wait=True で実行中タスクの完了を待つ（データ破損防止）
             # cancel_futures=True で待機中タスクはキャンセル
@@ -0,0 +1,110 @@
+"""
+kernel_event_loop.py - Kernel 所有のバックグラウンド asyncio イベントループ
+
+execute_flow_sync() が呼び出しごとに asyncio.run() でイベントループと
+デフォルト executor を作り直す代わりに、専用スレッドで常駐する
+1つのループへ run_coroutine_threadsafe() で投入する。
+
+設計原則:
+- ループスレッドは初回 submit 時に起動する（遅延起動）
+- 同期呼び出し側のタイムアウト時は、投入したコルーチン（Task）をキャンセルする
+- ループスレッド自身からの同期呼び出しはブロックできないため、
+  呼び出し側（execute_flow_sync）で一時ループにフォールバックする
+- RUMI_KERNEL_SHARED_LOOP=0 で従来の asyncio.run() 方式に戻せる
+"""
+
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import os
+import threading
+from typing import Any, Coroutine, Optional
+
+
+THREAD_JOIN_TIMEOUT_SECONDS = 5.0
+
+
+def is_shared_loop_enabled() -> bool:
+    """RUMI_KERNEL_SHARED_LOOP が有効かどうかを返す（デフォルト有効）。"""
+    return os.environ.get("RUMI_KERNEL_SHARED_LOOP", "1").lower() in ("1", "true", "yes")
+
+
+class KernelEventLoop:
+    """専用スレッドで常駐するイベントループ"""
+
+    def __init__(self, name: str = "rumi-kernel-loop") -> None:
+        self._name = name
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def _ensure_started(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is not None and self._thread is not None and self._thread.is_alive():
+                return self._loop
+            loop = asyncio.new_event_loop()
+            ready = threading.Event()
+
+            def _run() -> None:
+                asyncio.set_event_loop(loop)
+                loop.call_soon(ready.set)
+                loop.run_forever()
+
+            thread = threading.Thread(target=_run, name=self._name, daemon=True)
+            thread.start()
+            ready.wait()
+            self._loop = loop
+            self._thread = thread
+            return loop
+
+    def is_loop_thread(self) -> bool:
+        """現在のスレッドがループスレッドか"""
+        return self._thread is not None and threading.current_thread() is self._thread
+
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def submit(self, coro: Coroutine[Any, Any, Any]) -> "concurrent.futures.Future":
+        """コルーチンをループに投入する"""
+        return asyncio.run_coroutine_threadsafe(coro, self._ensure_started())
+
+    def run(self, coro: Coroutine[Any, Any, Any], timeout: Optional[float] = None) -> Any:
+        """
+        コルーチンをループで実行し、結果を待つ
+
+        Raises:
+            concurrent.futures.TimeoutError: timeout 秒以内に終わらなかった
+                （コルーチンはキャンセル済み）
+        """
+        future = self.submit(coro)
+        try:
+            return future.result(timeout=timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise
+
+    def stop(self) -> None:
+        """実行中のタスクをキャンセルしてループを停止する"""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = None
+            self._thread = None
+        if loop is None or thread is None:
+            return
+
+        async def _cancel_all() -> None:
+            tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+            for t in tasks:
+                t.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await loop.shutdown_asyncgens()
+
+        try:
+            asyncio.run_coroutine_threadsafe(_cancel_all(), loop).result(THREAD_JOIN_TIMEOUT_SECONDS)
+        except Exception:
+            pass
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout=THREAD_JOIN_TIMEOUT_SECONDS)
+        if not thread.is_alive():
+            loop.close()
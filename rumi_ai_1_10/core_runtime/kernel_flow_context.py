@@ -0,0 +1,229 @@
+"""
+kernel_flow_context.py - サブフロー用のコピーオンライトなコンテキスト
+
+_execute_sub_flow_step が呼び出しごとに ctx 全体を copy.deepcopy() する代わりに、
+親 ctx の浅いスナップショットを読み通す子コンテキストを作る。
+
+設計原則:
+- 子の書き込み・削除は子自身の層にだけ記録し、親 ctx は変更しない
+- 親由来の dict / list / set / tuple / bytearray は子が最初に読んだ時点でコピーし、
+  以後は子の層のコピーを返す（読まない値はコピーしない）
+- それ以外のオブジェクト（interface_registry / diagnostics 等のサービス）は
+  コピーせず参照を共有する
+- スナップショットは子の作成時点のキー集合。作成後に親へ追加・置換されたキーは見えない
+- RUMI_FLOW_COW_CONTEXT=0 で従来の copy.deepcopy() 方式に戻せる
+"""
+
+from __future__ import annotations
+
+import copy
+import os
+from collections.abc import ItemsView, KeysView, ValuesView
+from typing import Any, Dict, Iterator, Mapping, Set
+
+
+_MISSING = object()
+
+# 読み出し時にコピーする（親と共有してはいけない）型
+_COPIED_TYPES = (dict, list, set, tuple, bytearray)
+
+
+def is_cow_context_enabled() -> bool:
+    """RUMI_FLOW_COW_CONTEXT が有効かどうかを返す（デフォルト有効）。"""
+    return os.environ.get("RUMI_FLOW_COW_CONTEXT", "1").lower() in ("1", "true", "yes")
+
+
+def copy_context_value(value: Any, memo: Dict[int, Any]) -> Any:
+    """
+    データコンテナを再帰的にコピーする。
+
+    dict / list / set / tuple / bytearray は中身ごとコピーし、
+    それ以外のオブジェクトは参照のまま返す。これらの型のサブクラスは
+    copy.deepcopy() に任せる。
+    """
+    if not isinstance(value, _COPIED_TYPES):
+        return value
+    vid = id(value)
+    if vid in memo:
+        return memo[vid]
+    t = type(value)
+    if t is dict or isinstance(value, LayeredFlowContext):
+        result: Any = {}
+        memo[vid] = result
+        for k, v in value.items():
+            result[k] = copy_context_value(v, memo)
+        return result
+    if t is list:
+        result = []
+        memo[vid] = result
+        result.extend(copy_context_value(v, memo) for v in value)
+        return result
+    if t is tuple:
+        items = tuple(copy_context_value(v, memo) for v in value)
+        result = value if all(a is b for a, b in zip(items, value)) else items
+        memo[vid] = result
+        return result
+    if t is set:
+        result = set(value)
+    elif t is bytearray:
+        result = bytearray(value)
+    else:
+        result = copy.deepcopy(value, memo)
+    memo[vid] = result
+    return result
+
+
+class LayeredFlowContext(dict):
+    """
+    親 ctx のスナップショットを読み通す dict。
+
+    dict としての中身（dict.__getitem__ 等で見える部分）は子自身の層で、
+    _base が親のスナップショット、_deleted が子で削除した親のキー。
+    dict を受け取る既存コードからそのまま使えるよう、読み出し系のメソッドは
+    全て 2 層を合成した結果を返す。
+    """
+
+    __slots__ = ("_base", "_deleted")
+
+    def __init__(self, base: Mapping[str, Any]) -> None:
+        super().__init__()
+        self._base: Dict[str, Any] = base if type(base) is dict else dict(base)
+        self._deleted: Set[Any] = set()
+
+    # ------------------------------------------------------------------
+    # 読み出し
+    # ------------------------------------------------------------------
+
+    def __getitem__(self, key: Any) -> Any:
+        value = dict.get(self, key, _MISSING)
+        if value is not _MISSING:
+            return value
+        if key in self._deleted:
+            raise KeyError(key)
+        value = self._base[key]
+        if isinstance(value, _COPIED_TYPES):
+            value = copy_context_value(value, {})
+            dict.__setitem__(self, key, value)
+        return value
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __contains__(self, key: Any) -> bool:
+        if dict.__contains__(self, key):
+            return True
+        return key not in self._deleted and key in self._base
+
+    def __iter__(self) -> Iterator[Any]:
+        own = list(dict.__iter__(self))
+        own_set = set(own)
+        yield from own
+        for key in list(self._base):
+            if key not in own_set and key not in self._deleted:
+                yield key
+
+    def __len__(self) -> int:
+        extra = sum(
+            1 for key in self._base
+            if key not in self._deleted and not dict.__contains__(self, key)
+        )
+        return dict.__len__(self) + extra
+
+    def keys(self) -> KeysView:  # type: ignore[override]
+        return KeysView(self)
+
+    def items(self) -> ItemsView:  # type: ignore[override]
+        return ItemsView(self)
+
+    def values(self) -> ValuesView:  # type: ignore[override]
+        return ValuesView(self)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """2 層を合成した浅い dict を返す（コピーは行わない）。孫コンテキストの基底に使う。"""
+        merged = {k: v for k, v in self._base.items() if k not in self._deleted}
+        merged.update(dict.items(self))
+        return merged
+
+    # ------------------------------------------------------------------
+    # 書き込み（dict.__setitem__ / dict.update はそのまま子の層に入る）
+    # ------------------------------------------------------------------
+
+    def __delitem__(self, key: Any) -> None:
+        in_own = dict.__contains__(self, key)
+        in_base = key not in self._deleted and key in self._base
+        if not in_own and not in_base:
+            raise KeyError(key)
+        if in_own:
+            dict.__delitem__(self, key)
+        if key in self._base:
+            self._deleted.add(key)
+
+    def pop(self, key: Any, *default: Any) -> Any:
+        try:
+            value = self[key]
+        except KeyError:
+            if default:
+                return default[0]
+            raise
+        del self[key]
+        return value
+
+    def popitem(self) -> Any:
+        for key in reversed(list(self)):
+            value = self[key]
+            del self[key]
+            return key, value
+        raise KeyError("popitem(): dictionary is empty")
+
+    def setdefault(self, key: Any, default: Any = None) -> Any:
+        if key in self:
+            return self[key]
+        self[key] = default
+        return default
+
+    def clear(self) -> None:
+        dict.clear(self)
+        self._deleted.update(self._base)
+
+    # ------------------------------------------------------------------
+    # 比較・コピー
+    # ------------------------------------------------------------------
+
+    def __eq__(self, other: Any) -> bool:
+        return self.snapshot() == other
+
+    def __ne__(self, other: Any) -> bool:
+        return not self == other
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.snapshot()!r})"
+
+    def copy(self) -> Dict[str, Any]:  # type: ignore[override]
+        """通常の dict を返す。親由来のコンテナは読み出し時と同じくコピーされる。"""
+        return dict(self.items())
+
+    __copy__ = copy
+
+    def __deepcopy__(self, memo: Dict[int, Any]) -> Dict[str, Any]:
+        return copy.deepcopy(self.snapshot(), memo)
+
+    def __reduce__(self) -> Any:
+        return (dict, (self.snapshot(),))
+
+
+def fork_flow_context(parent: Mapping[str, Any]) -> Dict[str, Any]:
+    """
+    サブフロー用の子コンテキストを作る。
+
+    RUMI_FLOW_COW_CONTEXT=0 の場合は従来どおり copy.deepcopy(parent) を返す。
+    """
+    if not is_cow_context_enabled():
+        return copy.deepcopy(parent)
+    if isinstance(parent, LayeredFlowContext):
+        return LayeredFlowContext(parent.snapshot())
+    return LayeredFlowContext(dict(parent))
@@ -96,6 +96,7 @@ class FlowConverter:
                 "principal_id": step.get("principal_id"),
                 "input": step_input,
                 "timeout_seconds": step.get("timeout_seconds", 60.0),
+                "output_stream": step.get("output_stream"),
                 "_step_id": step.get("id"),
                 "_phase": step.get("phase"),
             }
@@ -128,7 +129,7 @@ class FlowConverter:
             legacy_step = self._convert_flow_step_to_legacy(step)
             legacy_steps.append(legacy_step)
 
-        return {
+        legacy: Dict[str, Any] = {
             "flow_id": flow_def.flow_id,
             "inputs": flow_def.inputs,
             "outputs": flow_def.outputs,
@@ -141,6 +142,13 @@ class FlowConverter:
             "_source_type": flow_def.source_type,
         }
 
+        # 実行モード（execution: dag）
+        execution = getattr(flow_def, "execution", None)
+        if execution:
+            legacy["execution"] = execution
+
+        return legacy
+
     def _convert_flow_step_to_legacy(
         self, step: "FlowStep"
     ) -> Dict[str, Any]:
@@ -159,6 +167,10 @@ class FlowConverter:
         if step.output:
             legacy_step["output"] = step.output
 
+        # Wave 10-C: depends_on（実行時チェック / DAG 実行で使用）
+        if step.depends_on:
+            legacy_step["depends_on"] = list(step.depends_on)
+
         # type ごとの変換
         if step.type == "python_file_call":
             legacy_step["handler"] = "kernel:python_file_call"
@@ -168,6 +180,7 @@ class FlowConverter:
                 "principal_id": step.principal_id,
                 "input": step.input,
                 "timeout_seconds": step.timeout_seconds,
+                "output_stream": step.output_stream,
                 "_step_id": step.id,
                 "_phase": step.phase,
             }
@@ -8,6 +8,7 @@ Mixin方式で Kernel クラスに合成される。
 - run_startup / run_pipeline (同期 pipeline 実行)
 - execute_flow / execute_flow_sync (async/sync Flow 実行エントリ)
 - _execute_flow_internal / _execute_steps_async (async 実行内部)
+- _execute_steps_dag_async (execution: dag — depends_on に基づく並行実行)
 - _execute_handler_step_async / _execute_sub_flow_step (ステップ実行)
 - _execute_function_step_async (Wave 27-C: function.call ステップ)
 - _eval_condition (条件式評価)
@@ -21,6 +22,7 @@ Mixin方式で Kernel クラスに合成される。
     self.event_bus          : EventBus
     self._flow              : Optional[Dict]
     self._executor          : ThreadPoolExecutor
+    self._flow_loop         : KernelEventLoop (execute_flow_sync の常駐ループ)
     self._flow_converter    : FlowConverter
     self._variable_resolver : VariableResolver
 
@@ -52,13 +54,21 @@ Wave 27-D1: 同期 pipeline での function step 対応
 
 Wave 27-D2: function step への vocab_normalize 追加
 - _execute_function_step_async() の結果格納前に vocab_normalize を適用 (opt-in)
+
+解決プラン:
+- async 実行のステップ args / when は VariableResolver.step_plan() の
+  解決プランで評価する（RUMI_FLOW_COMPILED_PLANS=0 で従来の逐次解決）
+
+サブフローのコンテキスト:
+- _execute_sub_flow_step は ctx を deepcopy せず、親を読み通す
+  コピーオンライトな子コンテキスト（kernel_flow_context）で実行する
 """
 
 from __future__ import annotations
 
 import asyncio
 import copy
-import re
+import os
 import time
 import uuid
 from typing import Any, Dict, List, Optional, Set, Tuple
@@ -69,6 +79,14 @@ from .logging_utils import get_structured_logger
 from .profiling import get_profiler
 from .metrics import get_metrics_collector
 from .kernel_facade import KernelFacade
+from .kernel_event_loop import is_shared_loop_enabled
+from .kernel_flow_context import fork_flow_context
+from .kernel_variable_resolver import (
+    VariableResolver,
+    _CONDITION_OP_RE,  # noqa: F401  (後方互換の再エクスポート)
+    compare_condition,
+    parse_condition,
+)
 
 _logger = get_structured_logger("rumi.kernel.flow_execution")
 
@@ -76,10 +94,15 @@ _logger = get_structured_logger("rumi.kernel.flow_execution")
 # --- Flow chain / resolve depth limits (Fix #58, #70) ---
 MAX_FLOW_CHAIN_DEPTH = 10
 
-# --- Condition parser pattern (Fix #16, Wave 27-A: comparison operators) ---
-_CONDITION_OP_RE = re.compile(r'\s+(==|!=|>=|<=|>|<)\s+')
+# --- execution: dag の既定同時実行数 ---
+DEFAULT_DAG_MAX_CONCURRENCY = 4
+
 
 
+def is_compiled_plans_enabled() -> bool:
+    """ステップ args / when の解決プランを使うか（RUMI_FLOW_COMPILED_PLANS、既定 1）"""
+    return os.environ.get("RUMI_FLOW_COMPILED_PLANS", "1") != "0"
+
 
 # ── universal_call constants ────────────────────────────────
 _UC_MAX_RESPONSE_SIZE = 1 * 1024 * 1024   # 1 MiB
@@ -293,11 +316,25 @@ class KernelFlowExecutionMixin:
         """
         Flow を同期的に実行する。
 
+        Kernel 所有の常駐イベントループ（self._flow_loop）に投入して結果を待つ。
+        同時に実行される Flow は同じループと self._executor を共有する。
+        待機がタイムアウトした場合は Flow のコルーチンをキャンセルする。
+
         S-4: asyncio.get_running_loop() の RuntimeError 依存をやめ、
         Python 3.9+ 互換のパターンに変更。
         """
         effective_timeout = timeout or 300
         coro = self.execute_flow(flow_id, context, timeout)
+        timeout_result = {"_error": f"Flow '{flow_id}' timed out after {effective_timeout}s (sync)", "_flow_timeout": True}
+
+        flow_loop = getattr(self, "_flow_loop", None)
+        if flow_loop is not None and is_shared_loop_enabled() and not flow_loop.is_loop_thread():
+            from concurrent.futures import TimeoutError as FuturesTimeoutError
+            try:
+                # execute_flow 側の wait_for が先に発火するよう猶予を持たせる
+                return flow_loop.run(coro, timeout=effective_timeout + 1)
+            except FuturesTimeoutError:
+                return timeout_result
 
         # S-4: ループの状態を安全に判定
         try:
@@ -307,13 +344,15 @@ class KernelFlowExecutionMixin:
             is_running = False
 
         if is_running:
-            # 既にイベントループが走っている → run_coroutine_threadsafe で安全にスケジュール
-            from concurrent.futures import TimeoutError as FuturesTimeoutError
-            future = asyncio.run_coroutine_threadsafe(coro, loop)
+            # このスレッドのループは塞げないため、別スレッドの一時ループで実行する
+            from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+            pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="rumi-flow-sync")
             try:
-                return future.result(timeout=effective_timeout)
+                return pool.submit(asyncio.run, coro).result(timeout=effective_timeout)
             except FuturesTimeoutError:
-                return {"_error": f"Flow '{flow_id}' timed out after {effective_timeout}s (sync)", "_flow_timeout": True}
+                return timeout_result
+            finally:
+                pool.shutdown(wait=False)
         else:
             # イベントループなし → asyncio.run で実行
             return asyncio.run(coro)
@@ -357,7 +396,7 @@ class KernelFlowExecutionMixin:
             ctx["_total_steps"] = len(steps)
             self.diagnostics.record_step(phase="flow", step_id=f"flow.{flow_id}.start", handler="kernel:execute_flow",
                                           status="success", meta={"flow_id": flow_id, "execution_id": execution_id, "step_count": len(steps)})
-            ctx = await self._execute_steps_async(steps, ctx)
+            ctx = await self._execute_steps_async(steps, ctx, execution=flow_def.get("execution"))
             self.diagnostics.record_step(phase="flow", step_id=f"flow.{flow_id}.end", handler="kernel:execute_flow",
                                           status="success", meta={"flow_id": flow_id, "execution_id": execution_id})
             # --- Wave 15-B: metrics ---
@@ -374,124 +413,284 @@ class KernelFlowExecutionMixin:
             except Exception:
                 pass
 
-    async def _execute_steps_async(self, steps: List[Dict[str, Any]], ctx: Dict[str, Any]) -> Dict[str, Any]:
+    @staticmethod
+    def _get_execution_settings(execution: Any) -> Tuple[str, int]:
+        """Flow の execution 設定を (mode, max_concurrency) に正規化する。"""
+        if isinstance(execution, str):
+            execution = {"mode": execution}
+        if not isinstance(execution, dict):
+            return "sequential", 1
+        mode = str(execution.get("mode", "sequential")).lower()
+        try:
+            max_concurrency = max(1, int(execution.get("max_concurrency", DEFAULT_DAG_MAX_CONCURRENCY)))
+        except (TypeError, ValueError):
+            max_concurrency = DEFAULT_DAG_MAX_CONCURRENCY
+        return ("dag" if mode == "dag" else "sequential"), max_concurrency
+
+    async def _execute_steps_async(
+        self,
+        steps: List[Dict[str, Any]],
+        ctx: Dict[str, Any],
+        execution: Any = None,
+    ) -> Dict[str, Any]:
+        mode, max_concurrency = self._get_execution_settings(execution)
+        if mode == "dag":
+            return await self._execute_steps_dag_async(steps, ctx, max_concurrency)
         executed_ids: Set[str] = set()
         for i, step in enumerate(steps):
             if not isinstance(step, dict) or ctx.get("_flow_timeout"):
                 continue
             ctx["_current_step_index"] = i
             step_id = step.get("id", f"step_{i}")
-            step_type = step.get("type", "handler")
-            if step.get("when") and not self._eval_condition(step["when"], ctx):
+            if step.get("when") and not self._eval_step_condition(step, ctx):
                 continue
             # --- Wave 10-C: depends_on check ---
             dep_ok, dep_missing = self._check_depends_on(step, executed_ids)
             if not dep_ok:
-                fail_soft = ctx.get("_flow_defaults", {}).get("fail_soft", True)
-                if fail_soft:
-                    _logger.warning(
-                        f"Step '{step_id}' skipped: depends_on not satisfied (missing: {dep_missing})",
-                    )
-                    self.diagnostics.record_step(
-                        phase="flow",
-                        step_id=f"{step_id}.depends_on.skipped",
-                        handler="kernel:depends_on_check",
-                        status="skipped",
-                        meta={
-                            "missing_deps": dep_missing,
-                            "flow_id": ctx.get("_flow_id"),
-                        },
-                    )
+                if self._record_depends_on_failure(step_id, dep_missing, ctx):
                     continue
-                else:
-                    self.diagnostics.record_step(
-                        phase="flow",
-                        step_id=f"{step_id}.depends_on.abort",
-                        handler="kernel:depends_on_check",
-                        status="failed",
-                        meta={
-                            "missing_deps": dep_missing,
-                            "flow_id": ctx.get("_flow_id"),
-                        },
-                    )
-                    return ctx
+                return ctx
             # --- end depends_on check ---
-            meta = {"flow_id": ctx.get("_flow_id"), "execution_id": ctx.get("_flow_execution_id"),
-                    "step_index": i, "total_steps": ctx.get("_total_steps", len(steps)),
-                    "parent_execution_id": ctx.get("_parent_flow_execution_id")}
-            should_skip, should_abort = False, False
-            for hook in self.interface_registry.get("flow.hooks.before_step", strategy="all"):
-                if callable(hook):
-                    try:
-                        result = hook(step, ctx, meta)
-                        if isinstance(result, dict):
-                            if result.get("_skip"):
-                                should_skip = True
-                                break
-                            if result.get("_abort"):
-                                should_abort = True
-                                break
-                    except Exception as e:
-                        self.diagnostics.record_step(phase="flow", step_id=f"{step_id}.before_hook",
-                                                      handler="flow.hooks.before_step", status="failed", error=e)
+            meta = self._build_step_meta(i, steps, ctx)
+            should_skip, should_abort = self._run_before_step_hooks(step, step_id, ctx, meta)
             if should_abort:
                 return ctx
             if should_skip:
                 continue
             step_result = None
             try:
-                if step_type == "handler":
-                    ctx, step_result = await self._execute_handler_step_async(step, ctx)
-                elif step_type == "flow":
-                    ctx, step_result = await self._execute_sub_flow_step(step, ctx)
-                elif step_type == "function":
-                    ctx, step_result = await self._execute_function_step_async(step, ctx)
-                else:
-                    construct = self.interface_registry.get(f"flow.construct.{step_type}")
-                    if construct and callable(construct):
-                        # Wave 17-A: Pack の construct に Kernel 直接参照を渡さず KernelFacade でラップ
-                        _facade = KernelFacade(self)
-                        ctx = await construct(_facade, step, ctx) if asyncio.iscoroutinefunction(construct) else construct(_facade, step, ctx)
+                ctx, step_result = await self._dispatch_step_async(step, ctx)
                 # C5: check flow control abort after step execution
                 if ctx.get("_flow_control_abort"):
                     return ctx
-                for hook in self.interface_registry.get("flow.hooks.after_step", strategy="all"):
-                    if callable(hook):
-                        try:
-                            hook(step, ctx, step_result, meta)
-                        except Exception as e:
-                            _logger.debug(f"after_step hook failed: {e}")
-                            self.diagnostics.record_step(
-                                phase="flow",
-                                step_id=f"{step_id}.after_hook",
-                                handler="flow.hooks.after_step",
-                                status="failed",
-                                error=e,
-                            )
+                self._run_after_step_hooks(step, step_id, ctx, step_result, meta)
                 # --- Wave 10-C: mark step as executed on success ---
                 executed_ids.add(step_id)
             except Exception as e:
-                error_handler = self.interface_registry.get("flow.error_handler")
-                if error_handler and callable(error_handler):
-                    try:
-                        action = error_handler(step, ctx, e)
-                        if action == "abort":
-                            self.diagnostics.record_step(phase="flow", step_id=f"{step_id}.error",
-                                                          handler=step.get("handler", "unknown"), status="failed", error=e, meta={"action": "abort"})
-                            return ctx
-                        if action == "retry":
-                            continue
-                    except Exception:
-                        pass
-                self.diagnostics.record_step(phase="flow", step_id=f"{step_id}.error",
-                                              handler=step.get("handler", "unknown"), status="failed", error=e, meta={"action": "continue"})
+                if self._handle_step_error(step, step_id, ctx, e) == "abort":
+                    return ctx
+        return ctx
+
+    # ------------------------------------------------------------------
+    # ステップ実行の共通部品（sequential / dag 共用）
+    # ------------------------------------------------------------------
+
+    def _build_step_meta(self, index: int, steps: List[Dict[str, Any]], ctx: Dict[str, Any]) -> Dict[str, Any]:
+        return {"flow_id": ctx.get("_flow_id"), "execution_id": ctx.get("_flow_execution_id"),
+                "step_index": index, "total_steps": ctx.get("_total_steps", len(steps)),
+                "parent_execution_id": ctx.get("_parent_flow_execution_id")}
+
+    def _record_depends_on_failure(self, step_id: str, dep_missing: List[str], ctx: Dict[str, Any]) -> bool:
+        """depends_on 未充足を記録する。fail_soft なら True（スキップして継続）。"""
+        fail_soft = ctx.get("_flow_defaults", {}).get("fail_soft", True)
+        if fail_soft:
+            _logger.warning(
+                f"Step '{step_id}' skipped: depends_on not satisfied (missing: {dep_missing})",
+            )
+            self.diagnostics.record_step(
+                phase="flow",
+                step_id=f"{step_id}.depends_on.skipped",
+                handler="kernel:depends_on_check",
+                status="skipped",
+                meta={
+                    "missing_deps": dep_missing,
+                    "flow_id": ctx.get("_flow_id"),
+                },
+            )
+            return True
+        self.diagnostics.record_step(
+            phase="flow",
+            step_id=f"{step_id}.depends_on.abort",
+            handler="kernel:depends_on_check",
+            status="failed",
+            meta={
+                "missing_deps": dep_missing,
+                "flow_id": ctx.get("_flow_id"),
+            },
+        )
+        return False
+
+    def _run_before_step_hooks(
+        self, step: Dict[str, Any], step_id: str, ctx: Dict[str, Any], meta: Dict[str, Any]
+    ) -> Tuple[bool, bool]:
+        """flow.hooks.before_step を実行し (should_skip, should_abort) を返す。"""
+        for hook in self.interface_registry.get("flow.hooks.before_step", strategy="all"):
+            if callable(hook):
+                try:
+                    result = hook(step, ctx, meta)
+                    if isinstance(result, dict):
+                        if result.get("_skip"):
+                            return True, False
+                        if result.get("_abort"):
+                            return False, True
+                except Exception as e:
+                    self.diagnostics.record_step(phase="flow", step_id=f"{step_id}.before_hook",
+                                                  handler="flow.hooks.before_step", status="failed", error=e)
+        return False, False
+
+    def _run_after_step_hooks(
+        self, step: Dict[str, Any], step_id: str, ctx: Dict[str, Any], step_result: Any, meta: Dict[str, Any]
+    ) -> None:
+        for hook in self.interface_registry.get("flow.hooks.after_step", strategy="all"):
+            if callable(hook):
+                try:
+                    hook(step, ctx, step_result, meta)
+                except Exception as e:
+                    _logger.debug(f"after_step hook failed: {e}")
+                    self.diagnostics.record_step(
+                        phase="flow",
+                        step_id=f"{step_id}.after_hook",
+                        handler="flow.hooks.after_step",
+                        status="failed",
+                        error=e,
+                    )
+
+    async def _dispatch_step_async(self, step: Dict[str, Any], ctx: Dict[str, Any]) -> Tuple[Dict[str, Any], Any]:
+        """step type に応じてステップを実行し (ctx, step_result) を返す。"""
+        step_type = step.get("type", "handler")
+        step_result = None
+        if step_type == "handler":
+            ctx, step_result = await self._execute_handler_step_async(step, ctx)
+        elif step_type == "flow":
+            ctx, step_result = await self._execute_sub_flow_step(step, ctx)
+        elif step_type == "function":
+            ctx, step_result = await self._execute_function_step_async(step, ctx)
+        else:
+            construct = self.interface_registry.get(f"flow.construct.{step_type}")
+            if construct and callable(construct):
+                # Wave 17-A: Pack の construct に Kernel 直接参照を渡さず KernelFacade でラップ
+                _facade = KernelFacade(self)
+                ctx = await construct(_facade, step, ctx) if asyncio.iscoroutinefunction(construct) else construct(_facade, step, ctx)
+        return ctx, step_result
+
+    def _handle_step_error(self, step: Dict[str, Any], step_id: str, ctx: Dict[str, Any], e: Exception) -> str:
+        """ステップ例外を flow.error_handler に委ね、"abort" / "retry" / "continue" を返す。"""
+        error_handler = self.interface_registry.get("flow.error_handler")
+        if error_handler and callable(error_handler):
+            try:
+                action = error_handler(step, ctx, e)
+                if action == "abort":
+                    self.diagnostics.record_step(phase="flow", step_id=f"{step_id}.error",
+                                                  handler=step.get("handler", "unknown"), status="failed", error=e, meta={"action": "abort"})
+                    return "abort"
+                if action == "retry":
+                    return "retry"
+            except Exception:
+                pass
+        self.diagnostics.record_step(phase="flow", step_id=f"{step_id}.error",
+                                      handler=step.get("handler", "unknown"), status="failed", error=e, meta={"action": "continue"})
+        return "continue"
+
+    # ------------------------------------------------------------------
+    # DAG 実行（execution: dag）
+    # ------------------------------------------------------------------
+
+    async def _execute_steps_dag_async(
+        self, steps: List[Dict[str, Any]], ctx: Dict[str, Any], max_concurrency: int
+    ) -> Dict[str, Any]:
+        """
+        depends_on に基づき、依存が完了したステップを並行実行する。
+
+        - 依存グラフは最初に1回だけ構築する
+        - 起動判定（when / depends_on / before_step）はリスト順に行い、
+          完了処理（after_step / エラー処理）は同時に完了したものをリスト順に行う
+        - 依存先がスキップ・失敗した場合は sequential と同じく depends_on 未充足として扱う
+        - abort（before_step の _abort、_flow_control_abort、error_handler の abort、
+          fail_soft=false の依存未充足）で新規起動を止め、実行中のステップをキャンセルする
+        - 各ステップは同じ ctx を共有する。並行ステップ間の受け渡しは output で行う前提
+        """
+        nodes: List[Tuple[int, Dict[str, Any], str, List[str]]] = []
+        for i, step in enumerate(steps):
+            if isinstance(step, dict):
+                deps = self._get_step_depends_on(step) or []
+                nodes.append((i, step, step.get("id", f"step_{i}"), [d for d in deps if isinstance(d, str)]))
+        known_ids = {node[2] for node in nodes}
+
+        executed_ids: Set[str] = set()
+        finished_ids: Set[str] = set()
+        pending = list(nodes)
+        running: Dict[asyncio.Future, Tuple[int, Dict[str, Any], str, Dict[str, Any]]] = {}
+        aborted = False
+        # 循環依存などで起動不能になった場合、残りを依存未充足として処理する
+        force_resolve = False
+
+        while not aborted:
+            # --- 起動フェーズ（リスト順） ---
+            launched = True
+            while launched and not aborted and not ctx.get("_flow_timeout"):
+                launched = False
+                waiting = []
+                for node in pending:
+                    i, step, step_id, deps = node
+                    if aborted or len(running) >= max_concurrency:
+                        waiting.append(node)
+                        continue
+                    if not force_resolve and any(d in known_ids and d not in finished_ids for d in deps):
+                        waiting.append(node)
+                        continue
+                    launched = True
+                    ctx["_current_step_index"] = i
+                    if step.get("when") and not self._eval_step_condition(step, ctx):
+                        finished_ids.add(step_id)
+                        continue
+                    dep_ok, dep_missing = self._check_depends_on(step, executed_ids)
+                    if not dep_ok:
+                        finished_ids.add(step_id)
+                        if not self._record_depends_on_failure(step_id, dep_missing, ctx):
+                            aborted = True
+                        continue
+                    meta = self._build_step_meta(i, steps, ctx)
+                    should_skip, should_abort = self._run_before_step_hooks(step, step_id, ctx, meta)
+                    if should_abort:
+                        aborted = True
+                        continue
+                    if should_skip:
+                        finished_ids.add(step_id)
+                        continue
+                    task = asyncio.ensure_future(self._dispatch_step_async(step, ctx))
+                    running[task] = (i, step, step_id, meta)
+                pending = waiting
+
+            if aborted or ctx.get("_flow_timeout"):
+                break
+            if not running:
+                if not pending:
+                    break
+                force_resolve = True
+                continue
+
+            # --- 完了フェーズ ---
+            done, _ = await asyncio.wait(list(running), return_when=asyncio.FIRST_COMPLETED)
+            for task in sorted(done, key=lambda t: running[t][0]):
+                i, step, step_id, meta = running.pop(task)
+                finished_ids.add(step_id)
+                if aborted:
+                    continue
+                try:
+                    step_ctx, step_result = task.result()
+                    if isinstance(step_ctx, dict) and step_ctx is not ctx:
+                        ctx.update(step_ctx)
+                    # C5: check flow control abort after step execution
+                    if ctx.get("_flow_control_abort"):
+                        aborted = True
+                        continue
+                    self._run_after_step_hooks(step, step_id, ctx, step_result, meta)
+                    executed_ids.add(step_id)
+                except Exception as e:
+                    if self._handle_step_error(step, step_id, ctx, e) == "abort":
+                        aborted = True
+
+        if running:
+            for task in running:
+                task.cancel()
+            await asyncio.gather(*running, return_exceptions=True)
         return ctx
 
     async def _execute_handler_step_async(self, step: Dict[str, Any], ctx: Dict[str, Any]) -> Tuple[Dict[str, Any], Any]:
         handler_key = step.get("handler")
         if not handler_key:
             return ctx, None
-        resolved_args = self._resolve_value(step.get("args", {}), ctx)
+        resolved_args = self._resolve_step_args(step, ctx)
 
         # handler 解決統一: kernel:* は _resolve_handler を優先し、
         # pipeline 実行と同じ経路で解決する（async/pipeline 非対称の解消）
@@ -595,12 +794,11 @@ class KernelFlowExecutionMixin:
             )
             return ctx, {"_error": error_msg}
 
-        child_ctx = copy.deepcopy(ctx)
+        child_ctx = fork_flow_context(ctx)
         child_ctx["_flow_call_stack"] = call_stack + [flow_name]
         child_ctx["_parent_flow_id"] = ctx.get("_flow_id")
 
-        args = step.get("args", {})
-        resolved_args = self._resolve_value(args, ctx)
+        resolved_args = self._resolve_step_args(step, ctx)
         if isinstance(resolved_args, dict):
             child_ctx.update(resolved_args)
 
@@ -631,9 +829,12 @@ class KernelFlowExecutionMixin:
                 steps = first_pipeline if isinstance(first_pipeline, list) else []
 
             child_ctx["_flow_id"] = flow_name
-            child_ctx = await self._execute_steps_async(steps, child_ctx)
+            child_ctx = await self._execute_steps_async(steps, child_ctx, execution=flow_def.get("execution"))
 
-            result = child_ctx.get("output") or child_ctx.get("result") or child_ctx
+            result = child_ctx.get("output") or child_ctx.get("result")
+            if not result:
+                # 子コンテキストそのものを返す場合は親から独立した通常の dict にする
+                result = dict(child_ctx)
 
             output_key = step.get("output")
             if output_key:
@@ -692,7 +893,7 @@ class KernelFlowExecutionMixin:
                 ctx[f"_step_out.{output_key}"] = error_result
             return ctx, error_result
 
-        resolved_args = self._resolve_value(step.get("args", {}), ctx)
+        resolved_args = self._resolve_step_args(step, ctx)
 
         # DI コンテナ経由で capability_executor を取得（循環インポート回避）
         try:
@@ -748,66 +949,35 @@ class KernelFlowExecutionMixin:
     # 条件評価
     # ------------------------------------------------------------------
 
-    def _eval_condition(self, condition: str, ctx: Dict[str, Any]) -> bool:  # noqa: C901
+    def _eval_condition(self, condition: str, ctx: Dict[str, Any]) -> bool:
         """条件式を評価する。Wave 27-A: 比較演算子拡張（>, <, >=, <=, None）。"""
-        condition = condition.strip()
-        m = _CONDITION_OP_RE.search(condition)
-        if m:
-            op = m.group(1)
-            left = condition[:m.start()].strip()
-            right = condition[m.end():].strip()
-
-            left_val = self._resolve_value(left, ctx)
-            right_val = right.strip('"\'')
-
-            # 型変換
-            if right_val.lower() == "true":
-                target = True
-            elif right_val.lower() == "false":
-                target = False
-            elif right_val.lower() == "none":
-                target = None
-            else:
-                try:
-                    target = float(right_val) if '.' in right_val else int(right_val)
-                except ValueError:
-                    target = right_val
-
-            # None 比較
-            if target is None:
-                if op == "==":
-                    return left_val is None
-                elif op == "!=":
-                    return left_val is not None
-                else:
-                    return False  # None に対する > < >= <= は常に False
-
-            # 数値変換ヘルパー
-            def _to_num(v):
-                if isinstance(v, (int, float)):
-                    return v
-                if not isinstance(v, str):
-                    return None
-                try:
-                    return float(v) if '.' in v else int(v)
-                except ValueError:
-                    return None
-
-            if op == "==":
-                if isinstance(target, (bool, int, float)):
-                    return left_val == target
-                return str(left_val) == target
-            elif op == "!=":
-                if isinstance(target, (bool, int, float)):
-                    return left_val != target
-                return str(left_val) != target
-            elif op in (">", "<", ">=", "<="):
-                ln, rn = _to_num(left_val), _to_num(target)
-                if ln is None or rn is None:
-                    return False  # 数値比較不能 → false（安全側）
-                return {">": ln > rn, "<": ln < rn, ">=": ln >= rn, "<=": ln <= rn}[op]
-
-        return bool(self._resolve_value(condition, ctx))
+        op, left, target = parse_condition(condition)
+        return compare_condition(op, self._resolve_value(left, ctx), target)
+
+    # ------------------------------------------------------------------
+    # ステップ解決プラン
+    # ------------------------------------------------------------------
+
+    def _step_plan(self, step: Dict[str, Any]):
+        """ステップの解決プランを返す。使えない場合は None（逐次解決にフォールバック）。"""
+        resolver = getattr(self, "_variable_resolver", None)
+        if not isinstance(resolver, VariableResolver) or not is_compiled_plans_enabled():
+            return None
+        return resolver.step_plan(step)
+
+    def _resolve_step_args(self, step: Dict[str, Any], ctx: Dict[str, Any]) -> Any:
+        """step["args"] を解決する。resolve_value(step.get("args", {})) と同じ結果。"""
+        plan = self._step_plan(step)
+        if plan is None:
+            return self._resolve_value(step.get("args", {}), ctx)
+        return self._variable_resolver.resolve_plan(plan.args, ctx)
+
+    def _eval_step_condition(self, step: Dict[str, Any], ctx: Dict[str, Any]) -> bool:
+        """step["when"] を評価する。_eval_condition(step["when"]) と同じ結果。"""
+        plan = self._step_plan(step)
+        if plan is None or plan.when is None:
+            return self._eval_condition(step["when"], ctx)
+        return self._variable_resolver.eval_condition_plan(plan.when, ctx)
 
     # ------------------------------------------------------------------
     # Flow Step 実行（同期・pipeline用）
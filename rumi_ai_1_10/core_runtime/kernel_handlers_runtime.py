@@ -30,6 +30,7 @@ from .flow_loader import FlowDefinition, FlowStep
 
 from .paths import ECOSYSTEM_DIR
 from .kernel_flow_converter import FlowConverter
+from .kernel_variable_resolver import VariableResolver
 
 from .logging_utils import get_structured_logger
 from .metrics import get_metrics_collector
@@ -47,6 +48,13 @@ def _is_diagnostics_verbose() -> bool:
     return os.environ.get("RUMI_DIAGNOSTICS_VERBOSE", "0") == "1"
 
 
+def _invalidate_step_plans(kernel: Any) -> None:
+    """Flow 定義を登録し直した後、キャッシュ済みのステップ解決プランを破棄する"""
+    resolver = getattr(kernel, "_variable_resolver", None)
+    if isinstance(resolver, VariableResolver):
+        resolver.invalidate_plans()
+
+
 class KernelRuntimeHandlersMixin:
     """
     運用/実行系ハンドラ Mixin
@@ -243,6 +251,8 @@ class KernelRuntimeHandlersMixin:
                 })
                 registered.append(flow_id)
 
+            _invalidate_step_plans(self)
+
             # 5. 完了ログ
             modifier_success = sum(1 for r in modifier_results_all if r.success)
             modifier_skipped = sum(1 for r in modifier_results_all if r.skipped_reason)
@@ -600,9 +610,12 @@ class KernelRuntimeHandlersMixin:
             owner_pack: 所有Pack ID(任意、パスから推測可能)
             input: 入力データ(任意)
             timeout_seconds: タイムアウト秒数(任意、デフォルト60)
+            output_stream: ストリームを格納する ctx キー(任意)。指定すると run の
+                yield を逐次 OutputStream で受け取り、output は None になる
             _step_id: ステップID(内部用)
             _phase: フェーズ名(内部用)
         """
+        from .output_stream import OutputStream
         from .python_file_executor import get_python_file_executor, ExecutionContext
 
         file_path = args.get("file")
@@ -623,6 +636,7 @@ class KernelRuntimeHandlersMixin:
         principal_id = args.get("principal_id")
         input_data = args.get("input", {})
         timeout_seconds = args.get("timeout_seconds", 60.0)
+        output_stream = args.get("output_stream")
         step_id = args.get("_step_id", "unknown")
         phase = args.get("_phase", "flow")
 
@@ -716,6 +730,7 @@ class KernelRuntimeHandlersMixin:
             principal_id=effective_principal,
             capability_sock_path=capability_sock_path,
             timeout_seconds=timeout_seconds,
+            stream=bool(output_stream),
         )
 
         # 結果を記録
@@ -732,6 +747,7 @@ class KernelRuntimeHandlersMixin:
                 "execution_mode": result.execution_mode,
                 "execution_time_ms": result.execution_time_ms,
                 "warnings": result.warnings if result.warnings else None,
+                "streaming": getattr(result, "stream", None) is not None,
             }
         )
 
@@ -753,13 +769,18 @@ class KernelRuntimeHandlersMixin:
                 file=file_path, execution_time_ms=result.execution_time_ms,
                 execution_mode=result.execution_mode,
             )
+            output = result.output
+            if output_stream:
+                # 非ジェネレータの run は戻り値 1 件のストリームとして渡す
+                ctx[output_stream] = result.as_stream() or OutputStream.from_chunks([output])
+                output = None
             return {
                 "_kernel_step_status": "success",
                 "_kernel_step_meta": {
                     "execution_mode": result.execution_mode,
                     "execution_time_ms": result.execution_time_ms,
                 },
-                "output": result.output
+                "output": output
             }
         else:
             _logger.error(
@@ -866,6 +887,8 @@ class KernelRuntimeHandlersMixin:
                     "_modifiers_applied": [r.modifier_id for r in results if r.success],
                 })
 
+            _invalidate_step_plans(self)
+
             success_count = sum(1 for r in all_results if r.success)
             skip_count = sum(1 for r in all_results if r.skipped_reason)
             fail_count = sum(1 for r in all_results if not r.success and not r.skipped_reason)
@@ -1120,24 +1143,27 @@ class KernelRuntimeHandlersMixin:
     # ------------------------------------------------------------------
 
     def _h_audit_query(self, args: Dict[str, Any], ctx: Dict[str, Any]) -> Any:
-        """監査ログを検索"""
+        """監査ログを検索（ts の新しい順。続きは next_cursor を cursor に渡す）"""
         try:
             from .audit_logger import get_audit_logger
             audit = get_audit_logger()
-            results = audit.query_logs(
+            page = audit.query_logs_page(
                 category=args.get("category"),
                 start_date=args.get("start_date"),
                 end_date=args.get("end_date"),
                 pack_id=args.get("pack_id"),
                 flow_id=args.get("flow_id"),
                 success_only=args.get("success_only"),
-                limit=args.get("limit", 100)
+                limit=args.get("limit", 100),
+                cursor=args.get("cursor"),
             )
+            results = page["results"]
 
             return {
                 "_kernel_step_status": "success",
                 "_kernel_step_meta": {"count": len(results)},
-                "results": results
+                "results": results,
+                "next_cursor": page["next_cursor"],
             }
         except Exception as e:
             return {
@@ -5,13 +5,23 @@ kernel_core.py から抽出。
 $flow., $ctx., $env. パターンマッチによる変数解決を提供する。
 
 K-1: kernel_core.py 責務分割の一環
+
+解決プラン:
+  Flow ステップの args / when は実行のたびに同じ木を走査するため、
+  compile_value() / step_plan() で一度だけ「解決プラン」に変換して再利用する。
+  定数部分木は凍結し、変数参照はパスのタプルに分解済み、条件式は
+  (演算子, 左辺プラン, 右辺値) に解析済みの状態で保持する。
+  resolve_plan() の結果は resolve_value() と同一になる。
 """
 
 from __future__ import annotations
 
+import functools
 import os
 import re
-from typing import Any, Dict, List, Optional
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
 
 # --- resolve depth limit (Fix #70) ---
 MAX_RESOLVE_DEPTH = 20
@@ -19,6 +29,120 @@ MAX_RESOLVE_DEPTH = 20
 # --- $variable pattern ---
 _VAR_REF_RE = re.compile(r'\$(?:flow|ctx|env)\.[a-zA-Z0-9_.]+')
 
+# --- condition operator pattern (Wave 27-A) ---
+_CONDITION_OP_RE = re.compile(r'\s+(==|!=|>=|<=|>|<)\s+')
+
+# step_plan() でキャッシュするステップ数の上限
+MAX_CACHED_STEP_PLANS = 4096
+
+# 解決プランのノード種別
+_PLAN_CONST = 0     # そのまま返す値（変数参照を含まない文字列・スカラー・深さ上限超え）
+_PLAN_COPY = 1      # 変数参照を含まない dict / list（コンテナだけ作り直す）
+_PLAN_REF = 2       # 文字列全体が単一の変数参照
+_PLAN_TEMPLATE = 3  # 変数参照を埋め込んだ文字列
+_PLAN_DICT = 4
+_PLAN_LIST = 5
+
+_MISSING = object()
+
+
+def _compile_ref(ref: str) -> Tuple[bool, Any, str]:
+    """変数参照を (env か, env キー or パスのタプル, 元の参照文字列) に分解する。"""
+    parts = ref[1:].split(".")
+    if parts[0] == "env":
+        return True, ".".join(parts[1:]), ref
+    return False, tuple(parts[1:]), ref
+
+
+def _lookup_ref(ref: Tuple[bool, Any, str], ctx: Dict[str, Any]) -> Any:
+    """分解済みの変数参照を解決する。解決できなければ _MISSING。"""
+    is_env, path, _text = ref
+    if is_env:
+        return os.environ.get(path, _MISSING)
+    current: Any = ctx
+    for key in path:
+        if isinstance(current, dict) and key in current:
+            current = current[key]
+        else:
+            return _MISSING
+    return current
+
+
+@functools.lru_cache(maxsize=1024)
+def parse_condition(condition: str) -> Tuple[Optional[str], str, Any]:
+    """
+    条件式を (演算子, 左辺, 右辺値) に解析する。
+
+    演算子を含まない場合は (None, 条件式, None)。右辺は true / false / none と
+    数値を型変換し、それ以外は引用符を除いた文字列とする。
+    """
+    condition = condition.strip()
+    m = _CONDITION_OP_RE.search(condition)
+    if not m:
+        return None, condition, None
+    op = m.group(1)
+    left = condition[:m.start()].strip()
+    right_val = condition[m.end():].strip().strip('"\'')
+
+    # 型変換
+    if right_val.lower() == "true":
+        target: Any = True
+    elif right_val.lower() == "false":
+        target = False
+    elif right_val.lower() == "none":
+        target = None
+    else:
+        try:
+            target = float(right_val) if '.' in right_val else int(right_val)
+        except ValueError:
+            target = right_val
+    return op, left, target
+
+
+def _to_num(v: Any) -> Any:
+    """数値比較用の変換。変換できなければ None。"""
+    if isinstance(v, (int, float)):
+        return v
+    if not isinstance(v, str):
+        return None
+    try:
+        return float(v) if '.' in v else int(v)
+    except ValueError:
+        return None
+
+
+def compare_condition(op: Optional[str], left_val: Any, target: Any) -> bool:
+    """parse_condition() の結果と解決済みの左辺から条件の真偽を返す。"""
+    if op is None:
+        return bool(left_val)
+
+    # None 比較
+    if target is None:
+        if op == "==":
+            return left_val is None
+        elif op == "!=":
+            return left_val is not None
+        return False  # None に対する > < >= <= は常に False
+
+    if op == "==":
+        if isinstance(target, (bool, int, float)):
+            return left_val == target
+        return str(left_val) == target
+    elif op == "!=":
+        if isinstance(target, (bool, int, float)):
+            return left_val != target
+        return str(left_val) != target
+    ln, rn = _to_num(left_val), _to_num(target)
+    if ln is None or rn is None:
+        return False  # 数値比較不能 → false（安全側）
+    return {">": ln > rn, "<": ln < rn, ">=": ln >= rn, "<=": ln <= rn}[op]
+
+
+class StepPlan(NamedTuple):
+    """1 ステップ分の解決プラン"""
+    args: tuple
+    when: Optional[Tuple[Optional[str], tuple, Any]]
+
 
 class VariableResolver:
     """
@@ -31,6 +155,9 @@ class VariableResolver:
 
     def __init__(self, max_depth: int = MAX_RESOLVE_DEPTH) -> None:
         self._max_depth = max_depth
+        # id(step) -> (step, args, when, StepPlan)。step を保持して id の再利用を防ぐ
+        self._step_plans: "OrderedDict[int, Tuple[Any, Any, Any, StepPlan]]" = OrderedDict()
+        self._plans_lock = threading.Lock()
 
     def resolve_value(self, value: Any, ctx: Dict[str, Any], depth: int = 0) -> Any:
         """
@@ -126,3 +253,127 @@ class VariableResolver:
             else:
                 return ref  # 解決不能 → 元の文字列
         return current
+
+    # ------------------------------------------------------------------
+    # 解決プラン
+    # ------------------------------------------------------------------
+
+    def compile_value(self, value: Any, depth: int = 0) -> tuple:
+        """
+        値を解決プランに変換する。
+
+        resolve_plan(compile_value(v), ctx) は resolve_value(v, ctx) と同じ結果を返す。
+        """
+        if depth > self._max_depth:
+            return (_PLAN_CONST, value)
+
+        if isinstance(value, str):
+            stripped = value.strip()
+            if _VAR_REF_RE.fullmatch(stripped):
+                return (_PLAN_REF, _compile_ref(stripped), value, depth)
+            parts: List[Any] = []
+            pos = 0
+            for m in _VAR_REF_RE.finditer(value):
+                if m.start() > pos:
+                    parts.append(value[pos:m.start()])
+                parts.append(_compile_ref(m.group(0)))
+                pos = m.end()
+            if not parts:
+                return (_PLAN_CONST, value)
+            if pos < len(value):
+                parts.append(value[pos:])
+            return (_PLAN_TEMPLATE, tuple(parts))
+
+        if isinstance(value, dict):
+            items = tuple((k, self.compile_value(v, depth + 1)) for k, v in value.items())
+            if all(p[0] in (_PLAN_CONST, _PLAN_COPY) for _k, p in items):
+                return (_PLAN_COPY, value, depth)
+            return (_PLAN_DICT, items)
+
+        if isinstance(value, list):
+            elems = tuple(self.compile_value(item, depth + 1) for item in value)
+            if all(p[0] in (_PLAN_CONST, _PLAN_COPY) for p in elems):
+                return (_PLAN_COPY, value, depth)
+            return (_PLAN_LIST, elems)
+
+        return (_PLAN_CONST, value)
+
+    def resolve_plan(self, plan: tuple, ctx: Dict[str, Any]) -> Any:
+        """compile_value() のプランを ctx で解決する。"""
+        kind = plan[0]
+        if kind == _PLAN_CONST:
+            return plan[1]
+        if kind == _PLAN_REF:
+            resolved = _lookup_ref(plan[1], ctx)
+            if resolved is _MISSING:
+                return plan[2]
+            # さらに文字列なら再帰解決（"$" を含まなければ解決しても同じ値）
+            if isinstance(resolved, str) and "$" in resolved and plan[3] < self._max_depth:
+                return self.resolve_value(resolved, ctx, plan[3] + 1)
+            return resolved
+        if kind == _PLAN_TEMPLATE:
+            out = []
+            for part in plan[1]:
+                if isinstance(part, str):
+                    out.append(part)
+                else:
+                    resolved = _lookup_ref(part, ctx)
+                    out.append(part[2] if resolved is _MISSING else str(resolved))
+            return "".join(out)
+        if kind == _PLAN_DICT:
+            return {k: self.resolve_plan(p, ctx) for k, p in plan[1]}
+        if kind == _PLAN_LIST:
+            return [self.resolve_plan(p, ctx) for p in plan[1]]
+        return self._copy_tree(plan[1], plan[2])
+
+    def _copy_tree(self, value: Any, depth: int) -> Any:
+        """変数参照を含まない木のコンテナだけを作り直す（resolve_value と同じ深さまで）。"""
+        if depth > self._max_depth:
+            return value
+        if isinstance(value, dict):
+            return {k: self._copy_tree(v, depth + 1) for k, v in value.items()}
+        if isinstance(value, list):
+            return [self._copy_tree(item, depth + 1) for item in value]
+        return value
+
+    def compile_condition(self, condition: str) -> Tuple[Optional[str], tuple, Any]:
+        """条件式を (演算子, 左辺プラン, 右辺値) に変換する。"""
+        op, left, target = parse_condition(condition)
+        return op, self.compile_value(left), target
+
+    def eval_condition_plan(self, plan: Tuple[Optional[str], tuple, Any], ctx: Dict[str, Any]) -> bool:
+        """compile_condition() のプランを評価する。"""
+        op, left_plan, target = plan
+        return compare_condition(op, self.resolve_plan(left_plan, ctx), target)
+
+    def step_plan(self, step: Dict[str, Any]) -> StepPlan:
+        """
+        ステップの args / when の解決プランを返す（キャッシュ付き）。
+
+        キャッシュはステップ dict の同一性で引き、args オブジェクトと when 文字列が
+        変わっていれば作り直す。modifier の再適用などで Flow 定義を登録し直した場合は
+        invalidate_plans() で破棄する。
+        """
+        key = id(step)
+        args = step.get("args", {})
+        when = step.get("when")
+        with self._plans_lock:
+            entry = self._step_plans.get(key)
+            if entry is not None and entry[0] is step and entry[1] is args and entry[2] == when:
+                self._step_plans.move_to_end(key)
+                return entry[3]
+        plan = StepPlan(
+            args=self.compile_value(args),
+            when=self.compile_condition(when) if when and isinstance(when, str) else None,
+        )
+        with self._plans_lock:
+            self._step_plans[key] = (step, args, when, plan)
+            self._step_plans.move_to_end(key)
+            while len(self._step_plans) > MAX_CACHED_STEP_PLANS:
+                self._step_plans.popitem(last=False)
+        return plan
+
+    def invalidate_plans(self) -> None:
+        """キャッシュ済みのステップ解決プランを全て破棄する。"""
+        with self._plans_lock:
+            self._step_plans.clear()
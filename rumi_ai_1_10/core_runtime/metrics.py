@@ -12,16 +12,65 @@ Wave 13 T-051: メトリクス収集の基盤モジュール。
   - observe(): ヒストグラム観測
   - timer(): コンテキストマネージャ型タイマー
   - snapshot(): 全メトリクスのスナップショット
+  - render_prometheus(): Prometheus / OpenMetrics テキスト形式での出力
   - reset(): 全メトリクスクリア
 - get_metrics_collector(): キャッシュ付きファクトリ関数
+
+ヒストグラムは観測値を保持しない。件数・合計・最小・最大に加え、
+固定境界のバケット件数（エクスポート用）と相対誤差保証付きの
+対数バケット（パーセンタイル推定用）だけを持つため、メモリは観測数に依存しない。
+カウンターとヒストグラムはスレッドごとのシャードに書き込み、
+snapshot() / render_prometheus() の時点でマージする。
 """
 
 from __future__ import annotations
 
+import math
+import re
 import threading
 import time
+import weakref
 from contextlib import contextmanager
-from typing import Any, Dict, Generator, List, Optional, Tuple
+from typing import Any, Dict, Generator, List, Optional, Sequence, Tuple
+
+
+# ============================================================
+# 定数
+# ============================================================
+
+# パーセンタイル推定の相対誤差（1%）
+RELATIVE_ACCURACY = 0.01
+
+# 対数バケットの最大数。超えた場合は最小側のバケットを畳み込む
+MAX_SKETCH_BINS = 2048
+
+# これ未満の観測値は 0 バケットに入れる
+MIN_INDEXABLE_VALUE = 1e-9
+
+# snapshot() に含めるパーセンタイル
+SNAPSHOT_QUANTILES: Tuple[Tuple[str, float], ...] = (
+    ("p50", 0.5),
+    ("p90", 0.9),
+    ("p95", 0.95),
+    ("p99", 0.99),
+)
+
+# エクスポート用のバケット境界（秒単位のメトリクス）
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+    0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+
+# 名前が "_ms" で終わるメトリクス（ミリ秒単位）のバケット境界
+DEFAULT_MS_BUCKETS: Tuple[float, ...] = tuple(b * 1000 for b in DEFAULT_BUCKETS)
+
+METRIC_NAME_PREFIX = "rumi_"
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+OPENMETRICS_CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+_GAMMA = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+_LOG_GAMMA = math.log(_GAMMA)
 
 
 # ============================================================
@@ -41,6 +90,172 @@ def _labels_to_dict(key: Tuple[Tuple[str, str], ...]) -> Dict[str, str]:
     return dict(key)
 
 
+def _default_buckets_for(name: str) -> Tuple[float, ...]:
+    """メトリクス名からエクスポート用のバケット境界を決める。"""
+    return DEFAULT_MS_BUCKETS if name.endswith("_ms") else DEFAULT_BUCKETS
+
+
+class Histogram:
+    """
+    定数メモリのヒストグラム。
+
+    count / sum / min / max は正確に保持する。パーセンタイルは
+    DDSketch 方式の対数バケットから相対誤差 RELATIVE_ACCURACY 以内で推定する。
+    bounds は Prometheus の ``le`` バケット用の固定境界。
+    同じ bounds を持つヒストグラム同士は merge() で合算できる。
+    """
+
+    __slots__ = ("bounds", "bucket_counts", "count", "sum", "min", "max", "zero_count", "bins")
+
+    def __init__(self, bounds: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        self.bounds: Tuple[float, ...] = tuple(bounds)
+        self.bucket_counts: List[int] = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.zero_count = 0
+        self.bins: Dict[int, int] = {}
+
+    def add(self, value: float) -> None:
+        """観測値を 1 件追加する。"""
+        self.count += 1
+        self.sum += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        # bounds は昇順。value 以上の最初の境界に数える（最後は +Inf）
+        bounds = self.bounds
+        lo, hi = 0, len(bounds)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if bounds[mid] < value:
+                lo = mid + 1
+            else:
+                hi = mid
+        self.bucket_counts[lo] += 1
+        if value < MIN_INDEXABLE_VALUE:
+            self.zero_count += 1
+            return
+        index = math.ceil(math.log(value) / _LOG_GAMMA)
+        bins = self.bins
+        bins[index] = bins.get(index, 0) + 1
+        if len(bins) > MAX_SKETCH_BINS:
+            self._collapse()
+
+    def _collapse(self) -> None:
+        """最小側の 2 バケットを 1 つに畳み込み、バケット数を上限内に戻す。"""
+        lowest, second = sorted(self.bins)[:2]
+        self.bins[second] += self.bins.pop(lowest)
+
+    def merge(self, other: "Histogram") -> None:
+        """other の観測を取り込む。bounds が異なる場合は ValueError。"""
+        if other.bounds != self.bounds:
+            raise ValueError("cannot merge histograms with different bucket bounds")
+        self.count += other.count
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.zero_count += other.zero_count
+        for i, n in enumerate(other.bucket_counts):
+            self.bucket_counts[i] += n
+        bins = self.bins
+        for index, n in other.bins.items():
+            bins[index] = bins.get(index, 0) + n
+        while len(bins) > MAX_SKETCH_BINS:
+            self._collapse()
+
+    def copy(self) -> "Histogram":
+        h = Histogram(self.bounds)
+        h.merge(self)
+        return h
+
+    def quantile(self, q: float) -> float:
+        """q (0〜1) 分位点の推定値を返す。観測が無ければ 0.0。"""
+        if self.count == 0:
+            return 0.0
+        if q <= 0:
+            return self.min
+        if q >= 1:
+            return self.max
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            estimate = 0.0
+        else:
+            estimate = self.max
+            for index in sorted(self.bins):
+                seen += self.bins[index]
+                if rank < seen:
+                    estimate = 2 * _GAMMA ** index / (_GAMMA + 1)
+                    break
+        return min(max(estimate, self.min), self.max)
+
+    def cumulative_buckets(self) -> List[Tuple[float, int]]:
+        """(le, 累積件数) のリストを返す。最後の le は +Inf。"""
+        result = []
+        total = 0
+        for bound, n in zip(self.bounds + (math.inf,), self.bucket_counts):
+            total += n
+            result.append((bound, total))
+        return result
+
+    def to_dict(self) -> Dict[str, Any]:
+        """snapshot() 用の集計値を返す。"""
+        if self.count == 0:
+            entry: Dict[str, Any] = {"count": 0, "sum": 0.0, "min": 0.0, "max": 0.0, "avg": 0.0}
+            for label, _q in SNAPSHOT_QUANTILES:
+                entry[label] = 0.0
+            return entry
+        entry = {
+            "count": self.count,
+            "sum": self.sum,
+            "min": self.min,
+            "max": self.max,
+            "avg": self.sum / self.count,
+        }
+        for label, q in SNAPSHOT_QUANTILES:
+            entry[label] = self.quantile(q)
+        return entry
+
+
+class _Shard:
+    """1 スレッド分のカウンター / ヒストグラム。lock は snapshot との排他にのみ使う。"""
+
+    __slots__ = ("lock", "counters", "histograms", "thread")
+
+    def __init__(self, thread: Optional[threading.Thread]) -> None:
+        self.lock = threading.Lock()
+        self.counters: Dict[str, Dict[Tuple[Tuple[str, str], ...], float]] = {}
+        self.histograms: Dict[str, Dict[Tuple[Tuple[str, str], ...], Histogram]] = {}
+        self.thread = weakref.ref(thread) if thread is not None else None
+
+    def is_dead(self) -> bool:
+        if self.thread is None:
+            return False
+        thread = self.thread()
+        return thread is None or not thread.is_alive()
+
+    def absorb(self, other: "_Shard") -> None:
+        """other の内容を取り込む（other は以後書き込まれないこと）。"""
+        for name, buckets in other.counters.items():
+            mine = self.counters.setdefault(name, {})
+            for key, value in buckets.items():
+                mine[key] = mine.get(key, 0.0) + value
+        for name, buckets in other.histograms.items():
+            mine_h = self.histograms.setdefault(name, {})
+            for key, hist in buckets.items():
+                if key in mine_h:
+                    mine_h[key].merge(hist)
+                else:
+                    mine_h[key] = hist
+
+    def clear(self) -> None:
+        self.counters.clear()
+        self.histograms.clear()
+
+
 class MetricsCollector:
     """
     スレッドセーフなメトリクス収集クラス。
@@ -48,6 +263,10 @@ class MetricsCollector:
     カウンター、ゲージ、ヒストグラム、タイマーを提供する。
     各メトリクスは名前とオプションのラベルで識別される。
 
+    カウンターとヒストグラムは呼び出しスレッド専用のシャードに記録するため、
+    ホットパスで他スレッドとロックを奪い合わない。終了したスレッドの
+    シャードは新しいシャード登録時と snapshot 時に退避用シャードへ畳み込む。
+
     Usage:
         collector = MetricsCollector()
         collector.increment("requests_total", labels={"method": "GET"})
@@ -60,9 +279,63 @@ class MetricsCollector:
 
     def __init__(self) -> None:
         self._lock = threading.Lock()
-        self._counters: Dict[str, Dict[Tuple[Tuple[str, str], ...], float]] = {}
         self._gauges: Dict[str, Dict[Tuple[Tuple[str, str], ...], float]] = {}
-        self._histograms: Dict[str, Dict[Tuple[Tuple[str, str], ...], List[float]]] = {}
+        self._bucket_bounds: Dict[str, Tuple[float, ...]] = {}
+        self._local = threading.local()
+        self._shards: List[_Shard] = []
+        self._retired = _Shard(None)
+
+    # ------------------------------------------------------------------
+    # シャード管理
+    # ------------------------------------------------------------------
+
+    def _shard(self) -> _Shard:
+        try:
+            return self._local.shard
+        except AttributeError:
+            pass
+        shard = _Shard(threading.current_thread())
+        with self._lock:
+            self._fold_dead_shards_locked()
+            self._shards.append(shard)
+        self._local.shard = shard
+        return shard
+
+    def _fold_dead_shards_locked(self) -> None:
+        """終了したスレッドのシャードを _retired に畳み込む（self._lock 保持下）。"""
+        alive = []
+        for shard in self._shards:
+            if shard.is_dead():
+                with self._retired.lock:
+                    self._retired.absorb(shard)
+            else:
+                alive.append(shard)
+        self._shards = alive
+
+    def _merged(self) -> _Shard:
+        """全シャードを合算した新しい _Shard を返す。"""
+        with self._lock:
+            self._fold_dead_shards_locked()
+            shards = [self._retired] + list(self._shards)
+        merged = _Shard(None)
+        for shard in shards:
+            with shard.lock:
+                for name, buckets in shard.counters.items():
+                    mine = merged.counters.setdefault(name, {})
+                    for key, value in buckets.items():
+                        mine[key] = mine.get(key, 0.0) + value
+                for name, buckets in shard.histograms.items():
+                    mine_h = merged.histograms.setdefault(name, {})
+                    for key, hist in buckets.items():
+                        if key in mine_h:
+                            mine_h[key].merge(hist)
+                        else:
+                            mine_h[key] = hist.copy()
+        return merged
+
+    # ------------------------------------------------------------------
+    # 記録
+    # ------------------------------------------------------------------
 
     def increment(
         self,
@@ -81,10 +354,11 @@ class MetricsCollector:
         if value < 0:
             raise ValueError("counter increment value must be non-negative")
         key = _normalize_labels(labels)
-        with self._lock:
-            if name not in self._counters:
-                self._counters[name] = {}
-            bucket = self._counters[name]
+        shard = self._shard()
+        with shard.lock:
+            bucket = shard.counters.get(name)
+            if bucket is None:
+                bucket = shard.counters[name] = {}
             bucket[key] = bucket.get(key, 0.0) + value
 
     def set_gauge(
@@ -107,6 +381,28 @@ class MetricsCollector:
                 self._gauges[name] = {}
             self._gauges[name][key] = value
 
+    def set_histogram_buckets(self, name: str, bounds: Sequence[float]) -> None:
+        """
+        ヒストグラムのエクスポート用バケット境界を設定する。
+
+        観測前に呼ぶこと。既に観測がある名前に対しては ValueError。
+        未設定の場合、名前が "_ms" で終われば DEFAULT_MS_BUCKETS、
+        それ以外は DEFAULT_BUCKETS を使う。
+
+        Args:
+            name: メトリクス名
+            bounds: 昇順の境界値（+Inf は含めない）
+        """
+        normalized = tuple(sorted(float(b) for b in bounds if not math.isinf(b)))
+        if not normalized:
+            raise ValueError("histogram buckets must not be empty")
+        with self._lock:
+            shards = [self._retired] + list(self._shards)
+            for shard in shards:
+                if shard.histograms.get(name):
+                    raise ValueError(f"histogram already has observations: {name}")
+            self._bucket_bounds[name] = normalized
+
     def observe(
         self,
         name: str,
@@ -122,13 +418,16 @@ class MetricsCollector:
             labels: ラベル辞書
         """
         key = _normalize_labels(labels)
-        with self._lock:
-            if name not in self._histograms:
-                self._histograms[name] = {}
-            bucket = self._histograms[name]
-            if key not in bucket:
-                bucket[key] = []
-            bucket[key].append(value)
+        shard = self._shard()
+        with shard.lock:
+            bucket = shard.histograms.get(name)
+            if bucket is None:
+                bucket = shard.histograms[name] = {}
+            hist = bucket.get(key)
+            if hist is None:
+                bounds = self._bucket_bounds.get(name) or _default_buckets_for(name)
+                hist = bucket[key] = Histogram(bounds)
+            hist.add(value)
 
     @contextmanager
     def timer(
@@ -156,6 +455,10 @@ class MetricsCollector:
             elapsed = time.monotonic() - start
             self.observe(name, elapsed, labels)
 
+    # ------------------------------------------------------------------
+    # 読み出し
+    # ------------------------------------------------------------------
+
     def snapshot(self) -> Dict[str, Any]:
         """
         全メトリクスのスナップショットを返す。
@@ -182,70 +485,142 @@ class MetricsCollector:
                             "sum": 1.5,
                             "min": 0.01,
                             "max": 0.5,
-                            "avg": 0.15
+                            "avg": 0.15,
+                            "p50": 0.12,
+                            "p90": 0.4,
+                            "p95": 0.45,
+                            "p99": 0.5
                         },
                         ...
                     ]
                 }
             }
+
+            p50〜p99 は相対誤差 RELATIVE_ACCURACY 以内の推定値。
         """
+        merged = self._merged()
+        result: Dict[str, Any] = {
+            "counters": {},
+            "gauges": {},
+            "histograms": {},
+        }
+
+        for name, buckets in merged.counters.items():
+            result["counters"][name] = [
+                {"labels": _labels_to_dict(key), "value": value}
+                for key, value in buckets.items()
+            ]
+
         with self._lock:
-            result: Dict[str, Any] = {
-                "counters": {},
-                "gauges": {},
-                "histograms": {},
-            }
+            for name, buckets in self._gauges.items():
+                result["gauges"][name] = [
+                    {"labels": _labels_to_dict(key), "value": value}
+                    for key, value in buckets.items()
+                ]
+
+        for name, buckets in merged.histograms.items():
+            entries = []
+            for key, hist in buckets.items():
+                entry: Dict[str, Any] = {"labels": _labels_to_dict(key)}
+                entry.update(hist.to_dict())
+                entries.append(entry)
+            result["histograms"][name] = entries
+
+        return result
+
+    def render_prometheus(self, openmetrics: bool = False) -> str:
+        """
+        全メトリクスを Prometheus テキスト形式（0.0.4）で返す。
 
-            for name, buckets in self._counters.items():
-                entries = []
-                for key, value in buckets.items():
-                    entries.append({
-                        "labels": _labels_to_dict(key),
-                        "value": value,
-                    })
-                result["counters"][name] = entries
+        メトリクス名は英数字と ``_`` / ``:`` 以外を ``_`` に置換し、
+        METRIC_NAME_PREFIX を付ける。カウンターには ``_total`` を付ける。
 
-            for name, buckets in self._gauges.items():
-                entries = []
-                for key, value in buckets.items():
-                    entries.append({
-                        "labels": _labels_to_dict(key),
-                        "value": value,
-                    })
-                result["gauges"][name] = entries
-
-            for name, buckets in self._histograms.items():
-                entries = []
-                for key, values in buckets.items():
-                    if values:
-                        entry: Dict[str, Any] = {
-                            "labels": _labels_to_dict(key),
-                            "count": len(values),
-                            "sum": sum(values),
-                            "min": min(values),
-                            "max": max(values),
-                            "avg": sum(values) / len(values),
-                        }
-                    else:
-                        entry = {
-                            "labels": _labels_to_dict(key),
-                            "count": 0,
-                            "sum": 0.0,
-                            "min": 0.0,
-                            "max": 0.0,
-                            "avg": 0.0,
-                        }
-                    entries.append(entry)
-                result["histograms"][name] = entries
-
-            return result
+        Args:
+            openmetrics: True なら OpenMetrics 1.0 形式（末尾に ``# EOF``）
+
+        Returns:
+            エクスポジションテキスト
+        """
+        merged = self._merged()
+        with self._lock:
+            gauges = {name: dict(buckets) for name, buckets in self._gauges.items()}
+
+        lines: List[str] = []
+        for name in sorted(merged.counters):
+            family = _prometheus_name(name)
+            if family.endswith("_total"):
+                family = family[: -len("_total")]
+            lines.append(f"# TYPE {family if openmetrics else family + '_total'} counter")
+            for key, value in sorted(merged.counters[name].items()):
+                lines.append(f"{family}_total{_format_labels(key)} {_format_value(value)}")
+
+        for name in sorted(gauges):
+            family = _prometheus_name(name)
+            lines.append(f"# TYPE {family} gauge")
+            for key, value in sorted(gauges[name].items()):
+                lines.append(f"{family}{_format_labels(key)} {_format_value(value)}")
+
+        for name in sorted(merged.histograms):
+            family = _prometheus_name(name)
+            lines.append(f"# TYPE {family} histogram")
+            for key, hist in sorted(merged.histograms[name].items()):
+                for bound, total in hist.cumulative_buckets():
+                    le = (("le", _format_value(bound)),)
+                    lines.append(f"{family}_bucket{_format_labels(key, le)} {total}")
+                lines.append(f"{family}_sum{_format_labels(key)} {_format_value(hist.sum)}")
+                lines.append(f"{family}_count{_format_labels(key)} {hist.count}")
+
+        if openmetrics:
+            lines.append("# EOF")
+        return "\n".join(lines) + "\n"
 
     def reset(self) -> None:
         """全メトリクスをクリアする。"""
         with self._lock:
-            self._counters.clear()
             self._gauges.clear()
-            self._histograms.clear()
+            self._bucket_bounds.clear()
+            shards = [self._retired] + list(self._shards)
+        for shard in shards:
+            with shard.lock:
+                shard.clear()
+
+
+# ============================================================
+# テキストエクスポジション用ヘルパー
+# ============================================================
+
+_INVALID_NAME_CHARS = re.compile(r"[^a-zA-Z0-9_:]")
+_INVALID_LABEL_CHARS = re.compile(r"[^a-zA-Z0-9_]")
+
+
+def _prometheus_name(name: str) -> str:
+    return METRIC_NAME_PREFIX + _INVALID_NAME_CHARS.sub("_", name)
+
+
+def _escape_label_value(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(
+    key: Tuple[Tuple[str, str], ...],
+    extra: Tuple[Tuple[str, str], ...] = (),
+) -> str:
+    pairs = key + extra
+    if not pairs:
+        return ""
+    body = ",".join(
+        f'{_INVALID_LABEL_CHARS.sub("_", str(k))}="{_escape_label_value(v)}"'
+        for k, v in pairs
+    )
+    return "{" + body + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if math.isnan(value):
+        return "NaN"
+    return repr(float(value))
 
 
 # ============================================================
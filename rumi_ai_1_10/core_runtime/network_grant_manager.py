@@ -224,6 +224,9 @@ class NetworkGrantManager:
             self._grants[pack_id] = grant
             self._disabled_packs.discard(pack_id)
             self._save_grant(grant)
+            self.invalidate_dns_cache(
+                list(allowed_domains) + (list(existing.allowed_domains) if existing else [])
+            )
             
             self._log_grant_event(pack_id, "grant", True, {
                 "allowed_domains": allowed_domains,
@@ -245,6 +248,7 @@ class NetworkGrantManager:
             grant.notes = reason or grant.notes
             
             self._save_grant(grant)
+            self.invalidate_dns_cache(grant.allowed_domains)
             self._log_grant_event(pack_id, "revoke", True, {"reason": reason})
             
             return True
@@ -387,6 +391,19 @@ class NetworkGrantManager:
             return True
         return port in allowed
     
+    def invalidate_dns_cache(self, domains: Optional[List[str]] = None) -> int:
+        """
+        Egress の DNS キャッシュから domains に該当するエントリを破棄する。
+
+        domains は allowed_domains と同じ形式（"*.example.com" / "*" 可）。
+        None は全件破棄。Grant 変更時に自動で呼ばれる。
+        """
+        try:
+            from .egress_ip import invalidate_dns_cache
+            return invalidate_dns_cache(domains)
+        except Exception:
+            return 0
+    
     def _log_grant_event(self, pack_id: str, action: str, success: bool, details: Dict[str, Any]) -> None:
         """Grant操作を監査ログに記録"""
         try:
@@ -454,7 +471,8 @@ class NetworkGrantManager:
             if pack_id not in self._grants:
                 return False
             
-            del self._grants[pack_id]
+            grant = self._grants.pop(pack_id)
+            self.invalidate_dns_cache(grant.allowed_domains)
             
             file_path = self._get_grant_file(pack_id)
             if file_path.exists():
@@ -0,0 +1,284 @@
+"""
+output_stream.py - python_file_call の逐次出力ストリーム
+
+ジェネレータ型の run() が yield したチャンクを、生成された時点で
+消費側（Flow ステップ / Pack API ルート）へ渡すための有界キュー。
+
+設計原則:
+- 生産側（ジェネレータを回すスレッド）と消費側は 1 対 1
+- キューは RUMI_STREAM_QUEUE_SIZE 件で有界。満杯なら生産側が待つ（バックプレッシャー）
+- 1 チャンクの JSON サイズが RUMI_STREAM_MAX_CHUNK_BYTES を超えたらストリームを失敗させる
+- 期限（deadline）を過ぎると生産側・消費側ともにタイムアウトとして終了する
+- 消費側が close() すると生産側はジェネレータを close() して止まる
+- 同期イテレータ（for）と非同期イテレータ（async for）の両方に対応する
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import queue
+import threading
+import time
+from typing import Any, Callable, Iterable, Iterator, List, Optional
+
+
+# 生産側・消費側がキャンセル/期限を確認する間隔（秒）
+_POLL_INTERVAL = 0.1
+
+_END = object()
+
+
+def _get_queue_size() -> int:
+    try:
+        return max(1, int(os.environ.get("RUMI_STREAM_QUEUE_SIZE", "64")))
+    except (TypeError, ValueError):
+        return 64
+
+
+def _get_max_chunk_bytes() -> int:
+    try:
+        return max(1, int(os.environ.get("RUMI_STREAM_MAX_CHUNK_BYTES", str(256 * 1024))))
+    except (TypeError, ValueError):
+        return 256 * 1024
+
+
+class OutputStreamError(Exception):
+    """ストリームの失敗（生産側の例外・サイズ超過・タイムアウト・キャンセル）"""
+
+    def __init__(self, message: str, error_type: str = "stream_error"):
+        super().__init__(message)
+        self.error_type = error_type
+
+
+class _Failure:
+    __slots__ = ("error",)
+
+    def __init__(self, error: OutputStreamError):
+        self.error = error
+
+
+class OutputStream:
+    """
+    チャンクを逐次受け渡す有界ストリーム
+
+    生産側は put() / finish() / fail()、消費側は反復と close() を使う。
+    ctx に格納されても copy / deepcopy で複製されない（同じストリームを共有する）。
+    """
+
+    def __init__(
+        self,
+        *,
+        max_queue: Optional[int] = None,
+        max_chunk_bytes: Optional[int] = None,
+        timeout_seconds: Optional[float] = None,
+    ):
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max_queue or _get_queue_size())
+        self.max_chunk_bytes = max_chunk_bytes or _get_max_chunk_bytes()
+        self.deadline = time.monotonic() + timeout_seconds if timeout_seconds else None
+        self._cancelled = threading.Event()
+        self._closed = False  # 生産側が finish / fail 済み
+        self._exhausted = False  # 消費側が終端まで読んだ
+        self.chunk_count = 0
+        self.error: Optional[str] = None
+        self.error_type: Optional[str] = None
+
+    @classmethod
+    def from_chunks(cls, chunks: Iterable[Any]) -> "OutputStream":
+        """生成済みのチャンク列から完了済みストリームを作る（コンテナ実行など）"""
+        items = list(chunks)
+        stream = cls(max_queue=len(items) + 1)
+        for item in items:
+            stream._queue.put_nowait(item)
+        stream.chunk_count = len(items)
+        stream.finish()
+        return stream
+
+    # ------------------------------------------------------------------
+    # 生産側
+    # ------------------------------------------------------------------
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def _remaining(self) -> Optional[float]:
+        if self.deadline is None:
+            return None
+        return self.deadline - time.monotonic()
+
+    def _offer(self, item: Any) -> bool:
+        """キューに入れる。空きが出るまで待ち、キャンセル・期限切れなら False"""
+        while not self._cancelled.is_set():
+            remaining = self._remaining()
+            if remaining is not None and remaining <= 0:
+                return False
+            wait = _POLL_INTERVAL if remaining is None else min(_POLL_INTERVAL, remaining)
+            try:
+                self._queue.put(item, timeout=wait)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def put(self, chunk: Any) -> bool:
+        """
+        チャンクを 1 つ送る。
+
+        キューが満杯なら消費されるまで待つ。キャンセル・期限切れで送れなかった場合は False。
+        サイズ上限を超えたチャンクは OutputStreamError。
+        """
+        if self._closed:
+            raise OutputStreamError("Stream already closed", "stream_closed")
+        size = len(json.dumps(chunk, ensure_ascii=False, default=str).encode("utf-8"))
+        if size > self.max_chunk_bytes:
+            raise OutputStreamError(
+                f"Stream chunk of {size} bytes exceeds limit of {self.max_chunk_bytes} bytes",
+                "stream_chunk_too_large",
+            )
+        if not self._offer(chunk):
+            return False
+        self.chunk_count += 1
+        return True
+
+    def finish(self) -> None:
+        """正常終了を通知する"""
+        if self._closed:
+            return
+        self._closed = True
+        self._offer(_END)
+
+    def fail(self, message: str, error_type: str = "stream_error") -> None:
+        """失敗を通知する。消費側は次の反復で OutputStreamError を受け取る"""
+        if self._closed:
+            return
+        self._closed = True
+        self.error = message
+        self.error_type = error_type
+        self._offer(_Failure(OutputStreamError(message, error_type)))
+
+    def pump(self, chunks: Iterable[Any], transform: Optional[Callable[[Any], Any]] = None) -> None:
+        """
+        イテラブルを回してチャンクを送り、終了・失敗を通知する（生産側スレッド用）。
+
+        キャンセル・期限切れ・失敗時はイテラブル（ジェネレータ）を close() する。
+        """
+        iterator = iter(chunks)
+        try:
+            for chunk in iterator:
+                if transform is not None:
+                    chunk = transform(chunk)
+                if not self.put(chunk):
+                    if self.cancelled:
+                        self.fail("Stream cancelled by consumer", "stream_cancelled")
+                    else:
+                        self.fail("Stream timed out", "timeout")
+                    return
+                remaining = self._remaining()
+                if remaining is not None and remaining <= 0:
+                    self.fail("Stream timed out", "timeout")
+                    return
+            self.finish()
+        except OutputStreamError as e:
+            self.fail(str(e), e.error_type)
+        except Exception as e:
+            self.fail(str(e), type(e).__name__)
+        finally:
+            close = getattr(iterator, "close", None)
+            if close is not None:
+                try:
+                    close()
+                except Exception:
+                    pass
+
+    # ------------------------------------------------------------------
+    # 消費側
+    # ------------------------------------------------------------------
+
+    def close(self) -> None:
+        """消費をやめる。生産側は次のチャンクでジェネレータを止める"""
+        self._cancelled.set()
+
+    def next_chunk(self) -> Any:
+        """次のチャンクを待って返す。終端なら StopIteration、失敗なら OutputStreamError"""
+        if self._exhausted:
+            raise StopIteration
+        while True:
+            if self._cancelled.is_set():
+                self._exhausted = True
+                raise StopIteration
+            remaining = self._remaining()
+            if remaining is not None and remaining <= 0:
+                # 生産側が期限内に送った分は読み切る
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    self._exhausted = True
+                    self._cancelled.set()
+                    raise OutputStreamError("Stream timed out", "timeout")
+            else:
+                wait = _POLL_INTERVAL if remaining is None else min(_POLL_INTERVAL, remaining)
+                try:
+                    item = self._queue.get(timeout=wait)
+                except queue.Empty:
+                    continue
+            if item is _END:
+                self._exhausted = True
+                raise StopIteration
+            if isinstance(item, _Failure):
+                self._exhausted = True
+                raise item.error
+            return item
+
+    def __iter__(self) -> Iterator[Any]:
+        return self
+
+    def __next__(self) -> Any:
+        return self.next_chunk()
+
+    def __aiter__(self) -> "OutputStream":
+        return self
+
+    async def __anext__(self) -> Any:
+        # 既にキューにあるチャンクはスレッドを介さずに返す
+        if not self._exhausted and not self._cancelled.is_set():
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                pass
+            else:
+                if item is _END:
+                    self._exhausted = True
+                    raise StopAsyncIteration
+                if isinstance(item, _Failure):
+                    self._exhausted = True
+                    raise item.error
+                return item
+        loop = asyncio.get_running_loop()
+        item = await loop.run_in_executor(None, self._next_or_end)
+        if item is _END:
+            raise StopAsyncIteration
+        return item
+
+    def _next_or_end(self) -> Any:
+        # StopIteration は Future に載せられないため番兵に置き換える
+        try:
+            return self.next_chunk()
+        except StopIteration:
+            return _END
+
+    def collect(self) -> List[Any]:
+        """残りのチャンクを全て読み出して返す"""
+        return list(self)
+
+    # ctx の copy / deepcopy（サブフロー等）で複製しない
+    def __copy__(self) -> "OutputStream":
+        return self
+
+    def __deepcopy__(self, memo: Any) -> "OutputStream":
+        return self
+
+    def __repr__(self) -> str:
+        state = "exhausted" if self._exhausted else ("closed" if self._closed else "open")
+        return f"OutputStream(state={state}, chunks={self.chunk_count})"
@@ -0,0 +1,213 @@
+"""
+pack_api_http_server.py - Pack API 用の並行 HTTP サーバー
+
+http.server.HTTPServer は1リクエストずつ処理するため、長時間の
+POST /api/flows/{id}/run が /health やコントロールパネルを塞いでしまう。
+このモジュールは固定数のワーカースレッドと上限付きキューで
+接続を並行処理する HTTPServer を提供する。
+
+設計原則:
+- accept はメインスレッド、リクエスト処理はワーカースレッド（RUMI_API_MAX_WORKERS）
+- 待ち行列は RUMI_API_MAX_QUEUE で上限を設け、溢れた接続には即座に 503 を返す
+- HTTP/1.1 keep-alive の接続はワーカーを占有するため、
+  アイドルタイムアウト（RUMI_API_KEEPALIVE_TIMEOUT）で解放する
+- RUMI_API_SERVER_MODE=single で従来の逐次処理 HTTPServer に戻せる
+- ワーカー数は RUMI_MAX_CONCURRENT_FLOWS より大きくしておくと、
+  Flow 実行中も他のエンドポイントが応答できる
+
+メトリクス（MetricsCollector）:
+- pack_api.queue_depth (gauge): 待ち行列の長さ
+- pack_api.workers_busy (gauge): 処理中のワーカー数
+- pack_api.queue_wait_seconds (histogram): accept からワーカー着手までの待ち時間
+- pack_api.request_seconds (histogram, label: method): リクエスト処理時間
+- pack_api.rejected (counter): 待ち行列溢れで拒否した接続数
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from http.server import HTTPServer
+from typing import List, Optional, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+
+# ============================================================
+# 定数
+# ============================================================
+
+SERVER_MODE_POOLED = "pooled"
+SERVER_MODE_SINGLE = "single"
+
+DEFAULT_MAX_WORKERS = 16
+DEFAULT_MAX_QUEUE = 64
+DEFAULT_KEEPALIVE_TIMEOUT = 15.0
+
+_REJECT_BODY = json.dumps(
+    {"success": False, "data": None, "error": "Server busy"}
+).encode("utf-8")
+
+
+def get_api_server_mode() -> str:
+    """RUMI_API_SERVER_MODE を返す（pooled / single、デフォルト pooled）。"""
+    mode = os.environ.get("RUMI_API_SERVER_MODE", SERVER_MODE_POOLED).strip().lower()
+    if mode not in (SERVER_MODE_POOLED, SERVER_MODE_SINGLE):
+        logger.warning("Unknown RUMI_API_SERVER_MODE=%r, using %s", mode, SERVER_MODE_POOLED)
+        return SERVER_MODE_POOLED
+    return mode
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return max(1, int(os.environ.get(name, str(default))))
+    except (TypeError, ValueError):
+        return default
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return max(0.1, float(os.environ.get(name, str(default))))
+    except (TypeError, ValueError):
+        return default
+
+
+def _metrics():
+    try:
+        from .metrics import get_metrics_collector
+        return get_metrics_collector()
+    except Exception:
+        return None
+
+
+# ============================================================
+# PooledHTTPServer
+# ============================================================
+
+class PooledHTTPServer(HTTPServer):
+    """
+    ワーカープールで接続を並行処理する HTTPServer
+
+    serve_forever() / shutdown() の使い方は HTTPServer と同じ。
+    server_close() でワーカーも停止する。
+    """
+
+    def __init__(
+        self,
+        server_address: Tuple[str, int],
+        handler_class,
+        max_workers: Optional[int] = None,
+        max_queue: Optional[int] = None,
+        keepalive_timeout: Optional[float] = None,
+    ):
+        self.max_workers = max_workers or _env_int("RUMI_API_MAX_WORKERS", DEFAULT_MAX_WORKERS)
+        self.max_queue = max_queue or _env_int("RUMI_API_MAX_QUEUE", DEFAULT_MAX_QUEUE)
+        self.keepalive_timeout = keepalive_timeout or _env_float(
+            "RUMI_API_KEEPALIVE_TIMEOUT", DEFAULT_KEEPALIVE_TIMEOUT
+        )
+        self._queue: "queue.Queue" = queue.Queue(maxsize=self.max_queue)
+        self._busy = 0
+        self._busy_lock = threading.Lock()
+        self._workers: List[threading.Thread] = []
+        super().__init__(server_address, handler_class)
+        for i in range(self.max_workers):
+            t = threading.Thread(target=self._worker_loop, name=f"pack-api-worker-{i}", daemon=True)
+            t.start()
+            self._workers.append(t)
+
+    def process_request(self, request, client_address) -> None:
+        """接続を待ち行列に入れる（満杯なら 503 で拒否）"""
+        try:
+            self._queue.put_nowait((request, client_address, time.monotonic()))
+        except queue.Full:
+            self._reject(request)
+            return
+        self._set_gauge("pack_api.queue_depth", self._queue.qsize())
+
+    def _reject(self, request) -> None:
+        mc = _metrics()
+        if mc is not None:
+            mc.increment("pack_api.rejected")
+        try:
+            request.sendall(
+                b"HTTP/1.1 503 Service Unavailable\r\n"
+                b"Content-Type: application/json; charset=utf-8\r\n"
+                b"Retry-After: 1\r\n"
+                b"Connection: close\r\n"
+                b"Content-Length: " + str(len(_REJECT_BODY)).encode("ascii") + b"\r\n\r\n"
+                + _REJECT_BODY
+            )
+        except OSError:
+            pass
+        self.shutdown_request(request)
+
+    def _worker_loop(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            request, client_address, enqueued_at = item
+            mc = _metrics()
+            if mc is not None:
+                mc.observe("pack_api.queue_wait_seconds", time.monotonic() - enqueued_at)
+                mc.set_gauge("pack_api.queue_depth", self._queue.qsize())
+            self._adjust_busy(1)
+            try:
+                request.settimeout(self.keepalive_timeout)
+                self.finish_request(request, client_address)
+            except Exception:
+                self.handle_error(request, client_address)
+            finally:
+                self.shutdown_request(request)
+                self._adjust_busy(-1)
+
+    def _adjust_busy(self, delta: int) -> None:
+        with self._busy_lock:
+            self._busy += delta
+            busy = self._busy
+        self._set_gauge("pack_api.workers_busy", busy)
+
+    @staticmethod
+    def _set_gauge(name: str, value: float) -> None:
+        mc = _metrics()
+        if mc is not None:
+            mc.set_gauge(name, value)
+
+    def server_close(self) -> None:
+        """リスニングソケットを閉じ、ワーカーを停止する"""
+        super().server_close()
+        # 未着手の接続は閉じる
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not None:
+                self.shutdown_request(item[0])
+        for _ in self._workers:
+            self._queue.put(None)
+        self._workers = []
+
+    def stats(self) -> dict:
+        """ワーカープールの状態"""
+        with self._busy_lock:
+            busy = self._busy
+        return {
+            "mode": SERVER_MODE_POOLED,
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "queue_depth": self._queue.qsize(),
+            "workers_busy": busy,
+        }
+
+
+def create_api_http_server(server_address: Tuple[str, int], handler_class) -> HTTPServer:
+    """RUMI_API_SERVER_MODE に従って HTTP サーバーを生成する。"""
+    if get_api_server_mode() == SERVER_MODE_SINGLE:
+        return HTTPServer(server_address, handler_class)
+    return PooledHTTPServer(server_address, handler_class)
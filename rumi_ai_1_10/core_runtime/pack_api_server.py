@@ -23,6 +23,7 @@ from http.server import HTTPServer, BaseHTTPRequestHandler
 from urllib.parse import urlparse, parse_qs, unquote
 
 from .hmac_key_manager import get_hmac_key_manager, HMACKeyManager
+from .pack_api_http_server import SERVER_MODE_SINGLE, create_api_http_server, get_api_server_mode
 
 from .validation import (
     validate_pack_id as _v_validate_pack_id,
@@ -168,10 +169,69 @@ class PackAPIHandler(
     _hmac_key_manager: HMACKeyManager = None
     kernel = None  # Kernel インスタンス参照（Flow実行API用）
     app_lifecycle_manager = None  # AppLifecycleManager インスタンス参照（Phase A）
+
+    # HTTP/1.1 keep-alive（逐次処理モードでは PackAPIServer.start が無効化する）
+    protocol_version = "HTTP/1.1"
+    keepalive_enabled: bool = True
     
     def log_message(self, format: str, *args) -> None:
         logger.info(f"API: {args[0]}")
 
+    # --- 接続管理 (keep-alive) ---
+
+    def handle_one_request(self) -> None:
+        self._request_started: Optional[float] = None
+        super().handle_one_request()
+        if self._request_started is not None:
+            try:
+                from .metrics import get_metrics_collector
+                get_metrics_collector().observe(
+                    "pack_api.request_seconds",
+                    time.monotonic() - self._request_started,
+                    labels={"method": self.command or ""},
+                )
+            except Exception:
+                pass
+
+    def parse_request(self) -> bool:
+        # keep-alive 接続ではハンドラーインスタンスが再利用されるため、リクエスト単位の状態を戻す
+        self._request_started = time.monotonic()
+        self._raw_body_bytes = None
+        self._sent_content_length = False
+        return super().parse_request()
+
+    def send_header(self, keyword: str, value: str) -> None:
+        # chunked 転送もボディの終端が分かるため Content-Length と同じ扱い
+        lowered = keyword.lower()
+        if lowered == "content-length" or (lowered == "transfer-encoding" and "chunked" in value.lower()):
+            self._sent_content_length = True
+        super().send_header(keyword, value)
+
+    def end_headers(self) -> None:
+        """接続を維持できない応答には Connection: close を付ける。
+
+        - 逐次処理モード（1接続がサーバーを占有するため）
+        - Content-Length も chunked 転送もない応答（ボディの終端が接続断になる）
+        - リクエストボディを読まずに応答した場合（次のリクエストと区別できない）
+        """
+        if not self.close_connection and (
+            not self.keepalive_enabled
+            or not getattr(self, "_sent_content_length", False)
+            or self._has_unread_body()
+        ):
+            self.send_header("Connection", "close")
+        super().end_headers()
+
+    def _has_unread_body(self) -> bool:
+        if getattr(self, "_raw_body_bytes", None) is not None:
+            return False
+        if self.headers.get("Transfer-Encoding"):
+            return True
+        try:
+            return int(self.headers.get("Content-Length", "0") or 0) > 0
+        except (TypeError, ValueError):
+            return True
+
     @staticmethod
     def _validate_pack_id(pack_id: str) -> bool:
         """pack_id が安全なパターンに合致するか検証する (Fix #9)"""
@@ -185,13 +245,42 @@ class PackAPIHandler(
     
     def _send_response(self, response: APIResponse, status: int = 200) -> None:
         self.send_response(status)
+        body = response.to_json().encode('utf-8')
         self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
         origin = self._get_cors_origin(self.headers.get('Origin', ''))
         if origin:
             self.send_header('Access-Control-Allow-Origin', origin)
             self.send_header('Vary', 'Origin')
         self.end_headers()
-        self.wfile.write(response.to_json().encode('utf-8'))
+        self.wfile.write(body)
+
+    def _send_metrics(self) -> None:
+        """メトリクスを Prometheus テキスト形式で返す。
+
+        Accept に ``application/openmetrics-text`` を含む場合は OpenMetrics 形式。
+        """
+        from .metrics import (
+            OPENMETRICS_CONTENT_TYPE,
+            PROMETHEUS_CONTENT_TYPE,
+            get_metrics_collector,
+        )
+        openmetrics = "application/openmetrics-text" in self.headers.get('Accept', '')
+        try:
+            text = get_metrics_collector().render_prometheus(openmetrics=openmetrics)
+        except Exception as e:
+            _log_internal_error("metrics", e)
+            self._send_response(APIResponse(False, error=_SAFE_ERROR_MSG), 500)
+            return
+        body = text.encode('utf-8')
+        self.send_response(200)
+        self.send_header(
+            'Content-Type',
+            OPENMETRICS_CONTENT_TYPE if openmetrics else PROMETHEUS_CONTENT_TYPE,
+        )
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
 
     def _send_result(self, result, error_status: int = 500) -> None:
         """ハンドラ戻り値を判定してレスポンスを送信する (T-008)。
@@ -379,6 +468,7 @@ class PackAPIHandler(
             self.send_header('Vary', 'Origin')
         self.send_header('Access-Control-Allow-Methods', 'GET, POST, PUT, DELETE, OPTIONS')
         self.send_header('Access-Control-Allow-Headers', 'Authorization, Content-Type')
+        self.send_header('Content-Length', '0')
         self.end_headers()
 
     @classmethod
@@ -498,6 +588,10 @@ class PackAPIHandler(
         
         parsed = urlparse(self.path)
         path = parsed.path
+
+        if path == "/metrics":
+            self._send_metrics()
+            return
         
         try:
             if path == "/api/packs":
@@ -547,6 +641,10 @@ class PackAPIHandler(
                 result = self._network_list()
                 self._send_result(result)
 
+            elif path == "/api/egress":
+                result = self._egress_status()
+                self._send_result(result)
+
             elif path == "/api/secrets":
                 result = self._secrets_list()
                 self._send_result(result)
@@ -1362,14 +1460,18 @@ class PackAPIServer:
         except Exception as e:
             logger.warning("Failed to set up deferred route loading: %s", e)
         
-        self.server = HTTPServer((self.host, self.port), PackAPIHandler)
+        # 並行処理モード（ワーカープール）/ 逐次処理モード（RUMI_API_SERVER_MODE=single）
+        mode = get_api_server_mode()
+        PackAPIHandler.keepalive_enabled = mode != SERVER_MODE_SINGLE
+        self.server = create_api_http_server((self.host, self.port), PackAPIHandler)
         self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
         self.thread.start()
-        logger.info("Pack API server started on http://%s:%s", self.host, self.port)
+        logger.info("Pack API server started on http://%s:%s (mode=%s)", self.host, self.port, mode)
     
     def stop(self) -> None:
         if self.server:
             self.server.shutdown()
+            self.server.server_close()
             self.server = None
         if self.thread:
             self.thread.join(timeout=THREAD_JOIN_TIMEOUT_SECONDS)
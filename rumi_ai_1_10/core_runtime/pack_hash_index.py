@@ -0,0 +1,366 @@
+"""
+pack_hash_index.py - Pack ファイルハッシュの stat インデックス
+
+ApprovalManager のハッシュ検証（verify_hash(use_cache=False)）で
+呼び出しごとに全ファイルを読み直す代わりに、
+(size, mtime_ns, inode, ctime_ns) が変わったファイルだけを再ハッシュする。
+
+設計原則:
+- 検証のたびに os.scandir でディレクトリを走査し、stat を必ず取り直す
+  （TTL キャッシュのように「古い結果」を返さない）
+- ディレクトリ単位の Merkle ルート（stat ベース）が前回と一致し、
+  racy なエントリがなければファイル単位の比較すら省略する
+- ハッシュ計算中にファイルが変化した場合（fstat 前後で不一致）はリトライし、
+  インデックスには安定した結果のみ記録する
+- インデックス作成時刻付近に mtime/ctime を持つエントリは "racy" とみなし、
+  タイムスタンプ粒度内の書き換えを見逃さないよう毎回再ハッシュする
+  （git の racy-clean と同じ考え方）
+- ctime は utime() で巻き戻せないため、内容を書き換えて mtime を戻す改ざんも検出できる
+
+PackFileWatcher（Linux inotify、任意）:
+  Pack ディレクトリの変更を即時に通知し、ApprovalManager が
+  MODIFIED への遷移を次回呼び出しを待たずに行えるようにする。
+"""
+
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import errno
+import hashlib
+import logging
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+
+# ハッシュ対象から除外するパス要素（従来の rglob 実装と同じ部分一致判定）
+EXCLUDED_PATH_PARTS = ("__pycache__", ".pyc", ".git")
+
+# インデックス時刻からこの範囲内に mtime/ctime を持つエントリは信用しない
+RACY_WINDOW_NS = 2_000_000_000
+
+# ハッシュ中に変化し続けるファイルのリトライ回数
+MAX_HASH_RETRIES = 3
+
+StatKey = Tuple[int, int, int, int]
+
+
+def _stat_key(st: os.stat_result) -> StatKey:
+    return (st.st_size, st.st_mtime_ns, st.st_ino, st.st_ctime_ns)
+
+
+def _is_excluded(path_str: str) -> bool:
+    return any(p in path_str for p in EXCLUDED_PATH_PARTS)
+
+
+def is_pack_file_watch_enabled() -> bool:
+    """RUMI_PACK_FILE_WATCH が有効かどうかを返す。"""
+    return os.environ.get("RUMI_PACK_FILE_WATCH", "0").lower() in ("1", "true", "yes")
+
+
+@dataclass
+class _FileRecord:
+    stat_key: StatKey
+    digest: str
+    indexed_at_ns: int
+
+    def is_racy(self) -> bool:
+        _, mtime_ns, _, ctime_ns = self.stat_key
+        return max(mtime_ns, ctime_ns) >= self.indexed_at_ns - RACY_WINDOW_NS
+
+
+@dataclass
+class _PackState:
+    files: Dict[str, _FileRecord]
+    root: str
+    racy: bool
+
+
+# ============================================================
+# PackHashIndex
+# ============================================================
+
+class PackHashIndex:
+    """
+    Pack ディレクトリごとのファイルハッシュインデックス。
+
+    compute() は従来の全ファイル SHA-256 と同じ {相対パス: "sha256:..."} を返す。
+    """
+
+    def __init__(self) -> None:
+        self._packs: Dict[str, _PackState] = {}
+        self._lock = threading.Lock()
+        self._stats = {"root_hits": 0, "files_reused": 0, "files_hashed": 0}
+
+    def compute(self, pack_dir: Path) -> Dict[str, str]:
+        """Pack 内全ファイルのハッシュを返す（変化したファイルのみ再計算）。"""
+        pack_dir = Path(pack_dir)
+        key = str(pack_dir.resolve())
+        entries: List[Tuple[str, str, StatKey]] = []
+        root = self._walk(str(pack_dir), "", entries)
+
+        with self._lock:
+            state = self._packs.get(key)
+            if state is not None and state.root == root and not state.racy:
+                self._stats["root_hits"] += 1
+                return {rel: rec.digest for rel, rec in state.files.items()}
+            previous = dict(state.files) if state is not None else {}
+
+        files: Dict[str, _FileRecord] = {}
+        reused = hashed = 0
+        for rel, abs_path, stat_key in entries:
+            rec = previous.get(rel)
+            if rec is None or rec.stat_key != stat_key or rec.is_racy():
+                rec = self._hash_stable(abs_path)
+                if rec is None:
+                    # 走査後に削除された
+                    continue
+                hashed += 1
+            else:
+                reused += 1
+            files[rel] = rec
+
+        racy = any(rec.is_racy() for rec in files.values())
+        with self._lock:
+            self._packs[key] = _PackState(files=files, root=root, racy=racy)
+            self._stats["files_reused"] += reused
+            self._stats["files_hashed"] += hashed
+        return {rel: rec.digest for rel, rec in files.items()}
+
+    def invalidate(self, pack_dir: Optional[Path] = None) -> None:
+        """インデックスを破棄する（pack_dir 省略時は全件）。"""
+        with self._lock:
+            if pack_dir is None:
+                self._packs.clear()
+            else:
+                self._packs.pop(str(Path(pack_dir).resolve()), None)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._stats, indexed_packs=len(self._packs))
+
+    # ------------------------------------------------------------------ #
+
+    def _walk(self, dir_path: str, rel_dir: str, out: List[Tuple[str, str, StatKey]]) -> str:
+        """
+        ディレクトリを走査してファイル一覧を out に追加し、
+        このディレクトリの stat Merkle ダイジェストを返す。
+
+        Path.rglob("*") と同じく、ディレクトリのシンボリックリンクは辿らず、
+        ファイルのシンボリックリンクはリンク先を対象にする。
+        """
+        lines: List[str] = []
+        try:
+            with os.scandir(dir_path) as it:
+                children = sorted(it, key=lambda e: e.name)
+        except (FileNotFoundError, NotADirectoryError, PermissionError):
+            children = []
+        for entry in children:
+            rel = os.path.join(rel_dir, entry.name) if rel_dir else entry.name
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if _is_excluded(entry.path):
+                        continue
+                    lines.append(f"d {entry.name} {self._walk(entry.path, rel, out)}")
+                elif entry.is_file():
+                    if _is_excluded(entry.path):
+                        continue
+                    stat_key = _stat_key(entry.stat())
+                    out.append((rel, entry.path, stat_key))
+                    lines.append(f"f {entry.name} {stat_key}")
+            except OSError:
+                continue
+        return hashlib.sha256("\n".join(lines).encode("utf-8", "surrogateescape")).hexdigest()
+
+    def _hash_stable(self, path: str) -> Optional[_FileRecord]:
+        """fstat の前後で変化しなかった内容のハッシュを返す。"""
+        for _ in range(MAX_HASH_RETRIES):
+            indexed_at_ns = time.time_ns()
+            try:
+                with open(path, "rb") as f:
+                    before = _stat_key(os.fstat(f.fileno()))
+                    sha256 = hashlib.sha256()
+                    for chunk in iter(lambda: f.read(65536), b""):
+                        sha256.update(chunk)
+                    after = _stat_key(os.fstat(f.fileno()))
+            except FileNotFoundError:
+                return None
+            if before == after:
+                return _FileRecord(before, f"sha256:{sha256.hexdigest()}", indexed_at_ns)
+        # 書き込みが続いている: 結果は返すが、次回必ず再ハッシュされるよう racy 扱い
+        return _FileRecord(after, f"sha256:{sha256.hexdigest()}", sys.maxsize)
+
+
+# ============================================================
+# PackFileWatcher (inotify)
+# ============================================================
+
+_IN_MODIFY = 0x00000002
+_IN_ATTRIB = 0x00000004
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_DELETE_SELF = 0x00000400
+_IN_MOVE_SELF = 0x00000800
+_IN_IGNORED = 0x00008000
+_IN_ISDIR = 0x40000000
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+
+_WATCH_MASK = (_IN_MODIFY | _IN_ATTRIB | _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO
+               | _IN_CREATE | _IN_DELETE | _IN_DELETE_SELF | _IN_MOVE_SELF)
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+class PackFileWatcher:
+    """
+    inotify で Pack ディレクトリを監視し、変更のあった pack_id を通知する。
+
+    Linux 以外、または inotify が使えない環境では start() が False を返す。
+    通知はバッチ単位（debounce 秒）で on_change(pack_id) を呼ぶ。
+    """
+
+    def __init__(self, on_change: Callable[[str], None], debounce: float = 0.2) -> None:
+        self._on_change = on_change
+        self._debounce = debounce
+        self._libc = None
+        self._fd: Optional[int] = None
+        self._wds: Dict[int, Tuple[str, str]] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def start(self) -> bool:
+        if self._fd is not None:
+            return True
+        if not sys.platform.startswith("linux"):
+            return False
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c") or None, use_errno=True)
+            fd = libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        except (OSError, AttributeError):
+            return False
+        if fd < 0:
+            logger.warning("inotify_init1 failed: %s", os.strerror(ctypes.get_errno()))
+            return False
+        self._libc, self._fd = libc, fd
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="rumi-pack-file-watcher", daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        with self._lock:
+            if self._fd is not None:
+                try:
+                    os.close(self._fd)
+                except OSError:
+                    pass
+            self._fd = None
+            self._wds.clear()
+
+    def watch(self, pack_id: str, pack_dir: Path) -> None:
+        """pack_dir 配下の全ディレクトリを監視対象に追加する。"""
+        if self._fd is None:
+            return
+        self.unwatch(pack_id)
+        self._watch_subtree(pack_id, str(pack_dir))
+
+    def unwatch(self, pack_id: str) -> None:
+        with self._lock:
+            if self._fd is None:
+                return
+            for wd in [wd for wd, (pid, _) in self._wds.items() if pid == pack_id]:
+                self._libc.inotify_rm_watch(self._fd, wd)
+                self._wds.pop(wd, None)
+
+    def watched_pack_ids(self) -> List[str]:
+        with self._lock:
+            return sorted({pid for pid, _ in self._wds.values()})
+
+    def _add_watch(self, pack_id: str, dir_path: str) -> None:
+        with self._lock:
+            if self._fd is None:
+                return
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(dir_path), _WATCH_MASK)
+            if wd < 0:
+                err = ctypes.get_errno()
+                if err != errno.ENOENT:
+                    logger.warning("inotify_add_watch failed for %s: %s", dir_path, os.strerror(err))
+                return
+            self._wds[wd] = (pack_id, dir_path)
+
+    def _loop(self) -> None:
+        pending: Dict[str, float] = {}
+        while not self._stop.is_set():
+            fd = self._fd
+            if fd is None:
+                break
+            try:
+                readable, _, _ = select.select([fd], [], [], self._debounce)
+            except (OSError, ValueError):
+                break
+            if readable:
+                try:
+                    data = os.read(fd, 65536)
+                except BlockingIOError:
+                    data = b""
+                except OSError:
+                    break
+                for pack_id in self._parse(data):
+                    pending.setdefault(pack_id, time.monotonic())
+            now = time.monotonic()
+            due = [pid for pid, ts in pending.items() if now - ts >= self._debounce]
+            for pack_id in due:
+                pending.pop(pack_id, None)
+                try:
+                    self._on_change(pack_id)
+                except Exception as e:
+                    logger.warning("Pack file watcher callback failed for %s: %s", pack_id, e)
+
+    def _parse(self, data: bytes) -> List[str]:
+        changed: List[str] = []
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            wd, mask, _cookie, name_len = _EVENT_HEADER.unpack_from(data, offset)
+            raw_name = data[offset + _EVENT_HEADER.size: offset + _EVENT_HEADER.size + name_len]
+            offset += _EVENT_HEADER.size + name_len
+            name = os.fsdecode(raw_name.rstrip(b"\0"))
+            with self._lock:
+                owner = self._wds.get(wd)
+                if mask & _IN_IGNORED:
+                    self._wds.pop(wd, None)
+            if owner is None:
+                continue
+            pack_id, dir_path = owner
+            full_path = os.path.join(dir_path, name) if name else dir_path
+            if _is_excluded(full_path):
+                continue
+            if mask & _IN_ISDIR and mask & (_IN_CREATE | _IN_MOVED_TO):
+                self._watch_subtree(pack_id, full_path)
+            if pack_id not in changed:
+                changed.append(pack_id)
+        return changed
+
+    def _watch_subtree(self, pack_id: str, dir_path: str) -> None:
+        for sub_path, dir_names, _ in os.walk(dir_path):
+            dir_names[:] = [d for d in dir_names
+                            if not _is_excluded(os.path.join(sub_path, d))
+                            and not os.path.islink(os.path.join(sub_path, d))]
+            self._add_watch(pack_id, sub_path)
@@ -57,6 +57,9 @@ GRANTS_DIR = str(BASE_DIR / "user_data" / "permissions")
 # Pack data 保存先
 PACK_DATA_BASE_DIR = str(BASE_DIR / "user_data" / "packs")
 
+# FlowScheduler の実行状態（最終実行時刻）保存先
+SCHEDULER_STATE_FILE = str(BASE_DIR / "user_data" / "scheduler" / "state.json")
+
 # Pack discovery 時に除外するディレクトリ名
 EXCLUDED_DIRS = frozenset({
     ".git",
@@ -36,11 +36,24 @@ PR-C追加:
 
 pip依存追加:
 - docker run に site-packages の RO マウントを追加し、PYTHONPATH に追加
+
+ホスト実行モジュールキャッシュ:
+- permissive ホスト実行でロードしたモジュールと run 関数のシグネチャ情報を
+  (owner_pack, ファイルパス, 内容ハッシュ) をキーに LRU で保持する
+- 内容ハッシュは承認済みハッシュの指紋（未承認管理下・core_pack はファイル内容の SHA-256）
+- ApprovalManager が Pack を MODIFIED にした時点で該当 Pack のエントリを破棄する
+- RUMI_HOST_MODULE_CACHE=0 で毎回ロードする従来動作に戻せる
+
+逐次ストリーミング:
+- execute(stream=True) でジェネレータ型 run の出力を ExecutionResult.stream
+  （output_stream.OutputStream）へ yield ごとに送る（ホスト実行のみ）
 """
 
 from __future__ import annotations
 
+import hashlib
 import importlib.util
+import inspect
 import json
 import os
 import tempfile
@@ -49,10 +62,11 @@ import threading
 import traceback
 import uuid
 import concurrent.futures
+from collections import OrderedDict
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Callable, Dict, List, Optional, Tuple
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
 
 
 # ============================================================
@@ -68,10 +82,15 @@ _DOCKER_CHECK_CACHE_TTL: float = float(os.environ.get("RUMI_DOCKER_CHECK_CACHE_T
 # SEC-2: Docker image ダイジェスト固定
 DEFAULT_EXECUTOR_IMAGE: str = "python:3.11-slim@sha256:d6e4d224f70f9e0172a06a3a2eba2f768eb146811a349278b38fff3a36463b47"
 EXECUTOR_IMAGE: str = os.environ.get("RUMI_EXECUTOR_IMAGE", DEFAULT_EXECUTOR_IMAGE)
+# ホスト実行モジュールキャッシュの最大エントリ数
+HOST_MODULE_CACHE_SIZE: int = int(os.environ.get("RUMI_HOST_MODULE_CACHE_SIZE", "64"))
 
 
 
 from .docker_run_builder import DockerRunBuilder
+from .output_stream import OutputStream
+from .host_execution_pool import HostPoolBusy, get_host_execution_pool
+from .container_session import ContainerSessionSpec, is_container_session_enabled
 
 from .paths import (
     ECOSYSTEM_DIR,
@@ -114,6 +133,100 @@ def _get_capability_gid() -> Optional[int]:
     return _read_gid_env("RUMI_CAPABILITY_SOCKET_GID")
 
 
+# ============================================================
+# ホスト実行モジュールキャッシュ
+# ============================================================
+
+def is_host_module_cache_enabled() -> bool:
+    """RUMI_HOST_MODULE_CACHE が有効かどうかを返す（デフォルト有効）。"""
+    return os.environ.get("RUMI_HOST_MODULE_CACHE", "1").lower() in ("1", "true", "yes")
+
+
+@dataclass
+class HostModuleEntry:
+    """ロード済みモジュールと run 関数の呼び出し情報"""
+    module: Any
+    run_fn: Callable
+    param_count: int
+    is_generator: bool
+    is_coroutine: bool
+
+
+HostModuleKey = Tuple[str, str, str]
+
+
+class HostModuleCache:
+    """
+    ホスト実行用のロード済みモジュール LRU キャッシュ
+
+    キーは (owner_pack, ファイルパス, 内容ハッシュ)。内容が変われば別キーになるため
+    古いエントリは参照されなくなり、LRU で追い出される。
+    """
+
+    def __init__(self, max_entries: Optional[int] = None):
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[HostModuleKey, HostModuleEntry]" = OrderedDict()
+        self._max_entries = max_entries
+        self._hits = 0
+        self._misses = 0
+
+    def _capacity(self) -> int:
+        limit = HOST_MODULE_CACHE_SIZE if self._max_entries is None else self._max_entries
+        return max(1, int(limit))
+
+    def get(self, key: HostModuleKey) -> Optional[HostModuleEntry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry
+
+    def put(self, key: HostModuleKey, entry: HostModuleEntry) -> HostModuleEntry:
+        """エントリを登録する。同じキーが先に登録済みならそちらを返す。"""
+        with self._lock:
+            existing = self._entries.get(key)
+            if existing is not None:
+                self._entries.move_to_end(key)
+                return existing
+            self._entries[key] = entry
+            capacity = self._capacity()
+            while len(self._entries) > capacity:
+                self._entries.popitem(last=False)
+            return entry
+
+    def invalidate_pack(self, pack_id: str) -> int:
+        """指定 Pack のエントリを全て破棄し、破棄件数を返す"""
+        with self._lock:
+            keys = [k for k in self._entries if k[0] == pack_id]
+            for k in keys:
+                del self._entries[k]
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self._hits, "misses": self._misses}
+
+
+_host_module_cache = HostModuleCache()
+
+
+def get_host_module_cache() -> HostModuleCache:
+    """プロセス共通のホスト実行モジュールキャッシュを取得する"""
+    return _host_module_cache
+
+
+def invalidate_host_modules(pack_id: str) -> int:
+    """Pack のキャッシュ済みモジュールを破棄する（ApprovalManager から呼ばれる）"""
+    return _host_module_cache.invalidate_pack(pack_id)
+
+
 @dataclass
 class ExecutionContext:
     """python_file_call 実行コンテキスト"""
@@ -140,6 +253,28 @@ class ExecutionResult:
     execution_time_ms: float = 0.0
     warnings: List[str] = field(default_factory=list)
     is_streaming: bool = False
+    stream: Optional[OutputStream] = None
+
+    def as_stream(self) -> Optional[OutputStream]:
+        """
+        ストリーミング結果を OutputStream として返す。
+
+        逐次実行中なら stream をそのまま、まとめて返された chunks
+        （コンテナ実行・stream 未指定のホスト実行）なら完了済みストリームを返す。
+        ストリーミング結果でなければ None。
+        """
+        if self.stream is not None:
+            return self.stream
+        if self.is_streaming and isinstance(self.output, dict) and isinstance(self.output.get("chunks"), list):
+            return OutputStream.from_chunks(self.output["chunks"])
+        return None
+
+    def aiter_chunks(self) -> AsyncIterator[Any]:
+        """チャンクを yield された順に返す非同期イテレータ"""
+        chunks = self.as_stream()
+        if chunks is None:
+            raise ValueError("Execution result is not a stream")
+        return chunks.__aiter__()
 
 
 class PackApprovalChecker:
@@ -210,6 +345,16 @@ class PackApprovalChecker:
         except Exception as e:
             return False, f"Hash verification error: {e}"
 
+    def get_fingerprint(self, pack_id: str) -> Optional[str]:
+        """承認済みハッシュの指紋を取得（常駐コンテナセッションのキー用）"""
+        am = self._get_approval_manager()
+        if am is None:
+            return None
+        try:
+            return am.get_approval_fingerprint(pack_id)
+        except Exception:
+            return None
+
 
 class PathValidator:
     """ファイルパス検証（pack_subdir boundary 強制）"""
@@ -402,7 +547,8 @@ class PythonFileExecutor:
         context: ExecutionContext,
         principal_id: Optional[str] = None,
         capability_sock_path: Optional[Path] = None,
-        timeout_seconds: float = 60.0
+        timeout_seconds: float = 60.0,
+        stream: bool = False,
     ) -> ExecutionResult:
         """
         pythonファイルを実行
@@ -415,6 +561,8 @@ class PythonFileExecutor:
             principal_id: 主体ID（capability用、未指定ならowner_pack）
             capability_sock_path: capability UDSソケットパス
             timeout_seconds: タイムアウト秒数
+            stream: True ならジェネレータの出力を result.stream で逐次返す（ホスト実行のみ。
+                コンテナ実行では従来どおりまとめた chunks を返す）
 
         Returns:
             ExecutionResult
@@ -521,7 +669,8 @@ class PythonFileExecutor:
             elif self._security_mode == "permissive":
                 # permissive モードではホスト実行（警告付き）
                 result = self._execute_on_host(
-                    resolved_path, resolved_pack, input_data, context, timeout_seconds, capability_sock_path
+                    resolved_path, resolved_pack, input_data, context, timeout_seconds, capability_sock_path,
+                    stream=stream,
                 )
                 result.execution_mode = "host_permissive"
                 result.warnings.append(
@@ -809,6 +958,16 @@ request = http_request
             "inputs": input_data,
         }
 
+        # 常駐コンテナセッション（有効時）。使えなければ使い捨てコンテナで実行
+        if owner_pack and is_container_session_enabled():
+            session_result = self._execute_in_session(
+                file_path, owner_pack, input_data, exec_context, timeout_seconds,
+                sock_path, capability_sock_path, pack_data_dir, pip_site_packages,
+                egress_gid, capability_gid, pythonpath_parts,
+            )
+            if session_result is not None:
+                return session_result
+
         # 一時ファイルのパスを事前に初期化
         input_file = None
         script_file = None
@@ -973,6 +1132,97 @@ request = http_request
 
         return result
 
+    def _execute_in_session(
+        self,
+        file_path: Path,
+        owner_pack: str,
+        input_data: Any,
+        exec_context: Dict[str, Any],
+        timeout_seconds: float,
+        sock_path: Optional[Path],
+        capability_sock_path: Optional[Path],
+        pack_data_dir: Optional[Path],
+        pip_site_packages: Optional[Path],
+        egress_gid: Optional[int],
+        capability_gid: Optional[int],
+        pythonpath_parts: List[str],
+    ) -> Optional[ExecutionResult]:
+        """
+        常駐コンテナセッションで実行する。
+
+        マウント・セキュリティベースラインは _execute_in_container と同じ。
+        rumi_syscall / rumi_capability は init フレームでプリロードする。
+        セッションを使えない場合は None を返す。
+        """
+        fingerprint = self._approval_checker.get_fingerprint(owner_pack)
+        if not fingerprint:
+            return None
+        try:
+            from .di_container import get_container
+            orchestrator = get_container().get_or_none("container_orchestrator")
+        except Exception:
+            orchestrator = None
+        if orchestrator is None:
+            return None
+
+        volumes = [f"{file_path.parent.resolve()}:/workspace:ro"]
+        group_add_gids: set = set()
+        if sock_path and sock_path.exists() and egress_gid is not None:
+            group_add_gids.add(egress_gid)
+        if capability_sock_path and capability_sock_path.exists() and capability_gid is not None:
+            group_add_gids.add(capability_gid)
+        if pip_site_packages:
+            volumes.append(f"{pip_site_packages.resolve()}:/pip-packages:ro")
+        if pack_data_dir and pack_data_dir.exists():
+            volumes.append(f"{pack_data_dir.resolve()}:/data:ro")
+        if sock_path and sock_path.exists():
+            volumes.append(f"{sock_path}:/run/rumi/egress.sock:rw")
+        if capability_sock_path and capability_sock_path.exists():
+            volumes.append(f"{capability_sock_path}:/run/rumi/capability.sock:rw")
+
+        spec = ContainerSessionSpec(
+            pack_id=owner_pack,
+            kind="python_file",
+            image=EXECUTOR_IMAGE,
+            fingerprint=fingerprint,
+            volumes=tuple(volumes),
+            envs=(("PYTHONPATH", ":".join(pythonpath_parts)),),
+            group_adds=tuple(sorted(group_add_gids)),
+            workdir="/workspace",
+            sys_path=("/workspace",),
+            pids_limit=100,
+        )
+        preload = {"rumi_syscall": self._get_syscall_module_content()}
+        cap_content = self._get_capability_module_content()
+        if cap_content:
+            preload["rumi_capability"] = cap_content
+        request = {
+            "kind": "python_file",
+            "module": f"/workspace/{file_path.name}",
+            "input_data": input_data,
+            "context": exec_context,
+        }
+        reply = orchestrator.call_in_session(spec, request, timeout_seconds, MAX_STDOUT_SIZE, preload)
+        if reply is None:
+            return None
+
+        result = ExecutionResult(success=False, execution_mode="container")
+        if group_add_gids:
+            result.warnings.append(f"Docker --group-add applied: {sorted(group_add_gids)}")
+        if reply.get("ok"):
+            result.success = True
+            result.output = reply.get("result")
+        elif reply.get("error_type") == "timeout":
+            result.error = f"Execution timed out after {timeout_seconds}s"
+            result.error_type = "timeout"
+        elif reply.get("error_type") == "response_too_large":
+            result.error = f"stdout exceeded size limit ({MAX_STDOUT_SIZE} bytes)"
+            result.error_type = "response_too_large"
+        else:
+            result.error = reply.get("error") or "Container session error"
+            result.error_type = "container_execution_error"
+        return result
+
     def _generate_executor_script(self, target_filename: str) -> str:
         """コンテナ内で実行するPythonスクリプトを生成"""
         return f'''
@@ -1054,8 +1304,15 @@ else:
         context: ExecutionContext,
         timeout_seconds: float,
         capability_sock_path: Optional[Path] = None,
+        stream: bool = False,
     ) -> ExecutionResult:
-        """ホスト上で実行（permissiveモード）"""
+        """
+        ホスト上で実行（permissiveモード）
+
+        stream=True かつ run がジェネレータの場合は、ジェネレータを別スレッドで回し
+        yield されたチャンクを result.stream（OutputStream）へ逐次送って即座に返す。
+        rumi_capability 注入の後始末はジェネレータの終了時に行う。
+        """
         result = ExecutionResult(success=False, execution_mode="host_permissive")
 
         # 警告を出力
@@ -1080,44 +1337,29 @@ else:
                 f"Failed to inject rumi_capability for host execution: {e}"
             )
 
+        def _cleanup_injection() -> None:
+            if _capability_injected:
+                sys.modules.pop("rumi_capability", None)
+            if _prev_env_cap_sock is not None:
+                os.environ["RUMI_CAPABILITY_SOCKET"] = _prev_env_cap_sock
+            elif "RUMI_CAPABILITY_SOCKET" in os.environ and capability_sock_path:
+                os.environ.pop("RUMI_CAPABILITY_SOCKET", None)
+
+        cleanup_deferred = False
         module_name = f"pfc_{owner_pack or 'unknown'}_{file_path.stem}_{abs(hash(str(file_path)))}"
 
         try:
-            # モジュールをロード
-            spec = importlib.util.spec_from_file_location(module_name, str(file_path))
-
-            if spec is None or spec.loader is None:
-                result.error = f"Cannot load module from {file_path}"
-                result.error_type = "module_load_error"
-                return result
-
-            module = importlib.util.module_from_spec(spec)
-            sys.modules[module_name] = module
-
-            # sys.pathに追加（スレッドセーフ）
-            file_dir = str(file_path.parent)
-            path_added = False
-
-            with self._syspath_lock:
-                if file_dir not in sys.path:
-                    sys.path.insert(0, file_dir)
-                    path_added = True
-
-            try:
-                spec.loader.exec_module(module)
-            finally:
-                # sys.pathから削除（追加した場合のみ）
-                if path_added:
-                    with self._syspath_lock:
-                        if file_dir in sys.path:
-                            sys.path.remove(file_dir)
+            cache_key = self._host_module_key(file_path, owner_pack) if is_host_module_cache_enabled() else None
+            entry = _host_module_cache.get(cache_key) if cache_key is not None else None
+            if entry is None:
+                entry = self._load_host_module(file_path, module_name, result)
+                if entry is None:
+                    return result
+                if cache_key is not None:
+                    entry = _host_module_cache.put(cache_key, entry)
 
-            # run関数を探す
-            run_fn = getattr(module, "run", None)
-            if run_fn is None:
-                result.error = f"No 'run' function found in {file_path}"
-                result.error_type = "no_run_function"
-                return result
+            run_fn = entry.run_fn
+            param_count = entry.param_count
 
             # コンテキスト辞書を構築
             exec_context = {
@@ -1137,16 +1379,22 @@ else:
             if context.permission_proxy:
                 exec_context["permission_proxy"] = context.permission_proxy
 
-            # 実行 (#4: タイムアウト付き — concurrent.futures.ThreadPoolExecutor)
-            import inspect
-            sig = inspect.signature(run_fn)
-            param_count = len(sig.parameters)
-
+            # 実行 (#4: タイムアウト付き — 共有 HostExecutionPool)
             effective_timeout = min(timeout_seconds, MAX_HOST_EXECUTION_TIMEOUT)
 
+            if stream and entry.is_generator:
+                result.stream = self._start_host_stream(
+                    run_fn, param_count, input_data, exec_context,
+                    effective_timeout, file_path, owner_pack, _cleanup_injection,
+                )
+                cleanup_deferred = True
+                result.is_streaming = True
+                result.success = True
+                return result
+
             def _run_target():
                 # --- async/generator support ---
-                if inspect.isgeneratorfunction(run_fn):
+                if entry.is_generator:
                     if param_count >= 2:
                         gen = run_fn(input_data, exec_context)
                     elif param_count == 1:
@@ -1155,7 +1403,7 @@ else:
                         gen = run_fn()
                     chunks = list(gen)
                     return {"chunks": chunks, "is_streaming": True}
-                elif inspect.iscoroutinefunction(run_fn):
+                elif entry.is_coroutine:
                     import asyncio
                     if param_count >= 2:
                         coro = run_fn(input_data, exec_context)
@@ -1172,52 +1420,158 @@ else:
                     else:
                         return run_fn()
 
-            with concurrent.futures.ThreadPoolExecutor(max_workers=1) as pool:
-                future = pool.submit(_run_target)
-                try:
-                    output = future.result(timeout=effective_timeout)
-                    if isinstance(output, dict) and output.get("is_streaming"):
-                        result.is_streaming = True
-                except concurrent.futures.TimeoutError:
-                    result.error = f"Host execution timed out after {effective_timeout}s"
-                    result.error_type = "timeout"
-                    # 診断ログに記録
-                    if context.diagnostics_callback:
-                        try:
-                            context.diagnostics_callback({
-                                "event": "host_execution_timeout",
-                                "file_path": str(file_path),
-                                "owner_pack": owner_pack,
-                                "timeout_seconds": effective_timeout,
-                                "ts": self._now_ts(),
-                            })
-                        except Exception:
-                            pass
-                    return result
+            try:
+                output = get_host_execution_pool().run(owner_pack, _run_target, effective_timeout)
+                if isinstance(output, dict) and output.get("is_streaming"):
+                    result.is_streaming = True
+            except concurrent.futures.TimeoutError:
+                # 実行中のスレッドは待たずに放棄される（HostExecutionPool が回収・計上する）
+                result.error = f"Host execution timed out after {effective_timeout}s"
+                result.error_type = "timeout"
+                # 診断ログに記録
+                if context.diagnostics_callback:
+                    try:
+                        context.diagnostics_callback({
+                            "event": "host_execution_timeout",
+                            "file_path": str(file_path),
+                            "owner_pack": owner_pack,
+                            "timeout_seconds": effective_timeout,
+                            "ts": self._now_ts(),
+                        })
+                    except Exception:
+                        pass
+                return result
 
             # 出力をJSON互換に変換
             result.output = self._ensure_json_compatible(output)
             result.success = True
 
+        except HostPoolBusy as e:
+            result.error = str(e)
+            result.error_type = HostPoolBusy.error_type
+
         except Exception as e:
             result.error = str(e)
             result.error_type = type(e).__name__
             result.warnings.append(f"Traceback: {traceback.format_exc()[-2000:]}")
 
         finally:
-            # モジュールをクリーンアップ
-            if module_name in sys.modules:
-                del sys.modules[module_name]
-            # rumi_capability 注入のクリーンアップ
-            if _capability_injected:
-                sys.modules.pop("rumi_capability", None)
-            if _prev_env_cap_sock is not None:
-                os.environ["RUMI_CAPABILITY_SOCKET"] = _prev_env_cap_sock
-            elif "RUMI_CAPABILITY_SOCKET" in os.environ and capability_sock_path:
-                os.environ.pop("RUMI_CAPABILITY_SOCKET", None)
+            # rumi_capability 注入のクリーンアップ（ストリーム中は終了時に行う）
+            if not cleanup_deferred:
+                _cleanup_injection()
 
         return result
 
+    def _start_host_stream(
+        self,
+        run_fn: Callable,
+        param_count: int,
+        input_data: Any,
+        exec_context: Dict[str, Any],
+        timeout_seconds: float,
+        file_path: Path,
+        owner_pack: Optional[str],
+        on_finish: Callable[[], None],
+    ) -> OutputStream:
+        """
+        ジェネレータを HostExecutionPool のワーカーで回す OutputStream を作って返す。
+
+        生産側はストリームの期限で止まるため、Pack の同時実行枠は期限内に返される。
+        """
+        stream = OutputStream(timeout_seconds=timeout_seconds)
+
+        def _produce() -> None:
+            try:
+                if param_count >= 2:
+                    gen = run_fn(input_data, exec_context)
+                elif param_count == 1:
+                    gen = run_fn(input_data)
+                else:
+                    gen = run_fn()
+                stream.pump(gen, transform=self._ensure_json_compatible)
+            except Exception as e:
+                stream.fail(str(e), type(e).__name__)
+            finally:
+                on_finish()
+
+        get_host_execution_pool().submit(owner_pack, _produce, timeout_seconds)
+        return stream
+
+    def _host_module_key(self, file_path: Path, owner_pack: Optional[str]) -> Optional[HostModuleKey]:
+        """
+        モジュールキャッシュのキーを作る。
+
+        承認済み Pack は承認済みハッシュの指紋を内容ハッシュとして使う。
+        指紋が得られない場合（ApprovalManager なし・core_pack 等）はファイル内容の
+        SHA-256 を使う。ファイルを読めなければ None（キャッシュしない）。
+        """
+        content_hash = None
+        if owner_pack:
+            fingerprint = self._approval_checker.get_fingerprint(owner_pack)
+            if isinstance(fingerprint, str) and fingerprint and fingerprint != "core":
+                content_hash = fingerprint
+        if content_hash is None:
+            try:
+                content_hash = hashlib.sha256(file_path.read_bytes()).hexdigest()
+            except OSError:
+                return None
+        return (owner_pack or "", str(file_path), content_hash)
+
+    def _load_host_module(
+        self, file_path: Path, module_name: str, result: ExecutionResult
+    ) -> Optional[HostModuleEntry]:
+        """
+        モジュールをロードして run 関数の呼び出し情報を返す。
+
+        失敗時は result に error / error_type を設定して None を返す。
+        sys.modules への登録はトップレベルコードの実行中だけ行う。
+        """
+        spec = importlib.util.spec_from_file_location(module_name, str(file_path))
+
+        if spec is None or spec.loader is None:
+            result.error = f"Cannot load module from {file_path}"
+            result.error_type = "module_load_error"
+            return None
+
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[module_name] = module
+        try:
+            # sys.pathに追加（スレッドセーフ）
+            file_dir = str(file_path.parent)
+            path_added = False
+
+            with self._syspath_lock:
+                if file_dir not in sys.path:
+                    sys.path.insert(0, file_dir)
+                    path_added = True
+
+            try:
+                spec.loader.exec_module(module)
+            finally:
+                # sys.pathから削除（追加した場合のみ）
+                if path_added:
+                    with self._syspath_lock:
+                        if file_dir in sys.path:
+                            sys.path.remove(file_dir)
+        finally:
+            if sys.modules.get(module_name) is module:
+                del sys.modules[module_name]
+
+        # run関数を探す
+        run_fn = getattr(module, "run", None)
+        if run_fn is None:
+            result.error = f"No 'run' function found in {file_path}"
+            result.error_type = "no_run_function"
+            return None
+
+        return HostModuleEntry(
+            module=module,
+            run_fn=run_fn,
+            param_count=len(inspect.signature(run_fn).parameters),
+            is_generator=inspect.isgeneratorfunction(run_fn),
+            is_coroutine=inspect.iscoroutinefunction(run_fn),
+        )
+
     def _ensure_json_compatible(self, value: Any) -> Any:
         """値をJSON互換に変換"""
         if value is None:
@@ -1406,6 +1760,7 @@ def reset_python_file_executor() -> PythonFileExecutor:
     from .di_container import get_container
     container = get_container()
     new = PythonFileExecutor()
+    _host_module_cache.clear()
     with _executor_lock:
         _global_executor = new
     container.set_instance("python_file_executor", new)
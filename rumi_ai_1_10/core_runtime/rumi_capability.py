@@ -19,15 +19,28 @@ PR-B: このファイルが唯一の実体。
         print(result["output"])
     else:
         print(f"Error: {result['error']}")
+
+    # まとめて呼び出す（1接続上でプロキシが並行に処理する）
+    results = rumi_capability.call_many([
+        {"permission_id": "store.get", "args": {"store_id": "s", "key": "a"}},
+        {"permission_id": "store.get", "args": {"store_id": "s", "key": "b"}},
+    ])
+
+接続はプロセス内で使い回し、"mux_id" 付きリクエストとして多重化する。
+asyncio からは AsyncCapabilityClient を使う。
 """
 
 from __future__ import annotations
 
+import asyncio
+import itertools
 import json
 import os
 import socket
 import struct
-from typing import Any, Dict, Optional
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
 
 
 # デフォルトのUDSソケットパス（コンテナ内）
@@ -41,6 +54,9 @@ MAX_RESPONSE_SIZE = 4 * 1024 * 1024  # 4MB
 DEFAULT_TIMEOUT = 30.0
 MAX_TIMEOUT = 120.0
 
+# 永続接続をアイドル後に再利用する期限（プロキシ側のアイドルタイムアウトより短くする）
+CLIENT_IDLE_REUSE_SECONDS = 30.0
+
 
 class CapabilityError(Exception):
     """Capability 呼び出しエラー"""
@@ -81,6 +97,203 @@ def _write_length_prefixed_json(sock: socket.socket, data: Dict[str, Any]) -> No
     sock.sendall(length + payload)
 
 
+def _error_result(error: str, error_type: str) -> Dict[str, Any]:
+    return {
+        "success": False,
+        "error": error,
+        "error_type": error_type,
+        "output": None,
+        "latency_ms": 0,
+    }
+
+
+def _connect_error_result(e: OSError, sock_path: str) -> Dict[str, Any]:
+    if isinstance(e, FileNotFoundError):
+        return _error_result(f"Capability proxy socket not found: {sock_path}", "socket_not_found")
+    if isinstance(e, PermissionError):
+        return _error_result(f"Permission denied to capability proxy socket: {sock_path}", "permission_denied")
+    if isinstance(e, ConnectionRefusedError):
+        return _error_result(f"Connection refused to capability proxy: {sock_path}", "connection_refused")
+    return _error_result(str(e), type(e).__name__)
+
+
+def _is_persistent_enabled() -> bool:
+    """RUMI_CAPABILITY_PERSISTENT が有効か（デフォルト有効）"""
+    return os.environ.get("RUMI_CAPABILITY_PERSISTENT", "1").lower() in ("1", "true", "yes")
+
+
+def _build_request(
+    permission_id: str,
+    args: Optional[Dict[str, Any]],
+    timeout: float,
+    request_id: Optional[str],
+) -> Dict[str, Any]:
+    request = {
+        "permission_id": permission_id,
+        "args": args or {},
+        "timeout_seconds": timeout,
+    }
+    if request_id:
+        request["request_id"] = request_id
+    return request
+
+
+# ============================================================
+# 永続・多重化接続
+# ============================================================
+
+class _PendingCall:
+    __slots__ = ("event", "result")
+
+    def __init__(self) -> None:
+        self.event = threading.Event()
+        self.result: Optional[Dict[str, Any]] = None
+
+
+class _MuxConnection:
+    """
+    プロキシへの永続接続
+
+    リクエストに "mux_id" を付けて送り、受信スレッドが応答を
+    mux_id で呼び出し元に振り分ける。複数スレッドから同時に使える。
+    """
+
+    def __init__(self, sock_path: str, connect_timeout: float) -> None:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.settimeout(connect_timeout)
+            sock.connect(sock_path)
+            sock.settimeout(None)
+        except Exception:
+            sock.close()
+            raise
+        self._sock = sock
+        self._send_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._pending: Dict[int, _PendingCall] = {}
+        self._ids = itertools.count(1)
+        self.closed = False
+        self.last_used = time.monotonic()
+        threading.Thread(target=self._read_loop, name="rumi-capability-client", daemon=True).start()
+
+    def is_reusable(self) -> bool:
+        """アイドル期限内で、まだ使える接続か"""
+        with self._lock:
+            if self.closed:
+                return False
+            if self._pending:
+                return True
+            return time.monotonic() - self.last_used < CLIENT_IDLE_REUSE_SECONDS
+
+    def send(self, request: Dict[str, Any]) -> Tuple[int, _PendingCall]:
+        """リクエストを送る（送信失敗時は接続を閉じて OSError を送出）"""
+        pending = _PendingCall()
+        with self._lock:
+            if self.closed:
+                raise ConnectionError("Connection closed")
+            mux_id = next(self._ids)
+            self._pending[mux_id] = pending
+        frame = dict(request, mux_id=mux_id)
+        try:
+            with self._send_lock:
+                _write_length_prefixed_json(self._sock, frame)
+        except OSError:
+            self.close()
+            raise
+        return mux_id, pending
+
+    def wait(self, mux_id: int, pending: _PendingCall, timeout: float) -> Dict[str, Any]:
+        """応答を待つ（タイムアウト後に届いた応答は捨てる）"""
+        if not pending.event.wait(timeout):
+            with self._lock:
+                self._pending.pop(mux_id, None)
+            return _error_result(f"Request timed out after {timeout}s", "timeout")
+        return pending.result
+
+    def _read_loop(self) -> None:
+        error = _error_result("Connection closed by proxy", "capability_error")
+        try:
+            while True:
+                response = _read_length_prefixed_json(self._sock, MAX_RESPONSE_SIZE)
+                mux_id = response.pop("mux_id", None)
+                with self._lock:
+                    pending = self._pending.pop(mux_id, None)
+                    self.last_used = time.monotonic()
+                if pending is not None:
+                    pending.result = response
+                    pending.event.set()
+                elif mux_id is None:
+                    # 多重化前のエラー応答（protocol_error 等）は接続全体の失敗
+                    error = response
+                    break
+        except json.JSONDecodeError as e:
+            error = _error_result(f"Invalid JSON response: {e}", "json_decode_error")
+        except CapabilityError as e:
+            error = _error_result(str(e), "capability_error")
+        except Exception as e:
+            error = _error_result(str(e), type(e).__name__)
+        self.close(error)
+
+    def close(self, error: Optional[Dict[str, Any]] = None) -> None:
+        """接続を閉じ、応答待ちの呼び出しを失敗させる"""
+        with self._lock:
+            self.closed = True
+            pending = list(self._pending.values())
+            self._pending.clear()
+        try:
+            self._sock.close()
+        except Exception:
+            pass
+        for p in pending:
+            p.result = dict(error or _error_result("Connection closed", "capability_error"))
+            p.event.set()
+
+
+_connections: Dict[Tuple[int, str], _MuxConnection] = {}
+_connections_lock = threading.Lock()
+
+
+def _get_connection(sock_path: str, connect_timeout: float, fresh: bool = False) -> _MuxConnection:
+    """永続接続を取得（プロセスごと・ソケットパスごとに1本）"""
+    key = (os.getpid(), sock_path)
+    with _connections_lock:
+        conn = _connections.get(key)
+        if conn is not None and not fresh and conn.is_reusable():
+            return conn
+        if conn is not None:
+            conn.close()
+        conn = _MuxConnection(sock_path, connect_timeout)
+        _connections[key] = conn
+        return conn
+
+
+def _send_with_retry(
+    sock_path: str, connect_timeout: float, request: Dict[str, Any]
+) -> Tuple[_MuxConnection, int, _PendingCall]:
+    """
+    永続接続で送信する
+
+    再利用した接続への送信に失敗した場合のみ、新しい接続で1回だけ再送する
+    （送信失敗時はプロキシに届いていないため二重実行にならない）。
+    """
+    conn = _get_connection(sock_path, connect_timeout)
+    try:
+        mux_id, pending = conn.send(request)
+    except OSError:
+        conn = _get_connection(sock_path, connect_timeout, fresh=True)
+        mux_id, pending = conn.send(request)
+    return conn, mux_id, pending
+
+
+def close() -> None:
+    """このプロセスの永続接続を閉じる"""
+    with _connections_lock:
+        conns = list(_connections.values())
+        _connections.clear()
+    for conn in conns:
+        conn.close()
+
+
 def call(
     permission_id: str,
     args: Optional[Dict[str, Any]] = None,
@@ -91,6 +304,10 @@ def call(
     """
     Capability を呼び出す
 
+    プロキシへの接続はプロセス内で使い回し、複数スレッドからの
+    同時呼び出しは1接続上で多重化される
+    （RUMI_CAPABILITY_PERSISTENT=0 で呼び出しごとの接続に戻る）。
+
     Args:
         permission_id: 実行する権限ID（例: "fs.read", "ui.autogui"）
         args: ハンドラーに渡す引数
@@ -108,15 +325,70 @@ def call(
     """
     sock_path = socket_path or SOCKET_PATH
     timeout = min(float(timeout_seconds), MAX_TIMEOUT)
+    request = _build_request(permission_id, args, timeout, request_id)
 
-    request = {
-        "permission_id": permission_id,
-        "args": args or {},
-        "timeout_seconds": timeout,
-    }
-    if request_id:
-        request["request_id"] = request_id
+    if not _is_persistent_enabled():
+        return _call_once(sock_path, timeout, request)
+
+    try:
+        conn, mux_id, pending = _send_with_retry(sock_path, timeout + 5, request)
+    except OSError as e:
+        return _connect_error_result(e, sock_path)
+    except Exception as e:
+        return _error_result(str(e), type(e).__name__)
+    return conn.wait(mux_id, pending, timeout + 5)
+
+
+def call_many(
+    calls: List[Dict[str, Any]],
+    timeout_seconds: float = DEFAULT_TIMEOUT,
+    socket_path: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """
+    複数の Capability をまとめて呼び出す
+
+    全リクエストを1接続に続けて送り、プロキシ側で並行に処理させる。
+
+    Args:
+        calls: {"permission_id", "args"（任意）, "request_id"（任意）} のリスト
+        timeout_seconds: バッチ全体のタイムアウト秒数（最大120秒）
+        socket_path: UDSソケットパス（通常は指定不要）
+
+    Returns:
+        calls と同じ順序の結果 dict のリスト（各要素は call() の戻り値と同じ形式）
+    """
+    sock_path = socket_path or SOCKET_PATH
+    timeout = min(float(timeout_seconds), MAX_TIMEOUT)
+    requests = [
+        _build_request(c["permission_id"], c.get("args"), timeout, c.get("request_id"))
+        for c in calls
+    ]
+
+    if not _is_persistent_enabled():
+        return [_call_once(sock_path, timeout, r) for r in requests]
 
+    sent: List[Any] = []
+    for request in requests:
+        try:
+            sent.append(_send_with_retry(sock_path, timeout + 5, request))
+        except OSError as e:
+            sent.append(_connect_error_result(e, sock_path))
+        except Exception as e:
+            sent.append(_error_result(str(e), type(e).__name__))
+
+    deadline = time.monotonic() + timeout + 5
+    results: List[Dict[str, Any]] = []
+    for item in sent:
+        if isinstance(item, dict):
+            results.append(item)
+            continue
+        conn, mux_id, pending = item
+        results.append(conn.wait(mux_id, pending, max(0.0, deadline - time.monotonic())))
+    return results
+
+
+def _call_once(sock_path: str, timeout: float, request: Dict[str, Any]) -> Dict[str, Any]:
+    """1リクエストごとに接続する（永続接続無効時）"""
     sock = None
     try:
         sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
@@ -124,66 +396,20 @@ def call(
 
         try:
             sock.connect(sock_path)
-        except FileNotFoundError:
-            return {
-                "success": False,
-                "error": f"Capability proxy socket not found: {sock_path}",
-                "error_type": "socket_not_found",
-                "output": None,
-                "latency_ms": 0,
-            }
-        except PermissionError:
-            return {
-                "success": False,
-                "error": f"Permission denied to capability proxy socket: {sock_path}",
-                "error_type": "permission_denied",
-                "output": None,
-                "latency_ms": 0,
-            }
-        except ConnectionRefusedError:
-            return {
-                "success": False,
-                "error": f"Connection refused to capability proxy: {sock_path}",
-                "error_type": "connection_refused",
-                "output": None,
-                "latency_ms": 0,
-            }
+        except (FileNotFoundError, PermissionError, ConnectionRefusedError) as e:
+            return _connect_error_result(e, sock_path)
 
         _write_length_prefixed_json(sock, request)
         return _read_length_prefixed_json(sock, MAX_RESPONSE_SIZE)
 
     except socket.timeout:
-        return {
-            "success": False,
-            "error": f"Request timed out after {timeout}s",
-            "error_type": "timeout",
-            "output": None,
-            "latency_ms": 0,
-        }
+        return _error_result(f"Request timed out after {timeout}s", "timeout")
     except CapabilityError as e:
-        return {
-            "success": False,
-            "error": str(e),
-            "error_type": "capability_error",
-            "output": None,
-            "latency_ms": 0,
-        }
+        return _error_result(str(e), "capability_error")
     except json.JSONDecodeError as e:
-        return {
-            "success": False,
-            "error": f"Invalid JSON response: {e}",
-            "error_type": "json_decode_error",
-            "output": None,
-            "latency_ms": 0,
-        }
+        return _error_result(f"Invalid JSON response: {e}", "json_decode_error")
     except Exception as e:
-        return {
-            "success": False,
-            "error": str(e),
-            "error_type": type(e).__name__,
-            "output": None,
-            "latency_ms": 0,
-        }
+        return _error_result(str(e), type(e).__name__)
     finally:
         if sock:
             try:
@@ -192,6 +418,149 @@ def call(
                 pass
 
 
+# ============================================================
+# asyncio クライアント
+# ============================================================
+
+class AsyncCapabilityClient:
+    """
+    asyncio ネイティブの Capability クライアント
+
+    1本の永続接続上で、複数のコルーチンからの呼び出しを多重化する。
+    イベントループごとに1インスタンスを使うこと。
+
+    使用例:
+        async with rumi_capability.AsyncCapabilityClient() as client:
+            a, b = await asyncio.gather(
+                client.call("store.get", {"store_id": "s", "key": "a"}),
+                client.call("store.get", {"store_id": "s", "key": "b"}),
+            )
+    """
+
+    def __init__(self, socket_path: Optional[str] = None) -> None:
+        self._sock_path = socket_path or SOCKET_PATH
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._read_task: Optional[asyncio.Task] = None
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._ids = itertools.count(1)
+        self._connect_lock: Optional[asyncio.Lock] = None
+        self._closed_error: Optional[Dict[str, Any]] = None
+
+    async def __aenter__(self) -> "AsyncCapabilityClient":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+    async def _ensure_connected(self) -> None:
+        if self._connect_lock is None:
+            self._connect_lock = asyncio.Lock()
+        async with self._connect_lock:
+            if self._writer is not None and self._closed_error is None:
+                return
+            self._reader, self._writer = await asyncio.open_unix_connection(self._sock_path)
+            self._closed_error = None
+            self._read_task = asyncio.ensure_future(self._read_loop())
+
+    async def _read_loop(self) -> None:
+        error = _error_result("Connection closed by proxy", "capability_error")
+        try:
+            while True:
+                length = struct.unpack(">I", await self._reader.readexactly(4))[0]
+                if length > MAX_RESPONSE_SIZE:
+                    raise CapabilityError(f"Response too large: {length} > {MAX_RESPONSE_SIZE}")
+                payload = await self._reader.readexactly(length) if length else b"{}"
+                response = json.loads(payload.decode("utf-8"))
+                mux_id = response.pop("mux_id", None)
+                future = self._pending.pop(mux_id, None)
+                if future is not None:
+                    if not future.done():
+                        future.set_result(response)
+                elif mux_id is None:
+                    error = response
+                    break
+        except asyncio.CancelledError:
+            error = _error_result("Client closed", "capability_error")
+        except asyncio.IncompleteReadError:
+            pass
+        except json.JSONDecodeError as e:
+            error = _error_result(f"Invalid JSON response: {e}", "json_decode_error")
+        except Exception as e:
+            error = _error_result(str(e), type(e).__name__)
+        self._fail_pending(error)
+
+    def _fail_pending(self, error: Dict[str, Any]) -> None:
+        self._closed_error = error
+        pending = list(self._pending.values())
+        self._pending.clear()
+        for future in pending:
+            if not future.done():
+                future.set_result(dict(error))
+        if self._writer is not None:
+            self._writer.close()
+
+    async def call(
+        self,
+        permission_id: str,
+        args: Optional[Dict[str, Any]] = None,
+        timeout_seconds: float = DEFAULT_TIMEOUT,
+        request_id: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Capability を呼び出す（戻り値は rumi_capability.call() と同じ）"""
+        timeout = min(float(timeout_seconds), MAX_TIMEOUT)
+        request = _build_request(permission_id, args, timeout, request_id)
+        try:
+            await self._ensure_connected()
+        except OSError as e:
+            return _connect_error_result(e, self._sock_path)
+
+        mux_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[mux_id] = future
+        payload = json.dumps(dict(request, mux_id=mux_id), ensure_ascii=False).encode("utf-8")
+        try:
+            self._writer.write(struct.pack(">I", len(payload)) + payload)
+            await self._writer.drain()
+        except OSError as e:
+            self._pending.pop(mux_id, None)
+            return _error_result(str(e), type(e).__name__)
+
+        try:
+            return await asyncio.wait_for(future, timeout + 5)
+        except asyncio.TimeoutError:
+            self._pending.pop(mux_id, None)
+            return _error_result(f"Request timed out after {timeout}s", "timeout")
+
+    async def call_many(
+        self,
+        calls: List[Dict[str, Any]],
+        timeout_seconds: float = DEFAULT_TIMEOUT,
+    ) -> List[Dict[str, Any]]:
+        """複数の Capability を並行に呼び出す（戻り値は rumi_capability.call_many() と同じ）"""
+        return list(await asyncio.gather(*(
+            self.call(c["permission_id"], c.get("args"), timeout_seconds, c.get("request_id"))
+            for c in calls
+        )))
+
+    async def close(self) -> None:
+        """接続を閉じる"""
+        if self._read_task is not None:
+            self._read_task.cancel()
+            try:
+                await self._read_task
+            except asyncio.CancelledError:
+                pass
+            self._read_task = None
+        if self._writer is not None:
+            self._writer.close()
+            try:
+                await self._writer.wait_closed()
+            except Exception:
+                pass
+            self._writer = None
+
+
 def get_secret(key: str) -> Optional[str]:
     """
     Retrieve a secret value by key.
@@ -22,15 +22,25 @@ PR-B: このファイルが唯一の実体。
         print(result["body"])
     else:
         print(f"Error: {result['error']}")
+
+ストリーミング（巨大ダウンロード、SSE 等）:
+    with rumi_syscall.stream("GET", "https://api.example.com/events") as resp:
+        if resp.success:
+            for chunk in resp:
+                handle(chunk)  # bytes
+        print(resp.trailer)  # bytes_read, truncated, error ...
 """
 
 from __future__ import annotations
 
+import itertools
 import json
 import os
 import socket
 import struct
-from typing import Any, Dict, Optional
+import threading
+import time
+from typing import Any, Dict, Iterator, Optional, Tuple
 
 
 # デフォルトのUDSソケットパス（コンテナ内）
@@ -43,6 +53,10 @@ SOCKET_PATH = os.environ.get("RUMI_EGRESS_SOCKET", DEFAULT_SOCKET_PATH)
 MAX_RESPONSE_SIZE = 4 * 1024 * 1024  # 4MB
 DEFAULT_TIMEOUT = 30.0
 MAX_TIMEOUT = 120.0
+MAX_STREAM_CHUNK_SIZE = 65536  # プロキシ側 MAX_RESPONSE_READ_CHUNK と同じ
+
+# 永続接続をアイドル後に再利用する期限（プロキシ側のアイドルタイムアウト 30秒より短くする）
+CLIENT_IDLE_REUSE_SECONDS = 15.0
 
 
 class SyscallError(Exception):
@@ -79,6 +93,17 @@ def _read_length_prefixed_json(sock: socket.socket, max_size: int) -> Dict[str,
     return json.loads(data.decode("utf-8"))
 
 
+def _recv_exact(sock: socket.socket, n: int) -> bytes:
+    """n バイトちょうど読み取る"""
+    data = b""
+    while len(data) < n:
+        chunk = sock.recv(min(n - len(data), 65536))
+        if not chunk:
+            raise SyscallError("Connection closed by proxy")
+        data += chunk
+    return data
+
+
 def _write_length_prefixed_json(sock: socket.socket, data: Dict[str, Any]) -> None:
     """length-prefix JSON を書き込む"""
     payload = json.dumps(data, ensure_ascii=False).encode("utf-8")
@@ -86,6 +111,168 @@ def _write_length_prefixed_json(sock: socket.socket, data: Dict[str, Any]) -> No
     sock.sendall(length + payload)
 
 
+def _error_result(error: str, error_type: str) -> Dict[str, Any]:
+    return {
+        "success": False,
+        "error": error,
+        "error_type": error_type,
+    }
+
+
+def _connect_error_result(e: OSError, sock_path: str) -> Dict[str, Any]:
+    if isinstance(e, FileNotFoundError):
+        return _error_result(f"Egress proxy socket not found: {sock_path}", "socket_not_found")
+    if isinstance(e, PermissionError):
+        return _error_result(f"Permission denied to egress proxy socket: {sock_path}", "permission_denied")
+    if isinstance(e, ConnectionRefusedError):
+        return _error_result(f"Connection refused to egress proxy: {sock_path}", "connection_refused")
+    return _error_result(str(e), type(e).__name__)
+
+
+def _is_persistent_enabled() -> bool:
+    """RUMI_EGRESS_PERSISTENT が有効か（デフォルト有効）"""
+    return os.environ.get("RUMI_EGRESS_PERSISTENT", "1").lower() in ("1", "true", "yes")
+
+
+# ============================================================
+# 永続・多重化接続
+# ============================================================
+
+class _PendingRequest:
+    __slots__ = ("event", "result")
+
+    def __init__(self) -> None:
+        self.event = threading.Event()
+        self.result: Optional[Dict[str, Any]] = None
+
+
+class _MuxConnection:
+    """
+    プロキシへの永続接続
+
+    リクエストに "mux_id" を付けて送り、受信スレッドが応答を
+    mux_id で呼び出し元に振り分ける。複数スレッドから同時に使える。
+    ストリーミング要求は多重化できないため stream() は専用接続を使う。
+    """
+
+    def __init__(self, sock_path: str, connect_timeout: float) -> None:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.settimeout(connect_timeout)
+            sock.connect(sock_path)
+            sock.settimeout(None)
+        except Exception:
+            sock.close()
+            raise
+        self._sock = sock
+        self._send_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._pending: Dict[int, _PendingRequest] = {}
+        self._ids = itertools.count(1)
+        self.closed = False
+        self.last_used = time.monotonic()
+        threading.Thread(target=self._read_loop, name="rumi-syscall-client", daemon=True).start()
+
+    def is_reusable(self) -> bool:
+        """アイドル期限内で、まだ使える接続か"""
+        with self._lock:
+            if self.closed:
+                return False
+            if self._pending:
+                return True
+            return time.monotonic() - self.last_used < CLIENT_IDLE_REUSE_SECONDS
+
+    def send(self, request: Dict[str, Any]) -> Tuple[int, _PendingRequest]:
+        """リクエストを送る（送信失敗時は接続を閉じて OSError を送出）"""
+        pending = _PendingRequest()
+        with self._lock:
+            if self.closed:
+                raise ConnectionError("Connection closed")
+            mux_id = next(self._ids)
+            self._pending[mux_id] = pending
+        frame = dict(request, mux_id=mux_id)
+        try:
+            with self._send_lock:
+                _write_length_prefixed_json(self._sock, frame)
+        except OSError:
+            self.close()
+            raise
+        return mux_id, pending
+
+    def wait(self, mux_id: int, pending: _PendingRequest, timeout: float) -> Dict[str, Any]:
+        """応答を待つ（タイムアウト後に届いた応答は捨てる）"""
+        if not pending.event.wait(timeout):
+            with self._lock:
+                self._pending.pop(mux_id, None)
+            return _error_result(f"Request timed out after {timeout}s", "timeout")
+        return pending.result
+
+    def _read_loop(self) -> None:
+        error = _error_result("Connection closed by proxy", "syscall_error")
+        try:
+            while True:
+                response = _read_length_prefixed_json(self._sock, MAX_RESPONSE_SIZE)
+                mux_id = response.pop("mux_id", None)
+                with self._lock:
+                    pending = self._pending.pop(mux_id, None)
+                    self.last_used = time.monotonic()
+                if pending is not None:
+                    pending.result = response
+                    pending.event.set()
+                elif mux_id is None:
+                    # 多重化前のエラー応答（protocol_error 等）は接続全体の失敗
+                    error = response
+                    break
+        except json.JSONDecodeError as e:
+            error = _error_result(f"Invalid JSON response: {e}", "json_decode_error")
+        except SyscallError as e:
+            error = _error_result(str(e), "syscall_error")
+        except Exception as e:
+            error = _error_result(str(e), type(e).__name__)
+        self.close(error)
+
+    def close(self, error: Optional[Dict[str, Any]] = None) -> None:
+        """接続を閉じ、応答待ちのリクエストを失敗させる"""
+        with self._lock:
+            self.closed = True
+            pending = list(self._pending.values())
+            self._pending.clear()
+        try:
+            self._sock.close()
+        except Exception:
+            pass
+        for p in pending:
+            p.result = dict(error or _error_result("Connection closed", "syscall_error"))
+            p.event.set()
+
+
+_connections: Dict[Tuple[int, str], _MuxConnection] = {}
+_connections_lock = threading.Lock()
+
+
+def _get_connection(sock_path: str, connect_timeout: float, fresh: bool = False) -> _MuxConnection:
+    """永続接続を取得（プロセスごと・ソケットパスごとに1本）"""
+    key = (os.getpid(), sock_path)
+    with _connections_lock:
+        conn = _connections.get(key)
+        if conn is not None and not fresh and conn.is_reusable():
+            return conn
+        if conn is not None:
+            conn.close()
+        conn = _MuxConnection(sock_path, connect_timeout)
+        _connections[key] = conn
+        return conn
+
+
+def close() -> None:
+    """このプロセスの永続接続を閉じる"""
+    with _connections_lock:
+        conns = list(_connections.values())
+        _connections.clear()
+    for conn in conns:
+        conn.close()
+
+
 def http_request(
     method: str,
     url: str,
@@ -96,6 +283,10 @@ def http_request(
 ) -> Dict[str, Any]:
     """
     HTTPリクエストを実行（Egress Proxy経由）
+
+    プロキシへの接続はプロセス内で使い回し、複数スレッドからの
+    同時リクエストは1接続上で多重化される
+    （RUMI_EGRESS_PERSISTENT=0 で呼び出しごとの接続に戻る）。
     
     Args:
         method: HTTPメソッド（GET, POST, PUT, DELETE, PATCH, HEAD）
@@ -129,7 +320,28 @@ def http_request(
         "body": body,
         "timeout_seconds": timeout,
     }
-    
+
+    if not _is_persistent_enabled():
+        return _request_once(sock_path, timeout, request)
+
+    try:
+        conn = _get_connection(sock_path, timeout + 5)
+        try:
+            mux_id, pending = conn.send(request)
+        except OSError:
+            # 再利用した接続への送信失敗はプロキシに届いていないため、新しい接続で1回だけ再送
+            conn = _get_connection(sock_path, timeout + 5, fresh=True)
+            mux_id, pending = conn.send(request)
+    except OSError as e:
+        return _connect_error_result(e, sock_path)
+    except Exception as e:
+        return _error_result(str(e), type(e).__name__)
+    # プロキシ処理時間を考慮
+    return conn.wait(mux_id, pending, timeout + 5)
+
+
+def _request_once(sock_path: str, timeout: float, request: Dict[str, Any]) -> Dict[str, Any]:
+    """1リクエストごとに接続する（永続接続無効時）"""
     sock = None
     try:
         # UDSに接続
@@ -138,57 +350,23 @@ def http_request(
         
         try:
             sock.connect(sock_path)
-        except FileNotFoundError:
-            return {
-                "success": False,
-                "error": f"Egress proxy socket not found: {sock_path}",
-                "error_type": "socket_not_found",
-            }
-        except PermissionError:
-            return {
-                "success": False,
-                "error": f"Permission denied to egress proxy socket: {sock_path}",
-                "error_type": "permission_denied",
-            }
-        except ConnectionRefusedError:
-            return {
-                "success": False,
-                "error": f"Connection refused to egress proxy: {sock_path}",
-                "error_type": "connection_refused",
-            }
+        except (FileNotFoundError, PermissionError, ConnectionRefusedError) as e:
+            return _connect_error_result(e, sock_path)
         
         # リクエスト送信
         _write_length_prefixed_json(sock, request)
         
         # レスポンス受信
-        response = _read_length_prefixed_json(sock, MAX_RESPONSE_SIZE)
-        
-        return response
+        return _read_length_prefixed_json(sock, MAX_RESPONSE_SIZE)
         
     except socket.timeout:
-        return {
-            "success": False,
-            "error": f"Request timed out after {timeout}s",
-            "error_type": "timeout",
-        }
+        return _error_result(f"Request timed out after {timeout}s", "timeout")
     except SyscallError as e:
-        return {
-            "success": False,
-            "error": str(e),
-            "error_type": "syscall_error",
-        }
+        return _error_result(str(e), "syscall_error")
     except json.JSONDecodeError as e:
-        return {
-            "success": False,
-            "error": f"Invalid JSON response: {e}",
-            "error_type": "json_decode_error",
-        }
+        return _error_result(f"Invalid JSON response: {e}", "json_decode_error")
     except Exception as e:
-        return {
-            "success": False,
-            "error": str(e),
-            "error_type": type(e).__name__,
-        }
+        return _error_result(str(e), type(e).__name__)
     finally:
         if sock:
             try:
@@ -197,6 +375,175 @@ def http_request(
                 pass
 
 
+class StreamResponse:
+    """
+    ストリーミング応答
+
+    ヘッダーは stream() から返った時点で読み取り済み。
+    ボディは反復（for chunk in resp）で bytes チャンクとして逐次受け取る。
+    反復の終了後、trailer に bytes_read / truncated / error 等が入る。
+
+    ヘッダー送出前に失敗した場合は success=False で、反復しても何も返さない。
+    """
+
+    def __init__(self, sock: Optional[socket.socket], header: Dict[str, Any]) -> None:
+        self._sock = sock
+        self._done = sock is None
+        self.success: bool = bool(header.get("success"))
+        self.status_code: Optional[int] = header.get("status_code")
+        self.headers: Dict[str, str] = header.get("headers") or {}
+        self.final_url: Optional[str] = header.get("final_url")
+        self.redirect_hops: int = header.get("redirect_hops", 0)
+        self.error: Optional[str] = header.get("error")
+        self.error_type: Optional[str] = header.get("error_type")
+        self.trailer: Optional[Dict[str, Any]] = None if sock is not None else dict(header)
+
+    def __enter__(self) -> "StreamResponse":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __iter__(self) -> Iterator[bytes]:
+        return self.iter_chunks()
+
+    def iter_chunks(self) -> Iterator[bytes]:
+        """ボディチャンクを順に返す（1回のみ反復可能）"""
+        while not self._done:
+            chunk = self._next_chunk()
+            if chunk is None:
+                return
+            yield chunk
+
+    def read(self) -> bytes:
+        """残りのボディを全て読み取る"""
+        return b"".join(self.iter_chunks())
+
+    def _next_chunk(self) -> Optional[bytes]:
+        try:
+            length = struct.unpack(">I", _recv_exact(self._sock, 4))[0]
+            if length > MAX_STREAM_CHUNK_SIZE:
+                raise SyscallError(f"Stream chunk too large: {length} > {MAX_STREAM_CHUNK_SIZE}")
+            if length > 0:
+                return _recv_exact(self._sock, length)
+            self._set_trailer(_read_length_prefixed_json(self._sock, MAX_RESPONSE_SIZE))
+        except socket.timeout:
+            self._set_trailer({
+                "success": False,
+                "error": "Stream timed out",
+                "error_type": "timeout",
+                "truncated": True,
+            })
+        except (SyscallError, OSError, ValueError) as e:
+            self._set_trailer({
+                "success": False,
+                "error": str(e),
+                "error_type": "syscall_error",
+                "truncated": True,
+            })
+        return None
+
+    def _set_trailer(self, trailer: Dict[str, Any]) -> None:
+        trailer.pop("stream", None)
+        self.trailer = trailer
+        self.success = self.success and bool(trailer.get("success"))
+        if trailer.get("error"):
+            self.error = trailer.get("error")
+            self.error_type = trailer.get("error_type")
+        self.close()
+
+    def close(self) -> None:
+        """接続を閉じる（途中で閉じた場合プロキシ側は転送を打ち切る）"""
+        self._done = True
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            except Exception:
+                pass
+            self._sock = None
+
+
+def stream(
+    method: str,
+    url: str,
+    headers: Optional[Dict[str, str]] = None,
+    body: Optional[str] = None,
+    timeout_seconds: float = DEFAULT_TIMEOUT,
+    socket_path: Optional[str] = None
+) -> StreamResponse:
+    """
+    HTTPリクエストを実行し、レスポンスボディをストリーミングで受け取る
+
+    引数は http_request() と同じ。ボディはプロキシのメモリに溜めずに
+    チャンク単位で届くため、巨大なダウンロードや SSE に使う。
+    timeout_seconds はチャンク間の待ち時間にも適用される。
+
+    Returns:
+        StreamResponse（with 文で使うこと）
+    """
+    sock_path = socket_path or SOCKET_PATH
+    timeout = min(float(timeout_seconds), MAX_TIMEOUT)
+
+    request = {
+        "method": method.upper(),
+        "url": url,
+        "headers": headers or {},
+        "body": body,
+        "timeout_seconds": timeout,
+        "stream": True,
+    }
+
+    sock = None
+    try:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(timeout + 5)  # プロキシ処理時間を考慮
+        try:
+            sock.connect(sock_path)
+        except (FileNotFoundError, PermissionError, ConnectionRefusedError) as e:
+            header = _connect_error_result(e, sock_path)
+        else:
+            _write_length_prefixed_json(sock, request)
+            header = _read_length_prefixed_json(sock, MAX_RESPONSE_SIZE)
+    except socket.timeout:
+        header = _error_result(f"Request timed out after {timeout}s", "timeout")
+    except SyscallError as e:
+        header = _error_result(str(e), "syscall_error")
+    except json.JSONDecodeError as e:
+        header = _error_result(f"Invalid JSON response: {e}", "json_decode_error")
+    except Exception as e:
+        header = _error_result(str(e), type(e).__name__)
+
+    if header.get("stream") == "header":
+        return StreamResponse(sock, header)
+
+    # ヘッダー送出前の失敗は通常のエラー応答1フレーム
+    if sock is not None:
+        try:
+            sock.close()
+        except Exception:
+            pass
+    return StreamResponse(None, header)
+
+
+def iter_stream(
+    method: str,
+    url: str,
+    headers: Optional[Dict[str, str]] = None,
+    body: Optional[str] = None,
+    timeout_seconds: float = DEFAULT_TIMEOUT
+) -> Iterator[bytes]:
+    """
+    ボディチャンクのみを返すイテレータ（stream() のショートカット）
+
+    失敗・打ち切り時は SyscallError を送出する。
+    """
+    with stream(method, url, headers=headers, body=body, timeout_seconds=timeout_seconds) as resp:
+        for chunk in resp:
+            yield chunk
+        if not resp.success:
+            raise SyscallError(resp.error or "Stream failed")
+
+
 def get(
     url: str,
     headers: Optional[Dict[str, str]] = None,
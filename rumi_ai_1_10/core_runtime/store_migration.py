@@ -6,6 +6,11 @@ JSON ディレクトリ（index.json）が存在する場合に自動実行さ
 
 stores.db.tmp に書き込み → os.replace で atomic rename。
 JSON ファイルは削除しない（ロールバック用）。
+
+import_store_files():
+旧 store.set が書いた <store_root>/<key>.json を Store 単位で
+store_data に取り込む。StoreRegistry が Store への初回アクセス時に呼ぶ。
+取り込み済みの Store は store_file_migrations に記録し、二度は取り込まない。
 """
 
 from __future__ import annotations
@@ -54,6 +59,105 @@ def _now_ts() -> str:
     return datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
 
 
+def _iter_store_files(store_root: Path):
+    """store_root 配下の (key, json_file) を列挙する。"""
+    if not store_root.is_dir():
+        return
+    for json_file in sorted(store_root.rglob("*.json")):
+        if not json_file.is_file():
+            continue
+        try:
+            rel = json_file.relative_to(store_root)
+        except ValueError:
+            continue
+        yield str(rel.with_suffix("")).replace("\\", "/"), json_file
+
+
+def _read_store_file(json_file: Path) -> Any:
+    with open(json_file, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def import_store_files(
+    conn: sqlite3.Connection,
+    store_id: str,
+    store_root: Path,
+) -> Optional[int]:
+    """
+    旧ファイルストアの <key>.json を store_data に取り込む。
+
+    既に store_data にあるキーは上書きしない（DB 側が新しい）。
+    BEGIN IMMEDIATE 内で取り込み済みかを確認するため、
+    複数プロセスが同時に呼んでも取り込みは1回だけ行われる。
+
+    Args:
+        conn: StoreRegistry の接続
+        store_id: 対象 Store
+        store_root: Store のルートディレクトリ
+
+    Returns:
+        取り込んだキー数。取り込み済みだった場合は None
+    """
+    # 循環インポート回避
+    from .store_registry import _allocate_seq, _encode_value
+
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        row = conn.execute(
+            "SELECT 1 FROM store_file_migrations WHERE store_id = ?",
+            (store_id,),
+        ).fetchone()
+        if row is not None:
+            conn.rollback()
+            return None
+
+        existing = {
+            r[0] for r in conn.execute(
+                "SELECT key FROM store_data WHERE store_id = ?", (store_id,),
+            )
+        }
+        rows = []
+        for key, json_file in _iter_store_files(store_root):
+            if key in existing:
+                continue
+            try:
+                value_json, value_hash = _encode_value(_read_store_file(json_file))
+            except (json.JSONDecodeError, OSError, TypeError, ValueError) as e:
+                logger.warning("Failed to read data file %s: %s", json_file, e)
+                continue
+            rows.append((key, value_json, value_hash))
+
+        now = _now_ts()
+        if rows:
+            first_seq = _allocate_seq(conn, store_id, len(rows), key_delta=len(rows))
+            conn.executemany(
+                "INSERT INTO store_data "
+                "(store_id, key, value, value_hash, updated_at, seq) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (store_id, key, value_json, value_hash, now, first_seq + i)
+                    for i, (key, value_json, value_hash) in enumerate(rows)
+                ],
+            )
+        imported = len(rows)
+
+        conn.execute(
+            "INSERT INTO store_file_migrations (store_id, imported, migrated_at) "
+            "VALUES (?, ?, ?)",
+            (store_id, imported, now),
+        )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+    if imported:
+        logger.info(
+            "Imported %d file-backed keys into SQLite store %s", imported, store_id,
+        )
+    return imported
+
+
 def cleanup_stale_tmp(db_path: Path) -> None:
     """
     起動時に stores.db.tmp が残っていたら削除する。
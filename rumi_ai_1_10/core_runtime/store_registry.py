@@ -10,8 +10,15 @@ Store（共有領域）を管理する。
 - #62 create_store_for_pack: 宣言的Store作成
 - #6  cas: Compare-And-Swap (BEGIN IMMEDIATE + value_hash)
 - I-1  audit_store_usage: ストアキーサイズ集計
-- #18 list_keys: ページネーション付きキー列挙
+- #18 list_keys: ページネーション付きキー列挙（件数は stores.key_count から返す）
+- iter_keys / iter_items: エクスポート・バックアップ用のバッチ単位ストリーミング
 - #19 batch_get: 複数キー一括取得
+- get_value / set_value / delete_value: store.get / set / delete の SQLite 実装
+- batch_set / batch_delete: 複数キーを1トランザクションで書き込み／削除
+- 旧ファイルストア（<root>/<key>.json）の初回アクセス時自動取り込み
+- changes / watch: Store ごとの連番 (seq) と削除 tombstone による変更フィード
+- 値キャッシュ: デコード済みの値を value_hash で検証する LRU
+  (RUMI_STORE_VALUE_CACHE_BYTES) と StoreDefinition のキャッシュ
 
 T-041 改善:
 - 接続ヘルスチェック (60秒間隔 SELECT 1)
@@ -30,10 +37,11 @@ import shutil
 import sqlite3
 import threading
 import time
+from collections import OrderedDict
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 
 # ---------------------------------------------------------------------------
@@ -45,8 +53,25 @@ STORES_BASE_DIR = Path("user_data/stores")
 STORES_DB_PATH = "user_data/stores/stores.db"
 MAX_STORES_PER_PACK = 10
 MAX_VALUE_BYTES_CAS = 1 * 1024 * 1024  # 1MB
+MAX_VALUE_BYTES = 1 * 1024 * 1024  # store.set / batch_set の1値あたり上限 (1MB)
+MAX_BATCH_WRITE_BYTES = 4 * 1024 * 1024  # batch_set の合計上限 (4MB)
+
+# スキーマバージョン (PRAGMA user_version)
+#   1: stores / store_data
+#   2: store_data.seq / stores.last_seq / store_tombstones（変更フィード）
+#   3: stores.key_count（list_keys の件数をページごとの COUNT(*) なしで返す）
+SCHEMA_VERSION = 3
+
+# 変更フィード (changes / watch)
+MAX_CHANGES_LIMIT = 1000
+MAX_WATCH_TIMEOUT = 30.0  # seconds
+WATCH_POLL_INTERVAL = 0.5  # 他プロセスの書き込み検出用の再確認間隔 (seconds)
 CAS_LOCK_TIMEOUT = 5  # seconds (互換用に残す)
 
+# iter_keys / iter_items の1バッチあたりの件数
+DEFAULT_ITER_BATCH_SIZE = 500
+MAX_ITER_BATCH_SIZE = 5000
+
 # 接続ヘルスチェック間隔 (秒)
 _HEALTH_CHECK_INTERVAL = 60.0
 
@@ -58,6 +83,9 @@ _HEALTH_CHECK_INTERVAL = 60.0
 # expected_value を省略する（デフォルト _EXPECT_MISSING が適用される）。
 _EXPECT_MISSING = object()
 
+# 値キャッシュ (RUMI_STORE_VALUE_CACHE_BYTES, 0 で無効)
+DEFAULT_VALUE_CACHE_BYTES = 8 * 1024 * 1024  # 8MB
+
 # key バリデーション用パターン（スラッシュ許可 — キー階層で使用中）
 _KEY_PATTERN = re.compile(r'^[a-zA-Z0-9_/.:\-]{1,512}$')
 
@@ -101,12 +129,71 @@ def _validate_key(key: str) -> Optional[str]:
     return None
 
 
+def _encode_value(value: Any) -> "tuple[str, str]":
+    """
+    値を正規化 JSON とその SHA-256 に変換する。
+
+    store_data.value / value_hash の書き込みはすべてこの形式に揃える
+    （cas の value_hash 比較と一致させるため）。
+
+    Raises:
+        TypeError / ValueError: JSON シリアライズ不可
+    """
+    canonical = json.dumps(
+        value, sort_keys=True, ensure_ascii=False, separators=(",", ":")
+    )
+    return canonical, hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _allocate_seq(
+    conn: sqlite3.Connection,
+    store_id: str,
+    count: int,
+    key_delta: int = 0,
+) -> int:
+    """
+    stores.last_seq を count 進め、割り当てた先頭の seq を返す。
+
+    書き込みトランザクション内で呼ぶこと。seq は書き込みロック下で
+    採番されるため、コミット順と seq の順序は一致する。
+    key_delta は同じ UPDATE で stores.key_count に加算する
+    （新規キー数 − 削除キー数）。
+    """
+    conn.execute(
+        "UPDATE stores SET last_seq = last_seq + ?, key_count = key_count + ? "
+        "WHERE store_id = ?",
+        (count, key_delta, store_id),
+    )
+    row = conn.execute(
+        "SELECT last_seq FROM stores WHERE store_id = ?", (store_id,),
+    ).fetchone()
+    if row is None:
+        # 別プロセスで Store が削除された
+        raise sqlite3.IntegrityError(f"Store not found: {store_id}")
+    return row[0] - count + 1
+
+
+def _add_column_if_missing(
+    conn: sqlite3.Connection, table: str, column: str, decl: str,
+) -> None:
+    """
+    列がなければ ALTER TABLE で追加する。
+
+    user_version の更新前に中断された DB（列だけ追加済み）でも
+    移行をやり直せるようにするため。
+    """
+    columns = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+    if column not in columns:
+        conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {decl}")
+
+
 def _normalize_value_hash(value: Any) -> str:
     """
     値の正規化ハッシュ (SHA-256) を計算する。
 
     json.dumps(value, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
     の SHA-256 hex digest を返す。CAS 比較に使用する。
+    保存済みの value_hash と一致させるため、_encode_value() と同じ正規化を使う。
 
     Args:
         value: ハッシュ対象の Python オブジェクト
@@ -114,10 +201,7 @@ def _normalize_value_hash(value: Any) -> str:
     Returns:
         SHA-256 hex digest 文字列
     """
-    canonical = json.dumps(
-        value, sort_keys=True, ensure_ascii=False, separators=(",", ":")
-    )
-    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+    return _encode_value(value)[1]
 
 
 # ---------------------------------------------------------------------------
@@ -163,6 +247,122 @@ class StoreResult:
         }
 
 
+# ---------------------------------------------------------------------------
+# 値キャッシュ
+# ---------------------------------------------------------------------------
+
+def get_value_cache_bytes() -> int:
+    """RUMI_STORE_VALUE_CACHE_BYTES を返す（0 以下でキャッシュ無効）。"""
+    try:
+        return max(0, int(os.environ.get(
+            "RUMI_STORE_VALUE_CACHE_BYTES", str(DEFAULT_VALUE_CACHE_BYTES),
+        )))
+    except (TypeError, ValueError):
+        return DEFAULT_VALUE_CACHE_BYTES
+
+
+def _copy_json(value: Any) -> Any:
+    """JSON 由来の値を複製する（呼び出し側の変更がキャッシュに波及しないように）。"""
+    if isinstance(value, dict):
+        return {k: _copy_json(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_copy_json(v) for v in value]
+    return value
+
+
+class _ValueCache:
+    """
+    デコード済みの値のバイト数上限付き LRU
+
+    エントリは (store_id, key) ごとに value_hash と共に保持し、
+    読み取り時に DB 上の value_hash と一致した場合のみヒットとする。
+    そのため別プロセスの書き込みで古い値を返すことはない
+    （同一プロセスの書き込みは invalidate() で即座に捨てる）。
+    サイズは値の JSON テキストのバイト数で数える。
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._max_entry_bytes = max_bytes // 4
+        self._entries: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._hits: Dict[str, int] = {}
+        self._misses: Dict[str, int] = {}
+        self._evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def cached_hash(self, store_id: str, key: str) -> Optional[str]:
+        """キャッシュ中の value_hash（無ければ None）"""
+        with self._lock:
+            entry = self._entries.get((store_id, key))
+        return entry[0] if entry is not None else None
+
+    def lookup(self, store_id: str, key: str, value_hash: str) -> "Optional[tuple]":
+        """value_hash が一致すれば (値の複製, サイズ) を返す"""
+        with self._lock:
+            entry = self._entries.get((store_id, key))
+            if entry is None or entry[0] != value_hash:
+                self._misses[store_id] = self._misses.get(store_id, 0) + 1
+                return None
+            self._entries.move_to_end((store_id, key))
+            self._hits[store_id] = self._hits.get(store_id, 0) + 1
+            value, size = entry[1], entry[2]
+        return _copy_json(value), size
+
+    def put(self, store_id: str, key: str, value_hash: str, value: Any, size: int) -> None:
+        if size > self._max_entry_bytes:
+            return
+        cache_key = (store_id, key)
+        with self._lock:
+            old = self._entries.pop(cache_key, None)
+            if old is not None:
+                self._bytes -= old[2]
+            self._entries[cache_key] = (value_hash, _copy_json(value), size)
+            self._bytes += size
+            while self._bytes > self.max_bytes and self._entries:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted[2]
+                self._evictions += 1
+
+    def invalidate(self, store_id: str, keys: List[str]) -> None:
+        with self._lock:
+            for key in keys:
+                old = self._entries.pop((store_id, key), None)
+                if old is not None:
+                    self._bytes -= old[2]
+
+    def invalidate_store(self, store_id: str) -> None:
+        with self._lock:
+            for cache_key in [k for k in self._entries if k[0] == store_id]:
+                self._bytes -= self._entries.pop(cache_key)[2]
+            self._hits.pop(store_id, None)
+            self._misses.pop(store_id, None)
+
+    def stats(self, store_id: Optional[str] = None) -> Dict[str, Any]:
+        with self._lock:
+            if store_id is None:
+                hits = sum(self._hits.values())
+                misses = sum(self._misses.values())
+            else:
+                hits = self._hits.get(store_id, 0)
+                misses = self._misses.get(store_id, 0)
+            total = hits + misses
+            return {
+                "enabled": self.enabled,
+                "hits": hits,
+                "misses": misses,
+                "hit_rate": (hits / total) if total else 0.0,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "evictions": self._evictions,
+            }
+
+
 # ---------------------------------------------------------------------------
 # StoreRegistry
 # ---------------------------------------------------------------------------
@@ -171,9 +371,25 @@ class StoreRegistry:
     MAX_BATCH_KEYS = 100
     MAX_BATCH_RESPONSE_BYTES = 900 * 1024  # 900KB
 
-    def __init__(self, db_path: Optional[str] = None):
+    def __init__(
+        self,
+        db_path: Optional[str] = None,
+        value_cache_bytes: Optional[int] = None,
+    ):
         self._db_path = Path(db_path or STORES_DB_PATH)
         self._local = threading.local()
+        # 読み取りキャッシュ: デコード済みの値 / StoreDefinition（存在するもののみ）
+        self._value_cache = _ValueCache(
+            get_value_cache_bytes() if value_cache_bytes is None else value_cache_bytes
+        )
+        self._store_defs: Dict[str, StoreDefinition] = {}
+        self._store_defs_lock = threading.Lock()
+        # 旧ファイルストアの取り込み確認済み store_id（プロセス内キャッシュ）
+        self._file_migrated: set = set()
+        self._file_migrated_lock = threading.Lock()
+        # watch 用: 同一プロセス内の書き込みで世代を進めて通知する
+        self._change_cond = threading.Condition()
+        self._change_gen = 0
 
         # 起動時: stale tmp を削除
         from .store_migration import cleanup_stale_tmp
@@ -229,6 +445,13 @@ class StoreRegistry:
 
     def _create_conn(self) -> sqlite3.Connection:
         """新しい SQLite connection を作成し threading.local に保存する。"""
+        conn = self._connect()
+        self._local.conn = conn
+        self._local.last_health_check = time.monotonic()
+        return conn
+
+    def _connect(self) -> sqlite3.Connection:
+        """新しい SQLite connection を作成する（threading.local には保存しない）。"""
         conn = sqlite3.connect(
             str(self._db_path),
             timeout=10.0,
@@ -236,8 +459,6 @@ class StoreRegistry:
         )
         conn.row_factory = sqlite3.Row
         self._apply_pragmas(conn)
-        self._local.conn = conn
-        self._local.last_health_check = time.monotonic()
         return conn
 
     @staticmethod
@@ -250,14 +471,17 @@ class StoreRegistry:
         conn.execute("PRAGMA cache_size = -8000")
 
     def _init_db(self) -> None:
-        """テーブル・インデックスを作成し user_version を設定する。"""
+        """テーブル・インデックスを作成し、必要ならスキーマを移行する。"""
         conn = self._get_conn()
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
         conn.executescript("""
             CREATE TABLE IF NOT EXISTS stores (
                 store_id   TEXT PRIMARY KEY,
                 root_path  TEXT NOT NULL,
                 created_at TEXT NOT NULL,
-                created_by TEXT NOT NULL DEFAULT ''
+                created_by TEXT NOT NULL DEFAULT '',
+                last_seq   INTEGER NOT NULL DEFAULT 0,
+                key_count  INTEGER NOT NULL DEFAULT 0
             );
             CREATE TABLE IF NOT EXISTS store_data (
                 store_id   TEXT NOT NULL
@@ -266,14 +490,100 @@ class StoreRegistry:
                 value      TEXT NOT NULL,
                 value_hash TEXT NOT NULL,
                 updated_at TEXT NOT NULL,
+                seq        INTEGER NOT NULL DEFAULT 0,
                 PRIMARY KEY (store_id, key)
             );
             CREATE INDEX IF NOT EXISTS idx_store_data_store_id
                 ON store_data(store_id);
+            CREATE TABLE IF NOT EXISTS store_tombstones (
+                store_id   TEXT NOT NULL
+                    REFERENCES stores(store_id) ON DELETE CASCADE,
+                key        TEXT NOT NULL,
+                seq        INTEGER NOT NULL,
+                deleted_at TEXT NOT NULL,
+                PRIMARY KEY (store_id, key)
+            );
+            CREATE TABLE IF NOT EXISTS store_file_migrations (
+                store_id    TEXT PRIMARY KEY
+                    REFERENCES stores(store_id) ON DELETE CASCADE,
+                imported    INTEGER NOT NULL,
+                migrated_at TEXT NOT NULL
+            );
         """)
-        conn.execute("PRAGMA user_version = 1")
+        if 0 < version < SCHEMA_VERSION:
+            self._migrate_schema(conn)
+        conn.executescript("""
+            CREATE INDEX IF NOT EXISTS idx_store_data_seq
+                ON store_data(store_id, seq);
+            CREATE INDEX IF NOT EXISTS idx_store_tombstones_seq
+                ON store_tombstones(store_id, seq);
+        """)
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
         conn.commit()
 
+    @staticmethod
+    def _migrate_schema(conn: sqlite3.Connection) -> None:
+        """
+        旧スキーマを SCHEMA_VERSION まで順に移行する。
+
+        - 1 → 2: seq / last_seq 列を追加し、既存キーに採番する
+          （Store ごとにキー順で 1..N）
+        - 2 → 3: key_count 列を追加し、既存キー数で初期化する
+
+        複数プロセスの同時起動に備え、BEGIN IMMEDIATE 内で
+        user_version を再確認してから移行する。
+        """
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            if version >= SCHEMA_VERSION:
+                conn.rollback()
+                return
+            if version < 2:
+                StoreRegistry._migrate_to_v2(conn)
+            _add_column_if_missing(
+                conn, "stores", "key_count", "INTEGER NOT NULL DEFAULT 0",
+            )
+            conn.execute(
+                "UPDATE stores SET key_count = ("
+                "SELECT COUNT(*) FROM store_data "
+                "WHERE store_data.store_id = stores.store_id)"
+            )
+            conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        logging.getLogger(__name__).info(
+            "Migrated stores.db schema from version %d to %d", version, SCHEMA_VERSION,
+        )
+
+    @staticmethod
+    def _migrate_to_v2(conn: sqlite3.Connection) -> None:
+        """user_version 1 → 2（_migrate_schema のトランザクション内で呼ぶ）"""
+        _add_column_if_missing(
+            conn, "stores", "last_seq", "INTEGER NOT NULL DEFAULT 0",
+        )
+        _add_column_if_missing(
+            conn, "store_data", "seq", "INTEGER NOT NULL DEFAULT 0",
+        )
+        updates: List[tuple] = []
+        counters: Dict[str, int] = {}
+        for row in conn.execute(
+            "SELECT store_id, key FROM store_data ORDER BY store_id, key"
+        ):
+            seq = counters.get(row[0], 0) + 1
+            counters[row[0]] = seq
+            updates.append((seq, row[0], row[1]))
+        conn.executemany(
+            "UPDATE store_data SET seq = ? WHERE store_id = ? AND key = ?",
+            updates,
+        )
+        conn.executemany(
+            "UPDATE stores SET last_seq = ? WHERE store_id = ?",
+            [(seq, store_id) for store_id, seq in counters.items()],
+        )
+
     def close(self) -> None:
         """
         現スレッドの SQLite connection をクローズする。
@@ -440,6 +750,12 @@ class StoreRegistry:
                 error=f"Database error: {e}",
             )
 
+        with self._file_migrated_lock:
+            self._file_migrated.discard(store_id)
+        with self._store_defs_lock:
+            self._store_defs.pop(store_id, None)
+        self._value_cache.invalidate_store(store_id)
+
         if delete_files:
             try:
                 rp = Path(root_path)
@@ -626,13 +942,9 @@ class StoreRegistry:
                 "error_type": "validation_error",
             }
 
-        store_def = self.get_store(store_id)
-        if store_def is None:
-            return {
-                "success": False,
-                "error": f"Store not found: {store_id}",
-                "error_type": "store_not_found",
-            }
+        _, err = self._resolve_for_data(store_id)
+        if err:
+            return err
 
         # value size check
         try:
@@ -682,14 +994,20 @@ class StoreRegistry:
 
             if not exists and expected_value is _EXPECT_MISSING:
                 # create: キーが存在せず expected_value が _EXPECT_MISSING → 新規作成
+                seq = _allocate_seq(conn, store_id, 1, key_delta=1)
                 conn.execute(
                     "INSERT INTO store_data "
-                    "(store_id, key, value, value_hash, updated_at) "
-                    "VALUES (?, ?, ?, ?, ?)",
-                    (store_id, key, new_value_json, new_hash, now),
+                    "(store_id, key, value, value_hash, updated_at, seq) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (store_id, key, new_value_json, new_hash, now, seq),
+                )
+                conn.execute(
+                    "DELETE FROM store_tombstones WHERE store_id = ? AND key = ?",
+                    (store_id, key),
                 )
                 conn.commit()
-                return {"success": True, "store_id": store_id, "key": key}
+                self._after_write(store_id, [key])
+                return {"success": True, "store_id": store_id, "key": key, "seq": seq}
 
             if not exists and expected_value is not _EXPECT_MISSING:
                 conn.rollback()
@@ -730,14 +1048,16 @@ class StoreRegistry:
                 }
 
             # swap: UPDATE
+            seq = _allocate_seq(conn, store_id, 1)
             conn.execute(
                 "UPDATE store_data "
-                "SET value = ?, value_hash = ?, updated_at = ? "
+                "SET value = ?, value_hash = ?, updated_at = ?, seq = ? "
                 "WHERE store_id = ? AND key = ?",
-                (new_value_json, new_hash, now, store_id, key),
+                (new_value_json, new_hash, now, seq, store_id, key),
             )
             conn.commit()
-            return {"success": True, "store_id": store_id, "key": key}
+            self._after_write(store_id, [key])
+            return {"success": True, "store_id": store_id, "key": key, "seq": seq}
 
         except sqlite3.Error as e:
             try:
@@ -760,6 +1080,7 @@ class StoreRegistry:
         prefix: str = "",
         limit: Optional[int] = None,
         cursor: Optional[str] = None,
+        include_total: bool = False,
     ) -> Dict[str, Any]:
         """
         Store 内のキーを列挙する（ページネーション対応）。
@@ -768,6 +1089,12 @@ class StoreRegistry:
         cursor (keyset pagination): WHERE key > :cursor
         limit/cursor 両方 None なら全件返却（後方互換）。
 
+        total_estimate はページごとに COUNT(*) を走らせない:
+        - prefix なし: 書き込み時に維持している stores.key_count
+        - prefix あり・全件返却: 返したキー数
+        - prefix あり・ページネーション: include_total=True のときだけ
+          prefix 範囲を COUNT(*) する（それ以外は None）
+
         idx_store_data_store_id インデックスにより store_id フィルタが高速化。
         """
         # prefix バリデーション（空文字列は許可）
@@ -780,34 +1107,12 @@ class StoreRegistry:
                     "error_type": "validation_error",
                 }
 
-        store_def = self.get_store(store_id)
-        if store_def is None:
-            return {
-                "success": False,
-                "error": f"Store not found: {store_id}",
-                "error_type": "store_not_found",
-            }
+        _, err = self._resolve_for_data(store_id)
+        if err:
+            return err
 
         conn = self._get_conn()
-
-        # ---- Build WHERE clause ----
-        conditions: List[str] = ["store_id = ?"]
-        params: List[Any] = [store_id]
-
-        if prefix:
-            prefix_upper = prefix + "\uffff"
-            conditions.append("key >= ?")
-            params.append(prefix)
-            conditions.append("key < ?")
-            params.append(prefix_upper)
-
-        where = " AND ".join(conditions)
-
-        # Total estimate (prefix-filtered count)
-        total_estimate: int = conn.execute(
-            f"SELECT COUNT(*) FROM store_data WHERE {where}",
-            params,
-        ).fetchone()[0]
+        where, params = self._key_range(store_id, prefix)
 
         # No pagination → return all (backward compatible)
         if limit is None and cursor is None:
@@ -815,12 +1120,13 @@ class StoreRegistry:
                 f"SELECT key FROM store_data WHERE {where} ORDER BY key",
                 params,
             ).fetchall()
+            keys = [r["key"] for r in rows]
             return {
                 "success": True,
-                "keys": [r["key"] for r in rows],
+                "keys": keys,
                 "next_cursor": None,
                 "has_more": False,
-                "total_estimate": total_estimate,
+                "total_estimate": len(keys),
             }
 
         # Pagination
@@ -831,15 +1137,12 @@ class StoreRegistry:
         if limit > 1000:
             limit = 1000
 
-        page_conditions = list(conditions)
+        page_where = where
         page_params = list(params)
-
         if cursor:
-            page_conditions.append("key > ?")
+            page_where += " AND key > ?"
             page_params.append(cursor)
 
-        page_where = " AND ".join(page_conditions)
-
         # Fetch limit + 1 to detect has_more
         rows = conn.execute(
             f"SELECT key FROM store_data WHERE {page_where} "
@@ -856,6 +1159,17 @@ class StoreRegistry:
         if has_more and keys:
             next_cursor = keys[-1]
 
+        total_estimate: Optional[int] = None
+        if not prefix:
+            row = conn.execute(
+                "SELECT key_count FROM stores WHERE store_id = ?", (store_id,),
+            ).fetchone()
+            total_estimate = row["key_count"] if row is not None else 0
+        elif include_total:
+            total_estimate = conn.execute(
+                f"SELECT COUNT(*) FROM store_data WHERE {where}", params,
+            ).fetchone()[0]
+
         return {
             "success": True,
             "keys": keys,
@@ -864,6 +1178,95 @@ class StoreRegistry:
             "total_estimate": total_estimate,
         }
 
+    @staticmethod
+    def _key_range(store_id: str, prefix: str) -> "Tuple[str, List[Any]]":
+        """store_id と prefix 範囲の WHERE 句とパラメータを返す。"""
+        if not prefix:
+            return "store_id = ?", [store_id]
+        return (
+            "store_id = ? AND key >= ? AND key < ?",
+            [store_id, prefix, prefix + "\uffff"],
+        )
+
+    # ------------------------------------------------------------------ #
+    # ストリーミング列挙 (エクスポート・バックアップ用)
+    # ------------------------------------------------------------------ #
+
+    def iter_keys(
+        self,
+        store_id: str,
+        prefix: str = "",
+        batch_size: int = DEFAULT_ITER_BATCH_SIZE,
+    ) -> Iterator[List[str]]:
+        """
+        Store 内のキーをキー順にバッチ単位で yield する。
+
+        専用接続の1カーソルで読むため、列挙全体が開始時点の
+        スナップショットになり、ページごとの再検索も発生しない。
+
+        Raises:
+            ValueError: prefix 不正または Store が存在しない（呼び出し時点で送出）
+        """
+        cursor = self._open_iter_cursor(store_id, prefix, "key")
+        return self._iter_batches(cursor, batch_size, lambda r: r["key"])
+
+    def iter_items(
+        self,
+        store_id: str,
+        prefix: str = "",
+        batch_size: int = DEFAULT_ITER_BATCH_SIZE,
+    ) -> Iterator[List[Tuple[str, Any]]]:
+        """
+        Store 内の (key, value) をキー順にバッチ単位で yield する。
+
+        iter_keys と同じく1カーソルのスナップショット読み取り。
+        値はデコードのみ行い、値キャッシュには載せない
+        （全件走査でキャッシュを押し流さないため）。
+
+        Raises:
+            ValueError: prefix 不正または Store が存在しない（呼び出し時点で送出）
+        """
+        cursor = self._open_iter_cursor(store_id, prefix, "key, value")
+        return self._iter_batches(
+            cursor, batch_size, lambda r: (r["key"], json.loads(r["value"])),
+        )
+
+    def _open_iter_cursor(
+        self, store_id: str, prefix: str, columns: str,
+    ) -> sqlite3.Cursor:
+        if prefix:
+            prefix_err = _validate_key(prefix)
+            if prefix_err:
+                raise ValueError(prefix_err)
+        _, err = self._resolve_for_data(store_id)
+        if err:
+            raise ValueError(err["error"])
+
+        # スレッド共有接続でカーソルを開いたままにすると、呼び出し側が
+        # 列挙の途中で書き込んだときに干渉するため専用接続を使う
+        conn = self._connect()
+        where, params = self._key_range(store_id, prefix)
+        try:
+            return conn.execute(
+                f"SELECT {columns} FROM store_data WHERE {where} ORDER BY key",
+                params,
+            )
+        except Exception:
+            conn.close()
+            raise
+
+    @staticmethod
+    def _iter_batches(cursor: sqlite3.Cursor, batch_size: int, convert) -> Iterator[list]:
+        batch_size = max(1, min(int(batch_size), MAX_ITER_BATCH_SIZE))
+        try:
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    return
+                yield [convert(r) for r in rows]
+        finally:
+            cursor.connection.close()
+
     # ------------------------------------------------------------------ #
     # #19  Batch get (single-query optimized)
     # ------------------------------------------------------------------ #
@@ -894,28 +1297,37 @@ class StoreRegistry:
                 "error_type": "validation_error",
             }
 
-        store_def = self.get_store(store_id)
-        if store_def is None:
-            return {
-                "success": False,
-                "error": f"Store not found: {store_id}",
-                "error_type": "store_not_found",
-            }
+        _, err = self._resolve_for_data(store_id)
+        if err:
+            return err
 
         conn = self._get_conn()
 
         # 一括取得: 有効なキーだけ SQL で取得 (単一クエリ)
+        # キャッシュと value_hash が一致するキーは value 本体を読まない
+        # (key と value_hash を '|' で連結して照合する。'|' は key に使えない)
+        cache = self._value_cache
         valid_keys = [k for k in keys if k and isinstance(k, str) and _validate_key(k) is None]
-        fetched: Dict[str, str] = {}
+        fetched: Dict[str, tuple] = {}
         if valid_keys:
             placeholders = ",".join("?" for _ in valid_keys)
+            cached = []
+            if cache.enabled:
+                for k in valid_keys:
+                    h = cache.cached_hash(store_id, k)
+                    if h is not None:
+                        cached.append(f"{k}|{h}")
+            cached_placeholders = ",".join("?" for _ in cached) or "NULL"
             rows = conn.execute(
-                f"SELECT key, value FROM store_data "
+                f"SELECT key, value_hash, "
+                f"CASE WHEN key || '|' || value_hash IN ({cached_placeholders}) "
+                f"THEN NULL ELSE value END AS value "
+                f"FROM store_data "
                 f"WHERE store_id = ? AND key IN ({placeholders})",
-                [store_id] + valid_keys,
+                cached + [store_id] + valid_keys,
             ).fetchall()
             for r in rows:
-                fetched[r["key"]] = r["value"]
+                fetched[r["key"]] = (r["value_hash"], r["value"])
 
         results: Dict[str, Any] = {}
         found = 0
@@ -941,13 +1353,23 @@ class StoreRegistry:
                 not_found += 1
                 continue
 
-            raw = fetched.get(key)
-            if raw is None:
+            row = fetched.get(key)
+            if row is None:
                 results[key] = None
                 not_found += 1
                 continue
 
-            entry_size = len(raw.encode("utf-8"))
+            value_hash, raw = row
+            hit = cache.lookup(store_id, key, value_hash) if cache.enabled else None
+            if hit is None and raw is None:
+                # 照合後に追い出された → 読み直す
+                row = self._fetch_raw(store_id, key)
+                if row is None:
+                    results[key] = None
+                    not_found += 1
+                    continue
+                value_hash, raw = row
+            entry_size = hit[1] if hit is not None else len(raw.encode("utf-8"))
             if cumulative_size + entry_size > self.MAX_BATCH_RESPONSE_BYTES:
                 size_exceeded = True
                 results[key] = None
@@ -960,12 +1382,18 @@ class StoreRegistry:
                 continue
 
             cumulative_size += entry_size
+            if hit is not None:
+                results[key] = hit[0]
+                found += 1
+                continue
             try:
                 results[key] = json.loads(raw)
             except (json.JSONDecodeError, TypeError):
                 results[key] = None
                 not_found += 1
                 continue
+            if cache.enabled:
+                cache.put(store_id, key, value_hash, results[key], entry_size)
             found += 1
 
         resp: Dict[str, Any] = {
@@ -978,6 +1406,489 @@ class StoreRegistry:
         }
         return resp
 
+    # ------------------------------------------------------------------ #
+    # 旧ファイルストアの取り込み
+    # ------------------------------------------------------------------ #
+
+    def _ensure_files_migrated(self, store_def: StoreDefinition) -> None:
+        """
+        旧 store.set が書いた <root>/<key>.json を初回アクセス時に取り込む。
+
+        取り込み済みかどうかはプロセス内でキャッシュし、2回目以降は
+        DB を参照しない。取り込みに失敗しても読み書き自体は継続する。
+        """
+        store_id = store_def.store_id
+        if store_id in self._file_migrated:
+            return
+        with self._file_migrated_lock:
+            if store_id in self._file_migrated:
+                return
+            try:
+                from .store_migration import import_store_files
+                import_store_files(
+                    self._get_conn(), store_id, Path(store_def.root_path),
+                )
+            except Exception as e:
+                logging.getLogger(__name__).warning(
+                    "Store %s: file store import failed: %s", store_id, e,
+                )
+                return
+            self._file_migrated.add(store_id)
+
+    def _get_store_cached(self, store_id: str) -> Optional[StoreDefinition]:
+        """
+        get_store() のキャッシュ版（データ操作の前段で毎回引かないように）。
+
+        存在する Store のみキャッシュし、delete_store() で破棄する。
+        """
+        store_def = self._store_defs.get(store_id)
+        if store_def is not None:
+            return store_def
+        store_def = self.get_store(store_id)
+        if store_def is not None:
+            with self._store_defs_lock:
+                self._store_defs[store_id] = store_def
+        return store_def
+
+    def _resolve_for_data(
+        self, store_id: str,
+    ) -> "tuple[Optional[StoreDefinition], Optional[Dict[str, Any]]]":
+        """データ操作用に Store を解決する（未取り込みなら旧ファイルを取り込む）。"""
+        store_def = self._get_store_cached(store_id)
+        if store_def is None:
+            return None, {
+                "success": False,
+                "error": f"Store not found: {store_id}",
+                "error_type": "store_not_found",
+            }
+        self._ensure_files_migrated(store_def)
+        return store_def, None
+
+    # ------------------------------------------------------------------ #
+    # Key-Value 操作 (store.get / store.set / store.delete)
+    # ------------------------------------------------------------------ #
+
+    def get_value(self, store_id: str, key: str) -> Dict[str, Any]:
+        """キーの値を取得する。"""
+        key_err = _validate_key(key)
+        if key_err:
+            return {"success": False, "error": key_err, "error_type": "validation_error"}
+
+        _, err = self._resolve_for_data(store_id)
+        if err:
+            return err
+
+        cache = self._value_cache
+        cached_hash = cache.cached_hash(store_id, key) if cache.enabled else None
+        # キャッシュと value_hash が一致する場合は value 本体を読まない
+        row = self._get_conn().execute(
+            "SELECT value_hash, "
+            "CASE WHEN value_hash = ? THEN NULL ELSE value END AS value "
+            "FROM store_data WHERE store_id = ? AND key = ?",
+            (cached_hash or "", store_id, key),
+        ).fetchone()
+        if row is None:
+            return {
+                "success": False,
+                "error": f"Key not found: {key}",
+                "error_type": "key_not_found",
+            }
+        value_hash, raw = row["value_hash"], row["value"]
+        if raw is None:
+            hit = cache.lookup(store_id, key, value_hash)
+            if hit is not None:
+                return {"success": True, "value": hit[0]}
+            # 照合後に追い出された → 読み直す
+            row = self._fetch_raw(store_id, key)
+            if row is None:
+                return {
+                    "success": False,
+                    "error": f"Key not found: {key}",
+                    "error_type": "key_not_found",
+                }
+            value_hash, raw = row
+        elif cache.enabled:
+            cache.lookup(store_id, key, value_hash)  # miss を計上
+
+        try:
+            value = json.loads(raw)
+        except (json.JSONDecodeError, TypeError) as e:
+            return {
+                "success": False,
+                "error": f"Failed to read: {e}",
+                "error_type": "read_error",
+            }
+        if cache.enabled:
+            cache.put(store_id, key, value_hash, value, len(raw.encode("utf-8")))
+        return {"success": True, "value": value}
+
+    def _fetch_raw(self, store_id: str, key: str) -> "Optional[tuple]":
+        """(value_hash, value の JSON テキスト) を読む（無ければ None）"""
+        row = self._get_conn().execute(
+            "SELECT value_hash, value FROM store_data WHERE store_id = ? AND key = ?",
+            (store_id, key),
+        ).fetchone()
+        return (row["value_hash"], row["value"]) if row is not None else None
+
+    def set_value(
+        self,
+        store_id: str,
+        key: str,
+        value: Any,
+        max_value_bytes: int = MAX_VALUE_BYTES,
+    ) -> Dict[str, Any]:
+        """キーに値を書き込む（UPSERT）。"""
+        return self.batch_set(store_id, {key: value}, max_value_bytes=max_value_bytes)
+
+    def delete_value(self, store_id: str, key: str) -> Dict[str, Any]:
+        """キーを削除する。キーが無ければ key_not_found。"""
+        result = self.batch_delete(store_id, [key])
+        if result.get("success") and result.get("deleted", 0) == 0:
+            return {
+                "success": False,
+                "error": f"Key not found: {key}",
+                "error_type": "key_not_found",
+            }
+        return result
+
+    # ------------------------------------------------------------------ #
+    # Batch write (store.batch_set / store.batch_delete)
+    # ------------------------------------------------------------------ #
+
+    def batch_set(
+        self,
+        store_id: str,
+        items: Dict[str, Any],
+        max_value_bytes: int = MAX_VALUE_BYTES,
+    ) -> Dict[str, Any]:
+        """
+        複数キーを1トランザクションで書き込む。
+
+        全キー・全値を先に検証し（1値あたり max_value_bytes、
+        合計 MAX_BATCH_WRITE_BYTES）、1件でも不正なら何も書き込まない。
+        書き込みは executemany + 1回の commit で行う。
+        """
+        if not items or not isinstance(items, dict):
+            return {
+                "success": False,
+                "error": "Missing or invalid items",
+                "error_type": "validation_error",
+            }
+        if len(items) > self.MAX_BATCH_KEYS:
+            return {
+                "success": False,
+                "error": f"Too many keys ({len(items)}). "
+                         f"Maximum is {self.MAX_BATCH_KEYS}.",
+                "error_type": "validation_error",
+            }
+
+        now = self._now_ts()
+        rows: List[tuple] = []
+        total_bytes = 0
+        for key, value in items.items():
+            key_err = _validate_key(key)
+            if key_err:
+                return {"success": False, "error": key_err, "error_type": "validation_error"}
+            try:
+                value_json, value_hash = _encode_value(value)
+            except (TypeError, ValueError) as e:
+                return {
+                    "success": False,
+                    "error": f"Value for '{key}' is not JSON serializable: {e}",
+                    "error_type": "validation_error",
+                }
+            size = len(value_json.encode("utf-8"))
+            if size > max_value_bytes:
+                return {
+                    "success": False,
+                    "error": f"Value for '{key}' too large (max {max_value_bytes} bytes)",
+                    "error_type": "payload_too_large",
+                }
+            total_bytes += size
+            rows.append((key, value_json, value_hash))
+
+        if total_bytes > MAX_BATCH_WRITE_BYTES:
+            return {
+                "success": False,
+                "error": f"Batch too large (max {MAX_BATCH_WRITE_BYTES} bytes)",
+                "error_type": "payload_too_large",
+            }
+
+        _, err = self._resolve_for_data(store_id)
+        if err:
+            return err
+
+        conn = self._get_conn()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                placeholders = ",".join("?" for _ in rows)
+                existing_count = conn.execute(
+                    f"SELECT COUNT(*) FROM store_data "
+                    f"WHERE store_id = ? AND key IN ({placeholders})",
+                    [store_id] + [key for key, _, _ in rows],
+                ).fetchone()[0]
+                first_seq = _allocate_seq(
+                    conn, store_id, len(rows), key_delta=len(rows) - existing_count,
+                )
+                conn.executemany(
+                    "INSERT INTO store_data "
+                    "(store_id, key, value, value_hash, updated_at, seq) "
+                    "VALUES (?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT(store_id, key) DO UPDATE SET "
+                    "value = excluded.value, value_hash = excluded.value_hash, "
+                    "updated_at = excluded.updated_at, seq = excluded.seq",
+                    [
+                        (store_id, key, value_json, value_hash, now, first_seq + i)
+                        for i, (key, value_json, value_hash) in enumerate(rows)
+                    ],
+                )
+                conn.executemany(
+                    "DELETE FROM store_tombstones WHERE store_id = ? AND key = ?",
+                    [(store_id, key) for key, _, _ in rows],
+                )
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+        except sqlite3.Error as e:
+            return {
+                "success": False,
+                "error": f"Write failed: {e}",
+                "error_type": "write_error",
+            }
+        self._after_write(store_id, [key for key, _, _ in rows])
+
+        return {
+            "success": True,
+            "store_id": store_id,
+            "written": len(rows),
+            "size_bytes": total_bytes,
+            "seq": first_seq + len(rows) - 1,
+        }
+
+    def batch_delete(self, store_id: str, keys: List[str]) -> Dict[str, Any]:
+        """
+        複数キーを1トランザクションで削除する。
+
+        存在しないキーは無視し、実際に削除した件数を deleted で返す。
+        """
+        if not keys or not isinstance(keys, list):
+            return {
+                "success": False,
+                "error": "Missing or invalid keys",
+                "error_type": "validation_error",
+            }
+        if len(keys) > self.MAX_BATCH_KEYS:
+            return {
+                "success": False,
+                "error": f"Too many keys ({len(keys)}). "
+                         f"Maximum is {self.MAX_BATCH_KEYS}.",
+                "error_type": "validation_error",
+            }
+        for key in keys:
+            key_err = _validate_key(key)
+            if key_err:
+                return {"success": False, "error": key_err, "error_type": "validation_error"}
+
+        _, err = self._resolve_for_data(store_id)
+        if err:
+            return err
+
+        unique_keys = list(dict.fromkeys(keys))
+        placeholders = ",".join("?" for _ in unique_keys)
+        conn = self._get_conn()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                existing = [
+                    r["key"] for r in conn.execute(
+                        f"SELECT key FROM store_data "
+                        f"WHERE store_id = ? AND key IN ({placeholders}) ORDER BY key",
+                        [store_id] + unique_keys,
+                    )
+                ]
+                if existing:
+                    first_seq = _allocate_seq(
+                        conn, store_id, len(existing), key_delta=-len(existing),
+                    )
+                    now = self._now_ts()
+                    conn.executemany(
+                        "DELETE FROM store_data WHERE store_id = ? AND key = ?",
+                        [(store_id, key) for key in existing],
+                    )
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO store_tombstones "
+                        "(store_id, key, seq, deleted_at) VALUES (?, ?, ?, ?)",
+                        [
+                            (store_id, key, first_seq + i, now)
+                            for i, key in enumerate(existing)
+                        ],
+                    )
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+        except sqlite3.Error as e:
+            return {
+                "success": False,
+                "error": f"Delete failed: {e}",
+                "error_type": "delete_error",
+            }
+        if existing:
+            self._after_write(store_id, existing)
+
+        return {"success": True, "store_id": store_id, "deleted": len(existing)}
+
+    # ------------------------------------------------------------------ #
+    # 変更フィード (store.changes / store.watch)
+    # ------------------------------------------------------------------ #
+
+    def _after_write(self, store_id: str, keys: List[str]) -> None:
+        """
+        コミット後の後処理: 値キャッシュを無効化し、
+        同一プロセス内の watch 待ちを起こす。
+        """
+        self._value_cache.invalidate(store_id, keys)
+        with self._change_cond:
+            self._change_gen += 1
+            self._change_cond.notify_all()
+
+    def changes(
+        self,
+        store_id: str,
+        since_seq: int = 0,
+        limit: int = 100,
+    ) -> Dict[str, Any]:
+        """
+        since_seq より後の変更を seq 順に返す。
+
+        キーごとに最新の状態だけを返す（途中の上書きは畳み込まれる）。
+        削除は op="delete"（value なし）の tombstone として返る。
+        呼び出し側は next_seq を次回の since_seq に渡せば差分だけを取得できる。
+
+        Returns:
+            {
+                "success": True,
+                "changes": [{"seq", "key", "op", "value"?}, ...],
+                "next_seq": int,     # 次回の since_seq
+                "has_more": bool,
+                "current_seq": int,  # Store の最新 seq
+                "reset": bool,       # since_seq が Store より新しい（作り直し等）。
+                                     # next_seq=0 から全件再同期する
+            }
+        """
+        if isinstance(since_seq, bool) or not isinstance(since_seq, int) or since_seq < 0:
+            return {
+                "success": False,
+                "error": "since_seq must be a non-negative integer",
+                "error_type": "validation_error",
+            }
+        if isinstance(limit, bool) or not isinstance(limit, int) or limit < 1:
+            limit = 1
+        limit = min(limit, MAX_CHANGES_LIMIT)
+
+        _, err = self._resolve_for_data(store_id)
+        if err:
+            return err
+
+        conn = self._get_conn()
+        # 1文で読むため、store_data / tombstones / last_seq は同一スナップショット
+        rows = conn.execute(
+            "SELECT seq, key, value, op, "
+            "  (SELECT last_seq FROM stores WHERE store_id = ?) AS current_seq "
+            "FROM ("
+            "  SELECT seq, key, value, 'set' AS op FROM store_data "
+            "    WHERE store_id = ? AND seq > ? "
+            "  UNION ALL "
+            "  SELECT seq, key, NULL AS value, 'delete' AS op FROM store_tombstones "
+            "    WHERE store_id = ? AND seq > ?"
+            ") ORDER BY seq LIMIT ?",
+            (store_id, store_id, since_seq, store_id, since_seq, limit + 1),
+        ).fetchall()
+
+        if rows:
+            current_seq = rows[0]["current_seq"]
+        else:
+            current_seq = conn.execute(
+                "SELECT last_seq FROM stores WHERE store_id = ?", (store_id,),
+            ).fetchone()[0]
+
+        has_more = len(rows) > limit
+        out: List[Dict[str, Any]] = []
+        cumulative_size = 0
+        for row in rows[:limit]:
+            change: Dict[str, Any] = {"seq": row["seq"], "key": row["key"], "op": row["op"]}
+            if row["op"] == "set":
+                raw = row["value"]
+                entry_size = len(raw.encode("utf-8"))
+                if out and cumulative_size + entry_size > self.MAX_BATCH_RESPONSE_BYTES:
+                    has_more = True
+                    break
+                cumulative_size += entry_size
+                try:
+                    change["value"] = json.loads(raw)
+                except (json.JSONDecodeError, TypeError):
+                    change["value"] = None
+            out.append(change)
+
+        reset = since_seq > current_seq
+        if out:
+            next_seq = out[-1]["seq"]
+        else:
+            next_seq = 0 if reset else since_seq
+
+        return {
+            "success": True,
+            "store_id": store_id,
+            "changes": out,
+            "next_seq": next_seq,
+            "has_more": has_more,
+            "current_seq": current_seq,
+            "reset": reset,
+        }
+
+    def watch(
+        self,
+        store_id: str,
+        since_seq: int = 0,
+        timeout: float = 10.0,
+        limit: int = 100,
+    ) -> Dict[str, Any]:
+        """
+        since_seq より後の変更が現れるまで最大 timeout 秒待って changes() を返す。
+
+        同一プロセス内の書き込みは条件変数で即座に起こされる。
+        別プロセス（host_execution のサブプロセス等）の書き込みは
+        WATCH_POLL_INTERVAL ごとの再確認で検出する。
+        タイムアウト時は空の changes と "timed_out": True を返す。
+        """
+        try:
+            timeout = float(timeout)
+        except (TypeError, ValueError):
+            return {
+                "success": False,
+                "error": "timeout must be a number",
+                "error_type": "validation_error",
+            }
+        deadline = time.monotonic() + min(max(timeout, 0.0), MAX_WATCH_TIMEOUT)
+
+        while True:
+            with self._change_cond:
+                gen = self._change_gen
+            result = self.changes(store_id, since_seq, limit)
+            if not result.get("success") or result["changes"] or result["reset"]:
+                return result
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                result["timed_out"] = True
+                return result
+            with self._change_cond:
+                self._change_cond.wait_for(
+                    lambda: self._change_gen != gen,
+                    timeout=min(remaining, WATCH_POLL_INTERVAL),
+                )
+
     # ------------------------------------------------------------------ #
     # I-1  Store usage audit
     # ------------------------------------------------------------------ #
@@ -999,16 +1910,15 @@ class StoreRegistry:
                 "total_size_bytes": int,
                 "largest_key": str,
                 "largest_size_bytes": int,
+                "value_cache": {"hits", "misses", "hit_rate", ...},
             }
             ストアが存在しない場合は error キーを含む dict を返す。
+            value_cache の hits / misses はこの Store 分、
+            entries / bytes はキャッシュ全体の値。
         """
-        store_def = self.get_store(store_id)
-        if store_def is None:
-            return {
-                "success": False,
-                "error": f"Store not found: {store_id}",
-                "error_type": "store_not_found",
-            }
+        _, err = self._resolve_for_data(store_id)
+        if err:
+            return err
 
         conn = self._get_conn()
 
@@ -1043,12 +1953,17 @@ class StoreRegistry:
             "total_size_bytes": total_size_bytes,
             "largest_key": largest_key,
             "largest_size_bytes": largest_size_bytes,
+            "value_cache": self._value_cache.stats(store_id),
         }
 
         self._audit("store_usage_audit", True, result)
 
         return result
 
+    def value_cache_stats(self) -> Dict[str, Any]:
+        """値キャッシュ全体のヒット率・使用量を返す。"""
+        return self._value_cache.stats()
+
     # ------------------------------------------------------------------ #
     # 監査ログ
     # ------------------------------------------------------------------ #
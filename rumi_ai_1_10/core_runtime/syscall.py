@@ -20,6 +20,10 @@ from .rumi_syscall import (
     MAX_TIMEOUT,
     # 例外
     SyscallError,
+    # ストリーミング
+    StreamResponse,
+    stream,
+    iter_stream,
     # 関数
     http_request,
     request,
@@ -35,6 +39,9 @@ __all__ = [
     "DEFAULT_TIMEOUT",
     "MAX_TIMEOUT",
     "SyscallError",
+    "StreamResponse",
+    "stream",
+    "iter_stream",
     "http_request",
     "request",
     "get",
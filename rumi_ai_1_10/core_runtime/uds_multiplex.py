@@ -0,0 +1,186 @@
+"""
+uds_multiplex.py - UDS 永続接続上のリクエスト多重化（サーバー側）
+
+capability_proxy / egress_proxy の UDS サーバーが、1接続で複数の
+length-prefix JSON リクエストを受け付けるための共通部品。
+
+プロトコル:
+- クライアントは接続を閉じずに、リクエストフレームを続けて送れる
+- リクエストに "mux_id"（str または int）を付けると多重化扱い:
+  サーバーは並行に処理し、完了順に同じ "mux_id" を付けて応答する
+- "mux_id" なしのリクエストは従来どおり到着順に1件ずつ処理・応答する
+  （1リクエストごとに接続を閉じる旧クライアントはそのまま動く）
+- アイドルタイムアウトで接続を閉じる。クライアント側のアイドル再利用期限は
+  これより短くすること
+
+主要コンポーネント:
+- MuxResponder: 1接続分の並行処理と応答書き込みの直列化
+- read_frame_or_eof(): フレーム境界での切断を None として返す読み取り
+"""
+
+from __future__ import annotations
+
+import concurrent.futures
+import os
+import socket
+import struct
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+
+MUX_ID_FIELD = "mux_id"
+
+DEFAULT_MAX_INFLIGHT = 16
+
+
+def get_max_inflight() -> int:
+    """RUMI_UDS_MAX_INFLIGHT（1接続あたりの同時処理数）を返す。"""
+    try:
+        return max(1, int(os.environ.get("RUMI_UDS_MAX_INFLIGHT", str(DEFAULT_MAX_INFLIGHT))))
+    except (TypeError, ValueError):
+        return DEFAULT_MAX_INFLIGHT
+
+
+def is_valid_mux_id(value: Any) -> bool:
+    """mux_id として受け付ける値か（bool は int 扱いしない）"""
+    if isinstance(value, bool):
+        return False
+    if isinstance(value, int):
+        return True
+    return isinstance(value, str) and 0 < len(value) <= 128
+
+
+def read_frame_or_eof(sock: socket.socket, max_size: int) -> Optional[bytes]:
+    """
+    length-prefix フレームを1つ読み取る
+
+    Returns:
+        ペイロード。フレーム境界で接続が閉じられた場合は None
+
+    Raises:
+        ConnectionError: フレームの途中で切断された
+        ValueError: サイズ超過
+        socket.timeout: アイドルタイムアウト
+    """
+    length_data = b""
+    while len(length_data) < 4:
+        chunk = sock.recv(4 - len(length_data))
+        if not chunk:
+            if not length_data:
+                return None
+            raise ConnectionError("Connection closed while reading length")
+        length_data += chunk
+    length = struct.unpack(">I", length_data)[0]
+    if length > max_size:
+        raise ValueError(f"Message too large: {length} > {max_size}")
+    data = b""
+    while len(data) < length:
+        chunk = sock.recv(min(length - len(data), 65536))
+        if not chunk:
+            raise ConnectionError("Connection closed while reading data")
+        data += chunk
+    return data
+
+
+class MuxResponder:
+    """
+    1接続分の多重化リクエスト処理
+
+    submit() した処理は executor（サーバー共有のスレッドプール）で実行し、
+    結果の dict に mux_id を付けて write_frame() で書き込む。executor を
+    渡さなければリクエストごとにスレッドを起こす。書き込みは接続単位のロックで直列化する。
+    同時処理数が上限に達すると submit() がブロックし、
+    呼び出し側（受信ループ）の読み取りが止まることで背圧がかかる。
+    """
+
+    def __init__(
+        self,
+        sock: socket.socket,
+        write_frame: Callable[[socket.socket, Dict[str, Any]], None],
+        max_inflight: Optional[int] = None,
+        name: str = "uds-mux",
+        executor: Optional[concurrent.futures.Executor] = None,
+    ):
+        self._sock = sock
+        self._write_frame = write_frame
+        self._write_lock = threading.Lock()
+        self._slots = threading.Semaphore(max_inflight or get_max_inflight())
+        self._executor = executor
+        self._threads: List[threading.Thread] = []
+        self._futures: List[concurrent.futures.Future] = []
+        self._name = name
+        self._closed = False
+        self._inflight = 0
+        self._inflight_lock = threading.Lock()
+
+    def write(self, response: Dict[str, Any]) -> bool:
+        """応答を1フレーム書き込む（失敗時 False、以後の書き込みは捨てる）"""
+        with self._write_lock:
+            if self._closed:
+                return False
+            try:
+                self._write_frame(self._sock, response)
+                return True
+            except Exception:
+                self._closed = True
+                return False
+
+    def submit(self, mux_id: Any, fn: Callable[[], Dict[str, Any]]) -> bool:
+        """
+        fn() を並行実行し、結果に mux_id を付けて応答する
+
+        Returns:
+            投入できたか（executor が shutdown 済みなら False。fn は実行されない）
+        """
+        self._slots.acquire()
+        with self._inflight_lock:
+            self._inflight += 1
+        if self._executor is not None:
+            self._futures = [f for f in self._futures if not f.done()]
+            try:
+                self._futures.append(self._executor.submit(self._run, mux_id, fn))
+            except RuntimeError:
+                with self._inflight_lock:
+                    self._inflight -= 1
+                self._slots.release()
+                return False
+            return True
+        self._threads = [t for t in self._threads if t.is_alive()]
+        thread = threading.Thread(
+            target=self._run, args=(mux_id, fn), name=self._name, daemon=True,
+        )
+        self._threads.append(thread)
+        thread.start()
+        return True
+
+    def _run(self, mux_id: Any, fn: Callable[[], Dict[str, Any]]) -> None:
+        try:
+            try:
+                response = fn()
+            except Exception as e:
+                response = {
+                    "success": False,
+                    "error": str(e),
+                    "error_type": type(e).__name__,
+                }
+            response = dict(response)
+            response[MUX_ID_FIELD] = mux_id
+            self.write(response)
+        finally:
+            with self._inflight_lock:
+                self._inflight -= 1
+            self._slots.release()
+
+    def busy(self) -> bool:
+        """処理中のリクエストがあるか（アイドルタイムアウト判定用）"""
+        with self._inflight_lock:
+            return self._inflight > 0
+
+    def wait(self, timeout: Optional[float] = None) -> None:
+        """処理中のリクエストの完了を待つ（接続を閉じる前に呼ぶ）"""
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+        if self._futures:
+            concurrent.futures.wait(self._futures, timeout)
+        self._futures = []
@@ -42,6 +42,26 @@ def _clean_env_vars(monkeypatch):
         monkeypatch.delenv(var, raising=False)
 
 
+@pytest.fixture(autouse=True)
+def _isolate_user_data(_clean_env_vars, tmp_path_factory, monkeypatch):
+    """
+    テストが作業ツリーの user_data/ に書き込まないようにする
+
+    - 相対パスの既定保存先（user_data/...）は一時ディレクトリをカレントにして逃がす
+    - 既定の grants_dir（BASE_DIR 基準）に署名鍵を生成させないよう鍵を環境変数で渡す
+    - マウント（data.settings など）の基準ディレクトリも一時ディレクトリに向ける
+    """
+    cwd = tmp_path_factory.mktemp("cwd")
+    monkeypatch.chdir(cwd)
+    monkeypatch.setenv("RUMI_HMAC_SECRET", "rumi-test-hmac-secret-" + "0" * 32)
+    try:
+        from backend_core.ecosystem import mounts as _mounts
+        monkeypatch.setattr(_mounts, "_BASE_DIR", cwd)
+        monkeypatch.setattr(_mounts, "_global_mount_manager", None)
+    except Exception:
+        pass
+
+
 @pytest.fixture(autouse=True)
 def _reset_singletons():
     """各テスト後にグローバルシングルトンをリセットする"""
@@ -0,0 +1,177 @@
+"""
+test_audit_index.py - 監査ログ索引のテスト
+
+対象:
+- core_runtime/audit_index.py (AuditIndex)
+- core_runtime/audit_logger.py (query_logs / query_logs_page / get_summary の索引利用)
+- core_runtime/kernel_handlers_runtime.py (_h_audit_query のカーソル)
+"""
+from __future__ import annotations
+
+import json
+from unittest.mock import patch
+
+import pytest
+
+from core_runtime import audit_index
+from core_runtime.audit_index import INDEX_DB_NAME
+from core_runtime.audit_logger import AuditEntry, AuditLogger, reset_audit_logger
+from core_runtime.di_container import get_container
+from core_runtime.kernel_handlers_runtime import KernelRuntimeHandlersMixin
+
+
+def _entry(ts, category="network", success=True, **kwargs):
+    return AuditEntry(
+        ts=ts, category=category, severity="info", action="a", success=success, **kwargs
+    )
+
+
+@pytest.fixture
+def al(tmp_path):
+    logger = AuditLogger(str(tmp_path))
+    yield logger
+    logger.close()
+
+
+def _index_count(tmp_path):
+    import sqlite3
+    conn = sqlite3.connect(str(tmp_path / INDEX_DB_NAME))
+    try:
+        return conn.execute("SELECT COUNT(*) FROM audit_entries").fetchone()[0]
+    finally:
+        conn.close()
+
+
+class TestIndexedQuery:
+
+    def test_filters_and_order(self, al, tmp_path):
+        al.log(_entry("2026-03-01T10:00:00Z", owner_pack="p1"))
+        al.log(_entry("2026-03-02T10:00:00Z", owner_pack="p2"))
+        al.log(_entry("2026-03-03T10:00:00Z", owner_pack="p1", success=False))
+        al.log(_entry("2026-03-03T11:00:00Z", category="system", owner_pack="p1"))
+
+        results = al.query_logs(category="network", pack_id="p1")
+        assert [r["ts"] for r in results] == ["2026-03-03T10:00:00Z", "2026-03-01T10:00:00Z"]
+        assert [r["ts"] for r in al.query_logs(success_only=False)] == ["2026-03-03T10:00:00Z"]
+        assert _index_count(tmp_path) == 4
+
+    def test_does_not_parse_unmatched_lines(self, al):
+        for i in range(20):
+            al.log(_entry(f"2026-03-01T10:00:{i:02d}Z", owner_pack=f"p{i}"))
+        al.flush()
+        with patch.object(audit_index.json, "loads", wraps=json.loads) as loads:
+            results = al.query_logs(pack_id="p7")
+        assert len(results) == 1
+        assert loads.call_count == 1
+
+    def test_date_range_pruning(self, al):
+        for day in ("01", "02", "03", "04"):
+            al.log(_entry(f"2026-03-{day}T00:00:00Z", flow_id="f"))
+        results = al.query_logs(flow_id="f", start_date="2026-03-02", end_date="2026-03-03")
+        assert [r["ts"][:10] for r in results] == ["2026-03-03", "2026-03-02"]
+
+    def test_cursor_pages_reverse_chronologically(self, al):
+        for i in range(7):
+            al.log(_entry(f"2026-03-0{1 + i % 3}T00:00:0{i}Z"))
+        seen = []
+        cursor = None
+        while True:
+            page = al.query_logs_page(limit=3, cursor=cursor)
+            seen.extend(r["ts"] for r in page["results"])
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+        assert seen == sorted(seen, reverse=True)
+        assert len(seen) == 7
+
+    def test_invalid_cursor(self, al):
+        with pytest.raises(ValueError):
+            al.query_logs_page(cursor="nope")
+
+    def test_summary(self, al):
+        al.log(_entry("2026-03-01T00:00:00Z"))
+        al.log(_entry("2026-03-01T00:00:01Z", success=False))
+        al.log(_entry("2026-03-01T00:00:02Z", category="system"))
+        summary = al.get_summary(date="2026-03-01")
+        assert summary["categories"]["network"] == {"success": 1, "failure": 1, "total": 2}
+        assert summary["total_entries"] == 3
+        assert summary["total_failure"] == 1
+
+
+class TestCatchUp:
+
+    def test_indexes_files_written_elsewhere(self, al, tmp_path):
+        lines = [
+            json.dumps({"ts": "2026-03-01T00:00:00Z", "category": "network", "success": True,
+                        "owner_pack": "ext"}),
+            "not json",
+            json.dumps({"ts": "2026-03-01T00:00:01Z", "category": "network", "success": True}),
+        ]
+        (tmp_path / "network_2026-03-01.jsonl").write_text("\n".join(lines) + "\n")
+        assert [r.get("owner_pack") for r in al.query_logs()] == [None, "ext"]
+
+        # 既存ファイルへの追記も、以後の AuditWriter の書き込みも拾う
+        al.log(_entry("2026-03-01T00:00:02Z", owner_pack="ext"))
+        assert len(al.query_logs(pack_id="ext")) == 2
+
+    def test_partial_line_waits(self, al, tmp_path):
+        path = tmp_path / "network_2026-03-01.jsonl"
+        full = json.dumps({"ts": "2026-03-01T00:00:00Z", "category": "network", "success": True})
+        path.write_text(full + "\n" + full[:10])
+        assert len(al.query_logs()) == 1
+        with open(path, "a") as f:
+            f.write(full[10:] + "\n")
+        assert len(al.query_logs()) == 2
+
+    def test_rewritten_file_is_reindexed(self, al, tmp_path):
+        al.log(_entry("2026-03-01T00:00:00Z"))
+        al.log(_entry("2026-03-01T00:00:01Z"))
+        assert len(al.query_logs()) == 2
+        al.flush()
+        al._writer.flush(close_files=True)
+        path = tmp_path / "network_2026-03-01.jsonl"
+        path.write_text(path.read_text().splitlines()[0] + "\n")
+        assert [r["ts"] for r in al.query_logs()] == ["2026-03-01T00:00:00Z"]
+
+    def test_cleanup_forgets_deleted_files(self, al, tmp_path):
+        al.log(_entry("2000-01-01T00:00:00Z"))
+        assert len(al.query_logs()) == 1
+        al.cleanup_old_logs(days_to_keep=30)
+        assert al.query_logs() == []
+        assert _index_count(tmp_path) == 0
+
+
+class TestIndexDisabled:
+
+    def test_scan_fallback(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("RUMI_AUDIT_INDEX", "0")
+        logger = AuditLogger(str(tmp_path))
+        try:
+            logger.log(_entry("2026-03-01T00:00:00Z", owner_pack="p"))
+            page = logger.query_logs_page(pack_id="p")
+            assert len(page["results"]) == 1
+            assert page["next_cursor"] is None
+            assert logger.get_summary(date="2026-03-01")["total_entries"] == 1
+        finally:
+            logger.close()
+        assert not (tmp_path / INDEX_DB_NAME).exists()
+
+
+class TestAuditQueryHandler:
+
+    def test_next_cursor(self, tmp_path):
+        logger = reset_audit_logger(str(tmp_path))
+        try:
+            for i in range(3):
+                logger.log(_entry(f"2026-03-01T00:00:0{i}Z"))
+            first = KernelRuntimeHandlersMixin._h_audit_query(None, {"limit": 2}, {})
+            assert first["_kernel_step_status"] == "success"
+            assert first["next_cursor"]
+            second = KernelRuntimeHandlersMixin._h_audit_query(
+                None, {"limit": 2, "cursor": first["next_cursor"]}, {},
+            )
+            assert [r["ts"] for r in second["results"]] == ["2026-03-01T00:00:00Z"]
+            assert second["next_cursor"] is None
+        finally:
+            logger.close()
+            get_container().reset("audit_logger")
@@ -0,0 +1,186 @@
+"""
+test_audit_writer.py - 監査ログ書き込みスレッドのテスト
+
+対象:
+- core_runtime/audit_writer.py (AuditWriter)
+- core_runtime/audit_logger.py (AuditLogger の書き込みスレッド経由の記録)
+"""
+from __future__ import annotations
+
+import json
+import threading
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from core_runtime import audit_writer
+from core_runtime.audit_logger import AuditEntry, AuditLogger
+from core_runtime.audit_writer import AuditWriter
+from core_runtime.metrics import get_metrics_collector, reset_metrics_collector
+
+
+def _entry(category="system", action="a", ts="2026-01-02T03:04:05Z", **kwargs):
+    return AuditEntry(
+        ts=ts, category=category, severity="info", action=action, success=True, **kwargs
+    )
+
+
+def _read(path: Path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+@pytest.fixture
+def writers():
+    created = []
+
+    def make(tmp_path, **kwargs):
+        gate = kwargs.pop("gate", None)
+
+        def serialize(entry):
+            if gate is not None:
+                gate.wait(5)
+            return json.dumps(entry)
+
+        w = AuditWriter(
+            path_for=lambda e: tmp_path / f"{e['file']}.jsonl",
+            serialize=serialize,
+            **kwargs,
+        )
+        created.append(w)
+        return w
+
+    reset_metrics_collector()
+    yield make
+    for w in created:
+        w.stop()
+
+
+class TestAuditWriter:
+
+    def test_flush_writes_in_order(self, writers, tmp_path):
+        w = writers(tmp_path)
+        for i in range(50):
+            w.submit({"file": "a", "i": i})
+        assert w.flush(timeout=5)
+        assert [e["i"] for e in _read(tmp_path / "a.jsonl")] == list(range(50))
+        assert w.stats()["written"] == 50
+
+    def test_writes_happen_off_caller_thread(self, writers, tmp_path):
+        threads = []
+        w = writers(tmp_path)
+        w._path_for = lambda e: threads.append(threading.current_thread()) or tmp_path / "a.jsonl"
+        w.submit({"file": "a"})
+        w.flush(timeout=5)
+        assert threads and threads[0] is not threading.current_thread()
+
+    def test_file_handles_stay_open(self, writers, tmp_path):
+        w = writers(tmp_path)
+        for name in ("a", "b", "a"):
+            w.submit({"file": name})
+            w.flush(timeout=5)
+        assert w.stats()["open_files"] == 2
+        w.flush(timeout=5, close_files=True)
+        assert w.stats()["open_files"] == 0
+        assert len(_read(tmp_path / "a.jsonl")) == 2
+
+    def test_open_files_bounded(self, writers, tmp_path, monkeypatch):
+        monkeypatch.setattr(audit_writer, "MAX_OPEN_FILES", 2)
+        w = writers(tmp_path)
+        for name in ("a", "b", "c"):
+            w.submit({"file": name})
+        w.flush(timeout=5)
+        assert w.stats()["open_files"] == 2
+        assert all((tmp_path / f"{n}.jsonl").exists() for n in "abc")
+
+    def test_drop_policy(self, writers, tmp_path):
+        gate = threading.Event()
+        w = writers(tmp_path, queue_size=1, policy="drop", gate=gate)
+        results = [w.submit({"file": "a", "i": i}) for i in range(5)]
+        gate.set()
+        w.flush(timeout=5)
+        assert results.count(False) >= 3
+        assert w.stats()["dropped"] == results.count(False)
+        counters = get_metrics_collector().snapshot()["counters"]
+        assert "audit.dropped" in counters
+
+    def test_block_policy_waits_then_times_out(self, writers, tmp_path):
+        gate = threading.Event()
+        w = writers(tmp_path, queue_size=1, policy="block", block_timeout=0.05, gate=gate)
+        assert w.submit({"file": "a", "i": 0})
+        while w.stats()["queue_depth"]:  # 書き込みスレッドが取り出して gate で止まるまで待つ
+            threading.Event().wait(0.01)
+        assert w.submit({"file": "a", "i": 1})
+        assert w.submit({"file": "a", "i": 2}) is False
+        assert w.stats()["dropped"] == 1
+
+        w.block_timeout = 5
+        threading.Timer(0.1, gate.set).start()
+        assert w.submit({"file": "a", "i": 3})
+        w.flush(timeout=5)
+        assert [e["i"] for e in _read(tmp_path / "a.jsonl")] == [0, 1, 3]
+        assert "audit.enqueue_wait_seconds" in get_metrics_collector().snapshot()["histograms"]
+
+    def test_durability_batch_fsyncs(self, writers, tmp_path):
+        w = writers(tmp_path, durability="batch")
+        with patch.object(audit_writer.os, "fsync") as fsync:
+            w.submit({"file": "a"})
+            w.flush(timeout=5)
+        assert fsync.called
+
+    def test_durability_none_never_fsyncs(self, writers, tmp_path):
+        w = writers(tmp_path, durability="none")
+        with patch.object(audit_writer.os, "fsync") as fsync:
+            w.submit({"file": "a"})
+            w.flush(timeout=5)
+        fsync.assert_not_called()
+
+    def test_durability_periodic(self, writers, tmp_path):
+        w = writers(tmp_path, durability="periodic", fsync_interval=0.05)
+        synced = threading.Event()
+        with patch.object(audit_writer.os, "fsync", side_effect=lambda fd: synced.set()):
+            w.submit({"file": "a"})
+            assert synced.wait(2)
+
+    def test_stop_drains_queue(self, writers, tmp_path):
+        w = writers(tmp_path)
+        for i in range(10):
+            w.submit({"file": "a", "i": i})
+        w.stop()
+        assert len(_read(tmp_path / "a.jsonl")) == 10
+        assert w.stats()["open_files"] == 0
+
+
+class TestAuditLoggerWriter:
+
+    def test_log_and_query(self, tmp_path):
+        al = AuditLogger(str(tmp_path))
+        try:
+            al.log(_entry(action="x", owner_pack="p1"))
+            al.log(_entry(category="network", action="y"))
+            results = al.query_logs(pack_id="p1")
+            assert [r["action"] for r in results] == ["x"]
+            assert al.writer_stats()["written"] == 2
+        finally:
+            al.close()
+        assert (tmp_path / "system_2026-01-02.jsonl").exists()
+        assert (tmp_path / "network_2026-01-02.jsonl").exists()
+
+    def test_cleanup_closes_handles(self, tmp_path):
+        al = AuditLogger(str(tmp_path))
+        try:
+            al.log(_entry(ts="2000-01-01T00:00:00Z"))
+            al.flush()
+            assert al.cleanup_old_logs(days_to_keep=30) == 1
+            assert al.writer_stats()["open_files"] == 0
+        finally:
+            al.close()
+
+    def test_inline_mode(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("RUMI_AUDIT_WRITER", "inline")
+        al = AuditLogger(str(tmp_path))
+        assert al.writer_stats() is None
+        al.log(_entry())
+        assert al._buffer
+        al.flush()
+        assert len(_read(tmp_path / "system_2026-01-02.jsonl")) == 1
@@ -0,0 +1,247 @@
+"""
+test_capability_usage_wal.py - CapabilityUsageStore 追記ログ（HMAC チェーン）のテスト
+
+対象:
+- core_runtime/capability_usage_store.py (追記ログ / グループコミット / 畳み込み / 改ざん検知)
+"""
+from __future__ import annotations
+
+import json
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+from core_runtime.capability_usage_store import CapabilityUsageStore
+
+
+def _store(path):
+    return CapabilityUsageStore(usage_dir=str(path), secret_key="k")
+
+
+def _wal_lines(path, principal="pa"):
+    wal = path / f"{principal}.wal"
+    return [line for line in wal.read_text(encoding="utf-8").split("\n") if line] if wal.exists() else []
+
+
+@pytest.fixture
+def audit():
+    events = []
+
+    class _Audit:
+        def log_security_event(self, **kwargs):
+            events.append(kwargs)
+
+    with patch("core_runtime.audit_logger.get_audit_logger", return_value=_Audit()):
+        yield events
+
+
+class TestAppendLog:
+
+    def test_consume_appends_instead_of_rewriting(self, tmp_path):
+        store = _store(tmp_path)
+        store.check_and_consume("pa", "p", "s", max_count=10)
+        snapshot = (tmp_path / "pa.json").read_text(encoding="utf-8")
+        for _ in range(4):
+            store.check_and_consume("pa", "p", "s", max_count=10)
+        assert (tmp_path / "pa.json").read_text(encoding="utf-8") == snapshot
+        assert len(_wal_lines(tmp_path)) == 5
+
+    def test_restart_replays_log(self, tmp_path):
+        store = _store(tmp_path)
+        for _ in range(3):
+            store.check_and_consume("pa", "p", "s", max_count=5, max_daily_count=10)
+        store.check_and_consume("pa", "p", "other", max_count=5)
+        reloaded = _store(tmp_path)
+        record = reloaded.get_usage("pa", "p", "s")
+        assert record.used_count == 3
+        assert sum(record.daily_counts.values()) == 3
+        assert reloaded.get_usage("pa", "p", "other").used_count == 1
+        assert reloaded.check_and_consume("pa", "p", "s", max_count=5).used_count == 4
+
+    def test_torn_last_line_ignored(self, tmp_path, audit):
+        store = _store(tmp_path)
+        store.check_and_consume("pa", "p", "s", max_count=5)
+        with open(tmp_path / "pa.wal", "a", encoding="utf-8") as f:
+            f.write('{"wal": "x", "se')
+        assert _store(tmp_path).get_usage("pa", "p", "s").used_count == 1
+        assert audit == []
+
+    def test_append_after_torn_last_line(self, tmp_path, audit):
+        store = _store(tmp_path)
+        for _ in range(3):
+            store.check_and_consume("pa", "p", "s", max_count=10)
+        with open(tmp_path / "pa.wal", "a", encoding="utf-8") as f:
+            f.write('{"wal": "x", "se')
+        reloaded = _store(tmp_path)
+        for _ in range(2):
+            reloaded.check_and_consume("pa", "p", "s", max_count=10)
+        assert _store(tmp_path).get_usage("pa", "p", "s").used_count == 5
+        assert audit == []
+
+    def test_legacy_snapshot_is_migrated(self, tmp_path):
+        store = _store(tmp_path)
+        data = {"principal_id": "pa", "updated_at": "2026-01-01T00:00:00Z", "records": {
+            "p:s": {"permission_id": "p", "scope_key": "s", "used_count": 2,
+                    "last_used_ts": None, "daily_counts": {}},
+        }}
+        data["_hmac_signature"] = store._compute_hmac(data)
+        (tmp_path / "pa.json").write_text(json.dumps(data), encoding="utf-8")
+        assert store.check_and_consume("pa", "p", "s", max_count=5).used_count == 3
+        assert _store(tmp_path).get_usage("pa", "p", "s").used_count == 3
+
+
+class TestTamperDetection:
+
+    def test_modified_log_line(self, tmp_path, audit):
+        store = _store(tmp_path)
+        for scope in ("a", "b", "c"):
+            store.check_and_consume("pa", "p", scope, max_count=1)
+        lines = _wal_lines(tmp_path)
+        entry = json.loads(lines[1])
+        entry["key"] = "p:z"
+        lines[1] = json.dumps(entry)
+        (tmp_path / "pa.wal").write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+        reloaded = _store(tmp_path)
+        assert reloaded.get_usage("pa", "p", "a").used_count == 1  # 検証済みの先頭は残る
+        assert reloaded.get_usage("pa", "p", "b") is None
+        assert audit and audit[0]["event_type"] == "capability_usage_tamper_detected"
+        # 壊れたチェーンは畳み直され、その後の消費は正しく残る
+        reloaded.check_and_consume("pa", "p", "d", max_count=1)
+        audit.clear()
+        assert _store(tmp_path).get_usage("pa", "p", "d").used_count == 1
+        assert audit == []
+
+    def test_removed_log_line(self, tmp_path, audit):
+        store = _store(tmp_path)
+        for _ in range(3):
+            store.check_and_consume("pa", "p", "s", max_count=5)
+        lines = _wal_lines(tmp_path)
+        (tmp_path / "pa.wal").write_text("\n".join([lines[0], lines[2]]) + "\n", encoding="utf-8")
+        assert _store(tmp_path).get_usage("pa", "p", "s").used_count == 1
+        assert len(audit) == 1
+
+    def test_close_checkpoints_trailing_lines(self, tmp_path, audit):
+        store = _store(tmp_path)
+        for _ in range(3):
+            store.check_and_consume("pa", "p", "s", max_count=5)
+        store.close()
+        # 末尾行の削除はチェーンでは検知できないが、close 時点までの消費は署名済みスナップショットに残る
+        (tmp_path / "pa.wal").write_text("", encoding="utf-8")
+        assert _store(tmp_path).get_usage("pa", "p", "s").used_count == 3
+        assert audit == []
+
+    def test_modified_snapshot(self, tmp_path, audit):
+        store = _store(tmp_path)
+        store.check_and_consume("pa", "p", "s", max_count=5)
+        data = json.loads((tmp_path / "pa.json").read_text(encoding="utf-8"))
+        data["records"] = {}
+        (tmp_path / "pa.json").write_text(json.dumps(data), encoding="utf-8")
+        assert _store(tmp_path).get_usage("pa", "p", "s") is None
+        assert len(audit) == 1
+
+
+class TestCompaction:
+
+    def test_threshold_compacts(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("RUMI_USAGE_COMPACT_THRESHOLD", "3")
+        store = _store(tmp_path)
+        for _ in range(7):
+            store.check_and_consume("pa", "p", "s", max_count=100)
+        assert len(_wal_lines(tmp_path)) < 3
+        snapshot = json.loads((tmp_path / "pa.json").read_text(encoding="utf-8"))
+        assert snapshot["records"]["p:s"]["used_count"] >= 6
+        assert _store(tmp_path).get_usage("pa", "p", "s").used_count == 7
+
+    def test_crash_before_log_truncation(self, tmp_path):
+        store = _store(tmp_path)
+        for _ in range(3):
+            store.check_and_consume("pa", "p", "s", max_count=100)
+        stale = (tmp_path / "pa.wal").read_text(encoding="utf-8")
+        state = store._get_state("pa")
+        store._compact("pa", state)
+        # 切り詰め前にクラッシュした状態を再現（旧世代の行が残る）
+        (tmp_path / "pa.wal").write_text(stale, encoding="utf-8")
+        assert _store(tmp_path).get_usage("pa", "p", "s").used_count == 3
+
+    def test_torn_tail_after_stale_generation(self, tmp_path, audit):
+        store = _store(tmp_path)
+        for _ in range(3):
+            store.check_and_consume("pa", "p", "s", max_count=100)
+        stale = (tmp_path / "pa.wal").read_text(encoding="utf-8")
+        store._compact("pa", store._get_state("pa"))
+        # 切り詰め前にクラッシュし、旧世代の行の後ろに新世代の行と書きかけの行が続く
+        (tmp_path / "pa.wal").write_text(stale, encoding="utf-8")
+        store = _store(tmp_path)
+        store.check_and_consume("pa", "p", "s", max_count=100)
+        with open(tmp_path / "pa.wal", "a", encoding="utf-8") as f:
+            f.write('{"wal": "x", "se')
+        reloaded = _store(tmp_path)
+        assert reloaded.get_usage("pa", "p", "s").used_count == 4
+        reloaded.check_and_consume("pa", "p", "s", max_count=100)
+        assert _store(tmp_path).get_usage("pa", "p", "s").used_count == 5
+        assert audit == []
+
+    def test_reset(self, tmp_path):
+        store = _store(tmp_path)
+        store.check_and_consume("pa", "p", "s", max_count=1)
+        store.check_and_consume("pa", "p", "t", max_count=1)
+        assert store.reset_usage("pa", "p", "s")
+        assert _wal_lines(tmp_path) == []
+        reloaded = _store(tmp_path)
+        assert reloaded.get_usage("pa", "p", "s") is None
+        assert reloaded.get_usage("pa", "p", "t").used_count == 1
+        assert reloaded.reset_all("pa")
+        assert _store(tmp_path).get_all_usage("pa") == {}
+
+
+class TestConcurrency:
+
+    def test_group_commit_under_contention(self, tmp_path):
+        store = _store(tmp_path)
+        barrier = threading.Barrier(8)
+        allowed = []
+
+        def worker():
+            barrier.wait()
+            for _ in range(10):
+                allowed.append(store.check_and_consume("pa", "p", "s", max_count=50).allowed)
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert sum(allowed) == 50
+        assert len(_wal_lines(tmp_path)) == 50
+        assert _store(tmp_path).get_usage("pa", "p", "s").used_count == 50
+
+    def test_principals_do_not_share_lock(self, tmp_path):
+        store = _store(tmp_path)
+        store.check_and_consume("pa", "p", "s", max_count=5)
+        state = store._get_state("pa")
+        done = threading.Event()
+
+        def other():
+            store.check_and_consume("pb", "p", "s", max_count=5)
+            done.set()
+
+        with state.lock:
+            threading.Thread(target=other).start()
+            assert done.wait(2)
+
+    def test_deferred_flush(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("RUMI_USAGE_FLUSH_INTERVAL_MS", "50")
+        store = _store(tmp_path)
+        try:
+            store.check_and_consume("pa", "p", "s", max_count=5)
+            deadline = time.monotonic() + 2
+            while not _wal_lines(tmp_path) and time.monotonic() < deadline:
+                time.sleep(0.02)
+            assert len(_wal_lines(tmp_path)) == 1
+            store.check_and_consume("pa", "p", "s", max_count=5)
+        finally:
+            store.close()
+        assert _store(tmp_path).get_usage("pa", "p", "s").used_count == 2
@@ -0,0 +1,272 @@
+"""
+test_container_session.py - 常駐コンテナセッションのテスト
+
+対象:
+- core_runtime/container_session.py
+- ContainerOrchestrator.call_in_session / stop_sessions / reap_idle_sessions
+- CapabilityExecutor の常駐コンテナ経由実行パス
+- ApprovalManager.get_approval_fingerprint
+
+Docker の代わりに sys.executable で SESSION_LOOP_SCRIPT を起動する。
+"""
+from __future__ import annotations
+
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from dataclasses import dataclass
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+_project_root = Path(__file__).resolve().parent.parent
+if str(_project_root) not in sys.path:
+    sys.path.insert(0, str(_project_root))
+
+from core_runtime.capability_executor import CapabilityExecutor
+from core_runtime.container_orchestrator import ContainerOrchestrator
+from core_runtime.container_session import (
+    SESSION_LOOP_SCRIPT,
+    ContainerSessionSpec,
+    is_container_session_enabled,
+)
+from core_runtime.function_registry import FunctionEntry
+
+
+_MAIN_PY = """
+import os
+_COUNTER = {"n": 0}
+
+def run(context, args):
+    _COUNTER["n"] += 1
+    if args.get("mode") == "sleep":
+        import time
+        time.sleep(args.get("seconds", 5))
+    if args.get("mode") == "raise":
+        raise ValueError("boom")
+    print("noise on stdout")
+    return {"n": _COUNTER["n"], "pid": os.getpid()}
+"""
+
+_PYTHON_FILE = """
+import helper_mod
+
+def run(input_data, context):
+    return {"echo": input_data, "owner": context.get("owner_pack"), "helper": helper_mod.VALUE}
+"""
+
+
+@dataclass(frozen=True)
+class _LocalSessionSpec(ContainerSessionSpec):
+    """docker run の代わりにローカルの Python でループを起動する。"""
+
+    def build_command(self, container_name: str) -> list:
+        return [sys.executable, "-c", SESSION_LOOP_SCRIPT]
+
+
+class _SessionTestBase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp(prefix="rumi_test_container_session_")
+        self.main_py = Path(self.tmpdir) / "main.py"
+        self.main_py.write_text(_MAIN_PY, encoding="utf-8")
+        self.orch = ContainerOrchestrator(packs_dir=self.tmpdir)
+        self.orch._docker_available = True
+        self._kill_patch = patch("core_runtime.container_session.subprocess.run")
+        self._kill_patch.start()
+
+    def tearDown(self):
+        self.orch.stop_sessions()
+        self._kill_patch.stop()
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def _spec(self, fingerprint="fp1", pack_id="pack_a"):
+        return _LocalSessionSpec(pack_id=pack_id, kind="function", image="local",
+                                 fingerprint=fingerprint, sys_path=(self.tmpdir,))
+
+    def _request(self, **args):
+        return {"kind": "function", "module": str(self.main_py), "func": "run",
+                "context": {}, "args": args}
+
+
+class TestContainerSessions(_SessionTestBase):
+
+    def test_session_is_reused(self):
+        r1 = self.orch.call_in_session(self._spec(), self._request(), 10, 1024 * 1024)
+        r2 = self.orch.call_in_session(self._spec(), self._request(), 10, 1024 * 1024)
+        self.assertTrue(r1["ok"])
+        self.assertEqual(r1["result"]["pid"], r2["result"]["pid"])
+        self.assertEqual(r2["result"]["n"], 2)
+        self.assertEqual(len(self.orch.list_sessions()), 1)
+
+    def test_function_exception_keeps_session(self):
+        r1 = self.orch.call_in_session(self._spec(), self._request(mode="raise"), 10, 1024 * 1024)
+        self.assertFalse(r1["ok"])
+        self.assertEqual(r1["error"], "boom")
+        r2 = self.orch.call_in_session(self._spec(), self._request(), 10, 1024 * 1024)
+        self.assertEqual(r2["result"]["n"], 2)
+
+    def test_fingerprint_change_replaces_session(self):
+        r1 = self.orch.call_in_session(self._spec("fp1"), self._request(), 10, 1024 * 1024)
+        r2 = self.orch.call_in_session(self._spec("fp2"), self._request(), 10, 1024 * 1024)
+        self.assertNotEqual(r1["result"]["pid"], r2["result"]["pid"])
+        self.assertEqual(r2["result"]["n"], 1)
+        self.assertEqual(len(self.orch.list_sessions()), 1)
+
+    def test_fingerprint_change_waits_for_running_request(self):
+        self.orch.call_in_session(self._spec("fp1"), self._request(), 10, 1024 * 1024)
+        old = self.orch._sessions[self._spec("fp1")]
+        results = []
+        worker = threading.Thread(target=lambda: results.append(self.orch.call_in_session(
+            self._spec("fp1"), self._request(mode="sleep", seconds=1), 10, 1024 * 1024)))
+        worker.start()
+        deadline = time.monotonic() + 5
+        while not old.lock.locked() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        r2 = self.orch.call_in_session(self._spec("fp2"), self._request(), 10, 1024 * 1024)
+        self.assertTrue(r2["ok"])
+        self.assertTrue(old.retired)
+        self.assertFalse(old.closed)
+        worker.join(10)
+        self.assertTrue(results[0]["ok"])
+        self.assertEqual(results[0]["result"]["n"], 2)
+        self.assertTrue(old.closed)
+
+    def test_timeout_discards_session(self):
+        r = self.orch.call_in_session(self._spec(), self._request(mode="sleep", seconds=10), 1.5, 1024 * 1024)
+        self.assertFalse(r["ok"])
+        self.assertEqual(r["error_type"], "timeout")
+        self.assertEqual(self.orch.list_sessions(), [])
+        fresh = self.orch.call_in_session(self._spec(), self._request(), 10, 1024 * 1024)
+        self.assertEqual(fresh["result"]["n"], 1)
+
+    def test_busy_session_falls_back(self):
+        self.orch.call_in_session(self._spec(), self._request(), 10, 1024 * 1024)
+        session = self.orch._sessions[self._spec()]
+        with session.lock:
+            self.assertIsNone(self.orch.call_in_session(self._spec(), self._request(), 10, 1024 * 1024))
+
+    def test_max_requests_recycles_session(self):
+        self.orch._session_max_requests = 2
+        pids = [self.orch.call_in_session(self._spec(), self._request(), 10, 1024 * 1024)["result"]["pid"]
+                for _ in range(3)]
+        self.assertEqual(pids[0], pids[1])
+        self.assertNotEqual(pids[1], pids[2])
+
+    def test_reap_idle_sessions(self):
+        self.orch.call_in_session(self._spec(), self._request(), 10, 1024 * 1024)
+        for session in self.orch._sessions.values():
+            session.last_used = time.monotonic() - 3600
+        self.assertEqual(self.orch.reap_idle_sessions(), 1)
+        self.assertEqual(self.orch.list_sessions(), [])
+
+    def test_docker_unavailable_returns_none(self):
+        self.orch._docker_available = False
+        self.assertIsNone(self.orch.call_in_session(self._spec(), self._request(), 10, 1024 * 1024))
+
+    def test_python_file_with_preloaded_module(self):
+        target = Path(self.tmpdir) / "block.py"
+        target.write_text(_PYTHON_FILE, encoding="utf-8")
+        spec = _LocalSessionSpec(pack_id="pack_a", kind="python_file", image="local", fingerprint="fp1")
+        request = {"kind": "python_file", "module": str(target),
+                   "input_data": {"x": 1}, "context": {"owner_pack": "pack_a"}}
+        r = self.orch.call_in_session(spec, request, 10, 1024 * 1024,
+                                      preload_modules={"helper_mod": "VALUE = 42\n"})
+        self.assertTrue(r["ok"])
+        self.assertEqual(r["result"], {"echo": {"x": 1}, "owner": "pack_a", "helper": 42})
+
+
+class TestContainerSessionSpec(unittest.TestCase):
+
+    def test_build_command_keeps_security_baseline(self):
+        spec = ContainerSessionSpec(pack_id="pack_a", kind="function", image="python:3.11-slim",
+                                    fingerprint="fp", volumes=("/tmp/f:/function:ro",))
+        cmd = spec.build_command("rumi-session-pack_a-1234")
+        self.assertEqual(cmd[:3], ["docker", "run", "-i"])
+        self.assertIn("--rm", cmd)
+        self.assertIn("--network=none", cmd)
+        self.assertIn("--read-only", cmd)
+        self.assertIn("rumi.type=session_function", cmd)
+
+    def test_enabled_flag(self):
+        with patch.dict(os.environ, {"RUMI_CONTAINER_SESSIONS": "1"}):
+            self.assertTrue(is_container_session_enabled())
+        with patch.dict(os.environ, {}, clear=False):
+            os.environ.pop("RUMI_CONTAINER_SESSIONS", None)
+            self.assertFalse(is_container_session_enabled())
+
+
+class TestCapabilityExecutorWithSessions(unittest.TestCase):
+
+    def _make_executor(self, reply):
+        executor = CapabilityExecutor()
+        executor._initialized = True
+        executor._approval_manager = MagicMock()
+        executor._approval_manager.get_approval_fingerprint.return_value = "fp"
+        executor._container_orchestrator = MagicMock()
+        executor._container_orchestrator.call_in_session.return_value = reply
+        return executor
+
+    def _entry(self):
+        tmp = Path(tempfile.gettempdir())
+        return FunctionEntry(function_id="f", pack_id="pack_a", function_dir=tmp,
+                             main_py_path=tmp / "main.py", manifest={})
+
+    def test_docker_path_uses_session(self):
+        executor = self._make_executor({"ok": True, "result": {"v": 1}})
+        with patch("core_runtime.capability_executor.subprocess.run") as mock_run:
+            resp = executor._execute_user_function_docker("pack_a", self._entry(), {}, "r", time.time(), 10)
+        mock_run.assert_not_called()
+        self.assertTrue(resp.success)
+        self.assertEqual(resp.output, {"v": 1})
+        spec = executor._container_orchestrator.call_in_session.call_args[0][0]
+        self.assertEqual(spec.fingerprint, "fp")
+        self.assertEqual(spec.kind, "function")
+
+    def test_session_timeout_maps_to_timeout(self):
+        executor = self._make_executor({"ok": False, "error_type": "timeout"})
+        resp = executor._execute_user_function_docker("pack_a", self._entry(), {}, "r", time.time(), 10)
+        self.assertEqual(resp.error_type, "timeout")
+
+    def test_busy_session_falls_back_to_docker_run(self):
+        executor = self._make_executor(None)
+        proc = MagicMock(returncode=0, stdout='{"v": 2}', stderr="")
+        with patch("core_runtime.capability_executor.subprocess.run", return_value=proc) as mock_run:
+            resp = executor._execute_user_function_docker("pack_a", self._entry(), {}, "r", time.time(), 10)
+        mock_run.assert_called_once()
+        self.assertEqual(resp.output, {"v": 2})
+
+    def test_unapproved_pack_skips_session(self):
+        executor = self._make_executor({"ok": True, "result": 1})
+        executor._approval_manager.get_approval_fingerprint.return_value = None
+        proc = MagicMock(returncode=0, stdout="", stderr="")
+        with patch("core_runtime.capability_executor.subprocess.run", return_value=proc):
+            executor._execute_user_function_docker("pack_a", self._entry(), {}, "r", time.time(), 10)
+        executor._container_orchestrator.call_in_session.assert_not_called()
+
+
+class TestApprovalFingerprint(unittest.TestCase):
+
+    def test_fingerprint_tracks_approved_hashes(self):
+        from core_runtime.approval_manager import ApprovalManager, PackApproval, PackStatus
+        tmp = tempfile.mkdtemp(prefix="rumi_test_fp_")
+        try:
+            am = ApprovalManager(packs_dir=tmp, grants_dir=tmp)
+            am._approvals["pack_a"] = PackApproval(pack_id="pack_a", status=PackStatus.APPROVED,
+                                                   created_at="t", file_hashes={"a.py": "h1"})
+            fp1 = am.get_approval_fingerprint("pack_a")
+            am._approvals["pack_a"].file_hashes = {"a.py": "h2"}
+            fp2 = am.get_approval_fingerprint("pack_a")
+            self.assertTrue(fp1)
+            self.assertNotEqual(fp1, fp2)
+            am._approvals["pack_a"].status = PackStatus.MODIFIED
+            self.assertIsNone(am.get_approval_fingerprint("pack_a"))
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+"""
+test_diagnostics.py - Diagnostics リングバッファのテスト
+
+対象:
+- core_runtime/diagnostics.py (Diagnostics)
+"""
+from __future__ import annotations
+
+from unittest.mock import patch
+
+from core_runtime import diagnostics as diagnostics_mod
+from core_runtime.diagnostics import Diagnostics
+
+
+def _fill(diag, n, **kwargs):
+    for i in range(n):
+        diag.record_step(phase=kwargs.get("phase", "flow"), step_id=f"s{i}", handler="h",
+                         status=kwargs.get("status", "success"))
+
+
+class TestRecord:
+
+    def test_normalized_event_shape(self):
+        diag = Diagnostics()
+        diag.record({"status": "bogus", "target": "x", "error": ValueError("boom"), "meta": 3})
+        ev = diag.events[0]
+        assert ev["phase"] == "system"
+        assert ev["status"] == "unknown"
+        assert ev["target"] == {"kind": "unknown", "id": "x"}
+        assert ev["error"] == {"type": "ValueError", "message": "boom"}
+        assert ev["meta"] == {"_raw_meta": 3}
+        assert ev["ts"].endswith("Z")
+
+    def test_explicit_ts_is_kept(self):
+        diag = Diagnostics()
+        diag.record({"ts": "2026-01-01T00:00:00Z", "status": "success"})
+        assert diag.events[0]["ts"] == "2026-01-01T00:00:00Z"
+
+    def test_capacity_is_fixed(self):
+        diag = Diagnostics(MAX_EVENTS=5)
+        _fill(diag, 12)
+        d = diag.as_dict()
+        assert d["event_count"] == 5
+        assert [e["step_id"] for e in d["events"]] == ["s7", "s8", "s9", "s10", "s11"]
+        assert len(diag._ring) == 5
+        assert d["summary"]["counts"] == {"success": 5}
+
+    def test_aged_events_evicted_on_overflow(self):
+        diag = Diagnostics(MAX_EVENTS=4)
+        _fill(diag, 3)
+        later = diagnostics_mod.time.monotonic_ns() + 2 * 3600 * 10**9
+        with patch.object(diagnostics_mod.time, "monotonic_ns", return_value=later):
+            _fill(diag, 2, phase="late")
+        assert [e["phase"] for e in diag.events] == ["late", "late"]
+
+    def test_max_events_change_resizes(self):
+        diag = Diagnostics(MAX_EVENTS=10)
+        _fill(diag, 8)
+        diag.MAX_EVENTS = 3
+        diag.record_step(phase="flow", step_id="new", handler="h", status="success")
+        assert [e["step_id"] for e in diag.events] == ["s6", "s7", "new"]
+
+
+class TestSummary:
+
+    def test_counts_follow_eviction(self):
+        diag = Diagnostics(MAX_EVENTS=4)
+        _fill(diag, 2, phase="startup", status="failed")
+        _fill(diag, 3, phase="flow")
+        summary = diag.summary()
+        assert summary["counts"] == {"failed": 1, "success": 3}
+        assert summary["phase_counts"] == {"startup": 1, "flow": 3}
+        assert [f["step_id"] for f in summary["failed"]] == ["s1"]
+        assert summary["last_failure"]["step_id"] == "s1"
+
+        _fill(diag, 1, phase="flow")
+        summary = diag.summary()
+        assert summary["counts"] == {"success": 4}
+        assert "startup" not in summary["phase_counts"]
+        assert summary["failed"] == []
+        assert summary["last_failure"] is None
+
+    def test_recent_lists_bounded(self):
+        diag = Diagnostics()
+        _fill(diag, 80, status="disabled")
+        summary = diag.summary()
+        assert len(summary["disabled"]) == diagnostics_mod.SUMMARY_RECENT_LIMIT
+        assert summary["disabled"][-1]["step_id"] == "s79"
+        assert summary["last_event_ts"] is not None
+
+    def test_empty(self):
+        summary = Diagnostics().summary()
+        assert summary["counts"] == {}
+        assert summary["last_event_ts"] is None
+
+
+class TestQueryEvents:
+
+    def test_pages_newest_first(self):
+        diag = Diagnostics(MAX_EVENTS=8)
+        _fill(diag, 11)
+        seen = []
+        before = None
+        while True:
+            page = diag.query_events(limit=3, before_seq=before)
+            seen.extend(e["step_id"] for e in page["events"])
+            before = page["next_before_seq"]
+            if before is None:
+                break
+        assert seen == [f"s{i}" for i in range(10, 2, -1)]
+
+    def test_filters(self):
+        diag = Diagnostics()
+        diag.record_step(phase="startup", step_id="boot.a", handler="k", status="success")
+        diag.record_step(phase="flow", step_id="flow.a", handler="k", status="failed")
+        diag.record_step(phase="flow", step_id="flow.b", handler="x", status="failed")
+        diag.record_step(phase="flow", step_id="other", handler="k", status="failed")
+        page = diag.query_events(phase="flow", status="failed", handler="k", step_id_prefix="flow.")
+        assert [e["step_id"] for e in page["events"]] == ["flow.a"]
+        assert page["events"][0]["seq"] == 1
+        assert page["next_before_seq"] is None
@@ -0,0 +1,182 @@
+"""
+test_egress_connection_pool.py - Egress keep-alive 接続プールのテスト
+
+対象:
+- core_runtime/egress_connection_pool.py
+- execute_http_request() の接続再利用パス
+
+127.0.0.1 の HTTP/1.1 サーバーに対し、resolve_and_check_ip を
+「検証済み IP = 127.0.0.1」を返すようパッチして接続する。
+"""
+from __future__ import annotations
+
+import http.client
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from core_runtime import egress_proxy
+from core_runtime.egress_connection_pool import EgressConnectionPool, EgressPoolKey, PooledConnection
+from core_runtime.metrics import get_metrics_collector, reset_metrics_collector
+
+
+class _KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        self.server.connections.append(self.client_address)
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        body = b"ok"
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        if self.path == "/close":
+            self.send_header("Connection", "close")
+        self.end_headers()
+        self.wfile.write(body)
+        if self.path == "/drop-after":
+            self.close_connection = True
+
+    do_POST = do_GET
+
+
+@pytest.fixture
+def server():
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), _KeepAliveHandler)
+    srv.daemon_threads = True
+    srv.connections = []
+    thread = threading.Thread(target=srv.serve_forever, daemon=True)
+    thread.start()
+    yield srv
+    srv.shutdown()
+    srv.server_close()
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    monkeypatch.setenv("RUMI_EGRESS_CONNECTION_POOL", "1")
+    monkeypatch.setattr(egress_proxy, "resolve_and_check_ip", lambda host: (False, "", ["127.0.0.1"]))
+    reset_metrics_collector()
+    p = EgressConnectionPool(max_idle_per_host=2, max_idle_total=8, idle_timeout=30, max_lifetime=300)
+    # DI コンテナ（他のテストで差し替えられうる）を経由せずにプールを固定する
+    monkeypatch.setattr(egress_proxy, "get_egress_connection_pool", lambda: p)
+    yield p
+    p.close_all()
+
+
+def _get(srv, pack_id="pack_a", path="/", method="GET"):
+    url = f"http://pool-test.invalid:{srv.server_address[1]}{path}"
+    return egress_proxy.execute_http_request(pack_id, {"method": method, "url": url}, None, None)
+
+
+def _counter(name):
+    entries = get_metrics_collector().snapshot()["counters"].get(name, [])
+    return sum(e["value"] for e in entries)
+
+
+class TestExecuteHttpRequestPooling:
+
+    def test_connection_is_reused(self, server, pool):
+        for _ in range(3):
+            assert _get(server)["success"] is True
+        assert len(server.connections) == 1
+        assert pool.stats()["hit"] == 2
+        assert _counter("egress.connection_pool.hit") == 2
+        assert _counter("egress.connection_pool.miss") == 1
+
+    def test_connection_targets_validated_ip(self, server, pool):
+        _get(server)
+        (key,) = list(pool._idle)
+        assert key == EgressPoolKey("pack_a", "http", "127.0.0.1", server.server_address[1], "pool-test.invalid")
+        assert pool._idle[key][0].conn.auto_open == 0
+
+    def test_packs_do_not_share_connections(self, server, pool):
+        _get(server, "pack_a")
+        _get(server, "pack_b")
+        assert len(server.connections) == 2
+        assert pool.stats()["idle_connections"] == 2
+
+    def test_connection_close_response_is_not_pooled(self, server, pool):
+        assert _get(server, path="/close")["success"] is True
+        assert pool.stats()["idle_connections"] == 0
+        _get(server)
+        assert len(server.connections) == 2
+
+    def test_stale_connection_is_replaced(self, server, pool):
+        _get(server, path="/drop-after")
+        time.sleep(0.1)
+        assert _get(server)["success"] is True
+        assert len(server.connections) == 2
+        assert pool.stats()["stale"] == 1
+
+    def test_disabled_pool_closes_connections(self, server, pool, monkeypatch):
+        monkeypatch.setenv("RUMI_EGRESS_CONNECTION_POOL", "0")
+        _get(server)
+        _get(server)
+        assert len(server.connections) == 2
+        assert pool.stats()["idle_connections"] == 0
+
+
+def _pooled(key, created_at=None):
+    a, b = socket.socketpair()
+    conn = http.client.HTTPConnection(key.host, key.port)
+    conn.sock = a
+    pooled = PooledConnection(key, conn)
+    if created_at is not None:
+        pooled.created_at = created_at
+    pooled._peer = b
+    return pooled
+
+
+class TestEgressConnectionPool:
+
+    KEY = EgressPoolKey("pack_a", "https", "93.184.216.34", 443, "example.com")
+
+    def test_per_host_cap_evicts_oldest(self):
+        pool = EgressConnectionPool(max_idle_per_host=1, max_idle_total=8, idle_timeout=30, max_lifetime=300)
+        first, second = _pooled(self.KEY), _pooled(self.KEY)
+        assert pool.release(first, True) is True
+        assert pool.release(second, True) is True
+        assert first.conn.sock is None
+        assert pool.acquire(self.KEY) is second
+        assert pool.stats()["evicted"] == 1
+
+    def test_total_cap_evicts_across_hosts(self):
+        pool = EgressConnectionPool(max_idle_per_host=4, max_idle_total=1, idle_timeout=30, max_lifetime=300)
+        other = self.KEY._replace(host="example.org")
+        first, second = _pooled(self.KEY), _pooled(other)
+        pool.release(first, True)
+        pool.release(second, True)
+        assert pool.acquire(self.KEY) is None
+        assert pool.acquire(other) is second
+
+    def test_idle_timeout_and_lifetime(self):
+        pool = EgressConnectionPool(max_idle_per_host=4, max_idle_total=8, idle_timeout=30, max_lifetime=300)
+        old = _pooled(self.KEY, created_at=time.monotonic() - 301)
+        assert pool.release(old, True) is False
+        idle = _pooled(self.KEY)
+        pool.release(idle, True)
+        idle.idle_since -= 31
+        assert pool.acquire(self.KEY) is None
+        assert pool.stats()["expired"] == 1
+
+    def test_unreusable_release_closes(self):
+        pool = EgressConnectionPool()
+        pooled = _pooled(self.KEY)
+        assert pool.release(pooled, False) is False
+        assert pooled.conn.sock is None
+
+    def test_close_pack(self):
+        pool = EgressConnectionPool(max_idle_per_host=4, max_idle_total=8, idle_timeout=30, max_lifetime=300)
+        pool.release(_pooled(self.KEY), True)
+        pool.release(_pooled(self.KEY._replace(pack_id="pack_b")), True)
+        assert pool.close_pack("pack_a") == 1
+        assert pool.acquire(self.KEY) is None
+        assert pool.stats()["idle_connections"] == 1
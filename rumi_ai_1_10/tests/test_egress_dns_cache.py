@@ -0,0 +1,141 @@
+"""
+test_egress_dns_cache.py - Egress DNS キャッシュのテスト
+
+対象:
+- core_runtime/egress_ip.py の DnsCache / resolve_and_check_ip
+- NetworkGrantManager の Grant 変更時のキャッシュ無効化
+- NetworkHandlersMixin._egress_status
+"""
+from __future__ import annotations
+
+import socket
+import time
+from unittest.mock import patch
+
+import pytest
+
+from core_runtime import egress_ip
+from core_runtime.egress_ip import DnsCache, get_dns_cache, reset_dns_cache, resolve_and_check_ip
+
+
+def _addrinfo(*ips):
+    return [(socket.AF_INET, socket.SOCK_STREAM, 6, "", (ip, 0)) for ip in ips]
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache(monkeypatch):
+    monkeypatch.setenv("RUMI_EGRESS_DNS_TTL", "30")
+    monkeypatch.setenv("RUMI_EGRESS_DNS_NEGATIVE_TTL", "5")
+    reset_dns_cache()
+    yield
+    reset_dns_cache()
+
+
+class TestResolveWithCache:
+
+    def test_warm_host_skips_resolver(self):
+        with patch("core_runtime.egress_ip.socket.getaddrinfo", return_value=_addrinfo("1.2.3.4")) as gai:
+            first = resolve_and_check_ip("api.example.com")
+            second = resolve_and_check_ip("API.example.com")
+        assert first == second == (False, "", ["1.2.3.4"])
+        assert gai.call_count == 1
+        assert get_dns_cache().stats()["hit_rate"] == 0.5
+
+    def test_internal_classification_is_cached(self):
+        with patch("core_runtime.egress_ip.socket.getaddrinfo", return_value=_addrinfo("10.0.0.1")) as gai:
+            resolve_and_check_ip("rebind.example.com")
+            blocked, reason, _ = resolve_and_check_ip("rebind.example.com")
+        assert blocked is True
+        assert "rebinding" in reason
+        assert gai.call_count == 1
+
+    def test_negative_result_uses_negative_ttl(self):
+        with patch("core_runtime.egress_ip.socket.getaddrinfo",
+                   side_effect=socket.gaierror("no such host")) as gai:
+            resolve_and_check_ip("missing.example.invalid")
+            resolve_and_check_ip("missing.example.invalid")
+        assert gai.call_count == 1
+        cache = get_dns_cache()
+        key = "missing.example.invalid"
+        expires_at = cache._entries[key][0]
+        assert expires_at - time.monotonic() <= 5
+
+    def test_unexpected_errors_are_not_cached(self):
+        with patch("core_runtime.egress_ip.socket.getaddrinfo", side_effect=RuntimeError("boom")) as gai:
+            resolve_and_check_ip("flaky.example.com")
+            resolve_and_check_ip("flaky.example.com")
+        assert gai.call_count == 2
+
+    def test_zero_ttl_disables_cache(self, monkeypatch):
+        monkeypatch.setenv("RUMI_EGRESS_DNS_TTL", "0")
+        reset_dns_cache()
+        with patch("core_runtime.egress_ip.socket.getaddrinfo", return_value=_addrinfo("1.2.3.4")) as gai:
+            resolve_and_check_ip("api.example.com")
+            resolve_and_check_ip("api.example.com")
+        assert gai.call_count == 2
+
+
+class TestDnsCache:
+
+    def test_expired_entry_is_dropped(self, monkeypatch):
+        cache = DnsCache(ttl=10, negative_ttl=1, max_entries=8)
+        cache.put("a.example.com", (False, "", ["1.1.1.1"]))
+        now = time.monotonic()
+        monkeypatch.setattr(egress_ip.time, "monotonic", lambda: now + 11)
+        assert cache.get("a.example.com") is None
+        assert cache.stats()["entries"] == 0
+
+    def test_lru_eviction(self):
+        cache = DnsCache(ttl=10, negative_ttl=1, max_entries=2)
+        cache.put("a", (False, "", ["1.1.1.1"]))
+        cache.put("b", (False, "", ["1.1.1.2"]))
+        cache.get("a")
+        cache.put("c", (False, "", ["1.1.1.3"]))
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert cache.stats()["evictions"] == 1
+
+    def test_invalidate_with_grant_patterns(self):
+        cache = DnsCache(ttl=10, negative_ttl=1, max_entries=8)
+        for host in ("example.com", "api.example.com", "other.org"):
+            cache.put(host, (False, "", ["1.1.1.1"]))
+        assert cache.invalidate(["*.example.com"]) == 2
+        assert cache.get("other.org") is not None
+        assert cache.invalidate(["*"]) == 1
+
+    def test_returned_list_is_a_copy(self):
+        cache = DnsCache(ttl=10, negative_ttl=1, max_entries=8)
+        cache.put("a", (False, "", ["1.1.1.1"]))
+        cache.get("a")[2].append("6.6.6.6")
+        assert cache.get("a")[2] == ["1.1.1.1"]
+
+
+class TestInvalidationFromGrants:
+
+    def test_grant_change_invalidates_domains(self, tmp_path):
+        from core_runtime.network_grant_manager import NetworkGrantManager
+        ngm = NetworkGrantManager(grants_dir=str(tmp_path), secret_key="test-secret")
+        cache = get_dns_cache()
+        cache.put("api.example.com", (False, "", ["1.2.3.4"]))
+        cache.put("other.org", (False, "", ["1.2.3.5"]))
+        ngm.grant_network_access("pack_a", ["api.example.com"], [443])
+        assert cache.get("api.example.com") is None
+        assert cache.get("other.org") is not None
+
+        cache.put("api.example.com", (False, "", ["1.2.3.4"]))
+        ngm.revoke_network_access("pack_a")
+        assert cache.get("api.example.com") is None
+
+
+class TestEgressStatus:
+
+    def test_status_reports_cache_and_pool(self):
+        from core_runtime.api.security.network_handlers import NetworkHandlersMixin
+        with patch("core_runtime.egress_ip.socket.getaddrinfo", return_value=_addrinfo("1.2.3.4")):
+            resolve_and_check_ip("api.example.com")
+            resolve_and_check_ip("api.example.com")
+        status = NetworkHandlersMixin()._egress_status()
+        assert status["dns_cache"]["hits"] == 1
+        assert status["dns_cache"]["hit_rate"] == 0.5
+        assert "hit" in status["connection_pool"]
+        assert isinstance(status["active_packs"], list)
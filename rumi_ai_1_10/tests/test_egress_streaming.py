@@ -0,0 +1,210 @@
+"""
+test_egress_streaming.py - Egress ストリーミング応答のテスト
+
+対象:
+- core_runtime/egress_protocol.py (StreamSink, stream_response_with_limit)
+- core_runtime/egress_proxy.py (execute_http_request の stream_sink, UDSEgressServer)
+- core_runtime/rumi_syscall.py (stream, iter_stream, StreamResponse)
+
+127.0.0.1 の HTTP サーバーに対し、resolve_and_check_ip を
+「検証済み IP = 127.0.0.1」を返すようパッチして接続する。
+"""
+from __future__ import annotations
+
+import io
+import os
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+from core_runtime import egress_proxy, rumi_syscall
+from core_runtime.egress_protocol import stream_response_with_limit, validate_request
+
+
+class _StreamHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path == "/slow":
+            # 2チャンク目は first_sent が立ってから送る
+            self.send_response(200)
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            self._chunk(b"data: first\n\n")
+            self.server.first_sent.set()
+            self.server.release.wait(5)
+            self._chunk(b"data: second\n\n")
+            self.wfile.write(b"0\r\n\r\n")
+            return
+        if self.path == "/redirect":
+            self.send_response(302)
+            self.send_header("Location", "/big")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        body = b"x" * 200_000
+        self.send_response(200)
+        if self.path != "/big-chunked":
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        else:
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            for i in range(0, len(body), 50_000):
+                self._chunk(body[i:i + 50_000])
+            self.wfile.write(b"0\r\n\r\n")
+
+    def _chunk(self, data: bytes) -> None:
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+
+@pytest.fixture
+def http_server(monkeypatch):
+    monkeypatch.setattr(egress_proxy, "resolve_and_check_ip", lambda host: (False, "", ["127.0.0.1"]))
+    monkeypatch.setenv("RUMI_EGRESS_CONNECTION_POOL", "0")
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), _StreamHandler)
+    srv.daemon_threads = True
+    srv.first_sent = threading.Event()
+    srv.release = threading.Event()
+    thread = threading.Thread(target=srv.serve_forever, daemon=True)
+    thread.start()
+    yield srv
+    srv.release.set()
+    srv.shutdown()
+    srv.server_close()
+
+
+@pytest.fixture
+def egress_server():
+    grants = MagicMock()
+    grants.check_access.return_value = SimpleNamespace(allowed=True, reason="")
+    audit = MagicMock()
+    # AF_UNIX のパス長制限があるため短いディレクトリを使う
+    tmpdir = tempfile.mkdtemp(prefix="rumi_eg_")
+    sock_path = Path(tmpdir) / "e.sock"
+    server = egress_proxy.UDSEgressServer("pack_s", sock_path, grants, audit)
+    assert server.start()
+    server.audit = audit
+    yield server
+    server.stop()
+    if sock_path.exists():
+        sock_path.unlink()
+    os.rmdir(tmpdir)
+
+
+def _url(srv, path):
+    return f"http://stream-test.invalid:{srv.server_address[1]}{path}"
+
+
+class _ChunkedFakeResponse:
+    def __init__(self, body: bytes):
+        self._body = io.BytesIO(body)
+
+    def read1(self, n: int) -> bytes:
+        return self._body.read(min(n, 1000))
+
+
+class TestStreamResponseWithLimit:
+
+    def test_passes_all_chunks(self):
+        out = []
+        exceeded, n = stream_response_with_limit(_ChunkedFakeResponse(b"a" * 2500), out.append, 4096)
+        assert exceeded is False
+        assert n == 2500
+        assert [len(c) for c in out] == [1000, 1000, 500]
+
+    def test_truncates_at_limit(self):
+        out = []
+        exceeded, n = stream_response_with_limit(_ChunkedFakeResponse(b"a" * 5000), out.append, 2200)
+        assert exceeded is True
+        assert n > 2200
+        assert sum(len(c) for c in out) == 2200
+
+    def test_stream_flag_must_be_bool(self):
+        ok, reason = validate_request({"method": "GET", "url": "https://a.example", "stream": "yes"})
+        assert ok is False
+        assert "stream" in reason
+
+
+class TestSyscallStream:
+
+    def test_streams_body(self, http_server, egress_server):
+        with rumi_syscall.stream("GET", _url(http_server, "/big-chunked"),
+                                 socket_path=str(egress_server.socket_path)) as resp:
+            assert resp.success is True
+            assert resp.status_code == 200
+            chunks = list(resp)
+        assert b"".join(chunks) == b"x" * 200_000
+        assert all(len(c) <= rumi_syscall.MAX_STREAM_CHUNK_SIZE for c in chunks)
+        assert resp.trailer["success"] is True
+        assert resp.trailer["bytes_read"] == 200_000
+        assert resp.trailer["truncated"] is False
+
+    def test_first_chunk_arrives_before_body_completes(self, http_server, egress_server):
+        with rumi_syscall.stream("GET", _url(http_server, "/slow"),
+                                 socket_path=str(egress_server.socket_path)) as resp:
+            it = iter(resp)
+            assert next(it) == b"data: first\n\n"
+            assert not http_server.release.is_set()
+            http_server.release.set()
+            assert b"".join(it) == b"data: second\n\n"
+        assert resp.success is True
+
+    def test_follows_redirect_before_streaming(self, http_server, egress_server):
+        with rumi_syscall.stream("GET", _url(http_server, "/redirect"),
+                                 socket_path=str(egress_server.socket_path)) as resp:
+            body = resp.read()
+        assert resp.redirect_hops == 1
+        assert resp.final_url.endswith("/big")
+        assert len(body) == 200_000
+
+    def test_content_length_over_limit_fails_before_header(self, http_server, egress_server, monkeypatch):
+        monkeypatch.setattr(egress_proxy, "MAX_STREAM_RESPONSE_SIZE", 1000)
+        resp = rumi_syscall.stream("GET", _url(http_server, "/big"),
+                                   socket_path=str(egress_server.socket_path))
+        assert resp.success is False
+        assert resp.error_type == "response_too_large"
+        assert list(resp) == []
+
+    def test_chunked_over_limit_is_truncated(self, http_server, egress_server, monkeypatch):
+        monkeypatch.setattr(egress_proxy, "MAX_STREAM_RESPONSE_SIZE", 120_000)
+        with rumi_syscall.stream("GET", _url(http_server, "/big-chunked"),
+                                 socket_path=str(egress_server.socket_path)) as resp:
+            assert resp.success is True
+            body = resp.read()
+        assert len(body) == 120_000
+        assert resp.success is False
+        assert resp.error_type == "response_too_large"
+        assert resp.trailer["truncated"] is True
+
+        details = egress_server.audit.log_network_event.call_args.kwargs["request_details"]
+        assert details["error_type"] == "response_too_large"
+        assert details["check_type"] == "proxy_stream"
+
+    def test_iter_stream_raises_on_truncation(self, http_server, egress_server, monkeypatch):
+        monkeypatch.setattr(egress_proxy, "MAX_STREAM_RESPONSE_SIZE", 120_000)
+        monkeypatch.setattr(rumi_syscall, "SOCKET_PATH", str(egress_server.socket_path))
+        received = 0
+        with pytest.raises(rumi_syscall.SyscallError, match="too large"):
+            for chunk in rumi_syscall.iter_stream("GET", _url(http_server, "/big-chunked")):
+                received += len(chunk)
+        assert received == 120_000
+
+    def test_socket_not_found(self, tmp_path):
+        resp = rumi_syscall.stream("GET", "https://a.example", socket_path=str(tmp_path / "none.sock"))
+        assert resp.success is False
+        assert resp.error_type == "socket_not_found"
+        assert resp.trailer["error_type"] == "socket_not_found"
+        # 非ストリーミング呼び出しと同じエラー応答になる
+        plain = rumi_syscall.http_request("GET", "https://a.example", socket_path=str(tmp_path / "none.sock"))
+        assert (resp.error, resp.error_type) == (plain["error"], plain["error_type"])
@@ -0,0 +1,242 @@
+"""
+test_flow_dag_execution.py - execution: dag（depends_on に基づく並行実行）のテスト
+
+対象:
+- KernelFlowExecutionMixin._execute_steps_async(execution="dag")
+- FlowLoader._parse_execution / FlowConverter の depends_on・execution 引き継ぎ
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+from unittest.mock import MagicMock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from core_runtime.flow_loader import FlowDefinition, FlowLoader, FlowStep
+from core_runtime.kernel_flow_converter import FlowConverter
+from core_runtime.kernel_flow_execution import KernelFlowExecutionMixin
+
+
+class _StubDiagnostics:
+
+    def __init__(self):
+        self.records: List[Dict[str, Any]] = []
+
+    def record_step(self, **kwargs):
+        self.records.append(kwargs)
+
+
+class _StubInterfaceRegistry:
+
+    def __init__(self):
+        self._store: Dict[str, Any] = {}
+
+    def get(self, key: str, strategy: str = "last"):
+        if strategy == "all":
+            v = self._store.get(key)
+            return [v] if v is not None else []
+        return self._store.get(key)
+
+    def register(self, key: str, value: Any, meta: Any = None):
+        self._store[key] = value
+
+
+class _FakeKernel(KernelFlowExecutionMixin):
+
+    def __init__(self):
+        self.diagnostics = _StubDiagnostics()
+        self.interface_registry = _StubInterfaceRegistry()
+        self.config = MagicMock()
+        self.event_bus = MagicMock()
+        self._flow = None
+        self._executor = ThreadPoolExecutor(max_workers=8)
+        self._flow_converter = MagicMock()
+        self._variable_resolver = MagicMock()
+
+    def _resolve_value(self, value: Any, ctx: Dict[str, Any], depth: int = 0) -> Any:
+        if isinstance(value, str) and value.startswith("$ctx."):
+            return ctx.get(value[5:])
+        return value
+
+    def _resolve_handler(self, handler: str, args: Any = None):
+        return None
+
+    def _vocab_normalize_output(self, unwrapped, step, ctx):
+        return unwrapped
+
+
+def _step(step_id: str, handler: str, depends_on: Optional[List[str]] = None, **extra) -> Dict[str, Any]:
+    d: Dict[str, Any] = {"id": step_id, "type": "handler", "handler": handler, "output": step_id}
+    if depends_on is not None:
+        d["depends_on"] = depends_on
+    d.update(extra)
+    return d
+
+
+class TestDagExecution:
+
+    def setup_method(self):
+        self.kernel = _FakeKernel()
+        self.events: List[str] = []
+
+    def teardown_method(self):
+        self.kernel._executor.shutdown(wait=False)
+
+    def _register_sleep(self, key: str, seconds: float = 0.2, result: Any = "ok"):
+        events = self.events
+
+        async def _handler(args, ctx):
+            events.append(f"start:{key}")
+            await asyncio.sleep(seconds)
+            events.append(f"end:{key}")
+            return {"output": result}
+
+        self.kernel.interface_registry.register(key, _handler)
+
+    def _run(self, steps, ctx=None, execution="dag"):
+        ctx = ctx if ctx is not None else {"_flow_defaults": {"fail_soft": True}}
+        return asyncio.run(self.kernel._execute_steps_async(steps, ctx, execution=execution))
+
+    def test_independent_steps_run_concurrently(self):
+        for key in ("t:a", "t:b", "t:c"):
+            self._register_sleep(key, 0.3)
+        steps = [_step("a", "t:a"), _step("b", "t:b"), _step("c", "t:c")]
+        started = time.monotonic()
+        ctx = self._run(steps)
+        assert time.monotonic() - started < 0.8
+        assert ctx["a"] == ctx["b"] == ctx["c"] == "ok"
+
+    def test_sequential_is_default(self):
+        for key in ("t:a", "t:b"):
+            self._register_sleep(key, 0.2)
+        self._run([_step("a", "t:a"), _step("b", "t:b")], execution=None)
+        assert self.events == ["start:t:a", "end:t:a", "start:t:b", "end:t:b"]
+
+    def test_dependent_waits_for_dependencies(self):
+        self._register_sleep("t:a", 0.2)
+        self._register_sleep("t:b", 0.05)
+        self._register_sleep("t:merge", 0.0)
+        steps = [_step("merge", "t:merge", depends_on=["a", "b"]), _step("a", "t:a"), _step("b", "t:b")]
+        self._run(steps)
+        assert self.events.index("start:t:merge") > self.events.index("end:t:a")
+        assert self.events.index("start:t:merge") > self.events.index("end:t:b")
+
+    def test_max_concurrency_is_respected(self):
+        for key in ("t:a", "t:b", "t:c", "t:d"):
+            self._register_sleep(key, 0.1)
+        steps = [_step(k, f"t:{k}") for k in "abcd"]
+        self._run(steps, execution={"mode": "dag", "max_concurrency": 2})
+        running = peak = 0
+        for ev in self.events:
+            running += 1 if ev.startswith("start:") else -1
+            peak = max(peak, running)
+        assert peak == 2
+
+    def test_failed_dependency_skips_dependent(self):
+        async def _boom(args, ctx):
+            raise RuntimeError("boom")
+
+        self.kernel.interface_registry.register("t:boom", _boom)
+        self._register_sleep("t:after", 0.0)
+        self._run([_step("a", "t:boom"), _step("b", "t:after", depends_on=["a"])])
+        assert "start:t:after" not in self.events
+        step_ids = [r["step_id"] for r in self.kernel.diagnostics.records]
+        assert step_ids == ["a.error", "b.depends_on.skipped"]
+
+    def test_strict_dependency_failure_aborts(self):
+        self._register_sleep("t:a", 0.0)
+        self._register_sleep("t:b", 0.0)
+        ctx = {"_flow_defaults": {"fail_soft": False}}
+        self._run([_step("b", "t:b", depends_on=["missing"]), _step("a", "t:a")], ctx=ctx)
+        assert self.kernel.diagnostics.records[0]["step_id"] == "b.depends_on.abort"
+        assert "start:t:b" not in self.events
+
+    def test_flow_control_abort_cancels_running_steps(self):
+        async def _abort(args, ctx):
+            await asyncio.sleep(0.05)
+            return {"output": {"__flow_control": "abort", "reason": "stop"}}
+
+        self.kernel.interface_registry.register("t:abort", _abort)
+        self._register_sleep("t:slow", 1.0)
+        self._register_sleep("t:next", 0.0)
+        steps = [_step("abort", "t:abort"), _step("slow", "t:slow"),
+                 _step("next", "t:next", depends_on=["abort"])]
+        started = time.monotonic()
+        ctx = self._run(steps)
+        assert time.monotonic() - started < 0.8
+        assert ctx["_flow_control_abort"] is True
+        assert "end:t:slow" not in self.events
+        assert "start:t:next" not in self.events
+
+    def test_hooks_called_for_each_step(self):
+        calls: List[str] = []
+        self.kernel.interface_registry.register(
+            "flow.hooks.before_step",
+            lambda step, ctx, meta: calls.append(f"before:{step['id']}") or ({"_skip": True} if step["id"] == "b" else None))
+        self.kernel.interface_registry.register(
+            "flow.hooks.after_step",
+            lambda step, ctx, result, meta: calls.append(f"after:{step['id']}"))
+        for key in ("t:a", "t:b", "t:c"):
+            self._register_sleep(key, 0.05)
+        self._run([_step("a", "t:a"), _step("b", "t:b"), _step("c", "t:c", depends_on=["b"])])
+        assert calls[:2] == ["before:a", "before:b"]
+        assert "after:a" in calls
+        assert "after:b" not in calls
+        assert "before:c" not in calls
+
+    def test_when_sees_dependency_output(self):
+        self._register_sleep("t:a", 0.05, result="yes")
+        self._register_sleep("t:b", 0.0)
+        self._run([_step("a", "t:a"), _step("b", "t:b", depends_on=["a"], when="$ctx.a == yes")])
+        assert "start:t:b" in self.events
+
+    def test_dependency_cycle_is_reported(self):
+        self._register_sleep("t:a", 0.0)
+        self._register_sleep("t:b", 0.0)
+        self._run([_step("a", "t:a", depends_on=["b"]), _step("b", "t:b", depends_on=["a"])])
+        assert self.events == []
+        assert [r["status"] for r in self.kernel.diagnostics.records] == ["skipped", "skipped"]
+
+    def test_sync_handlers_run_in_executor_concurrently(self):
+        def _block(args, ctx):
+            time.sleep(0.3)
+            return {"output": "done"}
+
+        for key in ("t:x", "t:y", "t:z"):
+            self.kernel.interface_registry.register(key, _block)
+        started = time.monotonic()
+        ctx = self._run([_step("x", "t:x"), _step("y", "t:y"), _step("z", "t:z")])
+        assert time.monotonic() - started < 0.8
+        assert ctx["x"] == ctx["y"] == ctx["z"] == "done"
+
+
+class TestExecutionSetting:
+
+    def test_parse_execution_forms(self):
+        loader = FlowLoader()
+        assert loader._parse_execution(None) == (None, None)
+        assert loader._parse_execution("dag") == ({"mode": "dag"}, None)
+        assert loader._parse_execution({"mode": "dag", "max_concurrency": 3}) == (
+            {"mode": "dag", "max_concurrency": 3}, None)
+        execution, warning = loader._parse_execution("parallel-ish")
+        assert execution is None and warning
+
+    def test_converter_keeps_execution_and_depends_on(self):
+        flow_def = FlowDefinition(
+            flow_id="f", inputs={}, outputs={}, phases=["main"], defaults={},
+            steps=[FlowStep(id="a", phase="main", priority=100, type="handler", when=None,
+                            input={"handler": "t:a"}, output=None, raw={}),
+                   FlowStep(id="b", phase="main", priority=100, type="handler", when=None,
+                            input={"handler": "t:b"}, output=None, raw={}, depends_on=["a"])],
+            execution={"mode": "dag"},
+        )
+        legacy = FlowConverter().convert_flow_def_to_legacy(flow_def)
+        assert legacy["execution"] == {"mode": "dag"}
+        assert legacy["steps"][1]["depends_on"] == ["a"]
+        assert "depends_on" not in legacy["steps"][0]
@@ -0,0 +1,214 @@
+"""
+test_flow_scheduler.py - ヒープ型 FlowScheduler のテスト
+
+対象:
+- core_runtime/flow_scheduler.py (CronExpression.next_after / ScheduleEntry / FlowScheduler)
+"""
+from __future__ import annotations
+
+import json
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from core_runtime import flow_scheduler as fs
+from core_runtime.flow_scheduler import CronExpression, FlowScheduler, ScheduleEntry
+
+UTC = timezone.utc
+
+
+def _wait_until(cond, timeout=3.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if cond():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+class TestCronNextAfter:
+
+    @pytest.mark.parametrize("expr, after, expected", [
+        ("*/15 * * * *", datetime(2026, 1, 1, 10, 7), datetime(2026, 1, 1, 10, 15)),
+        ("0 0 * * *", datetime(2026, 1, 1, 0, 0), datetime(2026, 1, 2, 0, 0)),
+        ("30 9 * * 1", datetime(2026, 1, 1, 12, 0), datetime(2026, 1, 5, 9, 30)),  # 2026-01-05 は月曜
+        ("0 0 1 */3 *", datetime(2026, 2, 10), datetime(2026, 4, 1)),
+        ("59 23 31 12 *", datetime(2026, 12, 31, 23, 59), datetime(2027, 12, 31, 23, 59)),
+    ])
+    def test_next_after(self, expr, after, expected):
+        cron = CronExpression.parse(expr)
+        result = cron.next_after(after)
+        assert result == expected
+        assert cron.matches(result)
+
+    def test_never_matching(self):
+        assert CronExpression.parse("0 0 31 2 *").next_after(datetime(2026, 1, 1)) is None
+
+    def test_timezone(self):
+        pytest.importorskip("zoneinfo")
+        entry = ScheduleEntry("f", cron=CronExpression.parse("0 9 * * *"),
+                              tz=fs._resolve_tz("Asia/Tokyo"))
+        after = datetime(2026, 1, 1, 0, 30, tzinfo=UTC)  # 09:30 JST
+        assert entry.compute_next_base(after) == datetime(2026, 1, 2, 0, 0, tzinfo=UTC)
+
+
+class TestScheduleEntry:
+
+    def test_jitter_is_stable_and_bounded(self):
+        offsets = {ScheduleEntry(f"flow{i}", jitter_seconds=30).jitter_offset for i in range(20)}
+        assert len(offsets) > 1
+        assert all(timedelta(0) <= o <= timedelta(seconds=30) for o in offsets)
+        assert ScheduleEntry("a", jitter_seconds=30).jitter_offset == \
+            ScheduleEntry("a", jitter_seconds=30).jitter_offset
+
+    def test_set_next_applies_jitter(self):
+        entry = ScheduleEntry("a", interval_seconds=60, jitter_seconds=10)
+        base = datetime(2026, 1, 1, tzinfo=UTC)
+        entry.set_next(base)
+        assert entry._next_run_utc == base + entry.jitter_offset
+
+
+@pytest.fixture
+def calls():
+    return []
+
+
+@pytest.fixture
+def scheduler(calls, tmp_path):
+    def execute(flow_id, ctx):
+        calls.append(flow_id)
+        return {}
+
+    s = FlowScheduler(execute, state_path=str(tmp_path / "state.json"))
+    yield s
+    s.stop(timeout=2)
+
+
+def _force_due(s, flow_id, seconds_ago=0.0):
+    """エントリの次回発火時刻を過去に書き換えてスレッドを起こす"""
+    with s._lock:
+        entry = s._entries[flow_id]
+        entry.set_next(datetime.now(UTC) - timedelta(seconds=seconds_ago))
+        entry.generation += 1
+        s._push(entry)
+
+
+class TestFlowScheduler:
+
+    def test_register_computes_next_run(self, scheduler):
+        assert scheduler.register("a", {"cron": "*/5 * * * *"})
+        assert scheduler.register("b", {"interval": 30})
+        status = scheduler.get_status()["entries"]
+        for fid in ("a", "b"):
+            assert datetime.fromisoformat(status[fid]["next_run_utc"]) > datetime.now(UTC)
+        assert not scheduler.register("c", {"cron": "* * *"})
+        assert not scheduler.register("d", {"interval": 30, "misfire": "sometimes"})
+
+    def test_single_thread_sleeps_until_due(self, scheduler, calls):
+        scheduler.register("a", {"interval": 30})
+        scheduler.start()
+        threads = [t for t in threading.enumerate() if t.name == "flow_scheduler"]
+        assert len(threads) == 1
+        time.sleep(0.1)
+        assert calls == []
+        _force_due(scheduler, "a")
+        assert _wait_until(lambda: calls == ["a"])
+        next_run = datetime.fromisoformat(scheduler.get_status()["entries"]["a"]["next_run_utc"])
+        assert next_run > datetime.now(UTC) + timedelta(seconds=25)
+
+    def test_unregister_drops_heap_item(self, scheduler, calls):
+        scheduler.register("a", {"interval": 30})
+        scheduler.start()
+        _force_due(scheduler, "a", seconds_ago=0)
+        scheduler.unregister("a")
+        time.sleep(0.2)
+        assert calls in ([], ["a"])  # 発火と unregister の競合は許容
+        assert "a" not in scheduler.get_status()["entries"]
+
+    def test_misfire_skip(self, scheduler, calls):
+        diag = []
+        scheduler._diagnostics_callback = lambda **kw: diag.append(kw)
+        scheduler.register("a", {"interval": 30})
+        scheduler.start()
+        _force_due(scheduler, "a", seconds_ago=fs.MISFIRE_GRACE_SECONDS + 30)
+        assert _wait_until(lambda: any(d["status"] == "skipped" for d in diag))
+        assert calls == []
+        skipped = [d for d in diag if d["status"] == "skipped"][0]
+        assert skipped["meta"]["reason"] == "misfire"
+
+    def test_misfire_run_once(self, scheduler, calls):
+        scheduler.register("a", {"interval": 30, "misfire": "run_once"})
+        scheduler.start()
+        _force_due(scheduler, "a", seconds_ago=fs.MISFIRE_GRACE_SECONDS + 30)
+        assert _wait_until(lambda: calls == ["a"])
+        time.sleep(0.2)
+        assert calls == ["a"]
+
+    def test_max_concurrency(self, tmp_path):
+        gate = threading.Event()
+        started = []
+
+        def execute(flow_id, ctx):
+            started.append(flow_id)
+            gate.wait(5)
+            return {}
+
+        s = FlowScheduler(execute)
+        try:
+            s.register("a", {"interval": 30, "max_concurrency": 2})
+            s.start()
+            for _ in range(3):
+                _force_due(s, "a")
+                time.sleep(0.1)
+            assert _wait_until(lambda: len(started) == 2)
+            time.sleep(0.1)
+            assert len(started) == 2
+            assert s.get_status()["entries"]["a"]["running_count"] == 2
+        finally:
+            gate.set()
+            s.stop(timeout=2)
+
+    def test_state_persisted_and_caught_up(self, tmp_path, calls):
+        path = tmp_path / "state.json"
+        last = datetime.now(UTC) - timedelta(hours=1)
+        path.write_text(json.dumps({"version": fs.STATE_VERSION, "flows": {
+            "a": {"schedule": "interval:30.0", "last_run_at": last.isoformat()},
+            "b": {"schedule": "interval:30.0", "last_run_at": last.isoformat()},
+            "c": {"schedule": "interval:999.0", "last_run_at": last.isoformat()},
+        }}), encoding="utf-8")
+
+        s = FlowScheduler(lambda fid, ctx: calls.append(fid) or {}, state_path=str(path))
+        try:
+            s.register("a", {"interval": 30, "misfire": "run_once"})
+            s.register("b", {"interval": 30})
+            s.register("c", {"interval": 30})  # 定義が変わったので状態は使わない
+            s.start()
+            assert _wait_until(lambda: calls == ["a"])
+            time.sleep(0.2)
+            assert calls == ["a"]
+        finally:
+            s.stop(timeout=2)
+
+        saved = json.loads(path.read_text(encoding="utf-8"))["flows"]
+        assert datetime.fromisoformat(saved["a"]["last_run_at"]) > last
+        assert datetime.fromisoformat(saved["b"]["last_run_at"]) > last
+        assert saved["c"]["schedule"] == "interval:999.0"
+
+        # 再起動しても同じ回を再実行しない
+        calls.clear()
+        s2 = FlowScheduler(lambda fid, ctx: calls.append(fid) or {}, state_path=str(path))
+        try:
+            s2.register("a", {"interval": 30, "misfire": "run_once"})
+            s2.start()
+            time.sleep(0.2)
+            assert calls == []
+        finally:
+            s2.stop(timeout=2)
+
+    def test_corrupt_state_ignored(self, tmp_path):
+        path = tmp_path / "state.json"
+        path.write_text("{not json", encoding="utf-8")
+        s = FlowScheduler(lambda fid, ctx: {}, state_path=str(path))
+        assert s.register("a", {"interval": 30})
@@ -0,0 +1,165 @@
+"""
+test_flow_step_plans.py - ステップ解決プランのテスト
+
+対象:
+- core_runtime/kernel_variable_resolver.py (compile_value / resolve_plan / step_plan)
+- core_runtime/kernel_flow_execution.py (_resolve_step_args / _eval_step_condition)
+- core_runtime/kernel_handlers_runtime.py (flow 再登録時のプラン破棄)
+"""
+from __future__ import annotations
+
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from core_runtime import kernel_variable_resolver as kvr
+from core_runtime.diagnostics import Diagnostics
+from core_runtime.event_bus import EventBus
+from core_runtime.interface_registry import InterfaceRegistry
+from core_runtime.kernel import Kernel
+from core_runtime.kernel_variable_resolver import MAX_RESOLVE_DEPTH, VariableResolver
+
+
+@pytest.fixture
+def resolver():
+    return VariableResolver()
+
+
+CTX = {
+    "name": "rumi",
+    "count": 3,
+    "nested": {"a": {"b": [1, 2]}},
+    "alias": "$ctx.name",
+    "step_out": {"x": None},
+}
+
+VALUES = [
+    "plain",
+    "$ctx.name",
+    "  $ctx.count  ",
+    "$flow.nested.a.b",
+    "$ctx.alias",
+    "$ctx.missing",
+    "  $ctx.missing ",
+    "hello $ctx.name, n=$ctx.count, m=$ctx.missing",
+    "$env.RUMI_PLAN_TEST_VAR",
+    "$env.RUMI_PLAN_TEST_UNSET",
+    "$ctx.step_out.x",
+    "$ctx.nested..a",
+    {"k": "$ctx.name", "c": {"d": [1, "two", {"e": None}]}, "l": ["$ctx.count", 4]},
+    [],
+    {},
+    42,
+    None,
+]
+
+
+class TestCompiledResolution:
+
+    @pytest.mark.parametrize("value", VALUES)
+    def test_matches_resolve_value(self, resolver, value, monkeypatch):
+        monkeypatch.setenv("RUMI_PLAN_TEST_VAR", "env-value")
+        plan = resolver.compile_value(value)
+        assert resolver.resolve_plan(plan, CTX) == resolver.resolve_value(value, CTX)
+
+    def test_depth_limit_matches(self, resolver):
+        deep = "$ctx.name"
+        for _ in range(MAX_RESOLVE_DEPTH + 3):
+            deep = {"inner": deep}
+        assert resolver.resolve_plan(resolver.compile_value(deep), CTX) == resolver.resolve_value(deep, CTX)
+
+    def test_constant_containers_are_fresh(self, resolver):
+        args = {"opts": {"retries": 2}, "tags": ["a"]}
+        plan = resolver.compile_value(args)
+        first = resolver.resolve_plan(plan, {})
+        first["opts"]["retries"] = 99
+        first["tags"].append("b")
+        assert resolver.resolve_plan(plan, {}) == {"opts": {"retries": 2}, "tags": ["a"]}
+        assert args == {"opts": {"retries": 2}, "tags": ["a"]}
+
+    def test_resolution_does_not_reparse(self, resolver):
+        plan = resolver.compile_value({"a": "$ctx.name", "b": "x $ctx.count"})
+        with patch.object(kvr, "_VAR_REF_RE") as regex:
+            assert resolver.resolve_plan(plan, CTX) == {"a": "rumi", "b": "x 3"}
+        regex.fullmatch.assert_not_called()
+        regex.sub.assert_not_called()
+
+    @pytest.mark.parametrize("condition,expected", [
+        ("$ctx.name == rumi", True),
+        ("$ctx.name != rumi", False),
+        ("$ctx.count >= 3", True),
+        ("$ctx.count < 2.5", False),
+        ("$ctx.step_out.x == none", True),
+        ("$ctx.count > none", False),
+        ("$ctx.name", True),
+        ("$ctx.missing == '$ctx.missing'", True),
+    ])
+    def test_condition_plan(self, resolver, condition, expected):
+        assert resolver.eval_condition_plan(resolver.compile_condition(condition), CTX) is expected
+
+
+class TestStepPlanCache:
+
+    def test_cached_per_step(self, resolver):
+        step = {"id": "s", "args": {"a": "$ctx.name"}, "when": "$ctx.count > 1"}
+        plan = resolver.step_plan(step)
+        assert resolver.step_plan(step) is plan
+        assert resolver.step_plan(dict(step)) is not plan
+
+    def test_replaced_args_recompile(self, resolver):
+        step = {"id": "s", "args": {"a": "$ctx.name"}}
+        plan = resolver.step_plan(step)
+        step["args"] = {"a": "$ctx.count"}
+        assert resolver.step_plan(step) is not plan
+        assert resolver.resolve_plan(resolver.step_plan(step).args, CTX) == {"a": 3}
+
+    def test_invalidate(self, resolver):
+        step = {"id": "s", "args": {}}
+        plan = resolver.step_plan(step)
+        resolver.invalidate_plans()
+        assert resolver.step_plan(step) is not plan
+
+    def test_bounded(self, resolver, monkeypatch):
+        monkeypatch.setattr(kvr, "MAX_CACHED_STEP_PLANS", 3)
+        steps = [{"id": str(i)} for i in range(5)]
+        for step in steps:
+            resolver.step_plan(step)
+        assert len(resolver._step_plans) == 3
+
+
+@pytest.fixture
+def kc():
+    kernel = Kernel(diagnostics=Diagnostics(), interface_registry=InterfaceRegistry(), event_bus=EventBus())
+    yield kernel
+    kernel._flow_loop.stop()
+
+
+class TestKernelIntegration:
+
+    def test_steps_use_plans(self, kc):
+        seen = []
+        kc.interface_registry.register("t.echo", lambda args, ctx: seen.append(args) or args)
+        steps = [
+            {"id": "a", "type": "handler", "handler": "t.echo", "args": {"who": "$ctx.name"},
+             "when": "$ctx.count > 1"},
+            {"id": "b", "type": "handler", "handler": "t.echo", "args": {"who": "skip"},
+             "when": "$ctx.count > 5"},
+        ]
+        with patch.object(kc._variable_resolver, "resolve_value",
+                          wraps=kc._variable_resolver.resolve_value) as slow:
+            asyncio.run(kc._execute_steps_async(steps, {"name": "rumi", "count": 3}))
+        assert seen == [{"who": "rumi"}]
+        slow.assert_not_called()
+        assert len(kc._variable_resolver._step_plans) == 2
+
+    def test_disabled_by_env(self, kc, monkeypatch):
+        monkeypatch.setenv("RUMI_FLOW_COMPILED_PLANS", "0")
+        step = {"id": "a", "args": {"who": "$ctx.name"}, "when": "$ctx.name == rumi"}
+        assert kc._resolve_step_args(step, {"name": "rumi"}) == {"who": "rumi"}
+        assert kc._eval_step_condition(step, {"name": "rumi"}) is True
+        assert kc._variable_resolver._step_plans == {}
+
+    def test_eval_condition_unchanged(self, kc):
+        assert kc._eval_condition("$ctx.count >= 3", {"count": "3"}) is True
+        assert kc._eval_condition("  ", {}) is False
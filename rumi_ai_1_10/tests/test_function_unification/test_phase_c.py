@@ -6,7 +6,7 @@ Tests:
  2. core_secrets_capability/ exists with ecosystem.json
  3. core_flow_capability/ exists with ecosystem.json
  4. core_communication_capability/ exists with ecosystem.json
- 5. core_store_capability has 6 function dirs (get, set, delete, list, batch_get, cas)
+ 5. core_store_capability has 10 function dirs (get, set, delete, list, batch_get, batch_set, batch_delete, cas, changes, watch)
  6. core_secrets_capability has 1 function dir (get)
  7. core_flow_capability has 1 function dir (run)
  8. core_communication_capability has 2 function dirs (send, propose_patch)
@@ -44,7 +44,7 @@ CORE_PACK_ROOT = _PROJECT_ROOT / "core_runtime" / "core_pack"
 # ---------------------------------------------------------------------------
 EXPECTED_PACKS = {
     "core_store_capability": {
-        "functions": ["get", "set", "delete", "list", "batch_get", "cas"],
+        "functions": ["get", "set", "delete", "list", "batch_get", "batch_set", "batch_delete", "cas", "changes", "watch"],
     },
     "core_secrets_capability": {
         "functions": ["get"],
@@ -115,10 +115,10 @@ class TestFunctionDirectoryCounts(unittest.TestCase):
             f"{pack_name}: expected {expected}, got {actual}",
         )
 
-    def test_05_store_has_6_functions(self):
+    def test_05_store_has_10_functions(self):
         self._assert_function_dirs(
             "core_store_capability",
-            ["get", "set", "delete", "list", "batch_get", "cas"],
+            ["get", "set", "delete", "list", "batch_get", "batch_set", "batch_delete", "cas", "changes", "watch"],
         )
 
     def test_06_secrets_has_1_function(self):
@@ -0,0 +1,233 @@
+"""
+test_function_worker_pool.py - 常駐 Python ワーカープールのテスト
+
+対象:
+- core_runtime/function_worker_pool.py
+- CapabilityExecutor のワーカープール経由実行パス
+
+実際に sys.executable のワーカーを起動する。
+"""
+from __future__ import annotations
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+_project_root = Path(__file__).resolve().parent.parent
+if str(_project_root) not in sys.path:
+    sys.path.insert(0, str(_project_root))
+
+from core_runtime.capability_executor import CapabilityExecutor
+from core_runtime.function_registry import FunctionEntry
+from core_runtime.function_worker_pool import (
+    FunctionWorkerPool,
+    WorkerSpec,
+    is_worker_pool_enabled,
+)
+
+
+_MAIN_PY = """
+import os
+_COUNTER = {"n": 0}
+
+def run(context, args):
+    _COUNTER["n"] += 1
+    mode = args.get("mode")
+    if mode == "raise":
+        raise ValueError("boom")
+    if mode == "sleep":
+        import time
+        time.sleep(args.get("seconds", 5))
+    if mode == "print":
+        print("noise on stdout")
+    if mode == "big":
+        return {"data": "x" * args.get("size", 10)}
+    return {"n": _COUNTER["n"], "pid": os.getpid(), "principal": context.get("principal_id")}
+"""
+
+
+class _PoolTestBase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp(prefix="rumi_test_worker_pool_")
+        self.main_py = Path(self.tmpdir) / "main.py"
+        self.main_py.write_text(_MAIN_PY, encoding="utf-8")
+        self.pool = FunctionWorkerPool(max_workers_per_key=2, max_requests=100, idle_timeout=60)
+
+    def tearDown(self):
+        self.pool.shutdown()
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def _spec(self, scope="pack_a"):
+        return WorkerSpec(scope=scope, module_path=str(self.main_py), func_name="run",
+                          cwd=self.tmpdir, path_entry=self.tmpdir)
+
+
+class TestFunctionWorkerPool(_PoolTestBase):
+
+    def test_worker_is_reused_and_keeps_module_state(self):
+        r1 = self.pool.call(self._spec(), {}, {}, timeout=10)
+        r2 = self.pool.call(self._spec(), {}, {}, timeout=10)
+        self.assertTrue(r1["ok"])
+        self.assertEqual(r1["result"]["pid"], r2["result"]["pid"])
+        self.assertEqual(r2["result"]["n"], 2)
+        stats = self.pool.stats()
+        self.assertEqual(stats["spawned"], 1)
+        self.assertEqual(stats["reused"], 1)
+
+    def test_scopes_are_isolated(self):
+        r1 = self.pool.call(self._spec("pack_a"), {}, {}, timeout=10)
+        r2 = self.pool.call(self._spec("pack_b"), {}, {}, timeout=10)
+        self.assertNotEqual(r1["result"]["pid"], r2["result"]["pid"])
+        self.assertEqual(r2["result"]["n"], 1)
+
+    def test_function_exception_keeps_worker(self):
+        r1 = self.pool.call(self._spec(), {}, {"mode": "raise"}, timeout=10)
+        self.assertFalse(r1["ok"])
+        self.assertEqual(r1["error_type"], "ValueError")
+        self.assertEqual(r1["error"], "boom")
+        r2 = self.pool.call(self._spec(), {}, {}, timeout=10)
+        self.assertTrue(r2["ok"])
+        self.assertEqual(self.pool.stats()["spawned"], 1)
+
+    def test_stdout_print_does_not_corrupt_protocol(self):
+        r = self.pool.call(self._spec(), {}, {"mode": "print"}, timeout=10)
+        self.assertTrue(r["ok"])
+
+    def test_timeout_kills_only_offending_worker(self):
+        warm = self.pool.call(self._spec("pack_b"), {}, {}, timeout=10)
+        r = self.pool.call(self._spec(), {}, {"mode": "sleep", "seconds": 10}, timeout=1.5)
+        self.assertFalse(r["ok"])
+        self.assertEqual(r["error_type"], "timeout")
+        again = self.pool.call(self._spec("pack_b"), {}, {}, timeout=10)
+        self.assertEqual(warm["result"]["pid"], again["result"]["pid"])
+        fresh = self.pool.call(self._spec(), {}, {}, timeout=10)
+        self.assertEqual(fresh["result"]["n"], 1)
+
+    def test_max_requests_recycles_worker(self):
+        pool = FunctionWorkerPool(max_workers_per_key=1, max_requests=2, idle_timeout=60)
+        try:
+            pids = [pool.call(self._spec(), {}, {}, timeout=10)["result"]["pid"] for _ in range(3)]
+            self.assertEqual(pids[0], pids[1])
+            self.assertNotEqual(pids[1], pids[2])
+            self.assertEqual(pool.stats()["recycled"], 1)
+        finally:
+            pool.shutdown()
+
+    def test_module_change_replaces_worker(self):
+        r1 = self.pool.call(self._spec(), {}, {}, timeout=10)
+        self.main_py.write_text(_MAIN_PY + "\n# changed\n", encoding="utf-8")
+        r2 = self.pool.call(self._spec(), {}, {}, timeout=10)
+        self.assertNotEqual(r1["result"]["pid"], r2["result"]["pid"])
+        self.assertEqual(self.pool.stats()["stale"], 1)
+
+    def test_response_too_large(self):
+        pool = FunctionWorkerPool(max_workers_per_key=1, max_response_size=1024)
+        try:
+            r = pool.call(self._spec(), {}, {"mode": "big", "size": 4096}, timeout=10)
+            self.assertFalse(r["ok"])
+            self.assertEqual(r["error_type"], "response_too_large")
+        finally:
+            pool.shutdown()
+
+    def test_load_error_reported(self):
+        bad = Path(self.tmpdir) / "bad.py"
+        bad.write_text("raise RuntimeError('import failed')\n", encoding="utf-8")
+        spec = WorkerSpec(scope="pack_a", module_path=str(bad), func_name="run", cwd=self.tmpdir)
+        r = self.pool.call(spec, {}, {}, timeout=10)
+        self.assertFalse(r["ok"])
+        self.assertEqual(r["error_type"], "load_error")
+        self.assertEqual(self.pool.stats()["busy_workers"], 0)
+
+    def test_reap_idle(self):
+        pool = FunctionWorkerPool(max_workers_per_key=1, idle_timeout=60)
+        try:
+            pool.call(self._spec(), {}, {}, timeout=10)
+            for workers in pool._idle.values():
+                for w in workers:
+                    w.last_used = time.monotonic() - 120
+            self.assertEqual(pool.reap_idle(), 1)
+            self.assertEqual(pool.stats()["idle_workers"], 0)
+        finally:
+            pool.shutdown()
+
+    def test_call_after_shutdown_is_rejected(self):
+        self.pool.shutdown()
+        r = self.pool.call(self._spec(), {}, {}, timeout=10)
+        self.assertEqual(r["error_type"], "pool_closed")
+
+
+class TestCapabilityExecutorWithPool(_PoolTestBase):
+
+    def _make_executor(self):
+        executor = CapabilityExecutor()
+        executor._initialized = True
+        executor._worker_pool = self.pool
+        return executor
+
+    def _entry(self):
+        return FunctionEntry(function_id="f", pack_id="pack_a", host_execution=True,
+                             function_dir=Path(self.tmpdir), main_py_path=self.main_py, manifest={})
+
+    def test_user_function_host_uses_pool(self):
+        executor = self._make_executor()
+        with patch("core_runtime.capability_executor.subprocess.run") as mock_run:
+            r1 = executor._execute_user_function_host("pack_a", self._entry(), {}, "r1", time.time(), 10)
+            r2 = executor._execute_user_function_host("pack_a", self._entry(), {}, "r2", time.time(), 10)
+        mock_run.assert_not_called()
+        self.assertTrue(r1.success)
+        self.assertEqual(r1.output["principal"], "pack_a")
+        self.assertEqual(r2.output["n"], 2)
+
+    def test_user_function_error_maps_to_function_execution_error(self):
+        executor = self._make_executor()
+        resp = executor._execute_user_function_host("pack_a", self._entry(), {"mode": "raise"}, "r", time.time(), 10)
+        self.assertFalse(resp.success)
+        self.assertEqual(resp.error_type, "function_execution_error")
+        self.assertIn("boom", resp.error)
+
+    def test_host_function_timeout(self):
+        executor = self._make_executor()
+        entry = self._entry()
+        entry.manifest = {"grant_config": {"timeout": 1}}
+        with patch.dict(os.environ, {"RUMI_ALLOW_HOST_EXECUTION": "1"}):
+            resp = executor._execute_host_function("pack_a", entry, {"mode": "sleep", "seconds": 10}, "r", time.time())
+        self.assertFalse(resp.success)
+        self.assertEqual(resp.error_type, "timeout")
+
+    def test_handler_subprocess_uses_pool(self):
+        from core_runtime.capability_executor import _HandlerDefAdapter
+        executor = self._make_executor()
+        handler_def = _HandlerDefAdapter(handler_id="h", permission_id="p", entrypoint="main.py:run",
+                                         handler_dir=Path(self.tmpdir), handler_py_path=self.main_py)
+        resp = executor._execute_handler_subprocess(handler_def, "pack_a", "p", {}, {"mode": "raise"}, 10, "r", time.time())
+        self.assertFalse(resp.success)
+        self.assertEqual(resp.error_type, "handler_error")
+        resp = executor._execute_handler_subprocess(handler_def, "pack_a", "p", {}, {}, 10, "r", time.time())
+        self.assertTrue(resp.success)
+        self.assertEqual(resp.output["n"], 2)
+
+
+class TestWorkerPoolEnabledFlag(unittest.TestCase):
+
+    def test_disabled_by_default(self):
+        with patch.dict(os.environ, {}, clear=False):
+            os.environ.pop("RUMI_FUNCTION_WORKER_POOL", None)
+            self.assertFalse(is_worker_pool_enabled())
+
+    def test_enabled_by_env(self):
+        with patch.dict(os.environ, {"RUMI_FUNCTION_WORKER_POOL": "1"}):
+            self.assertTrue(is_worker_pool_enabled())
+
+    def test_executor_without_pool_keeps_subprocess_path(self):
+        executor = CapabilityExecutor()
+        self.assertIsNone(executor._worker_pool)
+
+
+if __name__ == "__main__":
+    unittest.main()
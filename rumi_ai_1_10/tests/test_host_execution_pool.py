@@ -0,0 +1,178 @@
+"""
+test_host_execution_pool.py - ホスト実行用共有スレッドプールのテスト
+
+対象:
+- core_runtime/host_execution_pool.py (HostExecutionPool)
+- core_runtime/python_file_executor.py (_execute_on_host のプール利用)
+"""
+from __future__ import annotations
+
+import concurrent.futures
+import threading
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from core_runtime.di_container import get_container
+from core_runtime.host_execution_pool import HostExecutionPool, HostPoolBusy
+from core_runtime.python_file_executor import ExecutionContext, PythonFileExecutor
+
+
+def _wait_until(cond, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if cond():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+@pytest.fixture
+def pool():
+    p = HostExecutionPool(max_workers=2, max_per_pack=2, max_queue=4, idle_timeout=1.0)
+    yield p
+    p.shutdown()
+
+
+class TestHostExecutionPool:
+
+    def test_run_returns_result_and_reuses_workers(self, pool):
+        names = [pool.run("p", lambda: threading.current_thread().name, 2.0) for _ in range(5)]
+        assert set(names) == {"rumi-host-exec"}
+        stats = pool.stats()
+        assert stats["completed"] == 5
+        assert stats["workers"] == 1
+
+    def test_exception_propagates(self, pool):
+        def boom():
+            raise ValueError("bad")
+
+        with pytest.raises(ValueError, match="bad"):
+            pool.run("p", boom, 2.0)
+        assert pool.stats()["packs"] == {}
+
+    def test_timeout_abandons_without_waiting(self, pool):
+        gate = threading.Event()
+        started = time.monotonic()
+        with pytest.raises(concurrent.futures.TimeoutError):
+            pool.run("p", lambda: gate.wait(5), 0.2)
+        assert time.monotonic() - started < 1.0
+        stats = pool.stats()
+        assert stats["timeouts"] == 1
+        assert stats["abandoned"] == 1
+        assert stats["abandoned_running"] == 1
+        assert stats["workers"] == 0
+        # 放棄中も Pack の枠は返されない
+        assert stats["packs"] == {"p": 1}
+        # プールは引き続き使える
+        assert pool.run("q", lambda: 42, 2.0) == 42
+        gate.set()
+        assert _wait_until(lambda: pool.stats()["abandoned_running"] == 0)
+        assert pool.stats()["packs"] == {}
+
+    def test_per_pack_quota(self, pool):
+        gate = threading.Event()
+        futures = [pool.submit("p", lambda: gate.wait(5), 1.0) for _ in range(2)]
+        with pytest.raises(HostPoolBusy):
+            pool.run("p", lambda: 1, 0.2)
+        # 他の Pack は影響を受けない
+        pool_other = pool.submit("q", lambda: "ok", 1.0)
+        gate.set()
+        assert pool_other.result(2) == "ok"
+        assert all(f.result(2) for f in futures)
+        assert pool.stats()["rejected"] == 1
+
+    def test_quota_waits_for_slot(self, pool):
+        gate = threading.Event()
+        pool.submit("p", lambda: gate.wait(5), 1.0)
+        pool.submit("p", lambda: gate.wait(5), 1.0)
+        threading.Timer(0.2, gate.set).start()
+        assert pool.run("p", lambda: "after", 2.0) == "after"
+
+    def test_queue_limit(self):
+        p = HostExecutionPool(max_workers=1, max_per_pack=10, max_queue=1)
+        gate = threading.Event()
+        try:
+            p.submit("p", lambda: gate.wait(5), 1.0)
+            assert _wait_until(lambda: p.stats()["active_workers"] == 1)
+            p.submit("p", lambda: None, 1.0)
+            with pytest.raises(HostPoolBusy):
+                p.submit("p", lambda: None, 1.0)
+        finally:
+            gate.set()
+            p.shutdown()
+
+    def test_queued_task_timeout_is_cancelled(self):
+        p = HostExecutionPool(max_workers=1, max_per_pack=10, max_queue=10)
+        gate = threading.Event()
+        ran = []
+        try:
+            p.submit("p", lambda: gate.wait(5), 1.0)
+            with pytest.raises(concurrent.futures.TimeoutError):
+                p.run("p", lambda: ran.append(1), 0.2)
+            assert p.stats()["queue_depth"] == 0
+            assert p.stats()["abandoned"] == 0
+        finally:
+            gate.set()
+            p.shutdown()
+        time.sleep(0.1)
+        assert ran == []
+
+    def test_gauges_published(self, pool):
+        from core_runtime.metrics import get_metrics_collector
+
+        pool.run("p", lambda: None, 2.0)
+        snapshot = get_metrics_collector().snapshot()
+        assert "host_pool.queue_depth" in str(snapshot)
+        assert "host_pool.active_workers" in str(snapshot)
+
+
+BLOCK = '''
+import time
+
+def run(input_data, context):
+    time.sleep(input_data.get("sleep", 0))
+    return {"ok": True}
+'''
+
+
+class TestExecutorIntegration:
+
+    @pytest.fixture
+    def shared_pool(self):
+        p = HostExecutionPool(max_workers=2, max_per_pack=1, max_queue=4)
+        get_container().set_instance("host_execution_pool", p)
+        yield p
+        p.shutdown()
+        get_container().reset("host_execution_pool")
+
+    @staticmethod
+    def _execute(block, sleep, timeout, callback=None):
+        executor = PythonFileExecutor()
+        executor._approval_checker = MagicMock()
+        executor._approval_checker.get_fingerprint.return_value = None
+        context = ExecutionContext(flow_id="f", step_id="s", phase="flow",
+                                   ts="2026-01-01T00:00:00Z", owner_pack="my_pack", inputs={},
+                                   diagnostics_callback=callback)
+        return executor._execute_on_host(block, "my_pack", {"sleep": sleep}, context, timeout)
+
+    def test_runs_on_shared_pool(self, shared_pool, tmp_path):
+        block = tmp_path / "block.py"
+        block.write_text(BLOCK, encoding="utf-8")
+        result = self._execute(block, 0, 5.0)
+        assert result.success and result.output == {"ok": True}
+        assert shared_pool.stats()["completed"] == 1
+
+    def test_timeout_and_busy(self, shared_pool, tmp_path):
+        block = tmp_path / "block.py"
+        block.write_text(BLOCK, encoding="utf-8")
+        events = []
+        started = time.monotonic()
+        result = self._execute(block, 1.0, 0.2, events.append)
+        assert time.monotonic() - started < 0.8
+        assert result.error_type == "timeout"
+        assert events[0]["event"] == "host_execution_timeout"
+        # 放棄された実行が枠を持っている間、同じ Pack は host_pool_busy
+        busy = self._execute(block, 0, 0.2)
+        assert busy.error_type == "host_pool_busy"
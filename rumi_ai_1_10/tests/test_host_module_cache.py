@@ -0,0 +1,169 @@
+"""
+test_host_module_cache.py - ホスト実行モジュールキャッシュのテスト
+
+対象:
+- core_runtime/python_file_executor.py (HostModuleCache / _execute_on_host)
+- core_runtime/approval_manager.py (MODIFIED 時のキャッシュ破棄)
+"""
+from __future__ import annotations
+
+import textwrap
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from core_runtime import python_file_executor as pfe
+from core_runtime.approval_manager import ApprovalManager, PackApproval, PackStatus
+from core_runtime.python_file_executor import (
+    ExecutionContext,
+    HostModuleCache,
+    HostModuleEntry,
+    PythonFileExecutor,
+)
+
+
+BLOCK = textwrap.dedent("""
+    LOADS = globals().get("LOADS", 0) + 1
+    CALLS = 0
+
+    def run(input_data, context):
+        global CALLS
+        CALLS += 1
+        return {"calls": CALLS, "marker": MARKER, "x": input_data.get("x")}
+""")
+
+
+def _write_block(path, marker="v1"):
+    path.write_text(f"MARKER = {marker!r}\n" + BLOCK, encoding="utf-8")
+
+
+def _context():
+    return ExecutionContext(flow_id="f", step_id="s", phase="flow",
+                            ts="2026-01-01T00:00:00Z", owner_pack="my_pack", inputs={})
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache(monkeypatch):
+    cache = HostModuleCache()
+    monkeypatch.setattr(pfe, "_host_module_cache", cache)
+    return cache
+
+
+@pytest.fixture
+def executor():
+    ex = PythonFileExecutor()
+    ex._approval_checker = MagicMock()
+    ex._approval_checker.get_fingerprint.return_value = "fp-1"
+    return ex
+
+
+def _run(executor, path, owner_pack="my_pack", x=1):
+    result = executor._execute_on_host(path, owner_pack, {"x": x}, _context(), 10.0)
+    assert result.success, result.error
+    return result.output
+
+
+class TestHostExecutionCache:
+
+    def test_module_loaded_once(self, executor, tmp_path, fresh_cache):
+        block = tmp_path / "block.py"
+        _write_block(block)
+        assert _run(executor, block, x=1) == {"calls": 1, "marker": "v1", "x": 1}
+        with patch.object(pfe.importlib.util, "spec_from_file_location") as loader, \
+                patch.object(pfe.inspect, "signature") as signature:
+            assert _run(executor, block, x=2) == {"calls": 2, "marker": "v1", "x": 2}
+        loader.assert_not_called()
+        signature.assert_not_called()
+        assert fresh_cache.stats() == {"entries": 1, "hits": 1, "misses": 1}
+        assert not any(name.startswith("pfc_my_pack_block_") for name in pfe.sys.modules)
+
+    def test_fingerprint_change_reloads(self, executor, tmp_path):
+        block = tmp_path / "block.py"
+        _write_block(block)
+        _run(executor, block)
+        _write_block(block, "v2")
+        assert _run(executor, block)["marker"] == "v1"
+        executor._approval_checker.get_fingerprint.return_value = "fp-2"
+        assert _run(executor, block) == {"calls": 1, "marker": "v2", "x": 1}
+
+    def test_unapproved_pack_keyed_by_content(self, executor, tmp_path):
+        executor._approval_checker.get_fingerprint.return_value = None
+        block = tmp_path / "block.py"
+        _write_block(block)
+        _run(executor, block)
+        assert _run(executor, block)["calls"] == 2
+        _write_block(block, "v2")
+        assert _run(executor, block) == {"calls": 1, "marker": "v2", "x": 1}
+
+    def test_disabled_by_env(self, executor, tmp_path, monkeypatch, fresh_cache):
+        monkeypatch.setenv("RUMI_HOST_MODULE_CACHE", "0")
+        block = tmp_path / "block.py"
+        _write_block(block)
+        _run(executor, block)
+        assert _run(executor, block)["calls"] == 1
+        assert fresh_cache.stats()["entries"] == 0
+
+    def test_missing_run_is_not_cached(self, executor, tmp_path, fresh_cache):
+        block = tmp_path / "norun.py"
+        block.write_text("VALUE = 1\n", encoding="utf-8")
+        result = executor._execute_on_host(block, "my_pack", {}, _context(), 10.0)
+        assert result.error_type == "no_run_function"
+        assert fresh_cache.stats()["entries"] == 0
+
+
+class TestHostModuleCache:
+
+    @staticmethod
+    def _entry():
+        return HostModuleEntry(module=None, run_fn=lambda: None, param_count=0,
+                               is_generator=False, is_coroutine=False)
+
+    def test_lru_eviction(self):
+        cache = HostModuleCache(max_entries=2)
+        for name in ("a", "b"):
+            cache.put(("p", name, "h"), self._entry())
+        cache.get(("p", "a", "h"))
+        cache.put(("p", "c", "h"), self._entry())
+        assert cache.get(("p", "b", "h")) is None
+        assert cache.get(("p", "a", "h")) is not None
+
+    def test_first_put_wins(self):
+        cache = HostModuleCache()
+        first = cache.put(("p", "a", "h"), self._entry())
+        assert cache.put(("p", "a", "h"), self._entry()) is first
+
+    def test_invalidate_pack(self):
+        cache = HostModuleCache()
+        cache.put(("p", "a", "h"), self._entry())
+        cache.put(("p", "b", "h"), self._entry())
+        cache.put(("q", "a", "h"), self._entry())
+        assert cache.invalidate_pack("p") == 2
+        assert cache.stats()["entries"] == 1
+
+
+class TestApprovalInvalidation:
+
+    @pytest.fixture
+    def am(self, tmp_path):
+        am = ApprovalManager(packs_dir=str(tmp_path / "ecosystem"),
+                             grants_dir=str(tmp_path / "grants"), secret_key="k")
+        am.grants_dir.mkdir(parents=True)
+        am._approvals["my_pack"] = PackApproval(
+            pack_id="my_pack", status=PackStatus.APPROVED, created_at="2026-01-01T00:00:00Z",
+            file_hashes={"backend/blocks/block.py": "sha256:aa"},
+        )
+        return am
+
+    def test_mark_modified_invalidates(self, am, fresh_cache):
+        fresh_cache.put(("my_pack", "/x/block.py", "h"), TestHostModuleCache._entry())
+        fresh_cache.put(("other", "/y/block.py", "h"), TestHostModuleCache._entry())
+        am.mark_modified("my_pack")
+        assert fresh_cache.get(("my_pack", "/x/block.py", "h")) is None
+        assert fresh_cache.get(("other", "/y/block.py", "h")) is not None
+
+    def test_apply_update_mismatch_invalidates(self, am, fresh_cache):
+        fresh_cache.put(("my_pack", "/x/block.py", "h"), TestHostModuleCache._entry())
+        am.apply_update("my_pack", {"backend/blocks/block.py": "sha256:aa"})
+        assert fresh_cache.stats()["entries"] == 1
+        am.apply_update("my_pack", {"backend/blocks/block.py": "sha256:bb"})
+        assert fresh_cache.stats()["entries"] == 0
@@ -0,0 +1,141 @@
+"""
+test_kernel_event_loop.py - Kernel 常駐イベントループのテスト
+
+対象:
+- core_runtime/kernel_event_loop.py (KernelEventLoop)
+- core_runtime/kernel_flow_execution.py (execute_flow_sync の常駐ループ経由実行)
+"""
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from core_runtime.kernel import Kernel
+from core_runtime.kernel_event_loop import KernelEventLoop
+
+
+@pytest.fixture
+def loop():
+    kel = KernelEventLoop()
+    yield kel
+    kel.stop()
+
+
+class TestKernelEventLoop:
+
+    def test_lazy_start(self, loop):
+        assert not loop.is_running()
+        assert loop.run(asyncio.sleep(0, result=1)) == 1
+        assert loop.is_running()
+
+    def test_loop_is_reused(self, loop):
+        async def current():
+            return asyncio.get_running_loop(), threading.current_thread()
+
+        first = loop.run(current())
+        second = loop.run(current())
+        assert first == second
+        assert first[1] is not threading.current_thread()
+
+    def test_timeout_cancels_coroutine(self, loop):
+        cancelled = threading.Event()
+
+        async def slow():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        with pytest.raises(concurrent.futures.TimeoutError):
+            loop.run(slow(), timeout=0.1)
+        assert cancelled.wait(2)
+
+    def test_stop_cancels_pending_tasks(self):
+        kel = KernelEventLoop()
+        cancelled = threading.Event()
+
+        async def forever():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        future = kel.submit(forever())
+        kel.stop()
+        assert cancelled.is_set()
+        assert future.cancelled()
+        assert not kel.is_running()
+
+    def test_restart_after_stop(self, loop):
+        loop.run(asyncio.sleep(0))
+        loop.stop()
+        assert loop.run(asyncio.sleep(0, result="again")) == "again"
+
+
+class TestExecuteFlowSyncSharedLoop:
+
+    @pytest.fixture
+    def kc(self):
+        kernel = Kernel()
+        yield kernel
+        kernel._flow_loop.stop()
+
+    def test_flows_share_kernel_loop(self, kc):
+        loops = []
+
+        async def flow(flow_id, context=None, timeout=None):
+            loops.append(asyncio.get_running_loop())
+            return {"flow": flow_id}
+
+        with patch.object(kc, "execute_flow", side_effect=flow):
+            assert kc.execute_flow_sync("a") == {"flow": "a"}
+            assert kc.execute_flow_sync("b") == {"flow": "b"}
+        assert loops[0] is loops[1]
+        assert not loops[0].is_closed()
+
+    def test_concurrent_callers(self, kc):
+        async def flow(flow_id, context=None, timeout=None):
+            await asyncio.sleep(0.2)
+            return {"flow": flow_id}
+
+        with patch.object(kc, "execute_flow", side_effect=flow):
+            with concurrent.futures.ThreadPoolExecutor(max_workers=4) as pool:
+                results = list(pool.map(kc.execute_flow_sync, ["a", "b", "c", "d"]))
+        assert [r["flow"] for r in results] == ["a", "b", "c", "d"]
+
+    def test_call_from_loop_thread_falls_back(self, kc):
+        async def flow(flow_id, context=None, timeout=None):
+            return {"loop": asyncio.get_running_loop()}
+
+        async def nested():
+            return kc.execute_flow_sync("inner", timeout=5)
+
+        with patch.object(kc, "execute_flow", side_effect=flow):
+            result = kc._flow_loop.run(nested(), timeout=10)
+        assert result["loop"] is not kc._flow_loop._loop
+
+    def test_disabled_uses_asyncio_run(self, kc, monkeypatch):
+        monkeypatch.setenv("RUMI_KERNEL_SHARED_LOOP", "0")
+
+        async def flow(flow_id, context=None, timeout=None):
+            return {"ok": True}
+
+        with patch.object(kc, "execute_flow", side_effect=flow):
+            assert kc.execute_flow_sync("a") == {"ok": True}
+        assert not kc._flow_loop.is_running()
+
+    def test_shutdown_stops_loop(self, kc):
+        async def flow(flow_id, context=None, timeout=None):
+            return {}
+
+        with patch.object(kc, "execute_flow", side_effect=flow):
+            kc.execute_flow_sync("a")
+        assert kc._flow_loop.is_running()
+        kc.shutdown()
+        assert not kc._flow_loop.is_running()
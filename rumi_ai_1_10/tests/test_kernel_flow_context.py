@@ -0,0 +1,158 @@
+"""
+test_kernel_flow_context.py - サブフロー用コピーオンライトコンテキストのテスト
+
+対象:
+- core_runtime/kernel_flow_context.py (LayeredFlowContext, fork_flow_context)
+- core_runtime/kernel_flow_execution.py (_execute_sub_flow_step の子コンテキスト)
+"""
+from __future__ import annotations
+
+import asyncio
+import copy
+import json
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from core_runtime import kernel_flow_context
+from core_runtime.diagnostics import Diagnostics
+from core_runtime.event_bus import EventBus
+from core_runtime.interface_registry import InterfaceRegistry
+from core_runtime.kernel import Kernel
+from core_runtime.kernel_flow_context import LayeredFlowContext, fork_flow_context
+
+
+class _Service:
+    def __init__(self):
+        self.lock = threading.Lock()  # deepcopy できない
+
+
+@pytest.fixture
+def parent():
+    return {
+        "_step_out.big": {"rows": [[1, 2], [3, 4]]},
+        "tags": ["a"],
+        "name": "rumi",
+        "pair": (1, [2]),
+        "service": _Service(),
+    }
+
+
+class TestLayeredFlowContext:
+
+    def test_reads_through_and_isolates_writes(self, parent):
+        child = fork_flow_context(parent)
+        assert isinstance(child, dict)
+        assert child["name"] == "rumi"
+        child["name"] = "child"
+        child["new"] = 1
+        del child["tags"]
+        assert parent["name"] == "rumi"
+        assert "new" not in parent
+        assert parent["tags"] == ["a"]
+        assert "tags" not in child
+        assert child.get("tags") is None
+        assert sorted(child) == sorted(["_step_out.big", "name", "pair", "service", "new"])
+        assert len(child) == 5
+
+    def test_nested_mutation_does_not_reach_parent(self, parent):
+        child = fork_flow_context(parent)
+        child["_step_out.big"]["rows"][0].append(99)
+        child["tags"].append("b")
+        child["pair"][1].append(3)
+        assert parent["_step_out.big"] == {"rows": [[1, 2], [3, 4]]}
+        assert parent["tags"] == ["a"]
+        assert parent["pair"] == (1, [2])
+        assert child["tags"] == ["a", "b"]
+
+    def test_unread_values_are_not_copied(self, parent):
+        with patch.object(kernel_flow_context, "copy_context_value",
+                          wraps=kernel_flow_context.copy_context_value) as copier:
+            child = fork_flow_context(parent)
+            child["x"] = child["name"]
+            child["tags"]
+        copied = [c.args[0] for c in copier.call_args_list]
+        assert any(v is parent["tags"] for v in copied)
+        assert not any(v is parent["_step_out.big"] for v in copied)
+
+    def test_services_are_shared(self, parent):
+        child = fork_flow_context(parent)
+        assert child["service"] is parent["service"]
+        assert dict(child)["service"] is parent["service"]
+
+    def test_parent_changes_after_fork_are_invisible(self, parent):
+        child = fork_flow_context(parent)
+        parent["late"] = 1
+        parent["name"] = "changed"
+        assert "late" not in child
+        assert child["name"] == "rumi"
+
+    def test_grandchild(self, parent):
+        child = fork_flow_context(parent)
+        child["mid"] = {"v": 1}
+        del child["name"]
+        grandchild = fork_flow_context(child)
+        assert isinstance(grandchild, LayeredFlowContext)
+        assert "name" not in grandchild
+        grandchild["mid"]["v"] = 2
+        assert child["mid"] == {"v": 1}
+        assert grandchild["tags"] == ["a"]
+
+    def test_dict_protocols(self, parent):
+        del parent["service"]
+        child = fork_flow_context(parent)
+        child["extra"] = True
+        assert json.loads(json.dumps(child))["extra"] is True
+        assert {**child}["name"] == "rumi"
+        assert child == {**parent, "extra": True}
+        assert child.setdefault("name", "x") == "rumi"
+        assert child.setdefault("fresh", 5) == 5
+        assert child.pop("fresh") == 5
+        assert child.pop("fresh", None) is None
+        deep = copy.deepcopy(child)
+        assert type(deep) is dict and deep["tags"] == ["a"]
+        assert type(child.copy()) is dict
+        other = {}
+        other.update(child)
+        assert other["name"] == "rumi"
+
+    def test_disabled_uses_deepcopy(self, parent, monkeypatch):
+        monkeypatch.setenv("RUMI_FLOW_COW_CONTEXT", "0")
+        del parent["service"]
+        child = fork_flow_context(parent)
+        assert type(child) is dict
+        assert child == parent
+        assert child["tags"] is not parent["tags"]
+
+
+@pytest.fixture
+def kc():
+    kernel = Kernel(diagnostics=Diagnostics(), interface_registry=InterfaceRegistry(), event_bus=EventBus())
+    yield kernel
+    kernel._flow_loop.stop()
+
+
+class TestSubFlowStep:
+
+    def test_child_flow_isolated_from_parent(self, kc):
+        def mutate(args, ctx):
+            ctx["payload"]["items"].append("child")
+            ctx["child_only"] = True
+            return {"seen": list(ctx["payload"]["items"])}
+
+        kc.interface_registry.register("t.mutate", mutate)
+        kc.interface_registry.register("flow.child", {"steps": [
+            {"id": "m", "type": "handler", "handler": "t.mutate", "output": "output"},
+        ]})
+        parent_ctx = {
+            "_flow_id": "parent",
+            "payload": {"items": ["parent"]},
+            "service": _Service(),
+        }
+        step = {"id": "call", "type": "flow", "flow": "child", "output": "child_result"}
+        ctx, result = asyncio.run(kc._execute_sub_flow_step(step, parent_ctx))
+        assert result == {"seen": ["parent", "child"]}
+        assert ctx["payload"] == {"items": ["parent"]}
+        assert "child_only" not in ctx
+        assert ctx["child_result"] == result
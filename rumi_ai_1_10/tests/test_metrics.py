@@ -7,6 +7,8 @@ test_metrics.py - metrics ユニットテスト
 - snapshot の構造
 - reset
 - スレッドセーフ動作
+- 定数メモリのヒストグラム / パーセンタイル / マージ
+- Prometheus テキスト出力
 - get_metrics_collector: キャッシュ/リセット
 """
 
@@ -23,6 +25,10 @@ if str(_project_root) not in sys.path:
     sys.path.insert(0, str(_project_root))
 
 from core_runtime.metrics import (
+    DEFAULT_BUCKETS,
+    MAX_SKETCH_BINS,
+    RELATIVE_ACCURACY,
+    Histogram,
     MetricsCollector,
     get_metrics_collector,
     reset_metrics_collector,
@@ -161,6 +167,76 @@ class TestHistogram(unittest.TestCase):
         self.assertEqual(hist["avg"], 0.5)
 
 
+class TestBoundedHistogram(unittest.TestCase):
+    """定数メモリのヒストグラムのテスト"""
+
+    def test_samples_are_not_retained(self):
+        """観測数に関係なく保持するバケット数は上限内"""
+        hist = Histogram()
+        for i in range(1, 20001):
+            hist.add(i * 0.0001)
+        self.assertEqual(hist.count, 20000)
+        self.assertLessEqual(len(hist.bins), MAX_SKETCH_BINS)
+        self.assertEqual(len(hist.bucket_counts), len(DEFAULT_BUCKETS) + 1)
+
+    def test_bins_are_capped(self):
+        """値域が極端に広くてもバケット数は上限を超えない"""
+        hist = Histogram()
+        for e in range(-9, 12):
+            for m in range(1, 200):
+                hist.add(m * 10.0 ** e)
+        self.assertLessEqual(len(hist.bins), MAX_SKETCH_BINS)
+        self.assertEqual(hist.quantile(1.0), hist.max)
+
+    def test_percentiles_within_relative_accuracy(self):
+        """パーセンタイル推定が相対誤差内"""
+        collector = MetricsCollector()
+        values = [i / 1000 for i in range(1, 1001)]
+        for v in values:
+            collector.observe("latency", v)
+        hist = collector.snapshot()["histograms"]["latency"][0]
+        for label, expected in (("p50", 0.5), ("p90", 0.9), ("p99", 0.99)):
+            self.assertAlmostEqual(
+                hist[label], expected, delta=expected * RELATIVE_ACCURACY * 2 + 0.001,
+            )
+
+    def test_merge_matches_single_histogram(self):
+        """分割して観測したものをマージすると一括観測と同じ集計になる"""
+        whole, left, right = Histogram(), Histogram(), Histogram()
+        for i in range(1, 501):
+            v = i * 0.003
+            whole.add(v)
+            (left if i % 2 else right).add(v)
+        left.merge(right)
+        self.assertEqual(left.count, whole.count)
+        self.assertEqual(left.bucket_counts, whole.bucket_counts)
+        self.assertEqual(left.bins, whole.bins)
+        self.assertEqual(left.quantile(0.9), whole.quantile(0.9))
+
+    def test_merge_rejects_different_bounds(self):
+        with self.assertRaises(ValueError):
+            Histogram((1.0,)).merge(Histogram((2.0,)))
+
+    def test_zero_and_ms_buckets(self):
+        """0 の観測と "_ms" メトリクスのバケット境界"""
+        collector = MetricsCollector()
+        collector.observe("idle", 0.0)
+        collector.observe("python_file_call.duration_ms", 250.0)
+        snap = collector.snapshot()["histograms"]
+        self.assertEqual(snap["idle"][0]["p50"], 0.0)
+        self.assertEqual(snap["python_file_call.duration_ms"][0]["p50"], 250.0)
+        text = collector.render_prometheus()
+        self.assertIn('rumi_python_file_call_duration_ms_bucket{le="250.0"} 1', text)
+
+    def test_set_histogram_buckets(self):
+        collector = MetricsCollector()
+        collector.set_histogram_buckets("size", [10, 100])
+        collector.observe("size", 50)
+        self.assertIn('rumi_size_bucket{le="100.0"} 1', collector.render_prometheus())
+        with self.assertRaises(ValueError):
+            collector.set_histogram_buckets("size", [1])
+
+
 # =========================================================================
 # MetricsCollector タイマーテスト
 # =========================================================================
@@ -278,6 +354,71 @@ class TestThreadSafety(unittest.TestCase):
         )
 
 
+    def test_counts_from_finished_threads_survive(self):
+        """終了したスレッドのシャードは畳み込まれて値が残る"""
+        collector = MetricsCollector()
+        for _ in range(3):
+            t = threading.Thread(target=lambda: (
+                collector.increment("jobs"), collector.observe("job_seconds", 0.2)
+            ))
+            t.start()
+            t.join()
+        collector.increment("jobs")
+        snap = collector.snapshot()
+        self.assertEqual(snap["counters"]["jobs"][0]["value"], 4)
+        self.assertEqual(snap["histograms"]["job_seconds"][0]["count"], 3)
+        self.assertLessEqual(len(collector._shards), 1)
+
+    def test_reset_clears_all_shards(self):
+        collector = MetricsCollector()
+        t = threading.Thread(target=lambda: collector.increment("jobs"))
+        t.start()
+        t.join()
+        collector.increment("jobs")
+        collector.reset()
+        self.assertEqual(collector.snapshot()["counters"], {})
+
+
+# =========================================================================
+# Prometheus テキスト出力テスト
+# =========================================================================
+
+
+class TestPrometheusExport(unittest.TestCase):
+    """render_prometheus のテスト"""
+
+    def setUp(self):
+        self.collector = MetricsCollector()
+
+    def test_counter_gauge_histogram(self):
+        self.collector.increment("flow.step.success", labels={"handler": "h1"}, value=2)
+        self.collector.set_gauge("flows.registered", 3)
+        self.collector.observe("pack_api.request_seconds", 0.02)
+        self.collector.observe("pack_api.request_seconds", 7.0)
+        lines = self.collector.render_prometheus().splitlines()
+        self.assertIn("# TYPE rumi_flow_step_success_total counter", lines)
+        self.assertIn('rumi_flow_step_success_total{handler="h1"} 2.0', lines)
+        self.assertIn("rumi_flows_registered 3.0", lines)
+        self.assertIn("# TYPE rumi_pack_api_request_seconds histogram", lines)
+        self.assertIn('rumi_pack_api_request_seconds_bucket{le="0.025"} 1', lines)
+        self.assertIn('rumi_pack_api_request_seconds_bucket{le="5.0"} 1', lines)
+        self.assertIn('rumi_pack_api_request_seconds_bucket{le="+Inf"} 2', lines)
+        self.assertIn("rumi_pack_api_request_seconds_count 2", lines)
+        self.assertNotIn("# EOF", lines)
+
+    def test_label_escaping(self):
+        self.collector.increment("errors", labels={"msg": 'a"b\\c\nd', "bad-key": "x"})
+        text = self.collector.render_prometheus()
+        self.assertIn('rumi_errors_total{bad_key="x",msg="a\\"b\\\\c\\nd"} 1.0', text)
+
+    def test_openmetrics(self):
+        self.collector.increment("requests_total")
+        lines = self.collector.render_prometheus(openmetrics=True).splitlines()
+        self.assertIn("# TYPE rumi_requests counter", lines)
+        self.assertIn("rumi_requests_total 1.0", lines)
+        self.assertEqual(lines[-1], "# EOF")
+
+
 # =========================================================================
 # get_metrics_collector テスト
 # =========================================================================
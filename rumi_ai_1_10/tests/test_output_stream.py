@@ -0,0 +1,298 @@
+"""
+test_output_stream.py - python_file_call 逐次ストリーミングのテスト
+
+対象:
+- core_runtime/output_stream.py (OutputStream)
+- core_runtime/python_file_executor.py (_execute_on_host(stream=True) / ExecutionResult.as_stream)
+- core_runtime/kernel_handlers_runtime.py (_h_python_file_call の output_stream)
+- core_runtime/api/route_handlers.py (_send_output_stream)
+"""
+from __future__ import annotations
+
+import asyncio
+import copy
+import io
+import json
+import threading
+import time
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from core_runtime.api.route_handlers import RouteHandlersMixin
+from core_runtime.flow_loader import FlowLoader
+from core_runtime.output_stream import OutputStream, OutputStreamError
+from core_runtime.python_file_executor import ExecutionContext, ExecutionResult, PythonFileExecutor
+
+
+def _produce(stream, chunks, **kwargs):
+    thread = threading.Thread(target=stream.pump, args=(chunks,), kwargs=kwargs, daemon=True)
+    thread.start()
+    return thread
+
+
+class TestOutputStream:
+
+    def test_chunks_in_order(self):
+        stream = OutputStream()
+        _produce(stream, iter(range(5)))
+        assert stream.collect() == [0, 1, 2, 3, 4]
+        assert stream.chunk_count == 5
+
+    def test_backpressure_blocks_producer(self):
+        produced = []
+
+        def gen():
+            for i in range(10):
+                produced.append(i)
+                yield i
+
+        stream = OutputStream(max_queue=2)
+        thread = _produce(stream, gen())
+        time.sleep(0.3)
+        # キュー 2 件 + put 待ちの 1 件で止まる
+        assert len(produced) == 3
+        assert next(stream) == 0
+        assert stream.collect() == list(range(1, 10))
+        thread.join(1)
+
+    def test_chunk_size_limit(self):
+        stream = OutputStream(max_chunk_bytes=16)
+        _produce(stream, iter(["ok", "x" * 100, "never"]))
+        assert next(stream) == "ok"
+        with pytest.raises(OutputStreamError) as exc:
+            next(stream)
+        assert exc.value.error_type == "stream_chunk_too_large"
+
+    def test_producer_error(self):
+        def gen():
+            yield 1
+            raise RuntimeError("boom")
+
+        stream = OutputStream()
+        _produce(stream, gen())
+        assert next(stream) == 1
+        with pytest.raises(OutputStreamError, match="boom"):
+            next(stream)
+
+    def test_timeout(self):
+        gate = threading.Event()
+
+        def gen():
+            yield 1
+            gate.wait(2)
+            yield 2
+
+        stream = OutputStream(timeout_seconds=0.3)
+        _produce(stream, gen())
+        assert next(stream) == 1
+        with pytest.raises(OutputStreamError) as exc:
+            next(stream)
+        assert exc.value.error_type == "timeout"
+        gate.set()
+
+    def test_close_stops_generator(self):
+        closed = threading.Event()
+
+        def gen():
+            try:
+                i = 0
+                while True:
+                    yield i
+                    i += 1
+            finally:
+                closed.set()
+
+        stream = OutputStream(max_queue=1)
+        _produce(stream, gen())
+        assert next(stream) == 0
+        stream.close()
+        assert closed.wait(2)
+        assert list(stream) == []
+
+    def test_async_iteration(self):
+        stream = OutputStream()
+        _produce(stream, iter("abc"))
+
+        async def consume():
+            return [chunk async for chunk in stream]
+
+        assert asyncio.run(consume()) == ["a", "b", "c"]
+
+    def test_not_copied(self):
+        stream = OutputStream.from_chunks([1])
+        assert copy.deepcopy({"s": stream})["s"] is stream
+        assert stream.collect() == [1]
+
+
+BLOCK = '''
+def run(input_data, context):
+    yield {"token": "a"}
+    input_data["gate"].wait(5)
+    yield {"token": "b"}
+'''
+
+
+def _context():
+    return ExecutionContext(flow_id="f", step_id="s", phase="flow",
+                            ts="2026-01-01T00:00:00Z", owner_pack="my_pack", inputs={})
+
+
+@pytest.fixture
+def executor():
+    ex = PythonFileExecutor()
+    ex._approval_checker = MagicMock()
+    ex._approval_checker.get_fingerprint.return_value = None
+    return ex
+
+
+class TestHostStreaming:
+
+    def test_first_chunk_before_generator_finishes(self, executor, tmp_path):
+        block = tmp_path / "tokens.py"
+        block.write_text(BLOCK, encoding="utf-8")
+        gate = threading.Event()
+        result = executor._execute_on_host(block, "my_pack", {"gate": gate}, _context(), 10.0, stream=True)
+        assert result.success and result.is_streaming
+        assert result.output is None
+        assert next(result.stream) == {"token": "a"}
+        gate.set()
+        assert result.stream.collect() == [{"token": "b"}]
+
+    def test_without_stream_collects(self, executor, tmp_path):
+        block = tmp_path / "tokens.py"
+        block.write_text(BLOCK, encoding="utf-8")
+        gate = threading.Event()
+        gate.set()
+        result = executor._execute_on_host(block, "my_pack", {"gate": gate}, _context(), 10.0)
+        assert result.stream is None
+        assert result.output["chunks"] == [{"token": "a"}, {"token": "b"}]
+        assert result.as_stream().collect() == [{"token": "a"}, {"token": "b"}]
+
+    def test_aiter_chunks(self):
+        result = ExecutionResult(success=True, output={"chunks": [1, 2], "is_streaming": True},
+                                 is_streaming=True)
+
+        async def consume():
+            return [c async for c in result.aiter_chunks()]
+
+        assert asyncio.run(consume()) == [1, 2]
+        with pytest.raises(ValueError):
+            ExecutionResult(success=True, output=1).aiter_chunks()
+
+
+class TestFlowStep:
+
+    def test_loader_parses_output_stream(self):
+        loader = FlowLoader()
+        steps, errors, _ = loader._parse_steps([
+            {"id": "gen", "phase": "main", "type": "python_file_call", "file": "blocks/gen.py",
+             "output_stream": "tokens"},
+            {"id": "bad", "phase": "main", "type": "python_file_call", "file": "blocks/gen.py",
+             "output_stream": 3},
+        ], ["main"], Path("test.flow.yaml"))
+        assert [s.id for s in steps] == ["gen"]
+        assert steps[0].output_stream == "tokens"
+        assert len(errors) == 1
+
+    def test_handler_stores_stream_in_ctx(self):
+        from core_runtime.kernel_handlers_runtime import KernelRuntimeHandlersMixin
+
+        stream = OutputStream.from_chunks(["a"])
+        fake_executor = MagicMock()
+        fake_executor.execute.return_value = ExecutionResult(
+            success=True, is_streaming=True, stream=stream, execution_mode="host_permissive")
+        kernel = MagicMock()
+        kernel._resolve_value.side_effect = lambda value, ctx: value
+        kernel._get_uds_proxy_manager.return_value = None
+        kernel._get_capability_proxy.return_value = None
+        ctx = {"_flow_id": "f"}
+        with patch("core_runtime.python_file_executor.get_python_file_executor",
+                   return_value=fake_executor):
+            out = KernelRuntimeHandlersMixin._h_python_file_call(
+                kernel, {"file": "blocks/gen.py", "owner_pack": None, "output_stream": "tokens"}, ctx)
+        assert out["_kernel_step_status"] == "success"
+        assert out["output"] is None
+        assert ctx["tokens"] is stream
+        assert fake_executor.execute.call_args.kwargs["stream"] is True
+
+
+class _StubHandler(RouteHandlersMixin):
+
+    def __init__(self, accept="", version="HTTP/1.1"):
+        self.headers = {"Accept": accept}
+        self.request_version = version
+        self.wfile = io.BytesIO()
+        self.status = None
+        self.sent_headers = {}
+        self.close_connection = False
+
+    def send_response(self, status):
+        self.status = status
+
+    def send_header(self, key, value):
+        self.sent_headers[key] = value
+
+    def end_headers(self):
+        pass
+
+    def _get_cors_origin(self, origin):
+        return ""
+
+
+def _dechunk(body: bytes) -> bytes:
+    out = b""
+    while True:
+        size_line, body = body.split(b"\r\n", 1)
+        size = int(size_line, 16)
+        if size == 0:
+            return out
+        out += body[:size]
+        body = body[size + 2:]
+
+
+class TestRouteRelay:
+
+    def test_ndjson_chunked(self):
+        handler = _StubHandler()
+        handler._send_output_stream(OutputStream.from_chunks([{"t": "a"}, "b"]))
+        assert handler.sent_headers["Transfer-Encoding"] == "chunked"
+        assert handler.sent_headers["Content-Type"].startswith("application/x-ndjson")
+        lines = _dechunk(handler.wfile.getvalue()).decode().splitlines()
+        assert [json.loads(line) for line in lines] == [{"t": "a"}, "b"]
+
+    def test_sse_with_error(self):
+        stream = OutputStream()
+        stream.put("a")
+        stream.fail("boom", "RuntimeError")
+        handler = _StubHandler(accept="text/event-stream", version="HTTP/1.0")
+        handler._send_output_stream(stream)
+        assert "Transfer-Encoding" not in handler.sent_headers
+        body = handler.wfile.getvalue().decode()
+        assert body == ('data: "a"\n\n'
+                        'event: error\ndata: {"error": "boom", "error_type": "RuntimeError"}\n\n')
+
+    def test_client_disconnect_closes_stream(self):
+        handler = _StubHandler()
+        handler.wfile = MagicMock()
+        handler.wfile.write.side_effect = BrokenPipeError
+        stream = OutputStream.from_chunks([1, 2])
+        handler._send_output_stream(stream)
+        assert stream.cancelled
+        assert handler.close_connection
+
+    def test_stream_route(self):
+        handler = _StubHandler()
+        handler.load_pack_routes(MagicMock(get_all_routes=MagicMock(return_value={
+            "p": [{"method": "POST", "path": "/api/p/gen", "flow_id": "p.gen", "stream": "tokens"}],
+        })))
+        stream = OutputStream.from_chunks(["x"])
+        handler._run_flow = MagicMock(return_value={"success": True, "result": {}, "stream": stream})
+        match = handler._match_pack_route("/api/p/gen", "POST")
+        handler._handle_pack_route_request("/api/p/gen", {}, "POST", match)
+        assert handler._run_flow.call_args.kwargs["stream_key"] == "tokens"
+        assert _dechunk(handler.wfile.getvalue()) == b'"x"\n'
+        RouteHandlersMixin._pack_routes = {}
+        RouteHandlersMixin._exact_routes = {}
+        RouteHandlersMixin._template_routes = []
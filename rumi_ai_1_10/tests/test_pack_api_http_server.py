@@ -0,0 +1,202 @@
+"""
+test_pack_api_http_server.py - Pack API 並行 HTTP サーバーのテスト
+
+対象:
+- core_runtime/pack_api_http_server.py (PooledHTTPServer, create_api_http_server)
+- core_runtime/pack_api_server.py (PackAPIHandler の keep-alive 処理)
+"""
+from __future__ import annotations
+
+import http.client
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+from core_runtime.metrics import get_metrics_collector, reset_metrics_collector
+from core_runtime.pack_api_http_server import PooledHTTPServer, create_api_http_server
+from core_runtime.pack_api_server import PackAPIHandler
+
+
+class _SlowHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path == "/slow":
+            self.server.release.wait(5)
+        body = self.path.encode()
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def _serve(srv):
+    thread = threading.Thread(target=srv.serve_forever, daemon=True)
+    thread.start()
+    return thread
+
+
+@pytest.fixture
+def pooled():
+    servers = []
+
+    def make(handler=_SlowHandler, **kwargs):
+        srv = PooledHTTPServer(("127.0.0.1", 0), handler, **kwargs)
+        srv.release = threading.Event()
+        _serve(srv)
+        servers.append(srv)
+        return srv
+
+    reset_metrics_collector()
+    yield make
+    for srv in servers:
+        srv.release.set()
+        srv.shutdown()
+        srv.server_close()
+
+
+def _get(srv, path, timeout=5):
+    conn = http.client.HTTPConnection("127.0.0.1", srv.server_address[1], timeout=timeout)
+    try:
+        conn.request("GET", path)
+        resp = conn.getresponse()
+        return resp.status, resp.read()
+    finally:
+        conn.close()
+
+
+class TestPooledHTTPServer:
+
+    def test_slow_request_does_not_block_others(self, pooled):
+        srv = pooled(max_workers=4)
+        slow = threading.Thread(target=_get, args=(srv, "/slow"))
+        slow.start()
+        time.sleep(0.1)
+
+        start = time.monotonic()
+        assert _get(srv, "/fast") == (200, b"/fast")
+        assert time.monotonic() - start < 1.0
+        assert srv.stats()["workers_busy"] >= 1
+
+        srv.release.set()
+        slow.join()
+
+    def test_queue_overflow_returns_503(self, pooled):
+        srv = pooled(max_workers=1, max_queue=1)
+        blockers = [threading.Thread(target=_get, args=(srv, "/slow")) for _ in range(2)]
+        for t in blockers:
+            t.start()
+            time.sleep(0.1)
+
+        status, body = _get(srv, "/fast")
+        assert status == 503
+        assert json.loads(body)["error"] == "Server busy"
+        assert get_metrics_collector().snapshot()["counters"]["pack_api.rejected"]
+
+        srv.release.set()
+        for t in blockers:
+            t.join()
+
+    def test_keepalive_connection_reused(self, pooled):
+        srv = pooled()
+        conn = http.client.HTTPConnection("127.0.0.1", srv.server_address[1], timeout=5)
+        try:
+            for path in ("/a", "/b"):
+                conn.request("GET", path)
+                assert conn.getresponse().read() == path.encode()
+            sock = conn.sock
+            conn.request("GET", "/c")
+            conn.getresponse().read()
+            assert conn.sock is sock
+        finally:
+            conn.close()
+
+    def test_records_queue_wait(self, pooled):
+        srv = pooled()
+        _get(srv, "/a")
+        snap = get_metrics_collector().snapshot()
+        assert "pack_api.queue_wait_seconds" in snap["histograms"]
+
+    def test_mode_single(self, monkeypatch):
+        monkeypatch.setenv("RUMI_API_SERVER_MODE", "single")
+        srv = create_api_http_server(("127.0.0.1", 0), _SlowHandler)
+        try:
+            assert type(srv) is HTTPServer
+        finally:
+            srv.server_close()
+
+
+class TestPackAPIHandlerKeepAlive:
+
+    @pytest.fixture
+    def api(self, pooled, monkeypatch):
+        monkeypatch.setattr(PackAPIHandler, "app_lifecycle_manager", None)
+        monkeypatch.setattr(PackAPIHandler, "keepalive_enabled", True)
+        return pooled(handler=PackAPIHandler)
+
+    def test_health_over_one_connection(self, api):
+        conn = http.client.HTTPConnection("127.0.0.1", api.server_address[1], timeout=5)
+        try:
+            conn.request("GET", "/health")
+            first = conn.getresponse()
+            assert json.loads(first.read())["success"] is True
+            assert first.getheader("Connection") is None
+            sock = conn.sock
+            conn.request("GET", "/health")
+            assert conn.getresponse().status == 200
+            assert conn.sock is sock
+        finally:
+            conn.close()
+        histograms = get_metrics_collector().snapshot()["histograms"]
+        assert "pack_api.request_seconds" in histograms
+
+    def test_unread_body_closes_connection(self, api):
+        conn = http.client.HTTPConnection("127.0.0.1", api.server_address[1], timeout=5)
+        try:
+            conn.request("POST", "/api/packs/x/approve", body=b'{"a": 1}',
+                         headers={"Content-Type": "application/json"})
+            resp = conn.getresponse()
+            resp.read()
+            assert resp.status == 401
+            assert resp.getheader("Connection") == "close"
+        finally:
+            conn.close()
+
+    def test_keepalive_disabled(self, api, monkeypatch):
+        monkeypatch.setattr(PackAPIHandler, "keepalive_enabled", False)
+        conn = http.client.HTTPConnection("127.0.0.1", api.server_address[1], timeout=5)
+        try:
+            conn.request("GET", "/health")
+            resp = conn.getresponse()
+            resp.read()
+            assert resp.getheader("Connection") == "close"
+        finally:
+            conn.close()
+
+    def test_metrics_endpoint(self, api, monkeypatch):
+        monkeypatch.setattr(PackAPIHandler, "_check_auth", lambda self: True)
+        get_metrics_collector().increment("flow.step.success", labels={"handler": "h"})
+        status, body = _get(api, "/metrics")
+        assert status == 200
+        text = body.decode()
+        assert 'rumi_flow_step_success_total{handler="h"} 1.0' in text
+        assert not text.endswith("# EOF\n")
+
+        conn = http.client.HTTPConnection("127.0.0.1", api.server_address[1], timeout=5)
+        try:
+            conn.request("GET", "/metrics", headers={"Accept": "application/openmetrics-text"})
+            resp = conn.getresponse()
+            assert resp.getheader("Content-Type").startswith("application/openmetrics-text")
+            assert resp.read().decode().endswith("# EOF\n")
+        finally:
+            conn.close()
+
+    def test_metrics_requires_auth(self, api):
+        status, _ = _get(api, "/metrics")
+        assert status == 401
@@ -0,0 +1,187 @@
+"""
+test_pack_hash_index.py - Pack ハッシュ stat インデックスのテスト
+
+対象:
+- core_runtime/pack_hash_index.py
+- ApprovalManager の verify_hash(use_cache=False) / ファイル監視
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+from core_runtime import pack_hash_index
+from core_runtime.approval_manager import ApprovalManager, PackApproval, PackStatus
+from core_runtime.pack_hash_index import PackFileWatcher, PackHashIndex
+
+
+def _legacy_hashes(pack_dir: Path) -> dict:
+    """従来の rglob + SHA-256 実装"""
+    hashes = {}
+    for file_path in pack_dir.rglob("*"):
+        if file_path.is_file():
+            if any(p in str(file_path) for p in ["__pycache__", ".pyc", ".git"]):
+                continue
+            digest = hashlib.sha256(file_path.read_bytes()).hexdigest()
+            hashes[str(file_path.relative_to(pack_dir))] = f"sha256:{digest}"
+    return hashes
+
+
+@pytest.fixture
+def pack_dir(tmp_path):
+    d = tmp_path / "pack"
+    (d / "backend" / "flows").mkdir(parents=True)
+    (d / "__pycache__").mkdir()
+    (d / "ecosystem.json").write_text('{"pack_id": "p"}', encoding="utf-8")
+    (d / "backend" / "flows" / "a.flow.yaml").write_text("steps: []\n", encoding="utf-8")
+    (d / "handler.py").write_text("def run(): pass\n", encoding="utf-8")
+    (d / "__pycache__" / "handler.cpython-311.pyc").write_bytes(b"\x00\x01")
+    return d
+
+
+@pytest.fixture
+def no_racy_window(monkeypatch):
+    """作成直後のファイルも信用できるよう racy 判定幅を 0 にする"""
+    monkeypatch.setattr(pack_hash_index, "RACY_WINDOW_NS", 0)
+
+
+class TestPackHashIndex:
+
+    def test_matches_legacy_hashes(self, pack_dir):
+        assert PackHashIndex().compute(pack_dir) == _legacy_hashes(pack_dir)
+
+    def test_unchanged_pack_hits_root(self, pack_dir, no_racy_window):
+        index = PackHashIndex()
+        first = index.compute(pack_dir)
+        second = index.compute(pack_dir)
+        assert first == second
+        stats = index.stats()
+        assert stats["root_hits"] == 1
+        assert stats["files_hashed"] == 3
+
+    def test_only_changed_file_is_rehashed(self, pack_dir, no_racy_window):
+        index = PackHashIndex()
+        index.compute(pack_dir)
+        (pack_dir / "handler.py").write_text("def run(): return 'evil'\n", encoding="utf-8")
+        hashes = index.compute(pack_dir)
+        assert hashes == _legacy_hashes(pack_dir)
+        stats = index.stats()
+        assert stats["files_hashed"] == 4
+        assert stats["files_reused"] == 2
+
+    def test_same_size_rewrite_with_restored_mtime_is_detected(self, pack_dir, no_racy_window):
+        target = pack_dir / "handler.py"
+        index = PackHashIndex()
+        before = index.compute(pack_dir)
+        st = target.stat()
+        time.sleep(0.01)
+        target.write_text("def run(): evil\n", encoding="utf-8")
+        os.utime(target, ns=(st.st_atime_ns, st.st_mtime_ns))
+        after = index.compute(pack_dir)
+        assert after["handler.py"] != before["handler.py"]
+
+    def test_recent_files_are_rehashed_every_time(self, pack_dir):
+        index = PackHashIndex()
+        index.compute(pack_dir)
+        index.compute(pack_dir)
+        stats = index.stats()
+        assert stats["root_hits"] == 0
+        assert stats["files_hashed"] == 6
+
+    def test_added_and_removed_files(self, pack_dir, no_racy_window):
+        index = PackHashIndex()
+        index.compute(pack_dir)
+        (pack_dir / "extra.py").write_text("# new\n", encoding="utf-8")
+        (pack_dir / "handler.py").unlink()
+        hashes = index.compute(pack_dir)
+        assert "extra.py" in hashes
+        assert "handler.py" not in hashes
+
+    def test_invalidate_forces_full_rehash(self, pack_dir, no_racy_window):
+        index = PackHashIndex()
+        index.compute(pack_dir)
+        index.invalidate(pack_dir)
+        index.compute(pack_dir)
+        assert index.stats()["files_hashed"] == 6
+
+
+def _make_manager(tmp_path, monkeypatch):
+    eco_dir = tmp_path / "eco"
+    grants_dir = tmp_path / "grants"
+    pack_dir = eco_dir / "testpack"
+    pack_dir.mkdir(parents=True)
+    grants_dir.mkdir(parents=True)
+    (pack_dir / "ecosystem.json").write_text(json.dumps({"pack_id": "testpack"}), encoding="utf-8")
+    (pack_dir / "handler.py").write_text("def run(): pass\n", encoding="utf-8")
+    mgr = ApprovalManager(packs_dir=str(eco_dir), grants_dir=str(grants_dir),
+                          secret_key="test-secret-key-for-hmac")
+    monkeypatch.setattr(mgr, "_create_declared_stores", lambda pid: None)
+    mgr._approvals["testpack"] = PackApproval(pack_id="testpack", status=PackStatus.INSTALLED,
+                                              created_at="2026-01-01T00:00:00Z")
+    return mgr, pack_dir
+
+
+class TestApprovalManagerIndex:
+
+    def test_nocache_verification_reuses_index(self, tmp_path, monkeypatch, no_racy_window):
+        mgr, _ = _make_manager(tmp_path, monkeypatch)
+        mgr.approve("testpack")
+        assert mgr.is_pack_approved_and_verified("testpack") == (True, None)
+        assert mgr.is_pack_approved_and_verified("testpack") == (True, None)
+        assert mgr.get_hash_index_stats()["root_hits"] >= 1
+
+    def test_nocache_verification_sees_change_immediately(self, tmp_path, monkeypatch, no_racy_window):
+        mgr, pack_dir = _make_manager(tmp_path, monkeypatch)
+        mgr.approve("testpack")
+        assert mgr.verify_hash("testpack", use_cache=False) is True
+        (pack_dir / "handler.py").write_text("def run(): return 'evil'\n", encoding="utf-8")
+        assert mgr.is_pack_approved_and_verified("testpack") == (False, "hash_mismatch")
+
+    def test_file_change_notification_marks_modified(self, tmp_path, monkeypatch):
+        mgr, pack_dir = _make_manager(tmp_path, monkeypatch)
+        mgr.approve("testpack")
+        mgr._on_pack_files_changed("testpack")
+        assert mgr.get_status("testpack") == PackStatus.APPROVED
+        (pack_dir / "handler.py").write_text("def run(): return 'evil'\n", encoding="utf-8")
+        mgr._on_pack_files_changed("testpack")
+        assert mgr.get_status("testpack") == PackStatus.MODIFIED
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="inotify is Linux only")
+class TestPackFileWatcher:
+
+    def test_change_is_reported(self, pack_dir):
+        changed = []
+        watcher = PackFileWatcher(changed.append, debounce=0.05)
+        if not watcher.start():
+            pytest.skip("inotify unavailable")
+        try:
+            watcher.watch("p", pack_dir)
+            assert watcher.watched_pack_ids() == ["p"]
+            (pack_dir / "backend" / "flows" / "a.flow.yaml").write_text("steps: [x]\n", encoding="utf-8")
+            deadline = time.monotonic() + 5
+            while not changed and time.monotonic() < deadline:
+                time.sleep(0.05)
+            assert changed == ["p"]
+        finally:
+            watcher.stop()
+
+    def test_pycache_changes_are_ignored(self, pack_dir):
+        changed = []
+        watcher = PackFileWatcher(changed.append, debounce=0.05)
+        if not watcher.start():
+            pytest.skip("inotify unavailable")
+        try:
+            watcher.watch("p", pack_dir)
+            (pack_dir / "__pycache__" / "x.pyc").write_bytes(b"\x00")
+            (pack_dir / "handler.cpython-311.pyc").write_bytes(b"\x00")
+            time.sleep(0.5)
+            assert changed == []
+        finally:
+            watcher.stop()
@@ -4,8 +4,14 @@ test_store_sqlite.py - StoreRegistry SQLite 実装のテスト
 カバー範囲:
 - Store CRUD (create / get / list / delete)
 - CAS (create / update / conflict / concurrent)
-- list_keys (prefix / cursor / limit / 全件)
+- list_keys (prefix / cursor / limit / 全件 / key_count による件数)
+- iter_keys / iter_items (バッチ単位のストリーミング)
 - batch_get (normal / missing / size limit)
+- get_value / set_value / delete_value
+- batch_set / batch_delete (トランザクション・サイズ上限)
+- 旧ファイルストア (<key>.json) の取り込み
+- 変更フィード (changes / watch / スキーマ v1 → v3 移行)
+- 値キャッシュ (value_hash 照合 / 無効化 / LRU 追い出し / StoreDefinition キャッシュ)
 - マイグレーション (JSON → SQLite)
 - エッジケース (空ストア, 大量キー, 不正入力)
 - スレッドセーフ
@@ -30,10 +36,12 @@ if str(_ROOT) not in sys.path:
     sys.path.insert(0, str(_ROOT))
 
 from core_runtime.store_registry import (
+    SCHEMA_VERSION,
     STORES_BASE_DIR,
     StoreDefinition,
     StoreRegistry,
     StoreResult,
+    _encode_value,
     _normalize_value_hash,
     _validate_store_path,
 )
@@ -378,6 +386,58 @@ class TestListKeys(_TempDirMixin, TestCase):
         self.assertEqual(r2["keys"], ["a/2", "a/3"])
         reg.close()
 
+    def _fill(self, reg: StoreRegistry, sid: str, keys: List[str]) -> None:
+        reg.create_store(sid, self._store_root(sid))
+        reg.batch_set(sid, {k: f"val_{k}" for k in keys})
+
+    def test_total_from_key_count(self) -> None:
+        reg = self._make_registry()
+        self._fill(reg, "s", ["a", "b", "c"])
+        reg.batch_set("s", {"c": 1, "d": 2, "e": 3})
+        reg.batch_delete("s", ["a", "zz"])
+        reg.cas("s", "d", 2, 4)
+        r1 = reg.list_keys("s", limit=2)
+        r2 = reg.list_keys("s", limit=2, cursor=r1["next_cursor"])
+        self.assertEqual(r1["total_estimate"], 4)
+        self.assertEqual(r2["total_estimate"], 4)
+        reg.close()
+
+    def test_prefix_page_total_is_opt_in(self) -> None:
+        reg = self._make_registry()
+        self._fill(reg, "s", ["a/1", "a/2", "a/3", "b/1"])
+        self.assertIsNone(reg.list_keys("s", prefix="a/", limit=1)["total_estimate"])
+        r = reg.list_keys("s", prefix="a/", limit=1, include_total=True)
+        self.assertEqual(r["total_estimate"], 3)
+        self.assertEqual(reg.list_keys("s", prefix="a/")["total_estimate"], 3)
+        reg.close()
+
+    def test_iter_keys_batches(self) -> None:
+        reg = self._make_registry()
+        keys = [f"k{i:03d}" for i in range(25)]
+        self._fill(reg, "s", keys + ["other"])
+        batches = list(reg.iter_keys("s", prefix="k", batch_size=10))
+        self.assertEqual([len(b) for b in batches], [10, 10, 5])
+        self.assertEqual([k for b in batches for k in b], keys)
+        reg.close()
+
+    def test_iter_items_snapshot(self) -> None:
+        reg = self._make_registry()
+        reg.create_store("s", self._store_root("s"))
+        reg.batch_set("s", {"a": {"x": 1}, "b": [2], "c": None})
+        it = reg.iter_items("s", batch_size=2)
+        first = next(it)
+        # 列挙中の書き込みはブロックされず、列挙結果にも現れない
+        self.assertTrue(reg.set_value("s", "d", 4)["success"])
+        rest = [item for batch in it for item in batch]
+        self.assertEqual(first + rest, [("a", {"x": 1}), ("b", [2]), ("c", None)])
+        reg.close()
+
+    def test_iter_store_not_found(self) -> None:
+        reg = self._make_registry()
+        with self.assertRaises(ValueError):
+            reg.iter_keys("ghost")
+        reg.close()
+
 
 # ======================================================================
 # batch_get
@@ -463,6 +523,487 @@ class TestBatchGet(_TempDirMixin, TestCase):
         reg.close()
 
 
+# ======================================================================
+# get_value / set_value / delete_value
+# ======================================================================
+
+class TestKeyValue(_TempDirMixin, TestCase):
+
+    def test_set_get_delete(self) -> None:
+        reg = self._make_registry()
+        reg.create_store("s", self._store_root("s"))
+        self.assertTrue(reg.set_value("s", "a/b", {"x": 1})["success"])
+        self.assertEqual(reg.get_value("s", "a/b"), {"success": True, "value": {"x": 1}})
+        self.assertTrue(reg.set_value("s", "a/b", [1, 2])["success"])
+        self.assertEqual(reg.get_value("s", "a/b")["value"], [1, 2])
+        self.assertTrue(reg.delete_value("s", "a/b")["success"])
+        self.assertEqual(reg.get_value("s", "a/b")["error_type"], "key_not_found")
+        self.assertEqual(reg.delete_value("s", "a/b")["error_type"], "key_not_found")
+        reg.close()
+
+    def test_set_then_cas(self) -> None:
+        """set_value の value_hash は cas の比較と一致する"""
+        reg = self._make_registry()
+        reg.create_store("s", self._store_root("s"))
+        reg.set_value("s", "k", {"b": 2, "a": 1})
+        result = reg.cas("s", "k", {"a": 1, "b": 2}, {"a": 3})
+        self.assertTrue(result["success"])
+        reg.close()
+
+    def test_set_value_too_large(self) -> None:
+        reg = self._make_registry()
+        reg.create_store("s", self._store_root("s"))
+        result = reg.set_value("s", "k", "x" * 100, max_value_bytes=50)
+        self.assertEqual(result["error_type"], "payload_too_large")
+        reg.close()
+
+    def test_store_not_found(self) -> None:
+        reg = self._make_registry()
+        self.assertEqual(reg.get_value("ghost", "k")["error_type"], "store_not_found")
+        self.assertEqual(reg.set_value("ghost", "k", 1)["error_type"], "store_not_found")
+        reg.close()
+
+    def test_no_files_written(self) -> None:
+        reg = self._make_registry()
+        root = self._store_root("s")
+        reg.create_store("s", root)
+        reg.set_value("s", "k", 1)
+        self.assertEqual(os.listdir(root), [])
+        reg.close()
+
+
+# ======================================================================
+# batch_set / batch_delete
+# ======================================================================
+
+class TestBatchWrite(_TempDirMixin, TestCase):
+
+    def test_batch_set_and_delete(self) -> None:
+        reg = self._make_registry()
+        reg.create_store("s", self._store_root("s"))
+        items = {f"k{i}": {"i": i} for i in range(50)}
+        result = reg.batch_set("s", items)
+        self.assertTrue(result["success"])
+        self.assertEqual(result["written"], 50)
+        got = reg.batch_get("s", list(items))
+        self.assertEqual(got["found"], 50)
+
+        result = reg.batch_delete("s", ["k0", "k1", "k1", "missing"])
+        self.assertEqual(result, {"success": True, "store_id": "s", "deleted": 2})
+        self.assertEqual(len(reg.list_keys("s")["keys"]), 48)
+        reg.close()
+
+    def test_batch_set_is_all_or_nothing(self) -> None:
+        reg = self._make_registry()
+        reg.create_store("s", self._store_root("s"))
+        result = reg.batch_set("s", {"ok": 1, "big": "x" * 200}, max_value_bytes=100)
+        self.assertEqual(result["error_type"], "payload_too_large")
+        result = reg.batch_set("s", {"ok": 1, "bad key": 2})
+        self.assertEqual(result["error_type"], "validation_error")
+        self.assertEqual(reg.list_keys("s")["keys"], [])
+        reg.close()
+
+    def test_batch_set_total_size_limit(self) -> None:
+        import core_runtime.store_registry as mod
+        reg = self._make_registry()
+        reg.create_store("s", self._store_root("s"))
+        orig = mod.MAX_BATCH_WRITE_BYTES
+        mod.MAX_BATCH_WRITE_BYTES = 100
+        try:
+            result = reg.batch_set("s", {"a": "x" * 60, "b": "y" * 60})
+        finally:
+            mod.MAX_BATCH_WRITE_BYTES = orig
+        self.assertEqual(result["error_type"], "payload_too_large")
+        self.assertIn("Batch too large", result["error"])
+        reg.close()
+
+    def test_batch_too_many_keys(self) -> None:
+        reg = self._make_registry()
+        reg.create_store("s", self._store_root("s"))
+        many = [f"k{i}" for i in range(101)]
+        self.assertFalse(reg.batch_set("s", {k: 1 for k in many})["success"])
+        self.assertFalse(reg.batch_delete("s", many)["success"])
+        reg.close()
+
+    def test_batch_set_handler(self) -> None:
+        """store.batch_set capability handler は StoreRegistry.batch_set を使う"""
+        import importlib.util
+        from unittest.mock import patch
+
+        handler_path = (
+            _ROOT / "core_runtime" / "core_pack" / "core_store_capability"
+            / "functions" / "batch_set" / "main.py"
+        )
+        spec = importlib.util.spec_from_file_location("_batch_set_handler", handler_path)
+        handler = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(handler)
+
+        reg = self._make_registry()
+        reg.create_store("s", self._store_root("s"))
+        context = {"principal_id": "p", "grant_config": {"allowed_store_ids": ["s"]}}
+        with patch("core_runtime.store_registry.get_store_registry", return_value=reg):
+            ok = handler.execute(context, {"store_id": "s", "items": {"a": 1, "b": 2}})
+            denied = handler.execute(context, {"store_id": "t", "items": {"a": 1}})
+            traversal = handler.execute(context, {"store_id": "s", "items": {"a/../b": 1}})
+        self.assertTrue(ok["success"])
+        self.assertEqual(ok["written"], 2)
+        self.assertEqual(denied["error_type"], "grant_denied")
+        self.assertEqual(traversal["error_type"], "security_error")
+        self.assertEqual(reg.get_value("s", "b")["value"], 2)
+        reg.close()
+
+
+# ======================================================================
+# 旧ファイルストアの取り込み
+# ======================================================================
+
+class TestFileStoreImport(_TempDirMixin, TestCase):
+
+    def _write_file(self, root: str, key: str, value: Any) -> None:
+        path = Path(root) / (key + ".json")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(value), encoding="utf-8")
+
+    def test_import_on_first_access(self) -> None:
+        reg = self._make_registry()
+        root = self._store_root("s")
+        reg.create_store("s", root)
+        self._write_file(root, "a", {"v": 1})
+        self._write_file(root, "nested/b", [1, 2])
+        (Path(root) / "broken.json").write_text("{", encoding="utf-8")
+
+        self.assertEqual(reg.get_value("s", "nested/b")["value"], [1, 2])
+        self.assertEqual(reg.list_keys("s")["keys"], ["a", "nested/b"])
+        # 元ファイルは残す
+        self.assertTrue((Path(root) / "a.json").exists())
+        reg.close()
+
+    def test_import_runs_once(self) -> None:
+        root = self._store_root("s")
+        reg = self._make_registry()
+        reg.create_store("s", root)
+        self._write_file(root, "a", 1)
+        self.assertTrue(reg.delete_value("s", "a")["success"])
+        reg.close()
+
+        # 別インスタンス（別プロセス相当）からも再取り込みされない
+        reg2 = self._make_registry()
+        self.assertEqual(reg2.get_value("s", "a")["error_type"], "key_not_found")
+        reg2.close()
+
+    def test_db_value_wins(self) -> None:
+        from core_runtime.store_migration import import_store_files
+
+        reg = self._make_registry()
+        root = self._store_root("s")
+        reg.create_store("s", root)
+        conn = reg._get_conn()
+        conn.execute(
+            "INSERT INTO store_data (store_id, key, value, value_hash, updated_at) "
+            "VALUES ('s', 'a', '\"db\"', '', '')"
+        )
+        conn.commit()
+        self._write_file(root, "a", "file")
+        self._write_file(root, "b", "file")
+
+        self.assertEqual(import_store_files(conn, "s", Path(root)), 1)
+        self.assertIsNone(import_store_files(conn, "s", Path(root)))
+        self.assertEqual(reg.get_value("s", "a")["value"], "db")
+        reg.close()
+
+
+# ======================================================================
+# 変更フィード (changes / watch)
+# ======================================================================
+
+class TestChangeFeed(_TempDirMixin, TestCase):
+
+    def _setup(self) -> StoreRegistry:
+        reg = self._make_registry()
+        reg.create_store("s", self._store_root("s"))
+        return reg
+
+    def test_changes_in_seq_order(self) -> None:
+        reg = self._setup()
+        reg.set_value("s", "b", 1)
+        reg.batch_set("s", {"a": 2, "c": 3})
+        reg.cas("s", "d", new_value=4)
+        result = reg.changes("s", 0)
+        self.assertEqual(
+            [(c["seq"], c["key"], c["value"]) for c in result["changes"]],
+            [(1, "b", 1), (2, "a", 2), (3, "c", 3), (4, "d", 4)],
+        )
+        self.assertEqual(result["next_seq"], 4)
+        self.assertEqual(result["current_seq"], 4)
+        self.assertFalse(result["has_more"])
+        reg.close()
+
+    def test_incremental_sync_with_tombstones(self) -> None:
+        reg = self._setup()
+        reg.batch_set("s", {"a": 1, "b": 2})
+        since = reg.changes("s", 0)["next_seq"]
+
+        reg.set_value("s", "a", 10)
+        reg.set_value("s", "a", 11)
+        reg.delete_value("s", "b")
+        result = reg.changes("s", since)
+        self.assertEqual(
+            [(c["key"], c["op"], c.get("value")) for c in result["changes"]],
+            [("a", "set", 11), ("b", "delete", None)],
+        )
+
+        # 削除後の再作成で tombstone は消える
+        reg.set_value("s", "b", 3)
+        result = reg.changes("s", 0)
+        self.assertEqual(
+            [(c["key"], c["op"]) for c in result["changes"]],
+            [("a", "set"), ("b", "set")],
+        )
+        reg.close()
+
+    def test_batch_delete_ignores_missing_keys(self) -> None:
+        reg = self._setup()
+        reg.set_value("s", "a", 1)
+        reg.batch_delete("s", ["a", "ghost"])
+        result = reg.changes("s", 1)
+        self.assertEqual([(c["key"], c["op"]) for c in result["changes"]], [("a", "delete")])
+        self.assertEqual(result["current_seq"], 2)
+        reg.close()
+
+    def test_pagination(self) -> None:
+        reg = self._setup()
+        reg.batch_set("s", {f"k{i:02d}": i for i in range(25)})
+        since, seen = 0, []
+        while True:
+            result = reg.changes("s", since, limit=10)
+            seen.extend(c["key"] for c in result["changes"])
+            since = result["next_seq"]
+            if not result["has_more"]:
+                break
+        self.assertEqual(seen, [f"k{i:02d}" for i in range(25)])
+        reg.close()
+
+    def test_reset_when_since_is_ahead(self) -> None:
+        reg = self._setup()
+        reg.set_value("s", "a", 1)
+        result = reg.changes("s", 99)
+        self.assertTrue(result["reset"])
+        self.assertEqual(result["next_seq"], 0)
+        reg.close()
+
+    def test_invalid_since_seq(self) -> None:
+        reg = self._setup()
+        self.assertEqual(reg.changes("s", -1)["error_type"], "validation_error")
+        self.assertEqual(reg.changes("s", True)["error_type"], "validation_error")
+        reg.close()
+
+    def test_watch_wakes_on_write(self) -> None:
+        reg = self._setup()
+        timer = threading.Timer(0.2, lambda: reg.set_value("s", "a", 1))
+        timer.start()
+        try:
+            result = reg.watch("s", 0, timeout=5)
+        finally:
+            timer.join()
+        self.assertEqual([c["key"] for c in result["changes"]], ["a"])
+        reg.close()
+
+    def test_watch_sees_other_instance_writes(self) -> None:
+        """別インスタンス（別プロセス相当）の書き込みは再確認間隔で検出する"""
+        reg = self._setup()
+        other = self._make_registry()
+
+        def write() -> None:
+            other.set_value("s", "x", 1)
+            other.close()
+
+        timer = threading.Timer(0.2, write)
+        timer.start()
+        try:
+            result = reg.watch("s", 0, timeout=5)
+        finally:
+            timer.join()
+        self.assertEqual([c["key"] for c in result["changes"]], ["x"])
+        reg.close()
+
+    def test_watch_timeout(self) -> None:
+        reg = self._setup()
+        result = reg.watch("s", 0, timeout=0.1)
+        self.assertEqual(result["changes"], [])
+        self.assertTrue(result["timed_out"])
+        reg.close()
+
+    def test_schema_migration_from_v1(self) -> None:
+        conn = sqlite3.connect(self._db_path)
+        conn.executescript("""
+            CREATE TABLE stores (
+                store_id TEXT PRIMARY KEY, root_path TEXT NOT NULL,
+                created_at TEXT NOT NULL, created_by TEXT NOT NULL DEFAULT ''
+            );
+            CREATE TABLE store_data (
+                store_id TEXT NOT NULL REFERENCES stores(store_id) ON DELETE CASCADE,
+                key TEXT NOT NULL, value TEXT NOT NULL, value_hash TEXT NOT NULL,
+                updated_at TEXT NOT NULL, PRIMARY KEY (store_id, key)
+            );
+            INSERT INTO stores VALUES ('old', '/nonexistent', '', '');
+            INSERT INTO store_data VALUES ('old', 'b', '2', '', '');
+            INSERT INTO store_data VALUES ('old', 'a', '1', '', '');
+            PRAGMA user_version = 1;
+        """)
+        conn.commit()
+        conn.close()
+
+        reg = self._make_registry()
+        self.assertEqual(
+            reg._get_conn().execute("PRAGMA user_version").fetchone()[0], SCHEMA_VERSION,
+        )
+        self.assertEqual(reg.list_keys("old", limit=1)["total_estimate"], 2)
+        result = reg.changes("old", 0)
+        self.assertEqual([(c["seq"], c["key"]) for c in result["changes"]], [(1, "a"), (2, "b")])
+        reg.set_value("old", "c", 3)
+        self.assertEqual(reg.changes("old", 2)["changes"][0]["seq"], 3)
+        reg.close()
+
+    def test_schema_migration_resumes_partial_upgrade(self) -> None:
+        # 列追加後・user_version 更新前に中断された DB
+        conn = sqlite3.connect(self._db_path)
+        conn.executescript("""
+            CREATE TABLE stores (
+                store_id TEXT PRIMARY KEY, root_path TEXT NOT NULL,
+                created_at TEXT NOT NULL, created_by TEXT NOT NULL DEFAULT '',
+                last_seq INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE TABLE store_data (
+                store_id TEXT NOT NULL REFERENCES stores(store_id) ON DELETE CASCADE,
+                key TEXT NOT NULL, value TEXT NOT NULL, value_hash TEXT NOT NULL,
+                updated_at TEXT NOT NULL, PRIMARY KEY (store_id, key)
+            );
+            INSERT INTO stores VALUES ('old', '/nonexistent', '', '', 0);
+            INSERT INTO store_data VALUES ('old', 'a', '1', '', '');
+            PRAGMA user_version = 1;
+        """)
+        conn.commit()
+        conn.close()
+
+        reg = self._make_registry()
+        self.assertEqual(
+            reg._get_conn().execute("PRAGMA user_version").fetchone()[0], SCHEMA_VERSION,
+        )
+        self.assertEqual(reg.list_keys("old", limit=1)["total_estimate"], 1)
+        reg.close()
+
+
+# ======================================================================
+# 値キャッシュ
+# ======================================================================
+
+class TestValueCache(_TempDirMixin, TestCase):
+
+    def _setup(self, cache_bytes: int = 1024 * 1024) -> StoreRegistry:
+        reg = StoreRegistry(db_path=self._db_path, value_cache_bytes=cache_bytes)
+        reg.create_store("s", self._store_root("s"))
+        return reg
+
+    def test_repeated_get_hits_cache(self) -> None:
+        reg = self._setup()
+        reg.set_value("s", "cfg", {"a": [1, 2]})
+        for _ in range(3):
+            self.assertEqual(reg.get_value("s", "cfg")["value"], {"a": [1, 2]})
+        stats = reg.value_cache_stats()
+        self.assertEqual(stats["misses"], 1)
+        self.assertEqual(stats["hits"], 2)
+        self.assertEqual(stats["entries"], 1)
+        reg.close()
+
+    def test_returned_value_is_a_copy(self) -> None:
+        reg = self._setup()
+        reg.set_value("s", "cfg", {"a": [1]})
+        reg.get_value("s", "cfg")
+        reg.get_value("s", "cfg")["value"]["a"].append(2)
+        self.assertEqual(reg.get_value("s", "cfg")["value"], {"a": [1]})
+        reg.close()
+
+    def test_local_writes_invalidate(self) -> None:
+        reg = self._setup()
+        reg.set_value("s", "k", 1)
+        reg.get_value("s", "k")
+        reg.cas("s", "k", 1, 2)
+        self.assertEqual(reg.value_cache_stats()["entries"], 0)
+        self.assertEqual(reg.get_value("s", "k")["value"], 2)
+        reg.delete_value("s", "k")
+        self.assertEqual(reg.get_value("s", "k")["error_type"], "key_not_found")
+        reg.close()
+
+    def test_other_instance_write_is_not_served_stale(self) -> None:
+        reg = self._setup()
+        other = StoreRegistry(db_path=self._db_path, value_cache_bytes=0)
+        reg.set_value("s", "k", "old")
+        reg.get_value("s", "k")
+        other.set_value("s", "k", "new")
+        self.assertEqual(reg.get_value("s", "k")["value"], "new")
+        self.assertEqual(reg.batch_get("s", ["k"])["results"]["k"], "new")
+        other.close()
+        reg.close()
+
+    def test_batch_get_uses_cache(self) -> None:
+        reg = self._setup()
+        reg.batch_set("s", {"a": 1, "b": {"x": 2}})
+        first = reg.batch_get("s", ["a", "b", "c"])
+        second = reg.batch_get("s", ["a", "b", "c"])
+        self.assertEqual(first["results"], second["results"])
+        self.assertEqual(second["found"], 2)
+        self.assertEqual(reg.value_cache_stats()["hits"], 2)
+        reg.close()
+
+    def test_bytes_bound_evicts_lru(self) -> None:
+        reg = self._setup(cache_bytes=400)
+        for i in range(5):
+            reg.set_value("s", f"k{i}", "x" * 90)
+            reg.get_value("s", f"k{i}")
+        stats = reg.value_cache_stats()
+        self.assertLessEqual(stats["bytes"], 400)
+        self.assertGreater(stats["evictions"], 0)
+        # 追い出されたキーも正しく読める
+        self.assertEqual(reg.get_value("s", "k0")["value"], "x" * 90)
+        reg.close()
+
+    def test_disabled(self) -> None:
+        reg = self._setup(cache_bytes=0)
+        reg.set_value("s", "k", 1)
+        reg.get_value("s", "k")
+        reg.get_value("s", "k")
+        stats = reg.value_cache_stats()
+        self.assertFalse(stats["enabled"])
+        self.assertEqual((stats["hits"], stats["entries"]), (0, 0))
+        reg.close()
+
+    def test_audit_store_usage_reports_stats(self) -> None:
+        reg = self._setup()
+        reg.set_value("s", "k", 1)
+        reg.get_value("s", "k")
+        reg.get_value("s", "k")
+        usage = reg.audit_store_usage("s")
+        self.assertEqual(usage["value_cache"]["hits"], 1)
+        self.assertEqual(usage["value_cache"]["misses"], 1)
+        reg.close()
+
+    def test_store_definition_is_cached(self) -> None:
+        from unittest.mock import patch
+
+        reg = self._setup()
+        reg.set_value("s", "k", 1)
+        with patch.object(reg, "get_store", wraps=reg.get_store) as spy:
+            reg.get_value("s", "k")
+            reg.list_keys("s")
+            reg.batch_get("s", ["k"])
+            reg.cas("s", "k", 1, 2)
+        spy.assert_not_called()
+
+        reg.delete_store("s")
+        self.assertEqual(reg.get_value("s", "k")["error_type"], "store_not_found")
+        reg.close()
+
+
 # ======================================================================
 # create_store_for_pack
 # ======================================================================
@@ -551,6 +1092,10 @@ class TestNormalizeValueHash(TestCase):
         self.assertIsInstance(h, str)
         self.assertEqual(len(h), 64)
 
+    def test_matches_stored_hash(self) -> None:
+        value = {"b": [1, "あ"], "a": None}
+        self.assertEqual(_normalize_value_hash(value), _encode_value(value)[1])
+
 
 # ======================================================================
 # _validate_store_path
@@ -0,0 +1,358 @@
+"""
+test_uds_multiplex.py - UDS 永続接続・多重化のテスト
+
+対象:
+- core_runtime/uds_multiplex.py
+- core_runtime/capability_proxy.py (_PrincipalHandler の永続接続処理)
+- core_runtime/rumi_capability.py (call / call_many / AsyncCapabilityClient)
+- core_runtime/rumi_syscall.py (http_request の永続接続)
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import socket
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+from core_runtime import egress_proxy, rumi_capability, rumi_syscall
+from core_runtime.capability_proxy import _PrincipalHandler, _ThreadedUnixServer
+from core_runtime.egress_connection_pool import EgressConnectionPool
+
+
+class _FakeResponse:
+    def __init__(self, data):
+        self._data = data
+
+    def to_dict(self):
+        return self._data
+
+
+class _FakeExecutor:
+    """args.sleep 秒待ってから args を echo する executor"""
+
+    def __init__(self):
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def execute(self, principal_id, request):
+        with self.lock:
+            self.calls.append(request)
+        time.sleep(request["args"].get("sleep", 0))
+        return _FakeResponse({
+            "success": True,
+            "output": {"principal": principal_id, "args": request["args"]},
+            "error": None,
+            "error_type": None,
+            "latency_ms": 0,
+        })
+
+
+class _CountingServer(_ThreadedUnixServer):
+    def process_request(self, request, client_address):
+        self.accepted += 1
+        super().process_request(request, client_address)
+
+
+@pytest.fixture
+def short_dir():
+    # AF_UNIX のパス長制限があるため短いディレクトリを使う
+    d = tempfile.mkdtemp(prefix="rumi_mx_")
+    yield Path(d)
+    for p in Path(d).iterdir():
+        p.unlink()
+    os.rmdir(d)
+
+
+@pytest.fixture
+def cap_server(short_dir):
+    executor = _FakeExecutor()
+    srv = _CountingServer(str(short_dir / "c.sock"), _PrincipalHandler, "pack_p", executor)
+    srv.accepted = 0
+    srv.executor = executor
+    thread = threading.Thread(target=srv.serve_forever, daemon=True)
+    thread.start()
+    rumi_capability.close()
+    yield srv
+    rumi_capability.close()
+    srv.shutdown()
+    srv.server_close()
+
+
+def _sock(srv):
+    return srv.server_address
+
+
+class TestCapabilityPersistentConnection:
+
+    def test_calls_share_one_connection(self, cap_server):
+        for i in range(5):
+            result = rumi_capability.call("store.get", {"i": i}, socket_path=_sock(cap_server))
+            assert result["success"] is True
+            assert result["output"]["args"] == {"i": i}
+            assert "mux_id" not in result
+        assert cap_server.accepted == 1
+        assert all("mux_id" not in c for c in cap_server.executor.calls)
+
+    def test_concurrent_calls_are_multiplexed(self, cap_server):
+        results = {}
+
+        def worker(i):
+            results[i] = rumi_capability.call("x", {"i": i, "sleep": 0.3}, socket_path=_sock(cap_server))
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(6)]
+        start = time.monotonic()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.monotonic() - start
+
+        assert elapsed < 1.2
+        assert {i: r["output"]["args"]["i"] for i, r in results.items()} == {i: i for i in range(6)}
+        assert cap_server.accepted == 1
+
+    def test_call_many_preserves_order(self, cap_server):
+        calls = [
+            {"permission_id": "x", "args": {"i": i, "sleep": 0.3 - i * 0.05}}
+            for i in range(5)
+        ]
+        start = time.monotonic()
+        results = rumi_capability.call_many(calls, socket_path=_sock(cap_server))
+        assert time.monotonic() - start < 1.0
+        assert [r["output"]["args"]["i"] for r in results] == list(range(5))
+
+    def test_call_timeout_discards_late_response(self, cap_server):
+        conn = rumi_capability._get_connection(_sock(cap_server), 5.0)
+        mux_id, pending = conn.send({"permission_id": "x", "args": {"sleep": 0.3}})
+        result = conn.wait(mux_id, pending, 0.05)
+        assert result["error_type"] == "timeout"
+        time.sleep(0.4)
+        assert not conn.closed
+        ok = rumi_capability.call("x", {"i": 1}, socket_path=_sock(cap_server))
+        assert ok["output"]["args"] == {"i": 1}
+
+    def test_reconnects_after_idle_expiry(self, cap_server, monkeypatch):
+        rumi_capability.call("x", {}, socket_path=_sock(cap_server))
+        monkeypatch.setattr(rumi_capability, "CLIENT_IDLE_REUSE_SECONDS", 0.0)
+        rumi_capability.call("x", {}, socket_path=_sock(cap_server))
+        assert cap_server.accepted == 2
+
+    def test_reconnects_after_server_closed_connection(self, cap_server, monkeypatch):
+        monkeypatch.setenv("RUMI_CAPABILITY_CONN_IDLE_TIMEOUT", "1")
+        rumi_capability.call("x", {}, socket_path=_sock(cap_server))
+        time.sleep(1.5)
+        result = rumi_capability.call("x", {"i": 2}, socket_path=_sock(cap_server))
+        assert result["output"]["args"] == {"i": 2}
+        assert cap_server.accepted == 2
+
+    def test_legacy_single_shot_client(self, cap_server, monkeypatch):
+        monkeypatch.setenv("RUMI_CAPABILITY_PERSISTENT", "0")
+        for _ in range(2):
+            assert rumi_capability.call("x", {}, socket_path=_sock(cap_server))["success"] is True
+        assert cap_server.accepted == 2
+
+    def test_socket_not_found(self, short_dir):
+        result = rumi_capability.call("x", {}, socket_path=str(short_dir / "none.sock"))
+        assert result["error_type"] == "socket_not_found"
+        many = rumi_capability.call_many([{"permission_id": "x"}], socket_path=str(short_dir / "none.sock"))
+        assert many[0]["error_type"] == "socket_not_found"
+
+    def test_invalid_mux_id_is_protocol_error(self, cap_server):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(5)
+        sock.connect(_sock(cap_server))
+        try:
+            rumi_capability._write_length_prefixed_json(sock, {"permission_id": "x", "mux_id": True})
+            resp = rumi_capability._read_length_prefixed_json(sock, rumi_capability.MAX_RESPONSE_SIZE)
+        finally:
+            sock.close()
+        assert resp["error_type"] == "protocol_error"
+
+
+class TestAsyncCapabilityClient:
+
+    def test_gather_on_one_connection(self, cap_server):
+        async def run():
+            async with rumi_capability.AsyncCapabilityClient(_sock(cap_server)) as client:
+                start = time.monotonic()
+                results = await asyncio.gather(*(
+                    client.call("x", {"i": i, "sleep": 0.3}) for i in range(5)
+                ))
+                elapsed = time.monotonic() - start
+                many = await client.call_many([{"permission_id": "y", "args": {"i": 9}}])
+            return results, elapsed, many
+
+        results, elapsed, many = asyncio.run(run())
+        assert [r["output"]["args"]["i"] for r in results] == list(range(5))
+        assert elapsed < 1.0
+        assert many[0]["output"]["args"] == {"i": 9}
+        assert cap_server.accepted == 1
+
+    def test_connect_error(self, short_dir):
+        async def run():
+            client = rumi_capability.AsyncCapabilityClient(str(short_dir / "none.sock"))
+            try:
+                return await client.call("x")
+            finally:
+                await client.close()
+
+        assert asyncio.run(run())["error_type"] == "socket_not_found"
+
+
+class _OkHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        time.sleep(0.3)
+        body = self.path.encode()
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class TestSyscallPersistentConnection:
+
+    @pytest.fixture
+    def setup(self, short_dir, monkeypatch):
+        monkeypatch.setattr(egress_proxy, "resolve_and_check_ip", lambda host: (False, "", ["127.0.0.1"]))
+        # DI コンテナ（他のテストで差し替えられうる）を経由せずにプールを固定する
+        pool = EgressConnectionPool()
+        monkeypatch.setattr(egress_proxy, "get_egress_connection_pool", lambda: pool)
+        monkeypatch.setattr(egress_proxy, "is_egress_connection_pool_enabled", lambda: True)
+        http = ThreadingHTTPServer(("127.0.0.1", 0), _OkHandler)
+        http.daemon_threads = True
+        threading.Thread(target=http.serve_forever, daemon=True).start()
+
+        grants = MagicMock()
+        grants.check_access.return_value = SimpleNamespace(allowed=True, reason="")
+        server = egress_proxy.UDSEgressServer("pack_s", short_dir / "e.sock", grants, None)
+        accepted = []
+        orig = server._handle_client
+        server._handle_client = lambda sock: (accepted.append(1), orig(sock))
+        assert server.start()
+        rumi_syscall.close()
+        yield http, server, accepted
+        rumi_syscall.close()
+        server.stop()
+        pool.close_all()
+        http.shutdown()
+        http.server_close()
+
+    def test_concurrent_requests_share_connection(self, setup):
+        http, server, accepted = setup
+        base = f"http://mux-test.invalid:{http.server_address[1]}"
+        results = {}
+
+        def worker(i):
+            results[i] = rumi_syscall.http_request("GET", f"{base}/{i}", socket_path=str(server.socket_path))
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(5)]
+        start = time.monotonic()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert time.monotonic() - start < 1.2
+        assert {i: r["body"] for i, r in results.items()} == {i: f"/{i}" for i in range(5)}
+        assert len(accepted) == 1
+
+    def test_stream_after_persistent_requests(self, setup):
+        http, server, accepted = setup
+        base = f"http://mux-test.invalid:{http.server_address[1]}"
+        sock_path = str(server.socket_path)
+        assert rumi_syscall.http_request("GET", f"{base}/a", socket_path=sock_path)["body"] == "/a"
+        with rumi_syscall.stream("GET", f"{base}/b", socket_path=sock_path) as resp:
+            assert resp.read() == b"/b"
+        assert resp.success is True
+        assert rumi_syscall.http_request("GET", f"{base}/c", socket_path=sock_path)["body"] == "/c"
+        assert len(accepted) == 2
+
+
+class TestEgressWorkerLimit:
+    """RUMI_EGRESS_MAX_WORKERS は接続数ではなく処理中のリクエスト数に掛かる"""
+
+    @pytest.fixture
+    def server(self, short_dir, monkeypatch):
+        monkeypatch.setenv("RUMI_EGRESS_MAX_WORKERS", "2")
+        srv = egress_proxy.UDSEgressServer("pack_w", short_dir / "w.sock", MagicMock(), None)
+        srv.gate = threading.Event()
+        srv.active = []
+        srv.peak = 0
+        lock = threading.Lock()
+
+        def execute(request, stream_sink=None):
+            with lock:
+                srv.active.append(threading.current_thread().name)
+                srv.peak = max(srv.peak, len(srv.active))
+            srv.gate.wait(5)
+            with lock:
+                srv.active.pop()
+            return {"success": True, "url": request["url"]}
+
+        srv._execute = execute
+        assert srv.start()
+        yield srv
+        srv.gate.set()
+        srv.stop()
+
+    @staticmethod
+    def _connect(srv):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(5)
+        sock.connect(str(srv.socket_path))
+        return sock
+
+    @staticmethod
+    def _request(i, mux=True):
+        req = {"method": "GET", "url": f"http://example.invalid/{i}"}
+        if mux:
+            req["mux_id"] = i
+        return req
+
+    def test_idle_connections_do_not_hold_workers(self, server):
+        idle = [self._connect(server) for _ in range(4)]
+        try:
+            server.gate.set()
+            sock = self._connect(server)
+            egress_proxy.write_length_prefixed_json(sock, self._request(0, mux=False))
+            assert egress_proxy.read_length_prefixed_json(sock, 1 << 20)["success"] is True
+            sock.close()
+        finally:
+            for s in idle:
+                s.close()
+
+    def test_mux_requests_bounded_by_shared_pool(self, server):
+        socks = [self._connect(server) for _ in range(2)]
+        try:
+            for i, sock in enumerate(socks):
+                egress_proxy.write_length_prefixed_json(sock, self._request(i))
+                deadline = time.monotonic() + 5
+                while len(server.active) < i + 1 and time.monotonic() < deadline:
+                    time.sleep(0.01)
+            assert all(name.startswith("egress-pack_w") for name in server.active)
+            # 処理中が上限に達すると、どの接続の要求も pool_exhausted で即答される
+            for i, sock in enumerate(socks):
+                egress_proxy.write_length_prefixed_json(sock, self._request(10 + i))
+                busy = egress_proxy.read_length_prefixed_json(sock, 1 << 20)
+                assert busy["error_type"] == "pool_exhausted"
+                assert busy["mux_id"] == 10 + i
+            server.gate.set()
+            for i, sock in enumerate(socks):
+                assert egress_proxy.read_length_prefixed_json(sock, 1 << 20)["mux_id"] == i
+            assert server.peak == 2
+        finally:
+            for s in socks:
+                s.close()